@@ -0,0 +1,669 @@
+#!/usr/bin/env python3
+"""
+Async GitHub-Wide Plagiarism Detection
+asyncio end-to-end variant of the GitHub-wide detector: searches, tree
+listings and blob fetches run concurrently under a shared rate limiter and
+similarity scoring is offloaded to an executor
+"""
+
+import os
+import json
+import time
+import base64
+import asyncio
+import hashlib
+import argparse
+from contextlib import nullcontext
+from dataclasses import replace
+from typing import Dict, List, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from checkpoint_journal import CheckpointJournal
+from instrumentation import RunProfiler
+from events import EventStream, NDJSONEventSink
+from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector, FileInfo, RepoInfo, compare_files
+from repo_spec import format_repo_spec, split_repo_spec, repo_spec_url
+from search_cache import cached_search
+from subtree_matching import subtree_files
+
+class AsyncRateLimiter:
+    # (requests per second, burst) per GitHub rate-limit resource
+    DEFAULT_RATES = {
+        'core': (10.0, 20),
+        'search': (0.5, 5),  # search API allows 30 requests/minute
+    }
+
+    def __init__(self, rates: Dict[str, tuple] = None, max_concurrency: int = 16):
+        """
+        Initialize token buckets shared by every request of a run
+
+        Args:
+            rates: Mapping of bucket name -> (requests per second, burst size)
+            max_concurrency: Maximum HTTP requests in flight at once
+        """
+        self.rates = dict(self.DEFAULT_RATES, **(rates or {}))
+        self.tokens = {bucket: float(burst) for bucket, (_, burst) in self.rates.items()}
+        self.updated = {bucket: time.monotonic() for bucket in self.rates}
+        self.blocked_until = {bucket: 0.0 for bucket in self.rates}
+        self.remaining = {}
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self._locks = {bucket: asyncio.Lock() for bucket in self.rates}
+
+    async def acquire(self, bucket: str = 'core'):
+        """Wait until the bucket has a token (and any server-side block has passed)"""
+        rate, burst = self.rates[bucket]
+        async with self._locks[bucket]:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until[bucket]:
+                    await asyncio.sleep(self.blocked_until[bucket] - now)
+                    continue
+                self.tokens[bucket] = min(burst, self.tokens[bucket] + (now - self.updated[bucket]) * rate)
+                self.updated[bucket] = now
+                if self.tokens[bucket] >= 1:
+                    self.tokens[bucket] -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens[bucket]) / rate)
+
+    def update_from_headers(self, bucket: str, headers) -> None:
+        """Track X-RateLimit-* headers and pause the bucket when it is exhausted"""
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is None:
+            return
+        self.remaining[headers.get('X-RateLimit-Resource', bucket)] = int(remaining)
+        if int(remaining) == 0:
+            self.blocked_until[bucket] = time.monotonic() + self.retry_delay(headers)
+
+    def retry_delay(self, headers, cap: float = 60.0) -> float:
+        """Seconds to wait after a rate-limited response (Retry-After or X-RateLimit-Reset)"""
+        if headers.get('Retry-After'):
+            return min(float(headers['Retry-After']), cap)
+        if headers.get('X-RateLimit-Reset'):
+            return min(max(float(headers['X-RateLimit-Reset']) - time.time(), 0.0), cap)
+        return cap
+
+class AsyncGitHubWideDetector(GitHubWidePlagiarismDetector):
+    def __init__(self, github_token: str = None, api_base: str = None, max_concurrency: int = 16,
+                 max_repo_concurrency: int = 8, scoring_executor: str = "process",
+                 rate_limits: Dict[str, tuple] = None, **kwargs):
+        """
+        Initialize the async GitHub-wide detector
+
+        Args:
+            github_token: GitHub personal access token for API access
+            api_base: GitHub API base URL (e.g. a local fake server)
+            max_concurrency: Maximum HTTP requests in flight
+            max_repo_concurrency: Maximum candidate repositories fetched at once
+            scoring_executor: "process" (parallel CPU scoring) or "thread"
+            rate_limits: Overrides for AsyncRateLimiter.DEFAULT_RATES
+            **kwargs: Passed through to GitHubWidePlagiarismDetector
+        """
+        super().__init__(github_token=github_token, api_base=api_base, **kwargs)
+        self.max_concurrency = max_concurrency
+        self.max_repo_concurrency = max_repo_concurrency
+        self.scoring_executor = scoring_executor
+        self.rate_limits = rate_limits
+
+        # One pooled session; requests are issued from worker threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.blob_cache: Dict[str, str] = {}
+        # Downloads in flight by SHA, so concurrent fetches of a shared blob (e.g. the
+        # same file on several refs) wait for one request instead of issuing their own
+        self._blob_downloads: Dict[str, asyncio.Future] = {}
+        # FileInfo per blob SHA: a blob is hashed and measured once, whichever paths and refs hold it
+        self.blob_files: Dict[str, FileInfo] = {}
+        # Optional long-lived scoring executor (e.g. the detection service's); otherwise one per run
+        self.executor: Optional[Executor] = None
+        self.limiter = None
+        # Set by scan_refs_async() so per-ref runs reuse the tree listings of the whole scan
+        self._keep_tree_cache = False
+        # Threads walking cached_search() pages; kept apart from asyncio.to_thread's pool,
+        # which runs the HTTP requests these threads wait for
+        self._search_threads = ThreadPoolExecutor(max_workers=8, thread_name_prefix="search")
+
+    async def _request(self, url: str, params: Dict = None, bucket: str = 'core',
+                       headers: Dict = None) -> Optional[requests.Response]:
+        """GET a URL under the rate limiter, retrying once after a rate-limit response"""
+        response = None
+        for attempt in range(2):
+            await self.limiter.acquire(bucket)
+            async with self.limiter.semaphore:
+                self.metrics.incr("api_requests")
+                with self.metrics.track("http_requests_in_flight", bucket=bucket), self.metrics.timer("api_request"):
+                    response = await asyncio.to_thread(
+                        self.session.get, url, headers=dict(self.headers, **(headers or {})), params=params, timeout=30
+                    )
+            self.limiter.update_from_headers(bucket, response.headers)
+            self._record_rate_limit(response.headers, bucket)
+            if response.status_code in (403, 429) and attempt == 0:
+                delay = self.limiter.retry_delay(response.headers)
+                self.events.warning("rate_limited", f"⚠️  Rate limit hit. Waiting {delay:.0f} seconds...", wait_seconds=delay)
+                self.metrics.incr("rate_limit_waits")
+                await asyncio.sleep(delay)
+                continue
+            break
+        return response
+
+    async def _cached_search_async(self, endpoint: str, params: Dict) -> Optional[List[Dict]]:
+        """
+        Async counterpart of _cached_search()
+
+        cached_search() walks the pages on a search thread; each cache miss is
+        requested on the event loop under the search rate limit. As in the sync
+        path, an error only fails its own query.
+
+        Returns:
+            Result items, or None if the first page could not be fetched
+        """
+        loop = asyncio.get_running_loop()
+
+        def fetch_page(page_params: Dict):
+            response = asyncio.run_coroutine_threadsafe(
+                self._request(f"{self.api_base}/search/{endpoint}", page_params, bucket='search'), loop
+            ).result()
+            if response is None or response.status_code != 200:
+                status = response.status_code if response is not None else 'no response'
+                self.events.error("search_failed", f"❌ Search failed for query '{page_params['q']}': {status}",
+                                  query=page_params['q'], status=status)
+                return None
+            return response.json()
+
+        try:
+            return await loop.run_in_executor(self._search_threads, cached_search, self.search_cache, fetch_page,
+                                              endpoint, params, self.search_pages)
+        except Exception as e:
+            self.events.error("search_error", f"❌ Error searching {endpoint} for '{params['q']}': {e}",
+                              query=params['q'], error=str(e))
+            return None
+
+    async def fetch_tree_listing_async(self, repo_name: str, ref: str = None) -> List[Dict]:
+        """Recursive tree listing of a repository spec (at ref, else the spec's ref, else HEAD), cached for the run"""
+        repo_name, spec_ref = split_repo_spec(repo_name)
+        ref = ref or spec_ref or "HEAD"
+        if (repo_name, ref) in self._tree_cache:
+            return self._tree_cache[(repo_name, ref)]
+        try:
+            response = await self._request(f"{self.api_base}/repos/{repo_name}/git/trees/{ref}", {'recursive': 1})
+            tree = response.json().get('tree', []) if response is not None and response.status_code == 200 else []
+        except Exception as e:
+            self.events.error("fetch_error", f"❌ Error fetching tree for {repo_name}: {e}", repo=repo_name, error=str(e))
+            tree = []
+        self._tree_cache[(repo_name, ref)] = tree
+        return tree
+
+    async def fetch_blob_async(self, repo_name: str, sha: str) -> Optional[str]:
+        """Fetch a blob by SHA (each SHA is downloaded at most once per detector)"""
+        cached = self.blob_cache.get(sha)
+        if cached is not None:
+            self.metrics.incr("blob_cache_hits")
+            return cached
+        if sha in self._blob_downloads:
+            self.metrics.incr("blob_cache_hits")
+            return await asyncio.shield(self._blob_downloads[sha])
+        self.metrics.incr("blob_cache_misses")
+        download = asyncio.ensure_future(self._download_blob(split_repo_spec(repo_name)[0], sha))
+        self._blob_downloads[sha] = download
+        download.add_done_callback(lambda _: self._blob_downloads.pop(sha, None))
+        # Shielded so a cancelled waiter (decide-fast) does not cancel the download for the others
+        return await asyncio.shield(download)
+
+    async def _download_blob(self, repo_name: str, sha: str) -> Optional[str]:
+        try:
+            response = await self._request(f"{self.api_base}/repos/{repo_name}/git/blobs/{sha}")
+            if response is None or response.status_code != 200:
+                return None
+            data = response.json()
+            raw = base64.b64decode(data['content']) if data.get('encoding') == 'base64' else data['content'].encode()
+            content = raw.decode('utf-8', errors='ignore')
+        except Exception as e:
+            self.events.error("fetch_error", f"❌ Error fetching blob {sha} from {repo_name}: {e}",
+                              repo=repo_name, sha=sha, error=str(e))
+            return None
+        self.metrics.incr("bytes_downloaded", len(raw))
+        self.blob_cache[sha] = content
+        return content
+
+    def select_tree_blobs(self, tree: List[Dict], excluded_files: List[Dict]) -> List[Dict]:
+        """
+        Pick the blobs worth downloading from a tree listing
+
+        Vendored/build directories are recorded once and everything under them is
+        skipped; blobs are filtered by extension, path classification and size.
+        """
+        excluded_dirs = []
+        for entry in tree:
+            if entry.get('type') != 'tree' or any(entry['path'].startswith(d + '/') for d in excluded_dirs):
+                continue
+            classification = self.file_classifier.classify_dir(entry['path'])
+            if classification:
+                excluded_dirs.append(entry['path'])
+                excluded_files.append(classification.to_dict())
+
+        selected = []
+        for entry in tree:
+            if entry.get('type') != 'blob':
+                continue
+            path = entry['path']
+            if os.path.splitext(path)[1].lower() not in self.code_extensions:
+                continue
+            if any(path.startswith(d + '/') for d in excluded_dirs):
+                continue
+            classification = self.file_classifier.classify_path(path)
+            if classification:
+                excluded_files.append(classification.to_dict())
+                continue
+            if entry.get('size') is not None and entry['size'] < self.min_file_size:
+                continue
+            selected.append(entry)
+        return selected[:self.max_files_per_repo]
+
+    async def fetch_repo_contents_async(self, repo_name: str, subtrees: List[Dict] = None,
+                                        source_files: List[FileInfo] = None) -> Optional[RepoInfo]:
+        """
+        Fetch repository contents with one tree listing plus concurrent blob downloads
+
+        Args:
+            repo_name: Repository spec, "owner/repo" or "owner/repo@ref"
+            subtrees: Subtrees identical to the target's; their files are taken from
+                source_files instead of being downloaded
+            source_files: Target files backing the matched subtrees
+
+        Returns:
+            RepoInfo object containing repository data, or None on failure
+        """
+        self.events.info("fetch_start", f"📥 Fetching repository: {repo_name}", repo=repo_name)
+        tree = await self.fetch_tree_listing_async(repo_name)
+        if not tree:
+            return None
+
+        excluded_files = []
+        entries = self.select_tree_blobs(tree, excluded_files)
+
+        # Files inside identical subtrees are already known from the target
+        known = {f.path: f for subtree in subtrees or [] for f in subtree_files(subtree, source_files)}
+        downloads = [entry for entry in entries if entry['path'] not in known]
+        contents = await asyncio.gather(*(self.fetch_blob_async(repo_name, entry['sha']) for entry in downloads))
+        downloaded = {entry['path']: content for entry, content in zip(downloads, contents)}
+
+        files = []
+        for entry in entries:
+            if entry['path'] in known:
+                files.append(known[entry['path']])
+                continue
+            content = downloaded[entry['path']]
+            if not content:
+                continue
+            classification = self.file_classifier.classify_content(entry['path'], content)
+            if classification:
+                excluded_files.append(classification.to_dict())
+            elif len(content) >= self.min_file_size:
+                file_info = self.blob_files.get(entry['sha'])
+                if file_info is None:
+                    file_info = FileInfo(
+                        path=entry['path'],
+                        content=content,
+                        hash=hashlib.md5(content.encode()).hexdigest(),
+                        size=len(content),
+                        lines=len(content.splitlines())
+                    )
+                    self.blob_files[entry['sha']] = file_info
+                files.append(replace(file_info, path=entry['path']))
+
+        return RepoInfo(
+            url=repo_spec_url(repo_name),
+            name=repo_name,
+            files=files,
+            total_files=len(files),
+            total_lines=sum(f.lines for f in files),
+            excluded_files=excluded_files
+        )
+
+    async def _fetch_checkpointed_async(self, repo_name: str, subtrees: List[Dict] = None,
+                                        source_files: List[FileInfo] = None) -> Optional[RepoInfo]:
+        """fetch_repo_contents_async() that replays journaled fetches and journals new ones"""
+        repo_info = self._load_checkpointed_repo(repo_name)
+        if repo_info:
+            self.metrics.incr("repos_from_journal")
+            return repo_info
+        repo_info = self._load_cached_repo(repo_name)
+        if repo_info:
+            return repo_info
+        with self.metrics.track("fetches_in_flight"), self.metrics.timer("fetch"):
+            repo_info = await self.fetch_repo_contents_async(repo_name, subtrees, source_files)
+        self._count_fetch(repo_info)
+        self._store_fetched_repo(repo_info)
+        return repo_info
+
+    async def search_github_code_async(self, target_info: RepoInfo, target_language: str = None) -> List[Dict]:
+        """Run every planned code-search query concurrently and merge the hits per repository"""
+        planned = self.code_search_planner.plan(target_info, target_language)
+        self.events.info("code_search_planned", f"🧬 Planned {len(planned)} code-search queries from rare snippets",
+                         queries=len(planned))
+        responses = await asyncio.gather(
+            *(self._cached_search_async("code", {'q': plan['query'], 'per_page': 30}) for plan in planned)
+        )
+
+        candidates = {}
+        for plan, items in zip(planned, responses):
+            if items is not None:
+                self._merge_code_hits(candidates, plan, items)
+        return list(candidates.values())
+
+    async def search_github_repositories_async(self, keywords: List[str], target_language: str = None,
+                                               target_info: RepoInfo = None,
+                                               seed_candidates: List[Dict] = None) -> List[Dict]:
+        """Concurrent counterpart of search_github_repositories(), with concurrent tree-overlap checks"""
+        self.events.info("search_start", f"🔍 Searching GitHub with keywords: {', '.join(keywords[:5])}...",
+                         keywords=keywords)
+        unique_repos = {candidate['name']: candidate for candidate in seed_candidates or []}
+
+        queries = self._build_search_queries(keywords, target_language, bool(unique_repos))
+        responses = await asyncio.gather(
+            *(self._cached_search_async("repositories", self._repository_search_params(query)) for query in queries)
+        )
+        # Merge in query order so results do not depend on completion order
+        for query, repos in zip(queries, responses):
+            if repos is not None:
+                self._merge_repo_hits(unique_repos, query, repos)
+
+        # Prefetch tree listings for the metadata front-runners concurrently, then rank with them
+        trees = {}
+        if target_info:
+            target_name = split_repo_spec(target_info.name)[0].lower()
+            prelim = self.candidate_ranker.rank(
+                [dict(repo) for repo in unique_repos.values() if repo['name'].lower() != target_name],
+                keywords, target_language
+            )
+            names = [repo['name'] for repo in prelim[:self.candidate_ranker.max_tree_checks]]
+            listings = await asyncio.gather(*(self.fetch_tree_listing_async(name) for name in names))
+            trees = {
+                name: [entry['path'] for entry in listing if entry.get('type') == 'blob']
+                for name, listing in zip(names, listings)
+            }
+
+        return self._rank_candidates(unique_repos, keywords, target_language, target_info,
+                                     trees.get if target_info else None)
+
+    def _make_executor(self) -> Executor:
+        if self.scoring_executor == "process":
+            return ProcessPoolExecutor()
+        return ThreadPoolExecutor()
+
+    async def detect_plagiarism_github_wide_async(self, target_repo: str, decide_fast: bool = False) -> Dict:
+        """
+        Detect plagiarism across GitHub with concurrent I/O and offloaded scoring
+
+        Produces the same results structure as detect_plagiarism_github_wide().
+
+        Args:
+            target_repo: Repository URL to check for plagiarism
+            decide_fast: Triage mode - cancel outstanding fetches once the verdict is CRITICAL
+
+        Returns:
+            Dictionary containing plagiarism analysis results
+        """
+        self.events.info("run_start", f"🔍 Starting async GitHub-wide plagiarism detection for: {target_repo}",
+                         target_repo=target_repo)
+        self.metrics.reset()
+        self.limiter = AsyncRateLimiter(self.rate_limits, max_concurrency=self.max_concurrency)
+        if not self._keep_tree_cache:
+            self._tree_cache = {}
+
+        if self.journal:
+            self.journal.start_run(target_repo, decide_fast=decide_fast)
+
+        target_repo_name = self.get_repo_spec(target_repo)
+        target_info = await self._fetch_checkpointed_async(target_repo_name)
+        if not target_info:
+            return {"error": "Failed to fetch target repository"}
+        self.events.info("target_fetched", f"✅ Target repo: {target_info.total_files} files, {target_info.total_lines} lines",
+                         repo=target_repo_name, files=target_info.total_files, lines=target_info.total_lines)
+
+        journaled_search = self.journal.search(target_repo_name) if self.journal else None
+        if journaled_search:
+            keywords = journaled_search['keywords']
+            primary_language = journaled_search['primary_language']
+            candidate_repos = journaled_search['candidates']
+            self.events.info("journal_replay", f"♻️  Loaded {len(candidate_repos)} search candidates from checkpoint journal",
+                             candidates=len(candidate_repos))
+        else:
+            keywords = self.extract_search_keywords(target_info)
+            self.events.info("keywords", f"🔑 Extracted keywords: {', '.join(keywords)}", keywords=keywords)
+            primary_language = self.detect_primary_language(target_info)
+            self.events.info("language", f"🔤 Detected primary language: {primary_language or 'Unknown'}",
+                             language=primary_language)
+
+            with self.metrics.timer("search"):
+                code_candidates = []
+                if self.use_code_search and self.github_token:
+                    code_candidates = await self.search_github_code_async(target_info, primary_language)
+                candidate_repos = await self.search_github_repositories_async(
+                    keywords, primary_language, target_info=target_info, seed_candidates=code_candidates
+                )
+            if self.journal:
+                self.journal.record_search(target_repo_name, keywords, primary_language, candidate_repos)
+        self.df_table.add_repo(target_info)
+        history = await asyncio.to_thread(self.analyze_target_history, target_repo_name)
+
+        results = self._new_results(target_repo, target_repo_name, target_info, primary_language,
+                                    keywords, candidate_repos, history)
+        self.events.info("candidates", f"📋 Analyzing {len(candidate_repos)} candidate repositories concurrently...",
+                         candidates=len(candidate_repos))
+
+        loop = asyncio.get_running_loop()
+        repo_slots = asyncio.Semaphore(self.max_repo_concurrency)
+        rank_of = {candidate['name']: i for i, candidate in enumerate(candidate_repos)}
+
+        with nullcontext(self.executor) if self.executor else self._make_executor() as executor:
+            async def process(candidate: Dict):
+                subtrees = []
+                if self.subtree_matching:
+                    target_tree, comparison_tree = await asyncio.gather(
+                        self.fetch_tree_listing_async(target_repo_name),
+                        self.fetch_tree_listing_async(candidate['name'])
+                    )
+                    subtrees = self.match_candidate_subtrees(target_tree, comparison_tree, candidate['name'])
+                async with repo_slots:
+                    comparison_info = await self._fetch_checkpointed_async(candidate['name'], subtrees,
+                                                                          target_info.files)
+                if not comparison_info:
+                    self.events.warning("fetch_failed", f"❌ Failed to fetch: {candidate['name']}", repo=candidate['name'])
+                    return
+                # Ingest runs on the event loop thread, so results are never mutated concurrently
+                identical_matches = self._ingest_candidate(candidate, comparison_info, results)
+                files_to_score = [] if decide_fast and self._verdict_decided(results) else target_info.files
+                scored = self.journal.comparison(candidate['name']) if self.journal else None
+                if scored is None:
+                    # Pool workers cannot report into self.metrics, so only the wall time is recorded here
+                    with self.metrics.timer("score"):
+                        scored = await loop.run_in_executor(
+                            executor, compare_files, files_to_score, comparison_info.files,
+                            self.similarity_threshold, None, subtrees
+                        )
+                    self.metrics.incr("file_pairs_compared", scored[2])
+                    if self.journal:
+                        self.journal.record_comparison(candidate['name'], scored)
+                self._record_comparison(candidate, comparison_info, identical_matches, scored, results, subtrees)
+
+            tasks = [
+                asyncio.create_task(process(candidate))
+                for candidate in candidate_repos
+                if candidate['name'].lower() != split_repo_spec(target_repo_name)[0].lower()
+            ]
+            candidates_skipped = 0
+            for done, finished in enumerate(asyncio.as_completed(tasks), 1):
+                await finished
+                self.events.progress("compare", done, len(tasks))
+                if decide_fast and self._verdict_decided(results):
+                    pending = [task for task in tasks if not task.done()]
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    candidates_skipped = len(pending)
+                    if pending:
+                        self.events.info("decide_fast_stop", f"\n⏹️  Risk verdict decided (CRITICAL) - cancelled {len(pending)} outstanding candidates",
+                                         skipped=len(pending))
+                    break
+
+        # Completion order is nondeterministic; report in candidate rank order
+        results["comparisons"].sort(key=lambda c: rank_of.get(c['repo'], len(rank_of)))
+        results["identical_files"].sort(key=lambda m: rank_of.get(m['repo'], len(rank_of)))
+        results["suspicious_matches"].sort(key=lambda m: rank_of.get(m['repo'], len(rank_of)))
+
+        return self._finalize_results(results, candidate_repos, decide_fast, candidates_skipped)
+
+    def detect_plagiarism_github_wide(self, target_repo: str, decide_fast: bool = False) -> Dict:
+        """Synchronous entry point that runs the async flow to completion"""
+        return asyncio.run(self.detect_plagiarism_github_wide_async(target_repo, decide_fast=decide_fast))
+
+    async def scan_refs_async(self, target_repo: str, refs: List[str], decide_fast: bool = False) -> Dict:
+        """
+        Scan several refs (branches, tags or commits) of one repository in one pass
+
+        All refs are fetched concurrently up front; a blob shared between refs is
+        downloaded and fingerprinted once, and candidate repositories are fetched
+        once for all refs.
+
+        Args:
+            target_repo: Repository URL or spec (a ref in it is replaced by refs)
+            refs: Refs to scan
+            decide_fast: Triage mode for every per-ref run
+
+        Returns:
+            {"repo", "refs": {ref: results}, "blobs": {"total", "unique"}, "summary": {ref: risk}}
+        """
+        repo_name = split_repo_spec(self.get_repo_spec(target_repo))[0]
+        specs = {ref: format_repo_spec(repo_name, ref) for ref in refs}
+        owns_cache = self.repo_cache is None
+        if owns_cache:
+            self.repo_cache = {}
+        self.limiter = AsyncRateLimiter(self.rate_limits, max_concurrency=self.max_concurrency)
+        self._tree_cache = {}
+        self._keep_tree_cache = True
+        try:
+            self.events.info("refs_prefetch", f"🌿 Fetching {len(specs)} refs of {repo_name}", refs=list(specs))
+            trees = await asyncio.gather(*(self.fetch_tree_listing_async(spec) for spec in specs.values()))
+            fetched = await asyncio.gather(*(self._fetch_checkpointed_async(spec) for spec in specs.values()))
+            blob_refs = [
+                {entry['sha'] for entry in self.select_tree_blobs(tree, [])}
+                for tree, repo_info in zip(trees, fetched) if repo_info
+            ]
+            blobs = {"total": sum(len(shas) for shas in blob_refs),
+                     "unique": len(set().union(*blob_refs)) if blob_refs else 0}
+
+            results = {}
+            for ref, spec in specs.items():
+                results[ref] = await self.detect_plagiarism_github_wide_async(spec, decide_fast=decide_fast)
+        finally:
+            self._keep_tree_cache = False
+            if owns_cache:
+                self.repo_cache = None
+
+        return {
+            "repo": repo_name,
+            "refs": results,
+            "blobs": blobs,
+            "summary": {ref: r.get("summary", {}).get("plagiarism_risk", "ERROR") for ref, r in results.items()},
+        }
+
+    def scan_refs(self, target_repo: str, refs: List[str], decide_fast: bool = False) -> Dict:
+        """Synchronous entry point for scan_refs_async()"""
+        return asyncio.run(self.scan_refs_async(target_repo, refs, decide_fast=decide_fast))
+
+def main():
+    """Main function to run async GitHub-wide plagiarism detection"""
+    parser = argparse.ArgumentParser(description="Async GitHub-wide plagiarism detection")
+    parser.add_argument("target_repo", nargs="?",
+                        default="https://github.com/ka-reem/agenthacks-25/commits/stolen_rewritten",
+                        help="Repository URL to check for plagiarism")
+    parser.add_argument("--decide-fast", action="store_true",
+                        help="Triage mode: stop fetching once the risk verdict is decided")
+    parser.add_argument("--api-base", default=None, help="GitHub API base URL (e.g. a local fake server)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum HTTP requests in flight")
+    parser.add_argument("--executor", choices=["process", "thread"], default="process",
+                        help="Executor used for similarity scoring")
+    parser.add_argument("--journal", default="github_wide_checkpoint.jsonl",
+                        help="Checkpoint journal recording completed fetches and comparisons")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume an interrupted run from the checkpoint journal")
+    parser.add_argument("--profile", default=None, metavar="FILE",
+                        help="Capture cProfile hot spots and tracemalloc allocations of the run to FILE")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Only show warnings, errors and a periodic progress line")
+    parser.add_argument("--events", default=None, metavar="FILE",
+                        help="Append structured run events to this NDJSON file")
+    parser.add_argument("--history", action="store_true",
+                        help="Also flag rewritten or forged commit history of the target")
+    parser.add_argument("--no-subtree-match", action="store_true",
+                        help="Skip the tree-SHA pre-pass that reports wholesale-copied directories")
+    parser.add_argument("--refs", nargs="+", default=None, metavar="REF",
+                        help="Scan these branches, tags or commits of the target in one pass")
+    args = parser.parse_args()
+
+    print("🚀 Async GitHub-Wide Plagiarism Detection Tool")
+    print("=" * 80)
+
+    detector = AsyncGitHubWideDetector(
+        github_token=os.getenv('GITHUB_TOKEN'),
+        api_base=args.api_base,
+        max_concurrency=args.concurrency,
+        scoring_executor=args.executor,
+        df_table_path="corpus_df.json",
+        search_cache_path="search_cache.sqlite"
+    )
+    # A journal run records one target, so multi-ref scans run unjournaled
+    detector.journal = CheckpointJournal(args.journal, resume=args.resume) if not args.refs else None
+    detector.history_forensics = args.history
+    detector.subtree_matching = not args.no_subtree_match
+    detector.events = EventStream(quiet=args.quiet)
+    event_sink = detector.events.add_sink(NDJSONEventSink(args.events)) if args.events else None
+
+    try:
+        started = time.time()
+        if args.refs:
+            scan = detector.scan_refs(args.target_repo, args.refs, decide_fast=args.decide_fast)
+            json_file = f"github_wide_refs_{time.strftime('%Y%m%d_%H%M%S')}.json"
+            with open(json_file, 'w') as f:
+                json.dump(scan, f, indent=2)
+            print(f"\n🌿 {scan['repo']}: {scan['blobs']['unique']} unique of {scan['blobs']['total']} blobs across {len(args.refs)} refs")
+            for ref, risk in scan['summary'].items():
+                print(f"   {ref}: {risk}")
+            print(f"📄 JSON results saved to: {json_file}")
+            print(f"\n⏱️  Completed in {time.time() - started:.1f}s")
+            return
+        with RunProfiler() if args.profile else nullcontext() as profiler:
+            results = detector.detect_plagiarism_github_wide(args.target_repo, decide_fast=args.decide_fast)
+        if profiler:
+            profiler.dump(args.profile)
+        if "error" in results:
+            print(f"❌ {results['error']}")
+            return
+
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        detector.generate_github_wide_report(results, f"github_wide_plagiarism_report_{timestamp}.txt")
+        results["metrics"] = detector.metrics.snapshot()  # now including the report stage
+        json_file = f"github_wide_results_{timestamp}.json"
+        with open(json_file, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 JSON results saved to: {json_file}")
+        print(f"\n⏱️  Completed in {time.time() - started:.1f}s - Risk Level: {results['summary']['plagiarism_risk']}")
+
+    except Exception as e:
+        print(f"❌ Error during async GitHub-wide plagiarism detection: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        if detector.journal:
+            detector.journal.close()
+        if event_sink:
+            event_sink.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Batch Plagiarism Check
+Checks many target repositories (e.g. a hackathon gallery) in one run:
+every repository is fetched once, the content index is built once, and all
+targets are scored against the shared comparison set and against each other
+(only target pairs that share fingerprints are compared file by file)
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+from typing import Dict, List, Tuple
+
+from content_index import ContentHashIndex
+from collusion_clustering import FingerprintIndex, cluster_edges
+from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector, RepoInfo, compare_files
+from repo_spec import parse_repo_spec, format_repo_spec, split_repo_spec, repo_spec_url
+
+# Any GitHub URL found in a line (plain lists, CSV exports, markdown), including /tree/<ref> or @ref
+GITHUB_REPO_PATTERN = re.compile(r'github\.com/[^\s,;"\'<>()\[\]]+', re.IGNORECASE)
+
+# A line holding only an "owner/repo" or "owner/repo@ref" spec
+REPO_SPEC_LINE = re.compile(r'^[\w.-]+/[\w.-]+(?:@\S+)?$')
+
+def load_targets(path: str) -> Tuple[List[str], List[str]]:
+    """
+    Read target repositories from a list file or a devpost CSV export
+
+    Every GitHub repository URL found on a line, and every line holding just an
+    "owner/repo@ref" spec, is a target at the ref it names (duplicates dropped,
+    order kept); lines without one (e.g. devpost gallery URLs) are returned as skipped.
+
+    Args:
+        path: Text or CSV file
+
+    Returns:
+        (target repo URLs, with /tree/<ref> when a ref was given, skipped lines)
+    """
+    targets = []
+    skipped = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            found = GITHUB_REPO_PATTERN.findall(line) or REPO_SPEC_LINE.findall(line)
+            specs = []
+            for source in found:
+                try:
+                    specs.append(format_repo_spec(*parse_repo_spec(source)))
+                except ValueError:
+                    continue
+            if not specs:
+                skipped.append(line)
+                continue
+            for spec in specs:
+                if spec.lower() not in seen:
+                    seen.add(spec.lower())
+                    targets.append(repo_spec_url(spec))
+    return targets, skipped
+
+def mirror_scored(scored: Tuple[List[Dict], float, int]) -> Tuple[List[Dict], float, int]:
+    """Swap target/comparison sides of a compare_files() result"""
+    matches, total_similarity, comparisons_made = scored
+    mirrored = [
+        dict(match,
+             target_file=match['comparison_file'], comparison_file=match['target_file'],
+             target_lines=match['comparison_lines'], comparison_lines=match['target_lines'])
+        for match in matches
+    ]
+    return mirrored, total_similarity, comparisons_made
+
+class BatchPlagiarismChecker:
+    def __init__(self, detector: GitHubWidePlagiarismDetector = None, output_dir: str = "batch_results",
+                 cluster_threshold: float = 0.3, search: bool = True):
+        """
+        Initialize the batch checker
+
+        Args:
+            detector: Detector providing fetch, search and scoring (a default one is created)
+            output_dir: Directory receiving one results file per target plus the summary
+            cluster_threshold: Minimum pair similarity for two targets to share a cluster
+            search: Search GitHub for comparison repositories (False only checks targets
+                against each other)
+        """
+        self.detector = detector or GitHubWidePlagiarismDetector()
+        self.output_dir = output_dir
+        self.cluster_threshold = cluster_threshold
+        self.search = search
+        self.repo_cache: Dict[str, RepoInfo] = {}
+        self.content_index = ContentHashIndex()
+        self._pair_scores: Dict[Tuple[str, str], Tuple[List[Dict], float, int]] = {}
+
+    def fetch_repo(self, repo_name: str) -> RepoInfo:
+        """Fetch a repository at most once per batch"""
+        key = repo_name.lower()
+        if key not in self.repo_cache:
+            self.repo_cache[key] = self.detector.fetch_repo_contents(repo_name)
+        return self.repo_cache[key]
+
+    def score_pair(self, target_info: RepoInfo, comparison_info: RepoInfo) -> Tuple[List[Dict], float, int]:
+        """compare_files() for a pair, computed once per unordered pair of repositories"""
+        key = (target_info.name.lower(), comparison_info.name.lower())
+        if key in self._pair_scores:
+            return self._pair_scores[key]
+        reverse = (key[1], key[0])
+        if reverse in self._pair_scores:
+            return mirror_scored(self._pair_scores[reverse])
+        with self.detector.metrics.timer("score"):
+            scored = compare_files(target_info.files, comparison_info.files, self.detector.similarity_threshold,
+                                   self.detector.metrics)
+        self._pair_scores[key] = scored
+        return scored
+
+    def run(self, target_repos: List[str]) -> Dict:
+        """
+        Check every target against the shared comparison set and against each other
+
+        Args:
+            target_repos: Target repository URLs
+
+        Returns:
+            Batch summary (per-target verdicts, target pair similarities, clusters)
+        """
+        detector = self.detector
+        started = time.time()
+        print(f"📦 Batch check of {len(target_repos)} target repositories")
+
+        # 1. Fetch every target once
+        targets = []
+        for target_repo in target_repos:
+            target_name = detector.get_repo_spec(target_repo)
+            target_info = self.fetch_repo(target_name)
+            if not target_info:
+                print(f"❌ Failed to fetch target: {target_name}")
+                continue
+            targets.append((target_repo, target_name, target_info))
+        target_names = {split_repo_spec(name)[0].lower() for _, name, _ in targets}
+
+        # 2. Search per target; the union of candidates is the shared comparison set
+        plans = []
+        shared_candidates: Dict[str, Dict] = {}
+        for target_repo, target_name, target_info in targets:
+            keywords = detector.extract_search_keywords(target_info)
+            language = detector.detect_primary_language(target_info)
+            candidates = []
+            if self.search:
+                code_candidates = []
+                if detector.use_code_search and detector.github_token:
+                    code_candidates = detector.search_github_code(target_info, language)
+                candidates = [
+                    candidate for candidate in detector.search_github_repositories(
+                        keywords, language, target_info=target_info, seed_candidates=code_candidates)
+                    if candidate['name'].lower() not in target_names
+                ]
+            for candidate in candidates:
+                shared_candidates.setdefault(candidate['name'].lower(), candidate)
+            plans.append((target_repo, target_name, target_info, language, keywords, candidates))
+        print(f"📋 Shared comparison set: {len(shared_candidates)} repositories for {len(targets)} targets")
+
+        # 3. Fetch the shared comparison set once and build one content index over everything
+        for _, _, target_info in targets:
+            self.content_index.add_repo(target_info)
+            detector.df_table.add_repo(target_info)
+        for key, candidate in shared_candidates.items():
+            comparison_info = self.fetch_repo(candidate['name'])
+            if comparison_info:
+                self.content_index.add_repo(comparison_info, candidate['url'], candidate['stars'])
+                detector.df_table.add_repo(comparison_info)
+        print(f"🗂️  Content index: {self.content_index.stats()}")
+
+        # 4. Pair targets through the fingerprint index instead of comparing all N² pairs
+        fingerprint_index = FingerprintIndex()
+        fingerprint_index.add_repos([info for _, _, info in targets])
+        pairs = fingerprint_index.similarity_graph(threshold=0.0, min_shared=1)
+        peers_of = {}
+        for pair in pairs:
+            a, b = pair["repos"]
+            peers_of.setdefault(a.lower(), []).append(b)
+            peers_of.setdefault(b.lower(), []).append(a)
+        print(f"🕸️  {len(pairs)} target pairs share fingerprints")
+
+        # 5. Score each target against its candidates and the targets it shares code with;
+        # every target's results carry only its own metrics, the shared phases go in the summary
+        shared_metrics = detector.metrics.snapshot()
+        os.makedirs(self.output_dir, exist_ok=True)
+        target_summaries = []
+        for target_repo, target_name, target_info, language, keywords, candidates in plans:
+            peers = [
+                {'name': peer_info.name, 'url': peer_info.url, 'stars': 0, 'language': '',
+                 'description': 'batch target', 'match_score': 0}
+                for peer_info in (self.fetch_repo(name) for name in peers_of.get(target_info.name.lower(), []))
+            ]
+            comparisons = candidates + peers
+            results = self.check_target(target_repo, target_name, target_info, language, keywords, comparisons)
+            results_file = os.path.join(self.output_dir, f"{target_name.replace('/', '__').replace('@', '--')}.json")
+            with open(results_file, 'w') as f:
+                json.dump(results, f, indent=2)
+            target_summaries.append({
+                "target": target_name,
+                "results_file": results_file,
+                "plagiarism_risk": results["summary"]["plagiarism_risk"],
+                "identical_files": results["summary"]["total_identical_files"],
+                "suspicious_matches": results["summary"]["total_suspicious_matches"]
+            })
+
+        summary = {
+            "targets": target_summaries,
+            "comparison_repositories": len(shared_candidates),
+            "target_pairs": pairs,
+            "clusters": cluster_edges([info.name for _, _, info in targets], pairs, self.cluster_threshold),
+            "cluster_threshold": self.cluster_threshold,
+            "metrics": shared_metrics,
+            "elapsed_seconds": round(time.time() - started, 2)
+        }
+        with open(os.path.join(self.output_dir, "batch_summary.json"), 'w') as f:
+            json.dump(summary, f, indent=2)
+        detector.df_table.save()
+        return summary
+
+    def check_target(self, target_repo: str, target_name: str, target_info: RepoInfo, language: str,
+                     keywords: List[str], comparisons: List[Dict]) -> Dict:
+        """Build one target's results (same structure as a single-target run) from the shared data"""
+        detector = self.detector
+        detector.metrics.reset()
+        results = detector._new_results(target_repo, target_name, target_info, language, keywords, comparisons)
+
+        duplicates = {}
+        for target_file, location in self.content_index.find_duplicates(target_info):
+            duplicates.setdefault(location.repo.lower(), []).append((target_file, location))
+
+        for candidate in comparisons:
+            comparison_info = self.fetch_repo(candidate['name'])
+            if not comparison_info:
+                continue
+            for entry in comparison_info.excluded_files:
+                detector._add_result(results, "excluded_files", dict(entry, repo=candidate['name']))
+            identical_matches = [
+                detector._report_identical(candidate, target_file, location, results)
+                for target_file, location in duplicates.get(candidate['name'].lower(), [])
+            ]
+            scored = self.score_pair(target_info, comparison_info)
+            detector.metrics.incr("file_pairs_compared", scored[2])
+            detector._record_comparison(candidate, comparison_info, identical_matches, scored, results)
+
+        # The document-frequency table is saved once, after every target
+        return detector._finalize_results(results, comparisons, False, 0, save_df_table=False)
+
+def main():
+    """Run a batch plagiarism check over a list of target repositories"""
+    parser = argparse.ArgumentParser(description="Check many repositories against a shared corpus in one run")
+    parser.add_argument("targets_file", nargs="?", default="wins.txt",
+                        help="File with one repository URL per line, or a devpost CSV export")
+    parser.add_argument("--output-dir", default="batch_results", help="Directory for per-target results")
+    parser.add_argument("--cluster-threshold", type=float, default=0.3,
+                        help="Minimum pair similarity for two targets to be clustered")
+    parser.add_argument("--no-search", action="store_true",
+                        help="Only compare the targets against each other")
+    args = parser.parse_args()
+
+    print("🚀 Batch Plagiarism Check")
+    print("=" * 80)
+
+    targets, skipped = load_targets(args.targets_file)
+    if skipped:
+        print(f"⚠️  Skipped {len(skipped)} lines without a GitHub repository URL (e.g. {skipped[0]})")
+    if not targets:
+        print(f"❌ No GitHub repositories found in {args.targets_file}")
+        return
+
+    detector = GitHubWidePlagiarismDetector(github_token=os.getenv('GITHUB_TOKEN'), df_table_path="corpus_df.json",
+                                            search_cache_path="search_cache.sqlite")
+    checker = BatchPlagiarismChecker(detector, output_dir=args.output_dir,
+                                     cluster_threshold=args.cluster_threshold, search=not args.no_search)
+    summary = checker.run(targets)
+
+    print(f"\n📊 BATCH SUMMARY ({summary['elapsed_seconds']}s)")
+    print("=" * 50)
+    for target in summary["targets"]:
+        print(f"{target['plagiarism_risk']:<8} {target['target']} "
+              f"({target['identical_files']} identical, {target['suspicious_matches']} suspicious)")
+    if summary["clusters"]:
+        print("\n🕸️  Clusters of related submissions:")
+        for cluster in summary["clusters"]:
+            print(f"   - {', '.join(cluster['members'])} (max similarity {cluster['max_similarity']:.2f})")
+    print(f"\n📄 Results saved to: {args.output_dir}/")
+
+if __name__ == "__main__":
+    main()
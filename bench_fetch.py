@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Fetch-Layer Benchmark
+Times the repository fetch strategies against the local fake GitHub server
+so I/O changes can be measured offline and compared run to run
+"""
+
+import os
+import io
+import json
+import time
+import random
+import asyncio
+import tarfile
+import argparse
+import tempfile
+from typing import Dict
+
+import requests
+
+from fake_github_server import FakeGitHubServer
+from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector
+from async_github_detector import AsyncGitHubWideDetector, AsyncRateLimiter
+
+def build_fixtures(root: str, repos: int = 5, files: int = 15, seed: int = 7) -> str:
+    """
+    Write synthetic fixture repositories (nested directories of Python files)
+
+    Args:
+        root: Directory to create <owner>/<repo> fixtures under
+        repos: Number of repositories
+        files: Code files per repository
+        seed: Random seed so runs are comparable
+
+    Returns:
+        The fixture root
+    """
+    rng = random.Random(seed)
+    words = ['dispatch', 'emergency', 'route', 'caller', 'unit', 'incident', 'queue', 'priority', 'status', 'agent']
+    for r in range(repos):
+        for f in range(files):
+            directory = os.path.join(root, 'bench', f'repo{r}', 'src', f'pkg{f % 3}')
+            os.makedirs(directory, exist_ok=True)
+            body = '\n'.join(
+                f"def {rng.choice(words)}_{rng.choice(words)}_{i}(value):\n    return value * {rng.randint(1, 99)}\n"
+                for i in range(20)
+            )
+            with open(os.path.join(directory, f'module_{f}.py'), 'w') as out:
+                out.write(body)
+    return root
+
+def bench_contents_walk(server: FakeGitHubServer, names):
+    """Sync detector: recursive contents API walk plus one raw download per file"""
+    detector = GitHubWidePlagiarismDetector(api_base=server.api_base)
+    for name in names:
+        detector.fetch_repo_contents(name)
+
+def bench_trees_blobs(server: FakeGitHubServer, names):
+    """Async detector: one recursive tree listing per repo plus concurrent blob downloads"""
+    detector = AsyncGitHubWideDetector(api_base=server.api_base)
+
+    async def run():
+        detector.limiter = AsyncRateLimiter(rates={'core': (1000.0, 1000)}, max_concurrency=detector.max_concurrency)
+        await asyncio.gather(*(detector.fetch_repo_contents_async(name) for name in names))
+    asyncio.run(run())
+
+def bench_tarball(server: FakeGitHubServer, names):
+    """One archive download per repo, unpacked in memory"""
+    for name in names:
+        response = requests.get(f"{server.api_base}/repos/{name}/tarball")
+        with tarfile.open(fileobj=io.BytesIO(response.content), mode='r:gz') as tar:
+            for member in tar.getmembers():
+                tar.extractfile(member).read()
+
+STRATEGIES = {
+    'contents_walk': bench_contents_walk,
+    'trees_blobs_async': bench_trees_blobs,
+    'tarball': bench_tarball,
+}
+
+def run_benchmarks(fixture_root: str, latency: float, strategies=None) -> Dict[str, Dict]:
+    """
+    Run each fetch strategy against a fresh fake server
+
+    Returns:
+        strategy -> {'seconds', 'requests', 'requests_by_kind'}
+    """
+    results = {}
+    for name in strategies or STRATEGIES:
+        with FakeGitHubServer(fixture_root, latency=latency) as server:
+            repo_names = [repo.full_name for repo in server.repos.values()]
+            started = time.perf_counter()
+            STRATEGIES[name](server, repo_names)
+            elapsed = time.perf_counter() - started
+            results[name] = {
+                'seconds': round(elapsed, 3),
+                'requests': len(server.request_log),
+                'requests_by_kind': server.request_counts()
+            }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark repository fetch strategies offline")
+    parser.add_argument("--fixtures", help="Existing fixture root (default: generate synthetic repos)")
+    parser.add_argument("--repos", type=int, default=5, help="Synthetic repositories to generate")
+    parser.add_argument("--files", type=int, default=15, help="Files per synthetic repository")
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated seconds per request")
+    parser.add_argument("--strategy", action="append", choices=sorted(STRATEGIES), help="Strategies to run")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture_root = args.fixtures or build_fixtures(tmp, args.repos, args.files)
+        results = run_benchmarks(fixture_root, args.latency, args.strategy)
+
+    print(f"\n📊 Fetch benchmark (latency {args.latency * 1000:.0f} ms/request)")
+    print("=" * 60)
+    for name, result in results.items():
+        print(f"{name:<20} {result['seconds']:>8.3f}s {result['requests']:>6} requests")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Results saved to: {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Blob Provenance Timeline
+Finds when an original's code entered a suspected copy by intersecting blob
+SHAs instead of checking out revisions: the original's blobs come from one
+`git ls-tree` (or the API tree listing), the copy's history is replayed from
+a single streamed `git log --raw`, and per-commit coverage of the original is
+updated incrementally from the changed blobs
+"""
+
+import os
+import json
+import time
+import argparse
+import subprocess
+from collections import Counter
+from typing import Dict, Iterator, List, Set, Tuple
+
+# The empty file is shared by every repository and says nothing about provenance
+EMPTY_BLOB_SHA = "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391"
+
+ZERO_SHA = "0" * 40
+
+# Coverage milestones reported in the timeline
+MILESTONES = (0.5, 0.95)
+
+def local_blob_shas(repo_path: str, ref: str = "HEAD", all_history: bool = False) -> Set[str]:
+    """
+    Blob SHAs of a local repository
+
+    Args:
+        repo_path: Clone of the original
+        ref: Revision whose tree is read
+        all_history: Every blob reachable from ref (rev-list --objects piped through
+            cat-file --batch-check) instead of only the blobs of ref's tree
+    """
+    if not all_history:
+        output = subprocess.run(["git", "-C", repo_path, "ls-tree", "-r", "--full-tree", ref],
+                                capture_output=True, text=True, check=True).stdout
+        # "<mode> blob <sha>\t<path>"
+        return {line.split()[2] for line in output.splitlines() if line.split()[1] == "blob"} - {EMPTY_BLOB_SHA}
+
+    rev_list = subprocess.Popen(["git", "-C", repo_path, "rev-list", "--objects", "--no-object-names", ref], stdout=subprocess.PIPE)
+    batch_check = subprocess.Popen(["git", "-C", repo_path, "cat-file", "--batch-check=%(objectname) %(objecttype)"],
+                                   stdin=rev_list.stdout, stdout=subprocess.PIPE, text=True)
+    rev_list.stdout.close()
+    blobs = {sha for sha, kind in (line.split() for line in batch_check.stdout) if kind == "blob"}
+    batch_check.wait()
+    rev_list.wait()
+    return blobs - {EMPTY_BLOB_SHA}
+
+def tree_blob_shas(tree: List[Dict]) -> Set[str]:
+    """Blob SHAs of an API tree listing (e.g. fetch_tree_listing() of a GitHub original)"""
+    return {entry['sha'] for entry in tree if entry.get('type') == 'blob'} - {EMPTY_BLOB_SHA}
+
+def iter_raw_history(repo_path: str, ref: str = "HEAD") -> Iterator[Tuple[str, int, List[Tuple[str, str, str]]]]:
+    """
+    Stream a first-parent history oldest first as (commit, author_time, changes)
+
+    Each change is (status, path, new blob sha); a deleted path has the zero SHA.
+    """
+    process = subprocess.Popen(
+        ["git", "-C", repo_path, "log", "--reverse", "--first-parent", "--raw", "--no-abbrev", "--no-renames",
+         "--root", "--format=%x1e%H %at", ref],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, encoding="utf-8", errors="replace"
+    )
+    commit, author_time, changes = None, 0, []
+    try:
+        for line in process.stdout:
+            if line.startswith("\x1e"):
+                if commit:
+                    yield commit, author_time, changes
+                sha, timestamp = line[1:].split()
+                commit, author_time, changes = sha, int(timestamp), []
+            elif line.startswith(":"):
+                # ":<old mode> <new mode> <old sha> <new sha> <status>\t<path>"
+                meta, path = line.rstrip("\n").split("\t", 1)
+                new_sha, status = meta.split()[3:5]
+                changes.append((status, path, new_sha))
+        if commit:
+            yield commit, author_time, changes
+    finally:
+        process.stdout.close()
+        process.wait()
+
+def provenance_timeline(original_blobs: Set[str], target_path: str, ref: str = "HEAD") -> Dict:
+    """
+    Coverage of the original's blobs at every commit of the target's first-parent history
+
+    Args:
+        original_blobs: Blob SHAs of the original
+        target_path: Clone of the suspected copy
+        ref: Revision of the copy to replay
+
+    Returns:
+        Dictionary with the first commit sharing a blob, the commit reaching each
+        milestone, the timeline of commits that changed coverage and a verdict
+    """
+    started = time.perf_counter()
+    tree: Dict[str, str] = {}  # path -> blob sha at the current commit
+    present = Counter()  # original blob -> paths holding it
+    covered = 0
+    total = len(original_blobs)
+    timeline = []
+    milestones = {}
+    first_shared = None
+    commits = 0
+
+    for commit, author_time, changes in iter_raw_history(target_path, ref):
+        commits += 1
+        before = covered
+        added = 0
+        for status, path, new_sha in changes:
+            old_sha = tree.pop(path, None)
+            if old_sha in original_blobs:
+                present[old_sha] -= 1
+                if present[old_sha] == 0:
+                    covered -= 1
+            if status != "D" and new_sha != ZERO_SHA:
+                tree[path] = new_sha
+                if new_sha in original_blobs:
+                    present[new_sha] += 1
+                    if present[new_sha] == 1:
+                        covered += 1
+                        added += 1
+        if covered == before and not added:
+            continue
+
+        coverage = covered / total if total else 0.0
+        entry = {"commit": commit, "commit_index": commits, "author_time": author_time,
+                 "original_blobs_added": added, "coverage": round(coverage, 4)}
+        timeline.append(entry)
+        if first_shared is None and covered:
+            first_shared = entry
+        for milestone in MILESTONES:
+            if coverage >= milestone and milestone not in milestones:
+                milestones[milestone] = entry
+
+    final_coverage = covered / total if total else 0.0
+    verdict = "no_shared_code"
+    if first_shared:
+        verdict = "incremental"
+        bulk = max(timeline, key=lambda e: e["original_blobs_added"])
+        if total and bulk["original_blobs_added"] >= 0.8 * total:
+            verdict = "bulk_import_in_first_commit" if bulk["commit_index"] == 1 else "bulk_import"
+    return {
+        "target": target_path,
+        "original_blobs": total,
+        "commits_replayed": commits,
+        "final_coverage": round(final_coverage, 4),
+        "first_shared": first_shared,
+        "milestones": {f"{milestone:.0%}": entry for milestone, entry in milestones.items()},
+        "timeline": timeline,
+        "verdict": verdict,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+def format_timeline(result: Dict) -> List[str]:
+    """Report lines for one target's provenance"""
+    lines = [f"Target: {result['target']} ({result['commits_replayed']} commits, "
+             f"{result['final_coverage']:.0%} of {result['original_blobs']} original blobs at head, "
+             f"{result['elapsed_ms']}ms)",
+             f"  Verdict: {result['verdict']}"]
+    if result["first_shared"]:
+        lines.append(f"  First shared blob: commit #{result['first_shared']['commit_index']} "
+                     f"{result['first_shared']['commit'][:10]} ({result['first_shared']['coverage']:.0%})")
+    for label, entry in result["milestones"].items():
+        lines.append(f"  Reached {label}: commit #{entry['commit_index']} {entry['commit'][:10]} "
+                     f"at {time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(entry['author_time']))} UTC")
+    return lines
+
+def main():
+    """Provenance of an original's blobs in one or more suspected copies"""
+    parser = argparse.ArgumentParser(description="When did an original's code enter a suspected copy?")
+    parser.add_argument("original", help="Clone of the original, or an owner/repo fetched via the API tree listing")
+    parser.add_argument("targets", nargs="*", default=["./stolen-repos"],
+                        help="Clones of suspected copies, or directories whose subdirectories are clones")
+    parser.add_argument("--ref", default="HEAD", help="Revision of the original (and of each copy) to use")
+    parser.add_argument("--all-history", action="store_true",
+                        help="Count every blob in the original's history, not just its tree at --ref")
+    parser.add_argument("--api-base", default=None, help="GitHub API base URL for an API original")
+    parser.add_argument("--output", default="blob_provenance.json", help="JSON output file")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.original):
+        original_blobs = local_blob_shas(args.original, args.ref, args.all_history)
+    else:
+        from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector
+        detector = GitHubWidePlagiarismDetector(api_base=args.api_base)
+        original_blobs = tree_blob_shas(detector.fetch_tree_listing(detector.get_repo_info(args.original), args.ref))
+
+    target_paths = []
+    for path in args.targets:
+        if os.path.exists(os.path.join(path, ".git")):
+            target_paths.append(path)
+        elif os.path.isdir(path):
+            target_paths += [os.path.join(path, name) for name in sorted(os.listdir(path))
+                             if os.path.exists(os.path.join(path, name, ".git"))]
+
+    print("🧬 Blob Provenance Timeline")
+    print("=" * 80)
+    print(f"Original: {args.original} ({len(original_blobs)} blobs)")
+    results = []
+    for target_path in target_paths:
+        result = provenance_timeline(original_blobs, target_path, args.ref)
+        results.append(result)
+        print("\n".join(format_timeline(result)))
+        print()
+    with open(args.output, 'w') as f:
+        json.dump({"original": args.original, "original_blobs": len(original_blobs), "targets": results}, f, indent=2)
+    print(f"📄 Results saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Candidate Ranking
+Orders GitHub search candidates by expected match likelihood so the fetch
+budget goes to likely copies instead of popular unrelated repositories
+"""
+
+import math
+import os
+from typing import Callable, Dict, List, Optional, Set
+
+class CandidateRanker:
+    # Relative weight of each signal in the final score
+    WEIGHTS = {
+        'query_hits': 2.0,      # number of distinct search queries that returned the repo
+        'code_hits': 4.0,       # rare target snippets found in the repo by code search
+        'language': 1.5,        # primary language matches the target
+        'description': 1.0,     # keywords found in the repo name/description
+        'size': 1.0,            # repo size close to the target size
+        'stars': 0.25,          # popularity, only as a tie-breaker
+        'tree_overlap': 5.0,    # target file paths present in the repo tree
+    }
+
+    def __init__(self, max_tree_checks: int = 30):
+        """
+        Initialize the ranker
+
+        Args:
+            max_tree_checks: How many top metadata-ranked candidates get a tree-listing
+                overlap check (one API call each)
+        """
+        self.max_tree_checks = max_tree_checks
+
+    def metadata_score(self, candidate: Dict, keywords: List[str], target_language: str = None,
+                       target_size_kb: float = 0) -> float:
+        """
+        Score a candidate using only the metadata returned by the search API
+
+        Args:
+            candidate: Search result dict (name, description, language, size, stars, query_hits)
+            keywords: Search keywords extracted from the target
+            target_language: Primary language of the target
+            target_size_kb: Approximate target size in KB (GitHub reports repo size in KB)
+
+        Returns:
+            Weighted metadata score
+        """
+        score = self.WEIGHTS['query_hits'] * max(candidate.get('query_hits', 1) - 1, 0)
+        score += self.WEIGHTS['code_hits'] * candidate.get('code_hits', 0)
+
+        if target_language and candidate.get('language') == target_language:
+            score += self.WEIGHTS['language']
+
+        text = f"{candidate['name']} {candidate.get('description') or ''}".lower()
+        if keywords:
+            keyword_hits = sum(1 for keyword in keywords if keyword.lower() in text)
+            score += self.WEIGHTS['description'] * keyword_hits / len(keywords)
+
+        repo_size = candidate.get('size') or 0
+        if target_size_kb > 0 and repo_size > 0:
+            # 1.0 when sizes match, decaying with the log of the size ratio
+            ratio = abs(math.log(repo_size / target_size_kb))
+            score += self.WEIGHTS['size'] / (1.0 + ratio)
+
+        score += self.WEIGHTS['stars'] * math.log10(candidate.get('stars', 0) + 1)
+        return score
+
+    def tree_overlap(self, target_paths: Set[str], tree_paths: List[str]) -> float:
+        """
+        Fraction of target files whose path (1.0) or basename (0.5) appears in a repo tree
+
+        Args:
+            target_paths: Repository-relative paths of the target's code files
+            tree_paths: Blob paths from the candidate's recursive tree listing
+
+        Returns:
+            Overlap score between 0 and 1
+        """
+        if not target_paths or not tree_paths:
+            return 0.0
+
+        tree_path_set = set(tree_paths)
+        tree_basenames = {os.path.basename(path) for path in tree_paths}
+        total = 0.0
+        for path in target_paths:
+            if path in tree_path_set:
+                total += 1.0
+            elif os.path.basename(path) in tree_basenames:
+                total += 0.5
+        return total / len(target_paths)
+
+    def rank(self, candidates: List[Dict], keywords: List[str], target_language: str = None,
+             target_paths: Optional[Set[str]] = None, target_size_kb: float = 0,
+             fetch_tree_paths: Callable[[str], List[str]] = None) -> List[Dict]:
+        """
+        Rank candidates by expected match likelihood
+
+        Each candidate gets 'match_score' (and 'tree_overlap' when checked) added in place.
+
+        Args:
+            candidates: Deduplicated search results
+            keywords: Search keywords extracted from the target
+            target_language: Primary language of the target
+            target_paths: Target code file paths for the tree-overlap check
+            target_size_kb: Approximate target size in KB
+            fetch_tree_paths: Callable returning a repo's blob paths, or None to skip tree checks
+
+        Returns:
+            Candidates sorted by descending match score
+        """
+        for candidate in candidates:
+            candidate['match_score'] = self.metadata_score(candidate, keywords, target_language, target_size_kb)
+
+        ranked = sorted(candidates, key=lambda c: c['match_score'], reverse=True)
+
+        if fetch_tree_paths and target_paths:
+            for candidate in ranked[:self.max_tree_checks]:
+                tree_paths = fetch_tree_paths(candidate['name']) or []
+                candidate['tree_overlap'] = self.tree_overlap(target_paths, tree_paths)
+                candidate['match_score'] += self.WEIGHTS['tree_overlap'] * candidate['tree_overlap']
+            ranked.sort(key=lambda c: c['match_score'], reverse=True)
+
+        return ranked
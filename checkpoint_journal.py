@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Journal
+Append-only JSONL record of a detection run's completed work (fetches,
+searches, comparisons) so an interrupted run can resume without repeating
+API calls and rebuild its results from the journal
+"""
+
+import os
+import json
+import time
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+class CheckpointJournal:
+    def __init__(self, path: str, resume: bool = False):
+        """
+        Open a journal
+
+        Args:
+            path: JSONL file the journal is appended to
+            resume: Replay an existing journal; otherwise any existing file is replaced
+        """
+        self.path = path
+        self.run: Optional[Dict] = None
+        self.fetches: Dict[str, Dict] = {}
+        self.searches: Dict[str, Dict] = {}
+        self.comparisons: Dict[str, List] = {}
+        self.resumed = resume and os.path.exists(path)
+        if self.resumed:
+            self.load()
+        self._file = open(path, 'a' if self.resumed else 'w', encoding='utf-8')
+        if self.resumed and self._file.tell() > 0 and not self._ends_with_newline():
+            self._file.write('\n')  # terminate a torn line so new records start cleanly
+
+    def load(self):
+        """Replay the journal into memory (a torn final line from a crash is ignored)"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(f"⚠️  Ignoring unreadable journal line {line_number} in {self.path}")
+                    continue
+                self._apply(record)
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _apply(self, record: Dict):
+        kind = record.get('type')
+        if kind == 'run':
+            self.run = record
+        elif kind == 'fetch':
+            self.fetches[record['repo'].lower()] = record['repo_info']
+        elif kind == 'search':
+            self.searches[record['target'].lower()] = record
+        elif kind == 'comparison':
+            self.comparisons[record['repo'].lower()] = record['scored']
+
+    def _append(self, record: Dict):
+        record['time'] = time.time()
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._apply(record)
+
+    def start_run(self, target_repo: str, **options):
+        """
+        Record the run header, or check it matches when resuming
+
+        Options change what is journaled (a decide-fast run records unscored
+        comparisons for candidates it skipped), so they must match as well.
+
+        Raises:
+            ValueError: If the journal belongs to a different target or other options
+        """
+        if self.run:
+            if self.run['target_repo'] != target_repo:
+                raise ValueError(f"Journal {self.path} belongs to {self.run['target_repo']}, not {target_repo}")
+            if self.run.get('options', {}) != options:
+                raise ValueError(f"Journal {self.path} was written with options {self.run.get('options', {})}, "
+                                 f"not {options}")
+            print(f"♻️  Resuming from {self.path}: {len(self.fetches)} fetches, "
+                  f"{len(self.comparisons)} comparisons already done")
+            return
+        self._append({'type': 'run', 'target_repo': target_repo, 'options': options})
+
+    def record_fetch(self, repo_info):
+        """Record a successfully fetched repository (RepoInfo dataclass)"""
+        self._append({'type': 'fetch', 'repo': repo_info.name, 'repo_info': asdict(repo_info)})
+
+    def fetched(self, repo_name: str) -> Optional[Dict]:
+        """Journaled RepoInfo fields of a repository, or None if it was never fetched"""
+        return self.fetches.get(repo_name.lower())
+
+    def record_search(self, target: str, keywords: List[str], primary_language: str, candidates: List[Dict]):
+        """Record a target's keywords and ranked candidate list"""
+        self._append({'type': 'search', 'target': target, 'keywords': keywords,
+                      'primary_language': primary_language, 'candidates': candidates})
+
+    def search(self, target: str) -> Optional[Dict]:
+        """Journaled search for a target, or None"""
+        return self.searches.get(target.lower())
+
+    def record_comparison(self, repo_name: str, scored):
+        """Record the compare_files() result for a candidate"""
+        self._append({'type': 'comparison', 'repo': repo_name, 'scored': list(scored)})
+
+    def comparison(self, repo_name: str) -> Optional[tuple]:
+        """Journaled compare_files() result for a candidate, or None"""
+        scored = self.comparisons.get(repo_name.lower())
+        return tuple(scored) if scored is not None else None
+
+    def close(self):
+        self._file.close()
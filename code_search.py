@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Code-Search Query Planner
+Picks the rarest, most distinctive token sequences from a target's
+fingerprints and turns them into GitHub code-search queries
+"""
+
+import os
+from typing import Dict, List
+
+from fingerprints import tokenize, fingerprint_tokens
+
+# Language keywords and ubiquitous names that never make a snippet distinctive
+COMMON_TOKENS = {
+    'def', 'class', 'return', 'import', 'from', 'as', 'if', 'else', 'elif', 'for', 'while',
+    'in', 'is', 'not', 'and', 'or', 'none', 'true', 'false', 'self', 'this', 'new', 'null',
+    'function', 'const', 'let', 'var', 'async', 'await', 'export', 'default', 'require',
+    'public', 'private', 'static', 'void', 'int', 'string', 'str', 'try', 'except', 'catch',
+    'with', 'print', 'console', 'log', 'get', 'set', 'data', 'value', 'i', 'x', 'e', 'err',
+    'div', 'span', 'classname', 'props', 'react', 'usestate', 'useeffect', 'type', 'interface',
+}
+
+# Extensions worth spending code-search calls on
+SEARCHABLE_EXTENSIONS = {
+    '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.h', '.cs', '.php',
+    '.rb', '.go', '.rs', '.swift', '.kt', '.scala', '.vue', '.svelte', '.dart',
+}
+
+class CodeSearchPlanner:
+    def __init__(self, df_table, snippet_tokens: int = 4, max_queries: int = 6,
+                 max_per_file: int = 2, max_query_length: int = 100):
+        """
+        Initialize the planner
+
+        Args:
+            df_table: DocumentFrequencyTable used to score token rarity
+            snippet_tokens: Tokens per searched snippet
+            max_queries: Maximum code-search calls per target
+            max_per_file: Maximum snippets taken from one file
+            max_query_length: Longest allowed snippet phrase in characters
+        """
+        self.df_table = df_table
+        self.snippet_tokens = snippet_tokens
+        self.max_queries = max_queries
+        self.max_per_file = max_per_file
+        self.max_query_length = max_query_length
+
+    def token_weight(self, token: str) -> float:
+        """Rarity weight of a single token"""
+        if token in COMMON_TOKENS or len(token) < 3:
+            return 0.0
+        return self.df_table.idf(token)
+
+    def candidate_snippets(self, file_info) -> List[Dict]:
+        """
+        Score the token sequence behind every winnowed fingerprint of a file
+
+        Args:
+            file_info: FileInfo of a target file
+
+        Returns:
+            List of snippet dicts (phrase, score, path, line)
+        """
+        tokens = tokenize(file_info.content)
+        k = self.snippet_tokens
+        snippets = []
+        for fp in fingerprint_tokens(tokens, k=k):
+            window = tokens[fp.position:fp.position + k]
+            if len(window) < k or window[-1].line - window[0].line > 1:
+                continue
+
+            weights = [self.token_weight(token.text) for token in window]
+            # At least half of the snippet must be distinctive identifiers
+            if sum(1 for w in weights if w > 0) * 2 < k:
+                continue
+
+            phrase = ' '.join(token.text for token in window)
+            if len(phrase) > self.max_query_length:
+                continue
+            snippets.append({
+                'phrase': phrase,
+                'score': sum(weights),
+                'path': file_info.path,
+                'line': window[0].line
+            })
+        return snippets
+
+    def plan(self, target_info, language: str = None) -> List[Dict]:
+        """
+        Choose the code-search queries for a target repository
+
+        Args:
+            target_info: Target RepoInfo
+            language: Optional GitHub language qualifier
+
+        Returns:
+            List of planned queries (query, phrase, score, path, line), rarest first
+        """
+        per_file = {}
+        for file_info in target_info.files:
+            if os.path.splitext(file_info.path)[1].lower() not in SEARCHABLE_EXTENSIONS:
+                continue
+            ranked = sorted(self.candidate_snippets(file_info), key=lambda s: s['score'], reverse=True)
+            per_file[file_info.path] = ranked[:self.max_per_file]
+
+        all_snippets = sorted((s for snippets in per_file.values() for s in snippets),
+                              key=lambda s: (-s['score'], s['path'], s['line']))
+
+        planned = []
+        seen_phrases = set()
+        for snippet in all_snippets:
+            if snippet['phrase'] in seen_phrases:
+                continue
+            seen_phrases.add(snippet['phrase'])
+            query = f'"{snippet["phrase"]}"'
+            if language:
+                query += f" language:{language}"
+            planned.append(dict(snippet, query=query))
+            if len(planned) >= self.max_queries:
+                break
+        return planned
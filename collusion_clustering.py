@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Collusion Clustering
+All-pairs similarity across a submission set without N² file comparisons:
+winnowed fingerprints go into one posting-list index, only repositories that
+share postings are ever paired, and the resulting similarity graph is
+clustered with union-find
+"""
+
+import os
+import json
+import time
+import argparse
+from typing import Dict, List, Tuple
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from fingerprints import fingerprint_content
+
+class UnionFind:
+    def __init__(self, items=()):
+        self.parent = {item: item for item in items}
+
+    def find(self, item):
+        """Root of an item's set (with path halving)"""
+        self.parent.setdefault(item, item)
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+    def groups(self, min_size: int = 2) -> List[List]:
+        """Connected components with at least min_size members, largest first"""
+        groups = defaultdict(list)
+        for item in self.parent:
+            groups[self.find(item)].append(item)
+        return sorted((sorted(group) for group in groups.values() if len(group) >= min_size),
+                      key=lambda g: (-len(g), g))
+
+def fingerprint_files(files: List[Tuple[str, str]], k: int = 5, window: int = 4) -> List[Tuple[str, List[int]]]:
+    """Fingerprint (path, content) pairs; module-level so it can run in a process pool"""
+    return [(path, sorted({fp.hash for fp in fingerprint_content(content, k, window)})) for path, content in files]
+
+class FingerprintIndex:
+    def __init__(self, k: int = 5, window: int = 4, max_repo_fraction: float = 0.1, min_repo_cutoff: int = 5):
+        """
+        Initialize an empty index
+
+        Args:
+            k: Tokens per k-gram
+            window: Winnowing window size
+            max_repo_fraction: Fingerprints present in more than this share of repositories
+                are treated as boilerplate and never pair repositories
+            min_repo_cutoff: Boilerplate cutoff floor, so small sets still pair on shared code
+        """
+        self.k = k
+        self.window = window
+        self.max_repo_fraction = max_repo_fraction
+        self.min_repo_cutoff = min_repo_cutoff
+        self.repos: List[str] = []
+        self.repo_ids: Dict[str, int] = {}
+        self.files: List[Tuple[int, str]] = []  # file id -> (repo id, path)
+        self.file_hashes: List[List[int]] = []  # file id -> fingerprints (empty once replaced)
+        self.repo_files: List[Dict[str, int]] = []  # repo id -> path -> current file id
+        self.repo_fingerprint_counts: List[int] = []
+        self.postings: Dict[int, List[int]] = defaultdict(list)  # fingerprint -> file ids
+
+    def add_fingerprints(self, repo_name: str, file_fingerprints: List[Tuple[str, List[int]]]) -> int:
+        """Add one repository's precomputed file fingerprints, returning its repo id"""
+        repo_id = len(self.repos)
+        self.repos.append(repo_name)
+        self.repo_ids[repo_name] = repo_id
+        self.repo_files.append({})
+        self.repo_fingerprint_counts.append(0)
+        self._add_files(repo_id, file_fingerprints)
+        self.repo_fingerprint_counts[repo_id] = len(set().union(*(hashes for _, hashes in file_fingerprints)))
+        return repo_id
+
+    def _add_files(self, repo_id: int, file_fingerprints: List[Tuple[str, List[int]]]) -> List[int]:
+        file_ids = []
+        for path, hashes in file_fingerprints:
+            file_id = len(self.files)
+            self.files.append((repo_id, path))
+            self.file_hashes.append(hashes)
+            self.repo_files[repo_id][path] = file_id
+            for fp_hash in hashes:
+                self.postings[fp_hash].append(file_id)
+            file_ids.append(file_id)
+        return file_ids
+
+    def _remove_file(self, file_id: int):
+        for fp_hash in self.file_hashes[file_id]:
+            posting = self.postings[fp_hash]
+            posting.remove(file_id)
+            if not posting:
+                del self.postings[fp_hash]
+        self.file_hashes[file_id] = []
+
+    def update_repo(self, repo_name: str, file_fingerprints: List[Tuple[str, List[int]]],
+                    removed_paths=()) -> List[int]:
+        """
+        Replace changed files of a repository in place (adding the repository if new)
+
+        Previous versions of the changed and removed paths leave the posting lists,
+        so the index always describes each repository's latest snapshot.
+
+        Returns:
+            File ids of the new file versions
+        """
+        if repo_name not in self.repo_ids:
+            self.add_fingerprints(repo_name, [])
+        repo_id = self.repo_ids[repo_name]
+        files = self.repo_files[repo_id]
+        for path in list(removed_paths) + [path for path, _ in file_fingerprints]:
+            if path in files:
+                self._remove_file(files.pop(path))
+        file_ids = self._add_files(repo_id, file_fingerprints)
+        self.repo_fingerprint_counts[repo_id] = len(set().union(*(self.file_hashes[i] for i in files.values())))
+        return file_ids
+
+    def related_files(self, file_id: int, min_shared: int = 1) -> Dict[int, int]:
+        """
+        Files of other repositories sharing non-boilerplate fingerprints with a file
+
+        Returns:
+            Mapping of file id -> shared fingerprint count
+        """
+        cutoff = self.boilerplate_cutoff()
+        repo_id = self.files[file_id][0]
+        shared = defaultdict(int)
+        for fp_hash in self.file_hashes[file_id]:
+            file_ids = self.postings[fp_hash]
+            if len({self.files[other][0] for other in file_ids}) > cutoff:
+                continue
+            for other in file_ids:
+                if self.files[other][0] != repo_id:
+                    shared[other] += 1
+        return {other: count for other, count in shared.items() if count >= min_shared}
+
+    def add_repo(self, repo_info) -> int:
+        """Fingerprint and index every file of a repository"""
+        files = [(f.path, f.content) for f in repo_info.files]
+        return self.add_fingerprints(repo_info.name, fingerprint_files(files, self.k, self.window))
+
+    def add_repos(self, repo_infos: List, workers: int = None) -> None:
+        """Index many repositories, fingerprinting them in a process pool when workers > 1"""
+        batches = [[(f.path, f.content) for f in info.files] for info in repo_infos]
+        if workers and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(fingerprint_files, batches, [self.k] * len(batches),
+                                        [self.window] * len(batches), chunksize=8))
+        else:
+            results = [fingerprint_files(batch, self.k, self.window) for batch in batches]
+        for info, file_fingerprints in zip(repo_infos, results):
+            self.add_fingerprints(info.name, file_fingerprints)
+
+    def boilerplate_cutoff(self) -> int:
+        """Maximum number of repositories a fingerprint may appear in and still count"""
+        return max(self.min_repo_cutoff, int(len(self.repos) * self.max_repo_fraction))
+
+    def similarity_graph(self, threshold: float = 0.3, min_shared: int = 3, top_files: int = 5) -> List[Dict]:
+        """
+        Repository similarity edges from shared fingerprints
+
+        Only pairs that co-occur in some posting list are ever considered, so the
+        cost follows the number of shared fingerprints, not the number of pairs.
+        Similarity is containment: shared fingerprints over the smaller repository's.
+
+        Args:
+            threshold: Minimum similarity for an edge
+            min_shared: Minimum shared fingerprints for an edge
+            top_files: File pairs reported per edge as evidence
+
+        Returns:
+            Edges sorted by descending similarity
+        """
+        cutoff = self.boilerplate_cutoff()
+        repo_pairs = defaultdict(int)
+        file_pairs = defaultdict(int)
+
+        for file_ids in self.postings.values():
+            repo_ids = {self.files[file_id][0] for file_id in file_ids}
+            if len(repo_ids) < 2 or len(repo_ids) > cutoff:
+                continue
+            for a in repo_ids:
+                for b in repo_ids:
+                    if a < b:
+                        repo_pairs[(a, b)] += 1
+            for i, file_a in enumerate(file_ids):
+                for file_b in file_ids[i + 1:]:
+                    if self.files[file_a][0] != self.files[file_b][0]:
+                        file_pairs[(file_a, file_b) if file_a < file_b else (file_b, file_a)] += 1
+
+        evidence = defaultdict(list)
+        for (file_a, file_b), shared in file_pairs.items():
+            repo_a, repo_b = self.files[file_a][0], self.files[file_b][0]
+            if repo_a > repo_b:
+                repo_a, repo_b, file_a, file_b = repo_b, repo_a, file_b, file_a
+            evidence[(repo_a, repo_b)].append((shared, self.files[file_a][1], self.files[file_b][1]))
+
+        edges = []
+        for (a, b), shared in repo_pairs.items():
+            smaller = min(self.repo_fingerprint_counts[a], self.repo_fingerprint_counts[b])
+            similarity = shared / smaller if smaller else 0.0
+            if shared < min_shared or similarity < threshold:
+                continue
+            top = sorted(evidence[(a, b)], key=lambda e: (-e[0], e[1], e[2]))[:top_files]
+            edges.append({
+                "repos": [self.repos[a], self.repos[b]],
+                "shared_fingerprints": shared,
+                "similarity": round(similarity, 4),
+                "file_pairs": [{"files": [path_a, path_b], "shared_fingerprints": count}
+                               for count, path_a, path_b in top]
+            })
+        edges.sort(key=lambda e: (-e["similarity"], e["repos"]))
+        return edges
+
+def cluster_edges(names: List[str], edges: List[Dict], threshold: float = 0.0) -> List[Dict]:
+    """
+    Connected components of the similarity graph
+
+    Args:
+        names: Every repository in the set (so singletons are known)
+        edges: similarity_graph() edges
+        threshold: Minimum edge similarity that joins two repositories
+
+    Returns:
+        Clusters (members, edges, max_similarity), largest first
+    """
+    union_find = UnionFind(names)
+    for edge in edges:
+        if edge["similarity"] >= threshold:
+            union_find.union(*edge["repos"])
+
+    clusters = []
+    for members in union_find.groups():
+        member_set = set(members)
+        cluster_edges_ = [edge for edge in edges
+                          if edge["similarity"] >= threshold and set(edge["repos"]) <= member_set]
+        clusters.append({
+            "members": members,
+            "edges": len(cluster_edges_),
+            "max_similarity": max(edge["similarity"] for edge in cluster_edges_)
+        })
+    return clusters
+
+def find_collusion(repo_infos: List, threshold: float = 0.3, workers: int = None, **index_options) -> Dict:
+    """
+    All-pairs collusion check over a submission set
+
+    Args:
+        repo_infos: RepoInfo of every submission
+        threshold: Minimum containment similarity for an edge
+        workers: Processes used for fingerprinting
+        **index_options: Passed to FingerprintIndex
+
+    Returns:
+        Dictionary with graph edges, clusters and index stats
+    """
+    started = time.time()
+    index = FingerprintIndex(**index_options)
+    index.add_repos(repo_infos, workers=workers)
+    edges = index.similarity_graph(threshold=threshold)
+    clusters = cluster_edges([info.name for info in repo_infos], edges, threshold)
+    return {
+        "repositories": len(repo_infos),
+        "files": len(index.files),
+        "fingerprints": len(index.postings),
+        "boilerplate_cutoff": index.boilerplate_cutoff(),
+        "threshold": threshold,
+        "edges": edges,
+        "clusters": clusters,
+        "elapsed_seconds": round(time.time() - started, 2)
+    }
+
+def main():
+    """Cluster a submission set (GitHub list file or a directory of local checkouts)"""
+    parser = argparse.ArgumentParser(description="All-pairs collusion clustering across submissions")
+    parser.add_argument("source", nargs="?", default="wins.txt",
+                        help="Targets file (GitHub URLs / devpost CSV) or a directory of local repositories")
+    parser.add_argument("--threshold", type=float, default=0.3, help="Minimum pair similarity")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Fingerprinting processes")
+    parser.add_argument("--output", default="collusion_clusters.json", help="JSON output file")
+    args = parser.parse_args()
+
+    print("🕸️  Collusion Clustering")
+    print("=" * 80)
+
+    repo_infos = []
+    if os.path.isdir(args.source):
+        from enhanced_plagiarism_detector import EnhancedPlagiarismDetector
+        local = EnhancedPlagiarismDetector()
+        for repo_path in local.scan_local_repositories(args.source):
+            info = local.fetch_local_repo_contents(repo_path)
+            if info:
+                repo_infos.append(info)
+        local.object_readers.close()
+    else:
+        from batch_plagiarism_check import load_targets
+        from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector
+        detector = GitHubWidePlagiarismDetector(github_token=os.getenv('GITHUB_TOKEN'))
+        targets, skipped = load_targets(args.source)
+        if skipped:
+            print(f"⚠️  Skipped {len(skipped)} lines without a GitHub repository URL")
+        for target in targets:
+            info = detector.fetch_repo_contents(detector.get_repo_spec(target))
+            if info:
+                repo_infos.append(info)
+
+    results = find_collusion(repo_infos, threshold=args.threshold, workers=args.workers)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n📊 {results['repositories']} repositories, {results['files']} files, "
+          f"{len(results['edges'])} similar pairs ({results['elapsed_seconds']}s)")
+    for cluster in results["clusters"]:
+        print(f"🚨 Cluster (max similarity {cluster['max_similarity']:.2f}): {', '.join(cluster['members'])}")
+    print(f"📄 Results saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Shared test fixtures: in-memory repositories, a stubbed GitHub-wide detector and fake-server trees
+"""
+
+import hashlib
+import os
+import subprocess
+
+import pytest
+
+COPIED = {
+    f"src/{name}.py": f"def dispatch{name}(request):\n    payload = request.json()\n    return payload['{name}'] * 42\n"
+    for name in ("ambulance", "firetruck", "paramedic")
+}
+
+def build_repo(name, contents):
+    from github_wide_plagiarism_detector import FileInfo, RepoInfo
+
+    # Plain strings become file_<i>.py; (path, content) pairs keep their path
+    entries = [entry if isinstance(entry, tuple) else (f"file_{i}.py", entry) for i, entry in enumerate(contents)]
+    files = [FileInfo(path, content, hashlib.md5(content.encode()).hexdigest(),
+                      len(content), content.count("\n") + 1)
+             for path, content in entries]
+    return RepoInfo(f"https://github.com/{name}", name, files, len(files), sum(f.lines for f in files))
+
+def build_fake_detector(repos):
+    from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector
+
+    detector = GitHubWidePlagiarismDetector()
+    detector.fetch_repo_contents = lambda name: repos.get(name)
+    detector.fetch_tree_listing = lambda name, ref="HEAD": []  # in-memory repositories have no git trees
+    detector.search_github_repositories = lambda keywords, language=None, **kwargs: [
+        {'name': name, 'url': f"https://github.com/{name}", 'stars': 0,
+         'language': 'Python', 'description': '', 'size': 1}
+        for name in repos if name != "me/target"
+    ]
+    return detector
+
+def write_fixture_tree(root, repos):
+    for name, files in repos.items():
+        for path, content in files.items():
+            full_path = os.path.join(root, name, path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'w') as f:
+                f.write(content)
+    return str(root)
+
+def build_git_repo(path, files):
+    write_fixture_tree(path, {"": files})
+    env = dict(os.environ, GIT_AUTHOR_NAME="dev", GIT_AUTHOR_EMAIL="dev@example.com",
+               GIT_COMMITTER_NAME="dev", GIT_COMMITTER_EMAIL="dev@example.com")
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    subprocess.run(["git", "-C", str(path), "add", "-A"], check=True, env=env)
+    subprocess.run(["git", "-C", str(path), "commit", "-q", "-m", "import"], check=True, env=env)
+    return str(path)
+
+@pytest.fixture
+def make_repo():
+    """make_repo(name, contents) builds a RepoInfo from content strings or (path, content) pairs"""
+    return build_repo
+
+@pytest.fixture
+def make_fake_detector():
+    """make_fake_detector(repos) builds a detector whose fetch and search layers serve in-memory repositories"""
+    return build_fake_detector
+
+@pytest.fixture
+def write_fixtures():
+    """write_fixtures(root, repos) lays out {name: {path: content}} as a fake GitHub server root"""
+    return write_fixture_tree
+
+@pytest.fixture
+def make_git_repo():
+    """make_git_repo(path, files) commits the files into a fresh git repository"""
+    return build_git_repo
+
+@pytest.fixture
+def copied_files():
+    """Three dispatch handlers that fixture repositories share as copied code"""
+    return dict(COPIED)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Content Hash Index
+Global hash -> locations map built as repositories are ingested, so exact
+duplicates of target files are found with one dict lookup per file
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from collections import defaultdict
+
+@dataclass
+class FileLocation:
+    """Where a file with a given content hash lives"""
+    repo: str
+    path: str
+    lines: int
+    repo_url: str = ""
+    stars: int = 0
+
+class ContentHashIndex:
+    def __init__(self, on_identical: Callable[[object, FileLocation], None] = None):
+        """
+        Initialize an empty index
+
+        Args:
+            on_identical: Optional callback invoked as (target_file, location) the
+                moment an ingested file is found to duplicate a target file
+        """
+        self.locations: Dict[str, List[FileLocation]] = defaultdict(list)
+        self.repos = set()
+        self.target_files: Dict[str, List] = defaultdict(list)
+        self.on_identical = on_identical
+
+    def set_target(self, target_info) -> None:
+        """Register the target repository whose files are checked on every ingest"""
+        self.target_files = defaultdict(list)
+        for file_info in target_info.files:
+            self.target_files[file_info.hash].append(file_info)
+
+    def add_repo(self, repo_info, repo_url: str = None, stars: int = 0) -> List[Tuple]:
+        """
+        Index every file of a repository
+
+        Args:
+            repo_info: RepoInfo of the ingested repository
+            repo_url: URL recorded on each location (defaults to repo_info.url)
+            stars: Star count recorded on each location
+
+        Returns:
+            List of (target_file, location) pairs for target files duplicated in this repo
+        """
+        self.repos.add(repo_info.name)
+        duplicates = []
+        for file_info in repo_info.files:
+            location = FileLocation(
+                repo=repo_info.name,
+                path=file_info.path,
+                lines=file_info.lines,
+                repo_url=repo_url or repo_info.url,
+                stars=stars
+            )
+            self.locations[file_info.hash].append(location)
+
+            for target_file in self.target_files.get(file_info.hash, ()):
+                duplicates.append((target_file, location))
+                if self.on_identical:
+                    self.on_identical(target_file, location)
+        return duplicates
+
+    def lookup(self, file_hash: str) -> List[FileLocation]:
+        """Return every indexed location holding content with this hash"""
+        return self.locations.get(file_hash, [])
+
+    def find_duplicates(self, target_info, exclude_repos: Optional[set] = None) -> List[Tuple]:
+        """
+        Find every indexed exact duplicate of every target file
+
+        Args:
+            target_info: RepoInfo whose files are looked up
+            exclude_repos: Repository names to ignore (e.g. the target itself)
+
+        Returns:
+            List of (target_file, location) pairs
+        """
+        exclude_repos = exclude_repos or {target_info.name}
+        duplicates = []
+        for file_info in target_info.files:
+            for location in self.lookup(file_info.hash):
+                if location.repo not in exclude_repos:
+                    duplicates.append((file_info, location))
+        return duplicates
+
+    def stats(self) -> Dict:
+        """Index size counters"""
+        return {
+            "repositories": len(self.repos),
+            "unique_hashes": len(self.locations),
+            "locations": sum(len(locs) for locs in self.locations.values())
+        }
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Corpus Document-Frequency Table
+Persistent term -> document count table used to weight search terms and
+code snippets by rarity (IDF) across every repository seen so far
+"""
+
+import os
+import json
+import math
+from typing import Dict, Iterable
+
+from fingerprints import tokenize
+
+class DocumentFrequencyTable:
+    def __init__(self, path: str = None, max_terms: int = 200000):
+        """
+        Initialize the table, loading it from disk when the file exists
+
+        Args:
+            path: JSON file the table is persisted to (None keeps it in memory only)
+            max_terms: Size bound; the rarest terms are pruned when it is exceeded
+        """
+        self.path = path
+        self.max_terms = max_terms
+        self.document_count = 0
+        self.frequencies: Dict[str, int] = {}
+        self.load()
+
+    def load(self):
+        """Load the table from disk if it exists"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.document_count = data.get('documents', 0)
+            self.frequencies = data.get('frequencies', {})
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not load document-frequency table {self.path}: {e}")
+
+    def save(self):
+        """Persist the table to disk"""
+        if not self.path:
+            return
+        if len(self.frequencies) > self.max_terms:
+            self.prune()
+        with open(self.path, 'w') as f:
+            json.dump({'documents': self.document_count, 'frequencies': self.frequencies}, f)
+
+    def prune(self):
+        """Drop the rarest terms so the table stays within max_terms"""
+        kept = sorted(self.frequencies.items(), key=lambda item: item[1], reverse=True)[:self.max_terms]
+        self.frequencies = dict(kept)
+
+    def add_document(self, terms: Iterable[str]):
+        """Count one document containing the given terms (duplicates ignored)"""
+        self.document_count += 1
+        for term in set(terms):
+            self.frequencies[term] = self.frequencies.get(term, 0) + 1
+
+    def add_repo(self, repo_info):
+        """Count every file of a repository as one document of identifier tokens"""
+        for file_info in repo_info.files:
+            self.add_document(token.text for token in tokenize(file_info.content))
+
+    def idf(self, term: str) -> float:
+        """Smoothed inverse document frequency (higher means rarer)"""
+        return math.log((self.document_count + 1) / (self.frequencies.get(term, 0) + 1)) + 1.0
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Detection Service
+Long-running daemon that keeps one detector warm (fetched repositories,
+blob cache, corpus frequencies, search cache, pooled HTTP connections and
+scoring workers) and exposes a local HTTP/JSON API to submit targets and
+poll their results
+
+    POST /jobs                  {"target_repo": "...", "decide_fast": false, "refresh": false} -> 202 job
+    GET  /jobs                  all known jobs (newest last)
+    GET  /jobs/<id>             status, progress and summary
+    GET  /jobs/<id>/results     full results dict once the job is done
+    GET  /jobs/<id>/events      job events (?since=<seq> for incremental polling)
+    GET  /health                warm-cache and queue statistics
+    GET  /metrics               Prometheus text exposition of queue, cache and stage metrics
+"""
+
+import json
+import time
+import uuid
+import queue
+import argparse
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from events import EventStream
+from instrumentation import Metrics, format_prometheus
+from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector, RepoInfo
+
+class RepoCache:
+    def __init__(self, max_repos: int = 500, ttl: float = 900.0):
+        """
+        Thread-safe LRU cache of fetched repositories shared by every job
+
+        Args:
+            max_repos: Repositories kept before the least recently used is evicted
+            ttl: Seconds an entry is served before the repository is fetched again
+                (branches move, so warm contents go stale)
+        """
+        self.max_repos = max_repos
+        self.ttl = ttl
+        self._repos: "OrderedDict[str, Tuple[RepoInfo, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def get(self, key: str, default=None) -> Optional[RepoInfo]:
+        with self._lock:
+            entry = self._repos.get(key)
+            if entry is not None and time.time() - entry[1] > self.ttl:
+                del self._repos[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._repos.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def __setitem__(self, key: str, repo_info: RepoInfo):
+        with self._lock:
+            self._repos[key] = (repo_info, time.time())
+            self._repos.move_to_end(key)
+            while len(self._repos) > self.max_repos:
+                self._repos.popitem(last=False)
+
+    def invalidate(self, key: str):
+        """Drop one entry so its next use fetches the repository again"""
+        with self._lock:
+            self._repos.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._repos)
+
+class BlobCache:
+    def __init__(self, max_blobs: int = 50000):
+        """
+        Thread-safe LRU cache of per-blob values (contents or FileInfo) by SHA
+
+        Blobs are immutable, so entries never go stale; the bound only keeps a
+        long-running process from growing without limit.
+
+        Args:
+            max_blobs: Blobs kept before the least recently used is evicted
+        """
+        self.max_blobs = max_blobs
+        self._blobs: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, sha: str) -> bool:
+        with self._lock:
+            return sha in self._blobs
+
+    def __getitem__(self, sha: str):
+        with self._lock:
+            self._blobs.move_to_end(sha)
+            return self._blobs[sha]
+
+    def get(self, sha: str, default=None):
+        with self._lock:
+            if sha not in self._blobs:
+                return default
+            self._blobs.move_to_end(sha)
+            return self._blobs[sha]
+
+    def __setitem__(self, sha: str, value):
+        with self._lock:
+            self._blobs[sha] = value
+            self._blobs.move_to_end(sha)
+            while len(self._blobs) > self.max_blobs:
+                self._blobs.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+class DetectionJob:
+    def __init__(self, target_repo: str, decide_fast: bool = False, max_events: int = 500, refresh: bool = False):
+        self.id = uuid.uuid4().hex[:12]
+        self.target_repo = target_repo
+        self.decide_fast = decide_fast
+        self.refresh = refresh
+        self.status = "queued"
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.progress: Dict = {}
+        self.results: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.events = deque(maxlen=max_events)
+        self._sequence = 0
+
+    def add_event(self, record: Dict):
+        """Event sink for the detector while this job runs"""
+        self._sequence += 1
+        self.events.append(dict(record, seq=self._sequence))
+        if record["event"] == "progress":
+            self.progress = {"stage": record["stage"], "done": record["done"], "total": record["total"]}
+
+    def to_dict(self) -> Dict:
+        """Status view (without the full results)"""
+        end = self.finished or time.time()
+        return {
+            "id": self.id,
+            "target_repo": self.target_repo,
+            "decide_fast": self.decide_fast,
+            "refresh": self.refresh,
+            "status": self.status,
+            "submitted": self.submitted,
+            "elapsed_seconds": round(end - (self.started or end), 3),
+            "progress": self.progress,
+            "summary": self.results.get("summary") if self.results else None,
+            "error": self.error
+        }
+
+class DetectionService:
+    def __init__(self, detector: GitHubWidePlagiarismDetector = None, max_cached_repos: int = 500,
+                 max_jobs: int = 200, repo_ttl: float = 900.0, max_cached_blobs: int = 50000):
+        """
+        Initialize the service around one long-lived detector
+
+        Args:
+            detector: Detector reused by every job (an AsyncGitHubWideDetector by default)
+            max_cached_repos: Size of the warm repository cache
+            max_jobs: Finished jobs kept for polling before the oldest are dropped
+            repo_ttl: Seconds a warm repository is reused before it is fetched again
+            max_cached_blobs: Size of the detector's blob caches (async detector)
+        """
+        if detector is None:
+            from async_github_detector import AsyncGitHubWideDetector
+            detector = AsyncGitHubWideDetector(df_table_path="corpus_df.json", search_cache_path="search_cache.sqlite")
+        self.detector = detector
+        self.detector.repo_cache = RepoCache(max_cached_repos, ttl=repo_ttl)
+        if hasattr(self.detector, 'blob_cache'):
+            self.detector.blob_cache = BlobCache(max_cached_blobs)
+            self.detector.blob_files = BlobCache(max_cached_blobs)
+        if hasattr(self.detector, 'executor') and self.detector.executor is None:
+            self.detector.executor = self.detector._make_executor()  # scoring workers stay up between jobs
+        self.max_jobs = max_jobs
+        self.jobs: "OrderedDict[str, DetectionJob]" = OrderedDict()
+        self.started = time.time()
+        self.totals = Metrics()  # stage timers and counters of every finished job
+        self._queue: "queue.Queue[Optional[DetectionJob]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._httpd = None
+
+    def submit(self, target_repo: str, decide_fast: bool = False, refresh: bool = False) -> DetectionJob:
+        """
+        Queue a target (an already queued or running job for the same target is returned instead)
+
+        With refresh the target is fetched again rather than served from the warm
+        cache (e.g. resubmitted after a push); only a pending refresh job is reused.
+        """
+        with self._lock:
+            for job in self.jobs.values():
+                if (job.status in ("queued", "running") and job.decide_fast == decide_fast and
+                        (job.refresh or not refresh) and
+                        job.target_repo.rstrip('/').lower() == target_repo.rstrip('/').lower()):
+                    return job
+            job = DetectionJob(target_repo, decide_fast, refresh=refresh)
+            self.jobs[job.id] = job
+            self._prune_jobs()
+        self._queue.put(job)
+        return job
+
+    def _prune_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in ("done", "failed")]
+        for job_id in finished[:max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[job_id]
+
+    def job(self, job_id: str) -> Optional[DetectionJob]:
+        return self.jobs.get(job_id)
+
+    def run_job(self, job: DetectionJob):
+        """Run one job on the warm detector (jobs run one at a time)"""
+        detector = self.detector
+        job.status = "running"
+        job.started = time.time()
+        detector.events.add_sink(job.add_event)
+        try:
+            if job.refresh:
+                detector.repo_cache.invalidate(detector.get_repo_spec(job.target_repo).lower())
+            results = detector.detect_plagiarism_github_wide(job.target_repo, decide_fast=job.decide_fast)
+            if "error" in results:
+                job.error = results["error"]
+                job.status = "failed"
+            else:
+                job.results = results
+                job.status = "done"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = "failed"
+        finally:
+            detector.events.remove_sink(job.add_event)
+            with self._lock:
+                self.totals.merge(detector.metrics)
+                detector.metrics.reset()
+            job.finished = time.time()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            self.run_job(job)
+
+    def stats(self) -> Dict:
+        """Warm-cache and queue statistics"""
+        detector = self.detector
+        by_status = {}
+        for job in list(self.jobs.values()):
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        cache = detector.repo_cache
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "jobs": by_status,
+            "queued": self._queue.qsize(),
+            "cached_repos": len(cache),
+            "repo_cache_hits": cache.hits,
+            "repo_cache_misses": cache.misses,
+            "repo_cache_expired": cache.expired,
+            "cached_blobs": len(getattr(detector, 'blob_cache', {})),
+            "corpus_documents": detector.df_table.document_count
+        }
+
+    def prometheus_metrics(self) -> str:
+        """
+        Prometheus text exposition: cumulative stage latency histograms and
+        counters (finished jobs plus the running one), queue depth, in-flight
+        work, rate-limit remaining per bucket, cache hit ratios and scoring
+        throughput
+        """
+        detector = self.detector
+        with self._lock:
+            combined = Metrics()
+            combined.merge(self.totals)
+            combined.merge(detector.metrics)
+            gauges = detector.metrics.snapshot()["gauges"]
+        snapshot = combined.snapshot()
+        snapshot["gauges"] = gauges
+        counters = snapshot["counters"]
+
+        lines = [format_prometheus(snapshot).rstrip("\n")]
+        stats = self.stats()
+        lines += ["# TYPE plagiarism_jobs_queued gauge", f"plagiarism_jobs_queued {stats['queued']}",
+                  "# TYPE plagiarism_jobs gauge"]
+        lines += [f'plagiarism_jobs{{status="{status}"}} {count}' for status, count in sorted(stats["jobs"].items())]
+        lines += ["# TYPE plagiarism_cached_repos gauge", f"plagiarism_cached_repos {stats['cached_repos']}",
+                  "# TYPE plagiarism_cached_blobs gauge", f"plagiarism_cached_blobs {stats['cached_blobs']}"]
+
+        caches = {
+            "repo": (stats["repo_cache_hits"], stats["repo_cache_misses"]),
+            "blob": (counters.get("blob_cache_hits", 0), counters.get("blob_cache_misses", 0)),
+            "search": (detector.search_cache.hits, detector.search_cache.misses)
+        }
+        lines.append("# TYPE plagiarism_cache_hit_ratio gauge")
+        for cache, (hits, misses) in caches.items():
+            ratio = hits / (hits + misses) if hits + misses else 0.0
+            lines.append(f'plagiarism_cache_hit_ratio{{cache="{cache}"}} {ratio:.6g}')
+
+        score_seconds = snapshot["timers"].get("score", {}).get("sum", 0.0)
+        pairs_per_second = counters.get("file_pairs_compared", 0) / score_seconds if score_seconds else 0.0
+        lines += ["# HELP plagiarism_scoring_pairs_per_second File pairs scored per second of scoring time",
+                  "# TYPE plagiarism_scoring_pairs_per_second gauge",
+                  f"plagiarism_scoring_pairs_per_second {pairs_per_second:.6g}",
+                  "# TYPE plagiarism_uptime_seconds gauge", f"plagiarism_uptime_seconds {stats['uptime_seconds']}"]
+        return "\n".join(lines) + "\n"
+
+    def start(self, host: str = '127.0.0.1', port: int = 8787) -> 'DetectionService':
+        """Start the job worker and the HTTP API in background threads"""
+        self._worker = threading.Thread(target=self._work, daemon=True)
+        self._worker.start()
+        self._httpd = ThreadingHTTPServer((host, port), DetectionServiceHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.service = self
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def address(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        """Stop the HTTP API and the worker (after the running job) and release the scoring workers"""
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._worker:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+        executor = getattr(self.detector, 'executor', None)
+        if executor:
+            executor.shutdown()
+            self.detector.executor = None
+
+class DetectionServiceHandler(BaseHTTPRequestHandler):
+    server_version = "PlagiarismDetectionService/1.0"
+
+    def log_message(self, format, *args):
+        pass  # Job events are the service's log
+
+    def do_GET(self):
+        service: DetectionService = self.server.service
+        parsed = urlparse(self.path)
+        parts = parsed.path.strip('/').split('/')
+        params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+
+        if parts == ['health']:
+            return self._send_json(200, service.stats())
+        if parts == ['metrics']:
+            return self._send(200, service.prometheus_metrics().encode(), 'text/plain; version=0.0.4; charset=utf-8')
+        if parts == ['jobs']:
+            return self._send_json(200, [job.to_dict() for job in list(service.jobs.values())])
+        if parts[0] != 'jobs' or len(parts) > 3:
+            return self._send_json(404, {'error': 'Not Found'})
+
+        job = service.job(parts[1])
+        if not job:
+            return self._send_json(404, {'error': f"Unknown job {parts[1]}"})
+        if len(parts) == 2:
+            return self._send_json(200, job.to_dict())
+        if parts[2] == 'results':
+            if job.status != "done":
+                return self._send_json(409, {'error': f"Job is {job.status}", 'status': job.status})
+            return self._send_json(200, job.results)
+        if parts[2] == 'events':
+            try:
+                since = int(params.get('since', 0))
+            except ValueError:
+                return self._send_json(400, {'error': f"Expected an integer 'since', got {params['since']!r}"})
+            return self._send_json(200, [event for event in list(job.events) if event['seq'] > since])
+        return self._send_json(404, {'error': 'Not Found'})
+
+    def do_POST(self):
+        service: DetectionService = self.server.service
+        if urlparse(self.path).path.rstrip('/') != '/jobs':
+            return self._send_json(404, {'error': 'Not Found'})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            target_repo = body['target_repo']
+            service.detector.get_repo_info(target_repo)  # reject malformed targets up front
+        except (ValueError, KeyError, TypeError) as e:
+            return self._send_json(400, {'error': f"Expected {{\"target_repo\": \"owner/repo or URL\"}}: {e}"})
+        job = service.submit(target_repo, bool(body.get('decide_fast', False)), bool(body.get('refresh', False)))
+        return self._send_json(202, job.to_dict())
+
+    def _send_json(self, status: int, body):
+        self._send(status, json.dumps(body).encode(), 'application/json; charset=utf-8')
+
+    def _send(self, status: int, data: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+def main():
+    """Serve the detection API until interrupted"""
+    parser = argparse.ArgumentParser(description="Long-running plagiarism detection service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--api-base", default=None,
+                        help="GitHub API base URL (e.g. a local fake server); defaults to $GITHUB_API_URL")
+    parser.add_argument("--executor", choices=["process", "thread"], default="process",
+                        help="Executor used for similarity scoring")
+    parser.add_argument("--max-cached-repos", type=int, default=500,
+                        help="Fetched repositories kept warm between jobs")
+    parser.add_argument("--repo-ttl", type=float, default=900.0,
+                        help="Seconds a warm repository is reused before it is fetched again")
+    parser.add_argument("--max-cached-blobs", type=int, default=50000,
+                        help="Blob contents kept warm between jobs")
+    parser.add_argument("--verbose", action="store_true", help="Show full detector output on the console")
+    args = parser.parse_args()
+
+    from async_github_detector import AsyncGitHubWideDetector
+    detector = AsyncGitHubWideDetector(api_base=args.api_base, scoring_executor=args.executor,
+                                       df_table_path="corpus_df.json", search_cache_path="search_cache.sqlite")
+    detector.events = EventStream(quiet=not args.verbose)
+
+    service = DetectionService(detector, max_cached_repos=args.max_cached_repos, repo_ttl=args.repo_ttl,
+                               max_cached_blobs=args.max_cached_blobs).start(args.host, args.port)
+    print(f"🛰️  Detection service listening at {service.address}")
+    print(f"   curl -X POST {service.address}/jobs -d '{{\"target_repo\": \"owner/repo\"}}'")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping detection service")
+        service.stop()
+
+if __name__ == "__main__":
+    main()
@@ -11,11 +11,22 @@ import hashlib
 import difflib
 import re
 import glob
+import argparse
 from typing import Dict, List, Tuple, Set
-from urllib.parse import urlparse
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from collections import defaultdict
+from contextlib import nullcontext
+from file_classifier import FileClassifier, summarize_exclusions
+from content_index import ContentHashIndex
+from results_store import ResultsStore
+from instrumentation import Metrics, RunProfiler, format_metrics, timed
+from events import EventStream, NDJSONEventSink
+from history_forensics import analyze_local_repos, format_history_section
+from subtree_matching import local_tree_listing, match_subtrees, subtree_copies, subtree_files, under_subtree
+from git_object_reader import GitObjectReaderPool, is_git_root
+from repo_spec import parse_repo_spec, format_repo_spec
+from results_stream import ResultsStreamWriter, rebuild_results
 
 @dataclass
 class FileInfo:
@@ -35,24 +46,57 @@ class RepoInfo:
     total_files: int
     total_lines: int
     is_local: bool = False
+    excluded_files: List[Dict] = field(default_factory=list)
 
 class EnhancedPlagiarismDetector:
-    def __init__(self, config_file: str = "plagiarism_config.json", github_token: str = None):
+    def __init__(self, config_file: str = "plagiarism_config.json", github_token: str = None,
+                 api_base: str = None):
         """
         Initialize the enhanced plagiarism detector
         
         Args:
             config_file: Path to configuration file
             github_token: GitHub personal access token for API access
+            api_base: GitHub API base URL (e.g. a local fake server); defaults to $GITHUB_API_URL
         """
+        self.api_base = (api_base or os.getenv('GITHUB_API_URL') or "https://api.github.com").rstrip('/')
         self.github_token = github_token or os.getenv('GITHUB_TOKEN')
         self.headers = {}
         if self.github_token:
             self.headers['Authorization'] = f'token {self.github_token}'
         
+        self.events = EventStream()
+        
         # Load configuration
         self.load_config(config_file)
         
+        # Classifier for vendored, minified and generated files
+        self.file_classifier = FileClassifier()
+        
+        # Corpus-wide content hash index, rebuilt per detection run
+        self.content_index = ContentHashIndex()
+        
+        # Optional callback invoked with each identical-file match as soon as it is found
+        self.on_identical = None
+        
+        # Optional ResultsStreamWriter; when set, result records are streamed to it as
+        # NDJSON and the results dict only keeps the header and summary
+        self.results_sink = None
+        
+        self.metrics = Metrics()
+        
+        # Commit-history forensics of local clones (streamed git log, no network)
+        self.history_forensics = True
+        
+        # Subtrees with identical git tree SHAs are reported whole (their pairs stay hash-identical in scoring)
+        self.subtree_matching = True
+        self.min_subtree_files = 2
+        
+        # Local clones are read from their object database (committed HEAD) through
+        # one persistent git cat-file --batch process per repository
+        self.read_object_database = True
+        self.object_readers = GitObjectReaderPool()
+        
     def load_config(self, config_file: str):
         """Load configuration from JSON file"""
         try:
@@ -68,7 +112,7 @@ class EnhancedPlagiarismDetector:
             self.similarity_threshold = settings.get('similarity_threshold', 0.7)
             
         except FileNotFoundError:
-            print(f"⚠️  Config file {config_file} not found. Using defaults.")
+            self.events.warning("config_missing", f"⚠️  Config file {config_file} not found. Using defaults.", path=config_file)
             self.target_repo = "https://github.com/ka-reem/agenthacks-25/commits/stolen_rewritten"
             self.comparison_repos = ["https://github.com/IdkwhatImD0ing/DispatchAI"]
             self.code_extensions = {'.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp'}
@@ -92,28 +136,49 @@ class EnhancedPlagiarismDetector:
                 repo_path = os.path.join(base_path, item)
                 if os.path.isdir(repo_path) and item != "delete":
                     local_repos.append(repo_path)
-                    print(f"📁 Found local repository: {repo_path}")
+                    self.events.info("local_repo_found", f"📁 Found local repository: {repo_path}", path=repo_path)
         
         return local_repos
 
+    @timed("fetch")
     def fetch_local_repo_contents(self, repo_path: str) -> RepoInfo:
         """
         Fetch repository contents from local filesystem
         
+        Git clones are read from their object database (see fetch_local_git_contents);
+        other directories, and clones without a readable HEAD tree (no commits yet),
+        are walked on disk.
+        
         Args:
             repo_path: Path to local repository
             
         Returns:
             RepoInfo object containing repository data
         """
+        if self.read_object_database and is_git_root(repo_path):
+            repo_info = self.fetch_local_git_contents(repo_path)
+            if repo_info:
+                return repo_info
+            self.events.info("local_walk_fallback", f"📂 No committed tree in {repo_path}, walking the working tree",
+                             repo=repo_path)
         try:
-            print(f"📥 Scanning local repository: {repo_path}")
+            self.events.info("fetch_start", f"📥 Scanning local repository: {repo_path}", repo=repo_path, local=True)
             files = []
+            excluded_files = []
             
             # Walk through all files in the repository
             for root, dirs, filenames in os.walk(repo_path):
-                # Skip common non-code directories
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', '__pycache__', 'venv', 'env']]
+                # Skip hidden directories and vendored/build output directories
+                kept_dirs = []
+                for d in dirs:
+                    if d.startswith('.'):
+                        continue
+                    classification = self.file_classifier.classify_dir(os.path.relpath(os.path.join(root, d), repo_path))
+                    if classification:
+                        excluded_files.append(classification.to_dict())
+                    else:
+                        kept_dirs.append(d)
+                dirs[:] = kept_dirs
                 
                 for filename in filenames:
                     file_path = os.path.join(root, filename)
@@ -122,11 +187,19 @@ class EnhancedPlagiarismDetector:
                     
                     # Only process code files
                     if file_ext in self.code_extensions:
+                        classification = self.file_classifier.classify_path(relative_path)
+                        if classification:
+                            excluded_files.append(classification.to_dict())
+                            continue
+                        
                         try:
                             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                                 content = f.read()
                             
-                            if len(content) >= self.min_file_size:
+                            classification = self.file_classifier.classify_content(relative_path, content)
+                            if classification:
+                                excluded_files.append(classification.to_dict())
+                            elif len(content) >= self.min_file_size:
                                 file_info = FileInfo(
                                     path=relative_path,
                                     content=content,
@@ -136,7 +209,7 @@ class EnhancedPlagiarismDetector:
                                 )
                                 files.append(file_info)
                         except Exception as e:
-                            print(f"⚠️  Error reading file {file_path}: {e}")
+                            self.events.warning("read_error", f"⚠️  Error reading file {file_path}: {e}", path=file_path, error=str(e))
             
             total_lines = sum(f.lines for f in files)
             
@@ -146,53 +219,153 @@ class EnhancedPlagiarismDetector:
                 files=files,
                 total_files=len(files),
                 total_lines=total_lines,
-                is_local=True
+                is_local=True,
+                excluded_files=excluded_files
             )
             
         except Exception as e:
-            print(f"❌ Error scanning local repository {repo_path}: {e}")
+            self.events.error("fetch_error", f"❌ Error scanning local repository {repo_path}: {e}", repo=repo_path, error=str(e))
             return None
 
-    def get_repo_info(self, repo_url: str) -> str:
-        """Extract repository information from GitHub URL"""
-        parsed = urlparse(repo_url)
-        path_parts = parsed.path.strip('/').split('/')
+    def fetch_local_git_contents(self, repo_path: str, ref: str = "HEAD") -> RepoInfo:
+        """
+        Fetch the files of a local clone at a revision from its object database
         
-        if len(path_parts) >= 2:
-            owner = path_parts[0]
-            repo = path_parts[1]
-            return f"{owner}/{repo}"
+        One ls-tree lists the revision; the selected blobs are then streamed through
+        the repository's persistent cat-file pipe, so no checkout is needed and
+        uncommitted working-tree changes are not seen.
         
-        raise ValueError(f"Invalid GitHub repository URL: {repo_url}")
+        Args:
+            repo_path: Path to the clone's top level
+            ref: Revision to read
+            
+        Returns:
+            RepoInfo object containing repository data, or None if the revision
+            cannot be listed or its tree is empty
+        """
+        try:
+            self.events.info("fetch_start", f"📥 Reading local repository: {repo_path} ({ref})",
+                             repo=repo_path, local=True, ref=ref)
+            tree = local_tree_listing(repo_path, ref)
+            if not tree:
+                return None
+            excluded_files = []
+            
+            # Hidden and vendored/build output directories are skipped with everything under them
+            skipped_dirs = []
+            for entry in tree:
+                if entry['type'] != 'tree' or under_subtree(entry['path'], skipped_dirs):
+                    continue
+                if os.path.basename(entry['path']).startswith('.'):
+                    skipped_dirs.append(entry['path'])
+                    continue
+                classification = self.file_classifier.classify_dir(entry['path'])
+                if classification:
+                    excluded_files.append(classification.to_dict())
+                    skipped_dirs.append(entry['path'])
+            
+            selected = []
+            for entry in tree:
+                # Symlinks (mode 120000) are blobs holding the link target, not code
+                if entry['type'] != 'blob' or entry['mode'] == '120000' or under_subtree(entry['path'], skipped_dirs):
+                    continue
+                if os.path.splitext(entry['path'])[1].lower() not in self.code_extensions:
+                    continue
+                classification = self.file_classifier.classify_path(entry['path'])
+                if classification:
+                    excluded_files.append(classification.to_dict())
+                elif entry['size'] >= self.min_file_size:
+                    selected.append(entry)
+            
+            blobs = self.object_readers.get(repo_path).read_blobs(entry['sha'] for entry in selected)
+            self.metrics.incr("blobs_read", len(blobs))
+            
+            files = []
+            for entry in selected:
+                content = blobs.get(entry['sha'], b"").decode('utf-8', errors='ignore')
+                classification = self.file_classifier.classify_content(entry['path'], content)
+                if classification:
+                    excluded_files.append(classification.to_dict())
+                elif len(content) >= self.min_file_size:
+                    files.append(FileInfo(
+                        path=entry['path'],
+                        content=content,
+                        hash=hashlib.md5(content.encode()).hexdigest(),
+                        size=len(content),
+                        lines=len(content.splitlines())
+                    ))
+            
+            return RepoInfo(
+                url=repo_path,
+                name=os.path.basename(repo_path),
+                files=files,
+                total_files=len(files),
+                total_lines=sum(f.lines for f in files),
+                is_local=True,
+                excluded_files=excluded_files
+            )
+            
+        except Exception as e:
+            self.events.error("fetch_error", f"❌ Error reading local repository {repo_path}: {e}", repo=repo_path, error=str(e))
+            return None
 
-    def fetch_repo_contents(self, repo_url: str) -> RepoInfo:
+    def get_repo_info(self, repo_url: str) -> str:
+        """Extract repository information from GitHub URL"""
+        return parse_repo_spec(repo_url)[0]
+
+    def get_repo_ref(self, repo_url: str) -> str:
+        """Branch, tag or commit named by a GitHub URL or spec (None for the default branch)"""
+        return parse_repo_spec(repo_url)[1]
+
+    def fetch_tree_listing(self, repo_url: str) -> List[Dict]:
+        """Recursive git tree listing of a GitHub repository (one API call), empty on failure"""
+        try:
+            ref = self.get_repo_ref(repo_url) or "HEAD"
+            url = f"{self.api_base}/repos/{self.get_repo_info(repo_url)}/git/trees/{ref}"
+            response = requests.get(url, headers=self.headers, params={'recursive': 1})
+            if response.status_code == 200:
+                return response.json().get('tree', [])
+        except Exception as e:
+            self.events.error("fetch_error", f"❌ Error fetching tree for {repo_url}: {e}", repo=repo_url, error=str(e))
+        return []
+
+    @timed("fetch")
+    def fetch_repo_contents(self, repo_url: str, subtrees: List[Dict] = None,
+                            source_files: List[FileInfo] = None) -> RepoInfo:
         """
         Fetch repository contents from GitHub API
         
         Args:
-            repo_url: GitHub repository URL
+            repo_url: GitHub repository URL, optionally naming a branch, tag or commit
+            subtrees: Subtrees identical to the target's (from match_subtrees());
+                their files are taken from source_files instead of being downloaded
+            source_files: Target files backing the matched subtrees
             
         Returns:
             RepoInfo object containing repository data
         """
         try:
+            reused = {subtree['comparison_path']: subtree for subtree in subtrees or []}
             repo_name = self.get_repo_info(repo_url)
-            print(f"📥 Fetching repository: {repo_name}")
+            ref = self.get_repo_ref(repo_url)
+            ref_params = {'ref': ref} if ref else None
+            self.events.info("fetch_start", f"📥 Fetching repository: {format_repo_spec(repo_name, ref)}", repo=repo_name, ref=ref)
             
-            api_url = f"https://api.github.com/repos/{repo_name}/contents"
+            api_url = f"{self.api_base}/repos/{repo_name}/contents"
             files = []
+            excluded_files = []
             
             def fetch_directory(url: str, path: str = ""):
                 """Recursively fetch directory contents"""
                 try:
-                    response = requests.get(url, headers=self.headers)
+                    response = requests.get(url, headers=self.headers, params=ref_params)
                     if response.status_code == 403:
-                        print(f"⚠️  Rate limit hit. Waiting 60 seconds...")
+                        self.events.warning("rate_limited", "⚠️  Rate limit hit. Waiting 60 seconds...", wait_seconds=60)
                         time.sleep(60)
-                        response = requests.get(url, headers=self.headers)
+                        response = requests.get(url, headers=self.headers, params=ref_params)
                     
                     if response.status_code != 200:
-                        print(f"❌ Failed to fetch {url}: {response.status_code}")
+                        self.events.error("fetch_failed", f"❌ Failed to fetch {url}: {response.status_code}", url=url, status=response.status_code)
                         return
                     
                     items = response.json()
@@ -204,8 +377,16 @@ class EnhancedPlagiarismDetector:
                             
                             # Only process code files
                             if file_ext in self.code_extensions:
+                                classification = self.file_classifier.classify_path(file_path)
+                                if classification:
+                                    excluded_files.append(classification.to_dict())
+                                    continue
+                                
                                 file_content = self.fetch_file_content(item['download_url'])
-                                if file_content and len(file_content) >= self.min_file_size:
+                                classification = self.file_classifier.classify_content(file_path, file_content)
+                                if classification:
+                                    excluded_files.append(classification.to_dict())
+                                elif file_content and len(file_content) >= self.min_file_size:
                                     file_info = FileInfo(
                                         path=file_path,
                                         content=file_content,
@@ -216,11 +397,20 @@ class EnhancedPlagiarismDetector:
                                     files.append(file_info)
                         
                         elif item['type'] == 'dir':
+                            if item['path'] in reused:
+                                files.extend(subtree_files(reused[item['path']], source_files))
+                                continue
+                            
+                            classification = self.file_classifier.classify_dir(item['path'])
+                            if classification:
+                                excluded_files.append(classification.to_dict())
+                                continue
+                            
                             # Recursively fetch subdirectory
                             fetch_directory(item['url'], item['path'])
                 
                 except Exception as e:
-                    print(f"❌ Error fetching directory {url}: {e}")
+                    self.events.error("fetch_error", f"❌ Error fetching directory {url}: {e}", url=url, error=str(e))
             
             fetch_directory(api_url)
             
@@ -232,11 +422,12 @@ class EnhancedPlagiarismDetector:
                 files=files,
                 total_files=len(files),
                 total_lines=total_lines,
-                is_local=False
+                is_local=False,
+                excluded_files=excluded_files
             )
             
         except Exception as e:
-            print(f"❌ Error fetching repository {repo_url}: {e}")
+            self.events.error("fetch_error", f"❌ Error fetching repository {repo_url}: {e}", repo=repo_url, error=str(e))
             return None
 
     def fetch_file_content(self, download_url: str) -> str:
@@ -246,9 +437,10 @@ class EnhancedPlagiarismDetector:
             if response.status_code == 200:
                 return response.text
         except Exception as e:
-            print(f"❌ Error fetching file content: {e}")
+            self.events.error("fetch_error", f"❌ Error fetching file content: {e}", url=download_url, error=str(e))
         return None
 
+    @timed("normalize")
     def normalize_code(self, content: str) -> str:
         """
         Normalize code content for comparison
@@ -285,7 +477,8 @@ class EnhancedPlagiarismDetector:
         normalized2 = self.normalize_code(content2)
         
         # Use SequenceMatcher for similarity calculation
-        similarity = difflib.SequenceMatcher(None, normalized1, normalized2).ratio()
+        with self.metrics.timer("similarity"):
+            similarity = difflib.SequenceMatcher(None, normalized1, normalized2).ratio()
         return similarity
 
     def detect_plagiarism_comprehensive(self) -> Dict:
@@ -295,15 +488,17 @@ class EnhancedPlagiarismDetector:
         Returns:
             Dictionary containing plagiarism analysis results
         """
-        print(f"🔍 Starting comprehensive plagiarism detection")
-        print(f"🎯 Target repository: {self.target_repo}")
+        self.events.info("run_start", f"🔍 Starting comprehensive plagiarism detection", target_repo=self.target_repo)
+        self.events.info("target", f"🎯 Target repository: {self.target_repo}")
+        self.metrics.reset()
         
         # Fetch target repository
         target_info = self.fetch_repo_contents(self.target_repo)
         if not target_info:
             return {"error": "Failed to fetch target repository"}
         
-        print(f"✅ Target repo: {target_info.total_files} files, {target_info.total_lines} lines")
+        self.events.info("target_fetched", f"✅ Target repo: {target_info.total_files} files, {target_info.total_lines} lines",
+                         files=target_info.total_files, lines=target_info.total_lines)
         
         # Scan for local repositories
         local_repos = self.scan_local_repositories()
@@ -320,55 +515,112 @@ class EnhancedPlagiarismDetector:
             "comparisons": [],
             "suspicious_matches": [],
             "identical_files": [],
+            "excluded_files": [],
             "summary": {}
         }
         
-        print(f"📋 Comparing against {len(all_comparison_repos)} repositories ({len(local_repos)} local)")
+        if self.history_forensics and local_repos:
+            with self.metrics.timer("history"):
+                results["history"] = analyze_local_repos(local_repos)
+            flagged = [repo for repo, analysis in results["history"].items() if analysis["history_risk"] != "LOW"]
+            self.events.info("history_analyzed", f"🕰️  Analyzed commit history of {len(results['history'])} local clones, "
+                             f"{len(flagged)} flagged", repos=len(results["history"]), flagged=flagged)
+        
+        if self.results_sink:
+            self.results_sink.header(results)
+        for entry in target_info.excluded_files:
+            self._add_result(results, "excluded_files", dict(entry, repo=self.target_repo))
+        
+        # Exact duplicates are found by hash lookup as each repository is ingested
+        self.content_index = ContentHashIndex()
+        self.content_index.set_target(target_info)
+        
+        self.events.info("candidates", f"📋 Comparing against {len(all_comparison_repos)} repositories ({len(local_repos)} local)",
+                         candidates=len(all_comparison_repos), local=len(local_repos))
+        
+        # Tree listing of the target for the subtree-equality pre-pass
+        target_tree = self.fetch_tree_listing(self.target_repo) if self.subtree_matching else []
         
         # Compare with each repository
-        for repo in all_comparison_repos:
-            print(f"\n🔄 Comparing with: {repo}")
+        for i, repo in enumerate(all_comparison_repos, 1):
+            self.events.progress("compare", i, len(all_comparison_repos), f"\n🔄 Comparing with: {repo}", repo=repo)
+            
+            # Directories copied wholesale share a tree SHA; they are reported whole and,
+            # for remote repositories, taken from the target instead of downloaded
+            subtrees = []
+            if target_tree:
+                comparison_tree = local_tree_listing(repo) if os.path.exists(repo) else self.fetch_tree_listing(repo)
+                subtrees = match_subtrees(target_tree, comparison_tree, self.min_subtree_files,
+                                          self.file_classifier.classify_dir)
+            for subtree in subtrees:
+                self.metrics.incr("identical_subtrees")
+                self.events.warning("identical_subtree",
+                                    f"🚨 CRITICAL: {subtree['target_path']}/ is identical to {repo}/{subtree['comparison_path']}/ "
+                                    f"({subtree['files']} files)", repo=repo, **subtree)
             
             # Determine if it's a local or remote repository
             if os.path.exists(repo):
                 comparison_info = self.fetch_local_repo_contents(repo)
+            elif subtrees:
+                self.metrics.incr("subtree_files_reused", sum(subtree['files'] for subtree in subtrees))
+                comparison_info = self.fetch_repo_contents(repo, subtrees, target_info.files)
             else:
                 comparison_info = self.fetch_repo_contents(repo)
             
             if not comparison_info:
-                print(f"❌ Failed to fetch: {repo}")
+                self.events.warning("fetch_failed", f"❌ Failed to fetch: {repo}", repo=repo)
                 continue
             
-            print(f"✅ Comparison repo: {comparison_info.total_files} files, {comparison_info.total_lines} lines")
+            self.events.info("repo_stats", f"✅ Comparison repo: {comparison_info.total_files} files, {comparison_info.total_lines} lines",
+                             repo=repo, files=comparison_info.total_files, lines=comparison_info.total_lines)
+            for entry in comparison_info.excluded_files:
+                self._add_result(results, "excluded_files", dict(entry, repo=repo))
             
-            # Compare files
-            matches = []
+            # Identical files come straight from the content index, before any similarity work
             identical_matches = []
-            total_similarity = 0
-            comparisons_made = 0
+            for target_file, location in self.content_index.add_repo(comparison_info, repo):
+                identical_match = {
+                    "target_file": target_file.path,
+                    "comparison_file": location.path,
+                    "repo": repo,
+                    "lines": target_file.lines
+                }
+                identical_matches.append(identical_match)
+                self._add_result(results, "identical_files", identical_match)
+                self.events.warning("identical_file", f"🚨 CRITICAL: {target_file.path} is identical to {repo}/{location.path}",
+                                    repo=repo, target_file=target_file.path, comparison_file=location.path)
+                if self.on_identical:
+                    self.on_identical(identical_match)
+            
+            # Compare files; pairs inside identical subtrees are credited as copies instead of scored
+            matches = []
+            target_prefixes = [subtree['target_path'] for subtree in subtrees]
+            comparison_prefixes = [subtree['comparison_path'] for subtree in subtrees]
+            comparisons_made = subtree_copies([f.path for f in target_info.files],
+                                              [f.path for f in comparison_info.files], subtrees)
+            total_similarity = float(comparisons_made)
             
             for target_file in target_info.files:
+                target_in_subtree = under_subtree(target_file.path, target_prefixes)
                 for comp_file in comparison_info.files:
+                    if target_in_subtree and under_subtree(comp_file.path, comparison_prefixes):
+                        continue
+                    
                     # Compare files with similar paths or extensions
                     if (os.path.splitext(target_file.path)[1] == os.path.splitext(comp_file.path)[1] or
                         os.path.basename(target_file.path) == os.path.basename(comp_file.path)):
                         
-                        similarity = self.calculate_similarity(target_file.content, comp_file.content)
-                        total_similarity += similarity
                         comparisons_made += 1
                         
-                        # Check for identical files (hash comparison)
+                        # Identical files were already reported by the content index
                         if target_file.hash == comp_file.hash:
-                            identical_match = {
-                                "target_file": target_file.path,
-                                "comparison_file": comp_file.path,
-                                "repo": repo,
-                                "lines": target_file.lines
-                            }
-                            identical_matches.append(identical_match)
-                            results["identical_files"].append(identical_match)
+                            total_similarity += 1.0
+                            continue
                         
-                        elif similarity >= self.similarity_threshold:
+                        similarity = self.calculate_similarity(target_file.content, comp_file.content)
+                        total_similarity += similarity
+                        
+                        if similarity >= self.similarity_threshold:
                             match = {
                                 "target_file": target_file.path,
                                 "comparison_file": comp_file.path,
@@ -379,33 +631,38 @@ class EnhancedPlagiarismDetector:
                             matches.append(match)
                             
                             if similarity > 0.9:
-                                results["suspicious_matches"].append({
+                                self._add_result(results, "suspicious_matches", {
                                     "repo": repo,
                                     "match": match
                                 })
             
             avg_similarity = total_similarity / comparisons_made if comparisons_made > 0 else 0
+            self.metrics.incr("file_pairs_compared", comparisons_made)
             
             comparison_result = {
                 "repo": repo,
                 "is_local": comparison_info.is_local,
                 "repo_stats": {
                     "files": comparison_info.total_files,
-                    "lines": comparison_info.total_lines
+                    "lines": comparison_info.total_lines,
+                    "excluded_files": len(comparison_info.excluded_files)
                 },
                 "matches": matches,
                 "identical_files": identical_matches,
+                "identical_subtrees": subtrees,
                 "average_similarity": avg_similarity,
                 "high_similarity_files": len(matches)
             }
             
-            results["comparisons"].append(comparison_result)
-            print(f"📊 Found {len(matches)} suspicious matches, {len(identical_matches)} identical files (avg similarity: {avg_similarity:.2f})")
+            self._add_result(results, "comparisons", comparison_result)
+            self.events.info("comparison_scored",
+                             f"📊 Found {len(matches)} suspicious matches, {len(identical_matches)} identical files (avg similarity: {avg_similarity:.2f})",
+                             repo=repo, matches=len(matches), identical_files=len(identical_matches), average_similarity=avg_similarity)
         
         # Generate summary
-        total_suspicious = len(results["suspicious_matches"])
-        total_identical = len(results["identical_files"])
-        total_comparisons = len(results["comparisons"])
+        total_suspicious = self._count_results(results, "suspicious_matches")
+        total_identical = self._count_results(results, "identical_files")
+        total_comparisons = self._count_results(results, "comparisons")
         
         # Determine risk level
         if total_identical > 3 or total_suspicious > 10:
@@ -421,117 +678,208 @@ class EnhancedPlagiarismDetector:
             "total_repositories_compared": total_comparisons,
             "total_suspicious_matches": total_suspicious,
             "total_identical_files": total_identical,
+            "total_excluded_files": self._count_results(results, "excluded_files"),
+            "excluded_by_category": (dict(self.results_sink.excluded_by_category) if self.results_sink
+                                     else summarize_exclusions(results["excluded_files"])),
             "plagiarism_risk": risk_level
         }
+        results["metrics"] = self.metrics.snapshot()
+        self.events.info("run_complete", summary=results["summary"])
+        if self.results_sink:
+            self.results_sink.metrics(results["metrics"])
+            self.results_sink.summary(results["summary"])
+            results["results_stream"] = self.results_sink.path
         
         return results
 
-    def generate_detailed_report(self, results: Dict, output_file: str = None):
+    def _add_result(self, results: Dict, key: str, item: Dict):
+        """Append an item to a results list, or stream it when a results sink is set"""
+        if self.results_sink:
+            self.results_sink.add(key, item)
+        else:
+            results[key].append(item)
+
+    def _count_results(self, results: Dict, key: str) -> int:
+        """Number of items added to a results list (streamed or in memory)"""
+        return len(results[key]) + (self.results_sink.counts[key] if self.results_sink else 0)
+
+    @timed("report")
+    def generate_detailed_report(self, results: Dict = None, output_file: str = None,
+                                 store: ResultsStore = None, run_id: int = None):
         """
         Generate a detailed plagiarism report
         
         Args:
             results: Results from detect_plagiarism_comprehensive()
             output_file: Optional file to save the report
+            store: ResultsStore already holding the run (instead of results)
+            run_id: Run id within store
         """
+        if store is None:
+            store, run_id = ResultsStore.from_results(results)
+        run = store.run(run_id)
+        summary = run['summary']
+        
         report = []
         report.append("=" * 100)
         report.append("COMPREHENSIVE PLAGIARISM DETECTION REPORT")
         report.append("=" * 100)
-        report.append(f"Target Repository: {results['target_repo']}")
-        report.append(f"Target Stats: {results['target_stats']['files']} files, {results['target_stats']['lines']} lines")
-        report.append(f"Plagiarism Risk: {results['summary']['plagiarism_risk']}")
+        report.append(f"Target Repository: {run['target_repo']}")
+        report.append(f"Target Stats: {run['target_stats']['files']} files, {run['target_stats']['lines']} lines")
+        report.append(f"Plagiarism Risk: {summary['plagiarism_risk']}")
         report.append(f"Analysis Date: {time.strftime('%Y-%m-%d %H:%M:%S')}")
         report.append("")
         
         # Summary section
         report.append("📊 SUMMARY:")
         report.append("-" * 50)
-        report.append(f"Repositories Compared: {results['summary']['total_repositories_compared']}")
-        report.append(f"Suspicious Matches (>70% similarity): {results['summary']['total_suspicious_matches']}")
-        report.append(f"Identical Files (100% match): {results['summary']['total_identical_files']}")
+        report.append(f"Repositories Compared: {summary['total_repositories_compared']}")
+        report.append(f"Suspicious Matches (>70% similarity): {summary['total_suspicious_matches']}")
+        report.append(f"Identical Files (100% match): {summary['total_identical_files']}")
+        report.append(f"Excluded Files (vendored/generated, not scored): {summary.get('total_excluded_files', 0)}")
         report.append("")
         
         # Identical files (most serious)
-        if results['identical_files']:
+        identical_files = store.identical_files(run_id)
+        if identical_files:
             report.append("🚨 IDENTICAL FILES (100% match - CRITICAL):")
             report.append("-" * 70)
-            for match in results['identical_files']:
+            for match in identical_files:
                 report.append(f"Repository: {match['repo']}")
                 report.append(f"  {match['target_file']} → {match['comparison_file']}")
                 report.append(f"  Lines: {match['lines']}")
                 report.append("")
         
         # Suspicious matches
-        if results['suspicious_matches']:
+        suspicious_matches = store.suspicious_matches(run_id)
+        if suspicious_matches:
             report.append("⚠️  SUSPICIOUS MATCHES (>90% similarity):")
             report.append("-" * 70)
-            for match in results['suspicious_matches']:
+            for match in suspicious_matches:
                 report.append(f"Repository: {match['repo']}")
                 report.append(f"  {match['match']['target_file']} → {match['match']['comparison_file']}")
                 report.append(f"  Similarity: {match['match']['similarity']:.2%}")
                 report.append(f"  Lines: {match['match']['target_lines']} vs {match['match']['comparison_lines']}")
                 report.append("")
         
+        # Excluded files are listed separately, never scored
+        excluded_files = store.excluded_files(run_id, limit=20)  # Show first 20 exclusions
+        if excluded_files:
+            report.append("🗑️  EXCLUDED FILES (vendored, build output, minified, lockfiles, generated):")
+            report.append("-" * 70)
+            for category, count in sorted(summary['excluded_by_category'].items()):
+                report.append(f"  {category}: {count}")
+            for entry in excluded_files:
+                report.append(f"  {entry['repo']}: {entry['path']} ({entry['reason']})")
+            report.append("")
+        
         report.append("📋 DETAILED COMPARISON RESULTS:")
         report.append("-" * 70)
         
-        for comparison in results['comparisons']:
+        for comparison in store.comparisons(run_id):
             repo_type = "LOCAL" if comparison['is_local'] else "REMOTE"
             report.append(f"Repository: {comparison['repo']} ({repo_type})")
             report.append(f"  Files: {comparison['repo_stats']['files']}, Lines: {comparison['repo_stats']['lines']}")
             report.append(f"  Average Similarity: {comparison['average_similarity']:.2%}")
             report.append(f"  High Similarity Files: {comparison['high_similarity_files']}")
-            report.append(f"  Identical Files: {len(comparison['identical_files'])}")
+            report.append(f"  Identical Files: {comparison['identical_count']}")
             
-            if comparison['identical_files']:
+            if comparison.get('identical_subtrees'):
+                report.append("  IDENTICAL SUBTREES:")
+                for subtree in comparison['identical_subtrees']:
+                    report.append(f"    {subtree['target_path']}/ = {subtree['comparison_path']}/ ({subtree['files']} files)")
+            
+            if comparison['identical_count']:
                 report.append("  IDENTICAL FILES:")
-                for match in comparison['identical_files']:
+                for match in store.identical_files(run_id, comparison['repo']):
                     report.append(f"    {match['target_file']} = {match['comparison_file']}")
             
-            if comparison['matches']:
+            if comparison['high_similarity_files']:
                 report.append("  HIGH SIMILARITY MATCHES:")
-                for match in comparison['matches'][:5]:  # Show top 5 matches
+                for match in store.comparison_matches(comparison['_id'], limit=5):  # Show top 5 matches
                     report.append(f"    {match['target_file']} ({match['similarity']:.2%})")
             report.append("")
         
+        if run.get('history'):
+            report.append("🕰️  COMMIT HISTORY FORENSICS:")
+            report.append("-" * 70)
+            report.extend(format_history_section(run['history']))
+        
+        if run.get('metrics'):
+            report.append("RUN METRICS:")
+            report.append("-" * 50)
+            report.extend(format_metrics(run['metrics']))
+            report.append("")
+        
         report.append("=" * 100)
         
         report_text = "\n".join(report)
-        print(report_text)
+        self.events.say(report_text)
         
         if output_file:
             with open(output_file, 'w') as f:
                 f.write(report_text)
-            print(f"📄 Report saved to: {output_file}")
+            self.events.info("report_saved", f"📄 Report saved to: {output_file}", path=output_file, format="text")
 
 def main():
     """Main function to run comprehensive plagiarism detection"""
     
+    parser = argparse.ArgumentParser(description="Comprehensive plagiarism detection")
+    parser.add_argument("--profile", default=None, metavar="FILE",
+                        help="Capture cProfile hot spots and tracemalloc allocations of the run to FILE")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Only show warnings, errors and a periodic progress line")
+    parser.add_argument("--events", default=None, metavar="FILE",
+                        help="Append structured run events to this NDJSON file")
+    parser.add_argument("--no-history", action="store_true",
+                        help="Skip commit-history forensics of the local clones")
+    parser.add_argument("--no-subtree-match", action="store_true",
+                        help="Skip the tree-SHA pre-pass that reports wholesale-copied directories")
+    parser.add_argument("--stream", default=None,
+                        help="Stream result records to this NDJSON file instead of holding them in memory")
+    args = parser.parse_args()
+    
     print("🚀 Starting Enhanced Plagiarism Detection Tool")
     print("=" * 60)
     
     # Initialize detector with configuration
     detector = EnhancedPlagiarismDetector()
+    detector.history_forensics = not args.no_history
+    detector.subtree_matching = not args.no_subtree_match
+    detector.events = EventStream(quiet=args.quiet)
+    event_sink = detector.events.add_sink(NDJSONEventSink(args.events)) if args.events else None
+    if args.stream:
+        detector.results_sink = ResultsStreamWriter(args.stream)
     
     try:
         # Run comprehensive plagiarism detection
-        results = detector.detect_plagiarism_comprehensive()
+        with RunProfiler() if args.profile else nullcontext() as profiler:
+            results = detector.detect_plagiarism_comprehensive()
+        if profiler:
+            profiler.dump(args.profile)
         
         if "error" in results:
             print(f"❌ {results['error']}")
             return
         
-        # Generate and save report
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        report_file = f"comprehensive_plagiarism_report_{timestamp}.txt"
-        detector.generate_detailed_report(results, report_file)
-        
-        # Save results as JSON for further analysis
-        json_file = f"plagiarism_results_{timestamp}.json"
-        with open(json_file, 'w') as f:
-            json.dump(results, f, indent=2)
-        print(f"📄 JSON results saved to: {json_file}")
+        if detector.results_sink:
+            # Records are already on disk; the report is rendered from the rebuilt stream
+            print(f"📄 Result records streamed to: {args.stream}")
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            detector.generate_detailed_report(rebuild_results(args.stream),
+                                              f"comprehensive_plagiarism_report_{timestamp}.txt")
+        else:
+            # Generate and save report
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            report_file = f"comprehensive_plagiarism_report_{timestamp}.txt"
+            detector.generate_detailed_report(results, report_file)
+            results["metrics"] = detector.metrics.snapshot()  # now including the report stage
+            
+            # Save results as JSON for further analysis
+            json_file = f"plagiarism_results_{timestamp}.json"
+            with open(json_file, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"📄 JSON results saved to: {json_file}")
         
         # Print summary
         print(f"\n🎯 PLAGIARISM DETECTION COMPLETE")
@@ -543,6 +891,12 @@ def main():
         print(f"❌ Error during plagiarism detection: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        detector.object_readers.close()
+        if detector.results_sink:
+            detector.results_sink.close()
+        if event_sink:
+            event_sink.close()
 
 if __name__ == "__main__":
     main()
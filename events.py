@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Structured Run Events
+Leveled events in place of print() in the detectors: a console display
+(with quiet mode and rate-limited progress) plus machine-readable sinks
+such as an NDJSON event file for service integrations
+"""
+
+import sys
+import json
+import time
+import threading
+from typing import Callable, Dict, List
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+class NDJSONEventSink:
+    def __init__(self, path: str):
+        """
+        Append events to an NDJSON file, one record per line
+
+        Args:
+            path: File the events are appended to
+        """
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __call__(self, record: Dict):
+        self._file.write(json.dumps(record, default=str) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class EventStream:
+    def __init__(self, level: str = "info", quiet: bool = False, progress_interval: float = None, stream=None):
+        """
+        Initialize the event stream. Each detector keeps one as self.events
+        and sends its progress, findings and errors through it
+
+        Args:
+            level: Lowest level shown on the console
+            quiet: Only show warnings, errors and a rate-limited progress line
+            progress_interval: Minimum seconds between progress lines per stage
+                (default: every line normally, 2s in quiet mode)
+            stream: Console stream (default: stdout)
+        """
+        self.level = LEVELS["warning"] if quiet else LEVELS[level]
+        self.quiet = quiet
+        self.progress_interval = progress_interval if progress_interval is not None else (2.0 if quiet else 0.0)
+        self.stream = stream
+        self.sinks: List[Callable[[Dict], None]] = []
+        self._last_progress: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink: Callable[[Dict], None]):
+        """Receive every event record (all levels, progress included)"""
+        self.sinks.append(sink)
+        return sink
+
+    def remove_sink(self, sink: Callable[[Dict], None]):
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+
+    def enabled(self, level: str) -> bool:
+        """Whether a console message at this level would be shown"""
+        return LEVELS[level] >= self.level
+
+    def say(self, text: str, level: str = "info"):
+        """Console-only text (e.g. a rendered report); never sent to sinks"""
+        if LEVELS[level] >= self.level:
+            print(text, file=self.stream or sys.stdout)
+
+    def emit(self, event: str, message: str = None, level: str = "info", **fields):
+        """
+        Record an event
+
+        Args:
+            event: Machine-readable event name (e.g. "fetch_start")
+            message: Human-readable console line
+            level: debug, info, warning or error
+            fields: Structured event data for the sinks
+        """
+        if self.sinks:
+            record = dict(fields, event=event, level=level, time=time.time())
+            if message is not None:
+                record["message"] = message
+            with self._lock:
+                for sink in self.sinks:
+                    sink(record)
+        if message is not None:
+            self.say(message, level)
+
+    def debug(self, event: str, message: str = None, **fields):
+        self.emit(event, message, "debug", **fields)
+
+    def info(self, event: str, message: str = None, **fields):
+        self.emit(event, message, "info", **fields)
+
+    def warning(self, event: str, message: str = None, **fields):
+        self.emit(event, message, "warning", **fields)
+
+    def error(self, event: str, message: str = None, **fields):
+        self.emit(event, message, "error", **fields)
+
+    def progress(self, stage: str, done: int, total: int, message: str = None, **fields):
+        """
+        Report progress through a stage
+
+        Sinks receive every update. The console shows the message normally, or
+        a compact "stage done/total" line in quiet mode, at most once per
+        progress_interval per stage (the final update is always shown).
+        """
+        if self.sinks:
+            self.emit("progress", None, "info", stage=stage, done=done, total=total, **fields)
+        now = time.monotonic()
+        last = self._last_progress.get(stage)
+        if last is not None and now - last < self.progress_interval and done < total:
+            return
+        self._last_progress[stage] = now
+        if self.quiet:
+            print(f"⏳ {stage}: {done}/{total}", file=self.stream or sys.stdout)
+        elif message is not None:
+            self.say(message)
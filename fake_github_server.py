@@ -0,0 +1,575 @@
+#!/usr/bin/env python3
+"""
+Fake GitHub Server
+Local stand-in for the parts of the GitHub REST API the detectors use
+(contents, git trees/blobs, tarball/zipball archives, repository and code
+search, raw downloads, head commits and compares), served from on-disk
+fixture repositories with simulated latency, rate-limit headers and
+injected 403s
+
+Each load_fixtures() call keeps the previous snapshot of every repository as
+an earlier commit, so editing fixtures and reloading simulates a push.
+
+Fixture layout: <root>/<owner>/<repo>/... holds each repository's files
+(its default branch); <root>/<owner>/<repo>@<branch>/... adds a branch of
+that repository, served wherever the API takes a ref. An optional <root>/repos.json maps "owner/repo" to metadata overrides
+(stars, description, language, and "commits": the commit history served
+by the commits listing, in the API's shape, newest first).
+"""
+
+import io
+import os
+import re
+import json
+import time
+import base64
+import hashlib
+import tarfile
+import zipfile
+import argparse
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LANGUAGE_BY_EXTENSION = {
+    '.py': 'Python', '.js': 'JavaScript', '.ts': 'TypeScript', '.tsx': 'TypeScript',
+    '.jsx': 'JavaScript', '.java': 'Java', '.cpp': 'C++', '.c': 'C', '.cs': 'C#',
+    '.php': 'PHP', '.rb': 'Ruby', '.go': 'Go', '.rs': 'Rust',
+}
+
+# Search qualifiers (language:Python, stars:>10, ...) are parsed separately from terms
+QUALIFIER_PATTERN = re.compile(r'(\w+):(\S+)')
+TERM_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+def git_object_sha(kind: str, data: bytes) -> str:
+    """SHA-1 git assigns to an object (blob/tree) with the given body"""
+    return hashlib.sha1(f"{kind} {len(data)}\0".encode() + data).hexdigest()
+
+class FixtureRepo:
+    def __init__(self, full_name: str, root: str, metadata: Dict = None):
+        """
+        Load a fixture repository into memory and compute its git object ids
+
+        Args:
+            full_name: "owner/repo"
+            root: Directory holding the repository files
+            metadata: Optional overrides (stars, description, language)
+        """
+        self.full_name = full_name
+        self.root = root
+        self.metadata = metadata or {}
+        self.files: Dict[str, bytes] = {}
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d != '.git')
+            for filename in sorted(filenames):
+                full_path = os.path.join(dirpath, filename)
+                rel_path = os.path.relpath(full_path, root).replace(os.sep, '/')
+                with open(full_path, 'rb') as f:
+                    self.files[rel_path] = f.read()
+
+        self.blobs = {git_object_sha('blob', data): data for data in self.files.values()}
+        self.blob_shas = {path: git_object_sha('blob', data) for path, data in self.files.items()}
+        self.trees: Dict[str, Dict] = {}  # tree sha -> {'path', 'entries'}
+        self.dir_shas: Dict[str, str] = {}  # directory path ('' for root) -> tree sha
+        self.root_sha = self._build_tree('')
+        self.head_sha = hashlib.sha1(f"commit {full_name} {self.root_sha}".encode()).hexdigest()
+
+    def _children(self, directory: str) -> Dict[str, str]:
+        """Immediate children of a directory: name -> 'blob' or 'tree'"""
+        prefix = f"{directory}/" if directory else ""
+        children = {}
+        for path in self.files:
+            if not path.startswith(prefix):
+                continue
+            rest = path[len(prefix):]
+            name, _, remainder = rest.partition('/')
+            children[name] = 'tree' if remainder else 'blob'
+        return children
+
+    def _build_tree(self, directory: str) -> str:
+        """Compute the git tree object for a directory (recursively) and return its SHA"""
+        entries = []
+        for name, kind in self._children(directory).items():
+            path = f"{directory}/{name}" if directory else name
+            if kind == 'tree':
+                entries.append(('40000', name, self._build_tree(path), 'tree', path))
+            else:
+                entries.append(('100644', name, self.blob_shas[path], 'blob', path))
+
+        # Git orders tree entries by name, with directories compared as "name/"
+        entries.sort(key=lambda e: e[1] + ('/' if e[3] == 'tree' else ''))
+        body = b''.join(f"{mode} {name}\0".encode() + bytes.fromhex(sha) for mode, name, sha, _, _ in entries)
+        sha = git_object_sha('tree', body)
+        self.trees[sha] = {'path': directory, 'entries': entries}
+        self.dir_shas[directory] = sha
+        return sha
+
+    @property
+    def language(self) -> Optional[str]:
+        if 'language' in self.metadata:
+            return self.metadata['language']
+        counts = {}
+        for path in self.files:
+            language = LANGUAGE_BY_EXTENSION.get(os.path.splitext(path)[1].lower())
+            if language:
+                counts[language] = counts.get(language, 0) + 1
+        return max(sorted(counts), key=counts.get) if counts else None
+
+    def text(self, path: str) -> str:
+        return self.files[path].decode('utf-8', errors='ignore')
+
+class FakeGitHubServer:
+    def __init__(self, fixture_root: str, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 rate_limits: Dict[str, int] = None, reset_seconds: int = 60):
+        """
+        Configure the fake server (call start() or use it as a context manager)
+
+        Args:
+            fixture_root: Directory of <owner>/<repo> fixture repositories
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Seconds of simulated latency added to every response
+            rate_limits: Requests allowed per window per resource, e.g. {'core': 5000, 'search': 30}
+            reset_seconds: Length of the rate-limit window
+        """
+        self.fixture_root = fixture_root
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.rate_limits = dict({'core': 5000, 'search': 30}, **(rate_limits or {}))
+        self.reset_seconds = reset_seconds
+        self.repos: Dict[str, FixtureRepo] = {}
+        self.branches: Dict[str, Dict[str, FixtureRepo]] = {}  # repo -> branch name -> fixture
+        self.snapshots: Dict[str, Dict[str, FixtureRepo]] = {}  # repo -> head sha -> snapshot
+        self.request_log: List[Dict] = []
+        self._lock = threading.Lock()
+        self._used: Dict[str, int] = {}
+        self._window_start = time.time()
+        self._forced_403 = 0
+        self._httpd = None
+        self._thread = None
+        self.load_fixtures()
+
+    def load_fixtures(self):
+        """(Re)load every fixture repository from disk"""
+        metadata = {}
+        metadata_file = os.path.join(self.fixture_root, 'repos.json')
+        if os.path.exists(metadata_file):
+            with open(metadata_file, 'r') as f:
+                metadata = json.load(f)
+
+        self.repos = {}
+        self.branches = {}
+        for owner in sorted(os.listdir(self.fixture_root)):
+            owner_dir = os.path.join(self.fixture_root, owner)
+            if not os.path.isdir(owner_dir):
+                continue
+            for repo in sorted(os.listdir(owner_dir)):
+                repo_dir = os.path.join(owner_dir, repo)
+                if not os.path.isdir(repo_dir):
+                    continue
+                repo, _, branch = repo.partition('@')
+                full_name = f"{owner}/{repo}"
+                if branch:
+                    fixture = FixtureRepo(full_name, repo_dir, metadata.get(f"{full_name}@{branch}"))
+                    self.branches.setdefault(full_name.lower(), {})[branch] = fixture
+                else:
+                    fixture = FixtureRepo(full_name, repo_dir, metadata.get(full_name))
+                    self.repos[full_name.lower()] = fixture
+                    self.snapshots.setdefault(full_name.lower(), {})[fixture.head_sha] = fixture
+
+    @property
+    def api_base(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def inject_403(self, count: int = 1):
+        """Make the next `count` requests fail with a rate-limit 403"""
+        with self._lock:
+            self._forced_403 += count
+
+    def reset_counters(self):
+        """Clear the request log and rate-limit usage"""
+        with self._lock:
+            self.request_log = []
+            self._used = {}
+            self._window_start = time.time()
+
+    def request_counts(self) -> Dict[str, int]:
+        """Number of logged requests per endpoint kind"""
+        counts = {}
+        for entry in self.request_log:
+            counts[entry['kind']] = counts.get(entry['kind'], 0) + 1
+        return counts
+
+    def start(self) -> 'FakeGitHubServer':
+        """Start serving in a background thread"""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), FakeGitHubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving"""
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _charge(self, resource: str):
+        """
+        Account one request against its rate-limit resource
+
+        Returns:
+            (allowed, headers) for the response
+        """
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.reset_seconds:
+                self._window_start = now
+                self._used = {}
+            limit = self.rate_limits[resource]
+            used = self._used.get(resource, 0)
+            allowed = used < limit and self._forced_403 == 0
+            if self._forced_403:
+                self._forced_403 -= 1
+            elif allowed:
+                self._used[resource] = used + 1
+            headers = {
+                'X-RateLimit-Limit': str(limit),
+                'X-RateLimit-Remaining': str(max(limit - self._used.get(resource, 0), 0)),
+                'X-RateLimit-Reset': str(int(self._window_start + self.reset_seconds)),
+                'X-RateLimit-Resource': resource,
+            }
+        return allowed, headers
+
+    def _log(self, kind: str, path: str, status: int):
+        with self._lock:
+            self.request_log.append({'kind': kind, 'path': path, 'status': status, 'time': time.time()})
+
+    def resolve(self, repo: FixtureRepo, ref: Optional[str]) -> Optional[FixtureRepo]:
+        """Fixture a ref (default branch, branch name or head commit) points at, None if unknown"""
+        if ref in (None, 'HEAD', 'main', 'master', repo.head_sha):
+            return repo
+        branches = self.branches.get(repo.full_name.lower(), {})
+        if ref in branches:
+            return branches[ref]
+        return next((branch for branch in branches.values() if branch.head_sha == ref), None)
+
+    def _objects_holder(self, repo: FixtureRepo, attribute: str, sha: str) -> Optional[FixtureRepo]:
+        """Default branch or branch fixture whose trees/blobs contain sha"""
+        for fixture in [repo] + list(self.branches.get(repo.full_name.lower(), {}).values()):
+            if sha in getattr(fixture, attribute):
+                return fixture
+        return None
+
+    # --- API payloads -------------------------------------------------------------------
+
+    def repo_payload(self, repo: FixtureRepo) -> Dict:
+        owner = repo.full_name.split('/')[0]
+        return {
+            'full_name': repo.full_name,
+            'name': repo.full_name.split('/')[1],
+            'owner': {'login': owner},
+            'html_url': f"https://github.com/{repo.full_name}",
+            'description': repo.metadata.get('description', ''),
+            'language': repo.language,
+            'stargazers_count': repo.metadata.get('stars', 0),
+            'size': max(sum(len(data) for data in repo.files.values()) // 1024, 1),
+            'default_branch': 'main',
+        }
+
+    def content_entry(self, repo: FixtureRepo, path: str, kind: str, ref: str = 'main') -> Dict:
+        base = f"{self.api_base}/repos/{repo.full_name}"
+        if kind == 'tree':
+            return {
+                'name': path.rsplit('/', 1)[-1], 'path': path, 'type': 'dir',
+                'sha': repo.dir_shas[path], 'size': 0,
+                'url': f"{base}/contents/{path}", 'download_url': None,
+            }
+        return {
+            'name': path.rsplit('/', 1)[-1], 'path': path, 'type': 'file',
+            'sha': repo.blob_shas[path], 'size': len(repo.files[path]),
+            'url': f"{base}/contents/{path}",
+            'download_url': f"{self.api_base}/raw/{repo.full_name}/{ref}/{path}",
+        }
+
+    def contents(self, repo: FixtureRepo, path: str, ref: str = None):
+        base_ref = ref or 'main'
+        repo = self.resolve(repo, ref)
+        if not repo:
+            return 404, {'message': f"No commit found for the ref {ref}"}
+        if path in repo.files:
+            entry = self.content_entry(repo, path, 'blob', base_ref)
+            entry.update(encoding='base64', content=base64.b64encode(repo.files[path]).decode())
+            return 200, entry
+        if path not in repo.dir_shas:
+            return 404, {'message': 'Not Found'}
+        entries = repo.trees[repo.dir_shas[path]]['entries']
+        return 200, [self.content_entry(repo, entry_path, kind, base_ref) for _, _, _, kind, entry_path in entries]
+
+    def tree(self, repo: FixtureRepo, ref: str, recursive: bool):
+        holder = self._objects_holder(repo, 'trees', ref)
+        if holder:
+            repo, sha = holder, ref
+        else:
+            repo = self.resolve(repo, ref)
+            if not repo:
+                return 404, {'message': 'Not Found'}
+            sha = repo.root_sha
+        prefix = repo.trees[sha]['path']
+        entries = []
+
+        def walk(tree_sha: str):
+            for mode, _, entry_sha, kind, path in repo.trees[tree_sha]['entries']:
+                rel_path = path[len(prefix) + 1:] if prefix else path
+                entry = {'path': rel_path, 'mode': mode, 'type': kind, 'sha': entry_sha}
+                if kind == 'blob':
+                    entry['size'] = len(repo.files[path])
+                entries.append(entry)
+                if kind == 'tree' and recursive:
+                    walk(entry_sha)
+        walk(sha)
+        return 200, {'sha': sha, 'tree': entries, 'truncated': False}
+
+    def commit(self, repo: FixtureRepo, ref: str):
+        repo = self.resolve(repo, ref)
+        if not repo:
+            return 404, {'message': 'No commit found for SHA: ' + ref}
+        return 200, {'sha': repo.head_sha, 'commit': {'tree': {'sha': repo.root_sha}}}
+
+    def commits(self, repo: FixtureRepo, per_page: int, page: int, ref: str = None):
+        repo = self.resolve(repo, ref)
+        if not repo:
+            return 404, {'message': 'No commit found for SHA: ' + ref}
+        history = repo.metadata.get('commits')
+        if history is None:
+            date = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            signature = {'name': repo.full_name.split('/')[0], 'email': 'owner@example.com', 'date': date}
+            history = [{'sha': repo.head_sha, 'parents': [],
+                        'commit': {'author': signature, 'committer': signature, 'message': 'Initial commit'}}]
+        return 200, history[(page - 1) * per_page:page * per_page]
+
+    def compare(self, repo: FixtureRepo, spec: str):
+        """Changed files between two snapshots, with the blob SHA of each new version"""
+        base_ref, _, head_ref = spec.partition('...')
+        snapshots = self.snapshots.get(repo.full_name.lower(), {})
+        head = repo if head_ref in ('HEAD', 'main', 'master') else snapshots.get(head_ref)
+        base = snapshots.get(base_ref)
+        if not base or not head:
+            return 404, {'message': 'Not Found'}
+        files = []
+        for path in sorted(set(base.blob_shas) | set(head.blob_shas)):
+            if path not in head.blob_shas:
+                files.append({'filename': path, 'status': 'removed', 'sha': base.blob_shas[path]})
+            elif path not in base.blob_shas:
+                files.append({'filename': path, 'status': 'added', 'sha': head.blob_shas[path]})
+            elif base.blob_shas[path] != head.blob_shas[path]:
+                files.append({'filename': path, 'status': 'modified', 'sha': head.blob_shas[path]})
+        return 200, {'status': 'identical' if not files else 'ahead', 'ahead_by': int(bool(files)),
+                     'base_commit': {'sha': base.head_sha}, 'commits': [{'sha': head.head_sha}] if files else [],
+                     'files': files}
+
+    def blob(self, repo: FixtureRepo, sha: str):
+        repo = self._objects_holder(repo, 'blobs', sha)
+        if not repo:
+            return 404, {'message': 'Not Found'}
+        data = repo.blobs[sha]
+        return 200, {'sha': sha, 'size': len(data), 'encoding': 'base64', 'content': base64.b64encode(data).decode()}
+
+    def archive(self, repo: FixtureRepo, fmt: str) -> bytes:
+        prefix = f"{repo.full_name.replace('/', '-')}-{repo.head_sha[:7]}/"
+        buffer = io.BytesIO()
+        if fmt == 'tarball':
+            with tarfile.open(fileobj=buffer, mode='w:gz') as tar:
+                for path, data in sorted(repo.files.items()):
+                    info = tarfile.TarInfo(prefix + path)
+                    info.size = len(data)
+                    tar.addfile(info, io.BytesIO(data))
+        else:
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for path, data in sorted(repo.files.items()):
+                    archive.writestr(prefix + path, data)
+        return buffer.getvalue()
+
+    def _parse_query(self, query: str):
+        qualifiers = dict(QUALIFIER_PATTERN.findall(query))
+        remainder = QUALIFIER_PATTERN.sub(' ', query)
+        terms = [(phrase or word).lower() for phrase, word in TERM_PATTERN.findall(remainder)]
+        return [term for term in terms if term], qualifiers
+
+    def search_repositories(self, query: str, per_page: int, page: int):
+        terms, qualifiers = self._parse_query(query)
+        items = []
+        for repo in self.repos.values():
+            language = qualifiers.get('language')
+            if language and (repo.language or '').lower() != language.lower():
+                continue
+            # Real repository search matches name, description and README; contents stand in here
+            haystack = ' '.join([repo.full_name, repo.metadata.get('description', '')] +
+                                [repo.text(path) for path in repo.files]).lower()
+            if all(term in haystack for term in terms):
+                items.append(self.repo_payload(repo))
+        items.sort(key=lambda item: (-item['stargazers_count'], item['full_name']))
+        return 200, {'total_count': len(items), 'incomplete_results': False,
+                     'items': items[(page - 1) * per_page:page * per_page]}
+
+    def search_code(self, query: str, per_page: int, page: int):
+        terms, qualifiers = self._parse_query(query)
+        items = []
+        for repo in self.repos.values():
+            for path in sorted(repo.files):
+                language = qualifiers.get('language')
+                file_language = LANGUAGE_BY_EXTENSION.get(os.path.splitext(path)[1].lower(), '')
+                if language and file_language.lower() != language.lower():
+                    continue
+                # Code search ignores punctuation between tokens, so match on word sequences
+                words = ' '.join(re.findall(r'[a-z0-9_]+', repo.text(path).lower()))
+                if terms and all(' '.join(re.findall(r'[a-z0-9_]+', term)) in words for term in terms):
+                    items.append({
+                        'name': path.rsplit('/', 1)[-1], 'path': path, 'sha': repo.blob_shas[path],
+                        'repository': self.repo_payload(repo),
+                    })
+        return 200, {'total_count': len(items), 'incomplete_results': False,
+                     'items': items[(page - 1) * per_page:page * per_page]}
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    server_version = "FakeGitHub/1.0"
+
+    def log_message(self, format, *args):
+        pass  # Keep test and benchmark output clean
+
+    def do_GET(self):
+        fake: FakeGitHubServer = self.server.fake
+        parsed = urlparse(self.path)
+        path = unquote(parsed.path)
+        params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        kind = self._classify(path)
+
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        # Conditional requests answered with 304 do not count against the rate limit
+        if kind == 'commits' and self.headers.get('If-None-Match'):
+            parts = path.strip('/').split('/')
+            repo = fake.repos.get('/'.join(parts[1:3]).lower())
+            repo = fake.resolve(repo, parts[4] if len(parts) > 4 else None) if repo else None
+            if repo and self.headers['If-None-Match'] == f'"{repo.head_sha}"':
+                fake._log(kind, path, 304)
+                return self._send(304, b'', 'application/json; charset=utf-8', {})
+
+        allowed, headers = fake._charge('search' if kind.startswith('search') else 'core')
+        if not allowed:
+            fake._log(kind, path, 403)
+            return self._send_json(403, {'message': 'API rate limit exceeded'}, headers)
+
+        try:
+            status, body = self._route(fake, kind, path, params)
+        except Exception as e:
+            status, body = 500, {'message': str(e)}
+        fake._log(kind, path, status)
+        if kind == 'commits' and status == 200 and isinstance(body, dict):
+            headers['ETag'] = f'"{body["sha"]}"'
+        if isinstance(body, bytes):
+            return self._send(status, body, 'application/octet-stream', headers)
+        return self._send_json(status, body, headers)
+
+    def _classify(self, path: str) -> str:
+        parts = path.strip('/').split('/')
+        if parts[0] == 'search' and len(parts) > 1:
+            return f"search_{parts[1]}"
+        if parts[0] == 'raw':
+            return 'raw'
+        if parts[0] == 'rate_limit':
+            return 'rate_limit'
+        if parts[0] == 'repos' and len(parts) >= 4:
+            return parts[4] if parts[3] == 'git' and len(parts) > 4 else parts[3]
+        return 'repo' if parts[0] == 'repos' else 'unknown'
+
+    def _route(self, fake: FakeGitHubServer, kind: str, path: str, params: Dict):
+        parts = path.strip('/').split('/')
+        per_page = int(params.get('per_page', 30))
+        page = int(params.get('page', 1))
+
+        if kind == 'search_repositories':
+            return fake.search_repositories(params.get('q', ''), per_page, page)
+        if kind == 'search_code':
+            return fake.search_code(params.get('q', ''), per_page, page)
+        if kind == 'rate_limit':
+            return 200, {'resources': {resource: {'limit': limit} for resource, limit in fake.rate_limits.items()}}
+
+        if kind == 'raw':
+            # /raw/{owner}/{repo}/{ref}/{path}
+            repo = fake.repos.get('/'.join(parts[1:3]).lower())
+            repo = fake.resolve(repo, parts[3]) if repo and len(parts) > 3 else repo
+            file_path = '/'.join(parts[4:])
+            if not repo or file_path not in repo.files:
+                return 404, b'404: Not Found'
+            return 200, repo.files[file_path]
+
+        repo = fake.repos.get('/'.join(parts[1:3]).lower()) if len(parts) >= 3 else None
+        if not repo:
+            return 404, {'message': 'Not Found'}
+        if kind == 'repo':
+            return 200, fake.repo_payload(repo)
+        if kind == 'contents':
+            return fake.contents(repo, '/'.join(parts[4:]), params.get('ref'))
+        if kind == 'trees':
+            return fake.tree(repo, parts[5] if len(parts) > 5 else 'HEAD', params.get('recursive') not in (None, '0'))
+        if kind == 'blobs':
+            return fake.blob(repo, parts[5] if len(parts) > 5 else '')
+        if kind == 'commits':
+            if len(parts) == 4:
+                return fake.commits(repo, per_page, page, params.get('sha'))
+            return fake.commit(repo, parts[4])
+        if kind == 'compare':
+            return fake.compare(repo, '/'.join(parts[4:]))
+        if kind in ('tarball', 'zipball'):
+            return 200, fake.archive(repo, kind)
+        return 404, {'message': 'Not Found'}
+
+    def _send_json(self, status: int, body, headers: Dict):
+        self._send(status, json.dumps(body).encode(), 'application/json; charset=utf-8', headers)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Dict):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+def main():
+    """Serve a fixture directory until interrupted"""
+    parser = argparse.ArgumentParser(description="Local fake GitHub API for offline testing")
+    parser.add_argument("fixture_root", help="Directory of <owner>/<repo> fixture repositories")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of latency per request")
+    parser.add_argument("--core-limit", type=int, default=5000, help="Core requests per rate-limit window")
+    parser.add_argument("--search-limit", type=int, default=30, help="Search requests per rate-limit window")
+    args = parser.parse_args()
+
+    server = FakeGitHubServer(args.fixture_root, host=args.host, port=args.port, latency=args.latency,
+                              rate_limits={'core': args.core_limit, 'search': args.search_limit})
+    server.start()
+    print(f"🧪 Fake GitHub serving {len(server.repos)} repositories at {server.api_base}")
+    print(f"   export GITHUB_API_URL={server.api_base}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
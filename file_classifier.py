@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Vendored / Generated File Classifier
+Flags build outputs, minified bundles, lockfiles and generated code so the
+detectors can skip them before download/read instead of scoring them
+"""
+
+import os
+import re
+from typing import Dict, List, Optional
+from dataclasses import dataclass, asdict
+
+@dataclass
+class FileClassification:
+    """Why a file (or directory) was excluded from scoring"""
+    path: str
+    category: str
+    reason: str
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+class FileClassifier:
+    # Directories whose contents are never original work
+    VENDORED_DIRS = {
+        'node_modules', 'bower_components', 'jspm_packages', 'vendor', 'vendors',
+        'third_party', 'third-party', 'site-packages', '__pycache__', 'venv', 'env',
+    }
+    BUILD_DIRS = {
+        'dist', 'build', 'out', '.next', '.nuxt', '.svelte-kit', '.output',
+        'coverage', '.parcel-cache', '.turbo', '.cache',
+    }
+
+    LOCKFILES = {
+        'package-lock.json', 'npm-shrinkwrap.json', 'yarn.lock', 'pnpm-lock.yaml',
+        'bun.lockb', 'poetry.lock', 'pipfile.lock', 'cargo.lock', 'composer.lock',
+        'gemfile.lock', 'go.sum', 'pubspec.lock', 'podfile.lock', 'mix.lock',
+    }
+
+    # Filename patterns for minified bundles and generated sources
+    MINIFIED_PATTERN = re.compile(
+        r'(\.min\.(js|css|mjs)$)|(\.bundle\.js$)|(-bundle\.js$)|(\.map$)'
+        r'|(\.(chunk|[0-9a-f]{8,})\.(js|css)$)'
+    )
+    GENERATED_PATTERN = re.compile(
+        r'(_pb2(_grpc)?\.py$)|(\.pb\.(go|cc|h)$)|(\.g\.dart$)|(\.freezed\.dart$)'
+        r'|(\.generated\.\w+$)|(_generated\.\w+$)'
+    )
+
+    # Markers found in the first lines of generated files
+    HEADER_MARKERS = re.compile(
+        r'@generated|do not edit|auto-generated|autogenerated|generated by|code generated',
+        re.IGNORECASE
+    )
+
+    def __init__(self, header_lines: int = 5, max_avg_line_length: int = 250,
+                 max_line_length: int = 2000):
+        """
+        Initialize the classifier
+
+        Args:
+            header_lines: Number of leading lines searched for generator markers
+            max_avg_line_length: Average line length above which a file counts as minified
+            max_line_length: Single line length above which a file counts as minified
+        """
+        self.header_lines = header_lines
+        self.max_avg_line_length = max_avg_line_length
+        self.max_line_length = max_line_length
+
+    def classify_dir(self, dir_path: str) -> Optional[FileClassification]:
+        """Classify a directory by name so the whole subtree can be skipped"""
+        name = os.path.basename(dir_path.rstrip('/')).lower()
+        if name in self.VENDORED_DIRS:
+            return FileClassification(dir_path, 'vendored', f"vendored directory '{name}/'")
+        if name in self.BUILD_DIRS:
+            return FileClassification(dir_path, 'build_output', f"build output directory '{name}/'")
+        return None
+
+    def classify_path(self, path: str) -> Optional[FileClassification]:
+        """
+        Classify a file from its path alone (no content needed)
+
+        Args:
+            path: Repository-relative file path
+
+        Returns:
+            FileClassification if the file should be excluded, otherwise None
+        """
+        parts = path.replace('\\', '/').split('/')
+        for dir_name in parts[:-1]:
+            classification = self.classify_dir(dir_name)
+            if classification:
+                classification.path = path
+                return classification
+
+        filename = parts[-1].lower()
+        if filename in self.LOCKFILES:
+            return FileClassification(path, 'lockfile', 'dependency lockfile')
+        if self.MINIFIED_PATTERN.search(filename):
+            return FileClassification(path, 'minified', 'minified bundle or source map')
+        if self.GENERATED_PATTERN.search(filename):
+            return FileClassification(path, 'generated', 'generated source filename')
+        return None
+
+    def classify_content(self, path: str, content: str) -> Optional[FileClassification]:
+        """
+        Classify a file from its content (header markers and line-length statistics)
+
+        Args:
+            path: Repository-relative file path
+            content: File content
+
+        Returns:
+            FileClassification if the file should be excluded, otherwise None
+        """
+        if not content:
+            return None
+
+        header = '\n'.join(content.split('\n', self.header_lines)[:self.header_lines])
+        marker = self.HEADER_MARKERS.search(header)
+        if marker:
+            return FileClassification(path, 'generated', f"header marker '{marker.group(0)}'")
+
+        if 'sourceMappingURL=' in content[-300:]:
+            return FileClassification(path, 'minified', 'trailing sourceMappingURL comment')
+
+        line_count = content.count('\n') + 1
+        avg_line_length = len(content) / line_count
+        if avg_line_length > self.max_avg_line_length:
+            return FileClassification(path, 'minified', f"average line length {avg_line_length:.0f} chars")
+
+        if len(content) > self.max_line_length:
+            longest = max(len(line) for line in content.split('\n'))
+            if longest > self.max_line_length:
+                return FileClassification(path, 'minified', f"line of {longest} chars")
+
+        return None
+
+    def classify(self, path: str, content: str = None) -> Optional[FileClassification]:
+        """Classify by path first, then by content if it is available"""
+        classification = self.classify_path(path)
+        if classification or content is None:
+            return classification
+        return self.classify_content(path, content)
+
+def summarize_exclusions(excluded_files: List[Dict]) -> Dict[str, int]:
+    """Count excluded files per category"""
+    counts = {}
+    for entry in excluded_files:
+        counts[entry['category']] = counts.get(entry['category'], 0) + 1
+    return counts
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Code Fingerprinting
+Tokenizes source files and selects k-gram fingerprints with winnowing, so
+copied code can be located by a handful of stable hashes
+"""
+
+import re
+import hashlib
+from typing import List, NamedTuple
+
+# Comment patterns, same rules as the detectors' normalize_code()
+COMMENT_PATTERNS = [
+    re.compile(r'//.*$', re.MULTILINE),
+    re.compile(r'/\*.*?\*/', re.DOTALL),
+    re.compile(r'#.*$', re.MULTILINE),
+]
+
+IDENTIFIER_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+class Token(NamedTuple):
+    """A lowercased identifier and the line it was found on"""
+    text: str
+    line: int
+
+class Fingerprint(NamedTuple):
+    """A winnowed k-gram hash and the token index where the k-gram starts"""
+    hash: int
+    position: int
+
+def strip_comments(content: str) -> str:
+    """Remove comments while keeping line structure intact"""
+    for pattern in COMMENT_PATTERNS:
+        content = pattern.sub(lambda m: '\n' * m.group(0).count('\n'), content)
+    return content
+
+def tokenize(content: str) -> List[Token]:
+    """
+    Split source into lowercased identifier tokens with line numbers
+
+    Args:
+        content: Raw file content
+
+    Returns:
+        List of Token tuples in source order
+    """
+    tokens = []
+    for line_number, line in enumerate(strip_comments(content).split('\n'), 1):
+        for match in IDENTIFIER_PATTERN.finditer(line):
+            tokens.append(Token(match.group(0).lower(), line_number))
+    return tokens
+
+def kgram_hash(texts: List[str]) -> int:
+    """Stable 64-bit hash of a token sequence (identical across processes and runs)"""
+    digest = hashlib.blake2b('\x1f'.join(texts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+def fingerprint_tokens(tokens: List[Token], k: int = 5, window: int = 4) -> List[Fingerprint]:
+    """
+    Select fingerprints from a token stream with winnowing
+
+    Every run of `window` consecutive k-grams contributes its minimum hash
+    (rightmost on ties), which guarantees any shared sequence of at least
+    k + window - 1 tokens produces at least one shared fingerprint.
+
+    Args:
+        tokens: Token stream from tokenize()
+        k: Tokens per k-gram
+        window: Winnowing window size in k-grams
+
+    Returns:
+        Selected fingerprints in source order
+    """
+    texts = [token.text for token in tokens]
+    if len(texts) < k:
+        return [Fingerprint(kgram_hash(texts), 0)] if texts else []
+
+    hashes = [kgram_hash(texts[i:i + k]) for i in range(len(texts) - k + 1)]
+    if len(hashes) <= window:
+        smallest = min(range(len(hashes)), key=lambda i: (hashes[i], -i))
+        return [Fingerprint(hashes[smallest], smallest)]
+
+    selected = []
+    last_position = -1
+    for start in range(len(hashes) - window + 1):
+        position = min(range(start, start + window), key=lambda i: (hashes[i], -i))
+        if position != last_position:
+            selected.append(Fingerprint(hashes[position], position))
+            last_position = position
+    return selected
+
+def fingerprint_content(content: str, k: int = 5, window: int = 4) -> List[Fingerprint]:
+    """Tokenize and fingerprint raw file content"""
+    return fingerprint_tokens(tokenize(content), k, window)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Git Object Reader
+Reads objects of a local clone straight from its object database through one
+long-lived `git cat-file --batch` process per repository, so file contents at
+any revision or branch stream at pipe speed instead of costing a checkout or
+one `git show` process per file.
+"""
+
+import os
+import argparse
+import threading
+import subprocess
+from typing import Dict, Iterable, Optional, Tuple
+
+class GitObjectReader:
+    def __init__(self, repo_path: str):
+        """
+        Persistent `git cat-file --batch` pipe for one repository
+
+        The process is started on first use and kept until close(); requests
+        from several threads are serialized.
+
+        Args:
+            repo_path: Working tree or bare repository
+        """
+        self.repo_path = repo_path
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _ensure_process(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(["git", "-C", self.repo_path, "cat-file", "--batch"],
+                                             stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                             stderr=subprocess.DEVNULL)
+        return self._process
+
+    def _read_response(self, process: subprocess.Popen) -> Tuple[Optional[str], Optional[bytes]]:
+        # "<sha> <type> <size>\n<data>\n", or "<object> missing\n"
+        header = process.stdout.readline()
+        if not header:
+            raise RuntimeError(f"git cat-file exited while reading {self.repo_path}")
+        parts = header.split()
+        if len(parts) != 3:
+            return None, None
+        data = process.stdout.read(int(parts[2]))
+        process.stdout.read(1)
+        return parts[1].decode(), data
+
+    def read(self, object_name: str) -> Tuple[Optional[str], Optional[bytes]]:
+        """
+        Read one object
+
+        Args:
+            object_name: SHA or any revision expression (e.g. "HEAD:src/app.py")
+
+        Returns:
+            (object type, raw bytes), or (None, None) if the object does not exist
+        """
+        with self._lock:
+            process = self._ensure_process()
+            process.stdin.write(object_name.encode() + b"\n")
+            process.stdin.flush()
+            return self._read_response(process)
+
+    def read_many(self, object_names: Iterable[str]) -> Dict[str, Tuple[str, bytes]]:
+        """
+        Read many objects in one pipelined exchange
+
+        Requests are written from a helper thread while responses are read, so
+        neither side of the pipe blocks on a full buffer.
+
+        Returns:
+            object name -> (object type, raw bytes); missing objects are left out
+        """
+        names = list(dict.fromkeys(object_names))
+        if not names:
+            return {}
+        objects = {}
+        with self._lock:
+            process = self._ensure_process()
+
+            def write_requests():
+                process.stdin.write(b"".join(name.encode() + b"\n" for name in names))
+                process.stdin.flush()
+
+            writer = threading.Thread(target=write_requests, daemon=True)
+            writer.start()
+            for name in names:
+                kind, data = self._read_response(process)
+                if kind is not None:
+                    objects[name] = (kind, data)
+            writer.join()
+        return objects
+
+    def read_blobs(self, shas: Iterable[str]) -> Dict[str, bytes]:
+        """Contents of the given blobs (other object types and missing SHAs are left out)"""
+        return {sha: data for sha, (kind, data) in self.read_many(shas).items() if kind == "blob"}
+
+    def close(self):
+        """Stop the cat-file process"""
+        with self._lock:
+            if self._process is not None:
+                self._process.stdin.close()
+                self._process.wait()
+                self._process.stdout.close()
+                self._process = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+class GitObjectReaderPool:
+    def __init__(self):
+        """One GitObjectReader per repository, kept for the lifetime of the pool"""
+        self._readers: Dict[str, GitObjectReader] = {}
+        self._lock = threading.Lock()
+
+    def get(self, repo_path: str) -> GitObjectReader:
+        key = os.path.realpath(repo_path)
+        with self._lock:
+            if key not in self._readers:
+                self._readers[key] = GitObjectReader(repo_path)
+            return self._readers[key]
+
+    def close(self):
+        with self._lock:
+            readers, self._readers = list(self._readers.values()), {}
+        for reader in readers:
+            reader.close()
+
+def is_git_root(path: str) -> bool:
+    """True if path is the top level of a git working tree (not merely inside one)"""
+    result = subprocess.run(["git", "-C", path, "rev-parse", "--show-toplevel"], capture_output=True, text=True)
+    return result.returncode == 0 and os.path.realpath(result.stdout.strip()) == os.path.realpath(path)
+
+def main():
+    """Print objects of a local clone by SHA or revision expression"""
+    parser = argparse.ArgumentParser(description="Read objects from a local clone's object database")
+    parser.add_argument("repo", help="Local clone")
+    parser.add_argument("objects", nargs="+", help="Object SHAs or revision expressions (e.g. HEAD:README.md)")
+    args = parser.parse_args()
+
+    with GitObjectReader(args.repo) as reader:
+        for name, (kind, data) in reader.read_many(args.objects).items():
+            print(f"📦 {name} ({kind}, {len(data)} bytes)")
+            if kind == "blob":
+                print(data.decode('utf-8', errors='replace'))
+
+if __name__ == "__main__":
+    main()
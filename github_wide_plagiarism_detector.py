@@ -11,10 +11,31 @@ import hashlib
 import difflib
 import re
 import time
-from typing import Dict, List, Tuple, Set
-from urllib.parse import urlparse, quote
-from dataclasses import dataclass
+import argparse
+import math
+from typing import Dict, List, Optional, Tuple, Set
+from urllib.parse import quote
+from dataclasses import dataclass, field
 from collections import defaultdict
+from contextlib import nullcontext
+from file_classifier import FileClassifier, summarize_exclusions
+from content_index import ContentHashIndex
+from candidate_ranking import CandidateRanker
+from corpus_frequency import DocumentFrequencyTable
+from code_search import CodeSearchPlanner
+from search_cache import SearchCache, cached_search
+from checkpoint_journal import CheckpointJournal
+from results_stream import ResultsStreamWriter, rebuild_results
+from results_store import ResultsStore
+from html_report import write_html_report
+from instrumentation import Metrics, RunProfiler, format_metrics, timed
+from events import EventStream, NDJSONEventSink
+from history_forensics import analyze_history, fetch_api_commits, format_history_section
+from subtree_matching import match_subtrees, subtree_copies, subtree_files, under_subtree
+from repo_spec import parse_repo_spec, format_repo_spec, split_repo_spec, repo_spec_url
+
+# Single-pass scanner for declared names (classes, functions, constants, variables)
+DECLARATION_PATTERN = re.compile(r'\b(?:class|function|def|const|let|var)\s+(\w+)', re.IGNORECASE)
 
 @dataclass
 class FileInfo:
@@ -36,15 +57,104 @@ class RepoInfo:
     stars: int = 0
     language: str = ""
     description: str = ""
+    excluded_files: List[Dict] = field(default_factory=list)
+
+def normalize_code_text(content: str) -> str:
+    """Strip comments and whitespace differences and lowercase (see GitHubWidePlagiarismDetector.normalize_code)"""
+    # Remove comments (basic patterns)
+    content = re.sub(r'//.*$', '', content, flags=re.MULTILINE)  # Single-line comments
+    content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)  # Multi-line comments
+    content = re.sub(r'#.*$', '', content, flags=re.MULTILINE)   # Python/shell comments
+    
+    # Remove extra whitespace and normalize
+    content = re.sub(r'\s+', ' ', content)
+    return content.strip().lower()
+
+def compare_files(target_files: List[FileInfo], comparison_files: List[FileInfo],
+                  similarity_threshold: float, metrics: Metrics = None,
+                  subtrees: List[Dict] = None) -> Tuple[List[Dict], float, int]:
+    """
+    Score every target/comparison file pair with a matching extension or basename
+    
+    Module-level (and free of detector state) so it can run in a process pool.
+    Each file is normalized once, not once per pair; hash-identical pairs count
+    as 1.0 without running SequenceMatcher. Pairs with both files inside matched
+    subtrees are not looked at; each copied file is credited as one 1.0 pair.
+    
+    Args:
+        target_files: Files of the target repository
+        comparison_files: Files of the comparison repository
+        similarity_threshold: Minimum similarity recorded as a match
+        metrics: Optional Metrics receiving "normalize" and "similarity" timings
+            (left out when running in a process pool)
+        subtrees: Identical subtrees from match_subtrees()
+        
+    Returns:
+        (matches, total_similarity, comparisons_made)
+    """
+    timer = metrics.timer if metrics is not None else (lambda stage: nullcontext())
+    matches = []
+    normalized = {}
+    
+    subtrees = subtrees or []
+    target_prefixes = [subtree['target_path'] for subtree in subtrees]
+    comparison_prefixes = [subtree['comparison_path'] for subtree in subtrees]
+    comparison_in_subtree = [under_subtree(f.path, comparison_prefixes) for f in comparison_files]
+    comparisons_made = subtree_copies([f.path for f in target_files], [f.path for f in comparison_files], subtrees)
+    total_similarity = float(comparisons_made)
+    
+    for target_file in target_files:
+        target_in_subtree = under_subtree(target_file.path, target_prefixes)
+        for comp_file, comp_in_subtree in zip(comparison_files, comparison_in_subtree):
+            if target_in_subtree and comp_in_subtree:
+                continue
+            
+            # Compare files with similar paths or extensions
+            if (os.path.splitext(target_file.path)[1] == os.path.splitext(comp_file.path)[1] or
+                os.path.basename(target_file.path) == os.path.basename(comp_file.path)):
+                
+                comparisons_made += 1
+                
+                # Identical files are reported by the content index
+                if target_file.hash == comp_file.hash:
+                    total_similarity += 1.0
+                    continue
+                
+                for file_info in (target_file, comp_file):
+                    if id(file_info) not in normalized:
+                        with timer("normalize"):
+                            normalized[id(file_info)] = normalize_code_text(file_info.content)
+                
+                with timer("similarity"):
+                    similarity = difflib.SequenceMatcher(
+                        None, normalized[id(target_file)], normalized[id(comp_file)]
+                    ).ratio()
+                total_similarity += similarity
+                
+                if similarity >= similarity_threshold:
+                    matches.append({
+                        "target_file": target_file.path,
+                        "comparison_file": comp_file.path,
+                        "similarity": similarity,
+                        "target_lines": target_file.lines,
+                        "comparison_lines": comp_file.lines
+                    })
+    
+    return matches, total_similarity, comparisons_made
 
 class GitHubWidePlagiarismDetector:
-    def __init__(self, github_token: str = None):
+    def __init__(self, github_token: str = None, df_table_path: str = None, search_cache_path: str = None,
+                 api_base: str = None):
         """
         Initialize the GitHub-wide plagiarism detector
         
         Args:
             github_token: GitHub personal access token for API access
+            df_table_path: JSON file persisting the corpus document-frequency table
+            search_cache_path: sqlite file persisting search responses between runs
+            api_base: GitHub API base URL (e.g. a local fake server); defaults to $GITHUB_API_URL
         """
+        self.api_base = (api_base or os.getenv('GITHUB_API_URL') or "https://api.github.com").rstrip('/')
         self.github_token = github_token or os.getenv('GITHUB_TOKEN')
         self.headers = {}
         if self.github_token:
@@ -64,21 +174,73 @@ class GitHubWidePlagiarismDetector:
         self.similarity_threshold = 0.7
         self.max_repos_to_check = 50  # Limit for API rate limiting
         self.max_files_per_repo = 20  # Limit files analyzed per repo
+        
+        # Classifier for vendored, minified and generated files
+        self.file_classifier = FileClassifier()
+        
+        # Ranks search candidates by expected match likelihood before fetching
+        self.candidate_ranker = CandidateRanker()
+        
+        # Corpus document frequencies drive the rare-snippet code-search planner
+        self.df_table = DocumentFrequencyTable(df_table_path or os.getenv('PLAGIARISM_DF_TABLE'))
+        self.code_search_planner = CodeSearchPlanner(self.df_table)
+        self.use_code_search = True  # Code search requires an authenticated token
+        
+        # Search responses are cached across runs; warm caches make deeper pages free
+        self.search_cache = SearchCache(search_cache_path or os.getenv('PLAGIARISM_SEARCH_CACHE'))
+        self.search_pages = 1  # Result pages walked per search query
+        
+        # Corpus-wide content hash index, rebuilt per detection run
+        self.content_index = ContentHashIndex()
+        
+        # Optional callback invoked with each identical-file match as soon as it is found
+        self.on_identical = None
+        
+        # Optional CheckpointJournal; completed fetches, searches and comparisons are
+        # recorded there and replayed instead of repeated when a run is resumed
+        self.journal = None
+        
+        # Optional ResultsStreamWriter; when set, result records are streamed to it as
+        # NDJSON and the results dict only keeps the header and summary
+        self.results_sink = None
+        
+        # Optional dict-like cache of fetched RepoInfo (keyed by lowercase name) that
+        # outlives a run, e.g. the detection service's warm cache
+        self.repo_cache = None
+        
+        self.metrics = Metrics()
+        
+        self.events = EventStream()
+        
+        # Commit-history forensics of the target (paginated commits API, up to
+        # history_max_commits / 100 extra requests per run)
+        self.history_forensics = False
+        self.history_max_commits = 1000
+        
+        # Subtrees with identical git tree SHAs are reported whole and not downloaded
+        # again (one tree listing per candidate)
+        self.subtree_matching = True
+        self.min_subtree_files = 2
+        self._tree_cache: Dict[Tuple[str, str], List[Dict]] = {}
 
     def get_repo_info(self, repo_url: str) -> str:
-        """Extract repository information from GitHub URL"""
-        if repo_url.startswith('http'):
-            parsed = urlparse(repo_url)
-            path_parts = parsed.path.strip('/').split('/')
-        else:
-            path_parts = repo_url.split('/')
+        """Extract the "owner/repo" name from a GitHub URL or spec (any ref is dropped)"""
+        return parse_repo_spec(repo_url)[0]
+    
+    def get_repo_spec(self, repo_url: str) -> str:
+        """
+        Extract a ref-aware source spec from a GitHub URL or spec
         
-        if len(path_parts) >= 2:
-            owner = path_parts[0]
-            repo = path_parts[1]
-            return f"{owner}/{repo}"
+        /tree/<ref>, /commits/<ref>, /commit/<sha>, /blob/<ref>/... and "@ref" keep
+        their ref; every fetch method accepts the resulting "owner/repo@ref".
         
-        raise ValueError(f"Invalid GitHub repository: {repo_url}")
+        Args:
+            repo_url: Repository URL, "owner/repo" or "owner/repo@ref"
+            
+        Returns:
+            "owner/repo" (default branch) or "owner/repo@ref"
+        """
+        return format_repo_spec(*parse_repo_spec(repo_url))
 
     def extract_search_keywords(self, repo_info: RepoInfo) -> List[str]:
         """
@@ -88,59 +250,129 @@ class GitHubWidePlagiarismDetector:
             repo_info: Target repository information
             
         Returns:
-            List of search keywords
+            List of search keywords, ranked by TF-IDF (stable across runs)
         """
-        keywords = set()
+        term_counts = defaultdict(int)
         
         # Extract from file names and paths
         for file_info in repo_info.files:
             # Add file names without extension
-            filename = os.path.splitext(os.path.basename(file_info.path))[0]
+            filename = os.path.splitext(os.path.basename(file_info.path))[0].lower()
             if len(filename) > 3 and filename not in ['main', 'index', 'app', 'test']:
-                keywords.add(filename.lower())
+                term_counts[filename] += 1
             
             # Extract directory names
             dirs = file_info.path.split('/')[:-1]
             for dir_name in dirs:
+                dir_name = dir_name.lower()
                 if len(dir_name) > 3 and dir_name not in ['src', 'lib', 'utils', 'components']:
-                    keywords.add(dir_name.lower())
-        
-        # Extract from code content (function names, class names, etc.)
-        code_patterns = [
-            r'class\s+(\w+)',  # Class names
-            r'function\s+(\w+)',  # Function names
-            r'def\s+(\w+)',  # Python function names
-            r'const\s+(\w+)',  # Constants
-            r'let\s+(\w+)',  # Variables
-            r'var\s+(\w+)',  # Variables
-        ]
+                    term_counts[dir_name] += 1
         
+        # Extract declared names (function names, class names, etc.) in one pass per file
         for file_info in repo_info.files:
-            content = file_info.content.lower()
-            for pattern in code_patterns:
-                matches = re.findall(pattern, content)
-                for match in matches:
-                    if len(match) > 4 and match not in ['main', 'init', 'test', 'index']:
-                        keywords.add(match)
+            for match in DECLARATION_PATTERN.findall(file_info.content):
+                match = match.lower()
+                if len(match) > 4 and match not in ['main', 'init', 'test', 'index']:
+                    term_counts[match] += 1
+        
+        # Score by TF-IDF against the corpus table; ties broken alphabetically for stability
+        scored = [
+            ((1.0 + math.log(count)) * self.df_table.idf(term), term)
+            for term, count in term_counts.items()
+            if len(term) > 3 and term.isalpha()
+        ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [term for _, term in scored[:10]]  # Return top 10 keywords
+
+    def search_github_code(self, target_info: RepoInfo, target_language: str = None) -> List[Dict]:
+        """
+        Search GitHub code for the target's rarest fingerprinted snippets
+        
+        Args:
+            target_info: Target repository information
+            target_language: Programming language filter
+            
+        Returns:
+            Candidate repositories deduplicated across queries, with per-repo code hit counts
+        """
+        planned = self.code_search_planner.plan(target_info, target_language)
+        self.events.info("code_search_planned", f"🧬 Planned {len(planned)} code-search queries from rare snippets",
+                         queries=len(planned))
         
-        # Filter and return top keywords
-        filtered_keywords = [k for k in keywords if len(k) > 3 and k.isalpha()]
-        return list(filtered_keywords)[:10]  # Return top 10 keywords
+        candidates = {}
+        for plan in planned:
+            try:
+                items = self._cached_search("code", {'q': plan['query'], 'per_page': 30})
+            except Exception as e:
+                self.events.error("search_error", f"❌ Error in code search for {plan['query']}: {e}",
+                                  query=plan['query'], error=str(e))
+                continue
+            if items is None:
+                continue
+            
+            self._merge_code_hits(candidates, plan, items)
+        
+        return list(candidates.values())
+
+    def _merge_code_hits(self, candidates: Dict[str, Dict], plan: Dict, items: List[Dict]):
+        """Fold one code-search response into the per-repository candidate map"""
+        self.events.info("code_hits", f"📋 {len(items)} code hits for snippet from {plan['path']}:{plan['line']}",
+                         hits=len(items), path=plan['path'], line=plan['line'])
+        for item in items:
+            repo = item.get('repository', {})
+            name = repo.get('full_name')
+            if not name:
+                continue
+            if name not in candidates:
+                candidates[name] = {
+                    'name': name,
+                    'url': repo.get('html_url', f"https://github.com/{name}"),
+                    'stars': repo.get('stargazers_count', 0),
+                    'language': repo.get('language', ''),
+                    'description': repo.get('description', ''),
+                    'size': repo.get('size', 0),
+                    'query_hits': 0,
+                    'code_hits': 0,
+                    'code_matches': []
+                }
+            candidates[name]['code_hits'] += 1
+            candidates[name]['code_matches'].append({'target_file': plan['path'], 'comparison_file': item.get('path')})
 
-    def search_github_repositories(self, keywords: List[str], target_language: str = None) -> List[Dict]:
+    def search_github_repositories(self, keywords: List[str], target_language: str = None,
+                                   target_info: RepoInfo = None, seed_candidates: List[Dict] = None) -> List[Dict]:
         """
         Search GitHub for repositories using keywords
         
         Args:
             keywords: List of search keywords
             target_language: Programming language filter
+            target_info: Target repository, used to rank candidates by tree overlap
+            seed_candidates: Candidates already found by code search; when present the
+                generic fallback queries are skipped
             
         Returns:
-            List of repository information from search results
+            List of repository information from search results, ranked by expected match likelihood
         """
-        print(f"🔍 Searching GitHub with keywords: {', '.join(keywords[:5])}...")
+        self.events.info("search_start", f"🔍 Searching GitHub with keywords: {', '.join(keywords[:5])}...",
+                         keywords=keywords)
+        
+        unique_repos = {candidate['name']: candidate for candidate in seed_candidates or []}
+        
+        for query in self._build_search_queries(keywords, target_language, bool(unique_repos)):
+            try:
+                # Search repositories (served from the search cache when warm)
+                repos = self._cached_search("repositories", self._repository_search_params(query))
+                if repos is not None:
+                    self._merge_repo_hits(unique_repos, query, repos)
+            except Exception as e:
+                self.events.error("search_error", f"❌ Error searching for '{query}': {e}", query=query, error=str(e))
         
-        all_repos = []
+        return self._rank_candidates(unique_repos, keywords, target_language, target_info,
+                                     self.fetch_tree_paths if target_info else None)
+
+    def _build_search_queries(self, keywords: List[str], target_language: str = None,
+                              have_seeds: bool = False) -> List[str]:
+        """Repository search queries for a target, in priority order"""
         search_queries = []
         
         # Create different search query combinations
@@ -157,83 +389,173 @@ class GitHubWidePlagiarismDetector:
             if target_language:
                 search_queries.append(f"language:{target_language}")
         
-        # Fallback searches
-        search_queries.extend([
-            "dispatch emergency",
-            "hackathon project",
-            "ai assistant",
-            "web application"
-        ])
+        # Fallback searches, only needed when code search found nothing
+        if not have_seeds:
+            search_queries.extend([
+                "dispatch emergency",
+                "hackathon project",
+                "ai assistant",
+                "web application"
+            ])
         
-        for query in search_queries[:8]:  # Limit search queries
-            try:
-                # Search repositories
-                search_url = f"https://api.github.com/search/repositories"
-                params = {
-                    'q': query,
-                    'sort': 'stars',
-                    'order': 'desc',
-                    'per_page': 20
-                }
-                
-                response = requests.get(search_url, headers=self.headers, params=params)
-                
-                if response.status_code == 403:
-                    print(f"⚠️  Rate limit hit during search. Waiting 60 seconds...")
-                    time.sleep(60)
-                    response = requests.get(search_url, headers=self.headers, params=params)
-                
-                if response.status_code == 200:
-                    search_results = response.json()
-                    repos = search_results.get('items', [])
-                    
-                    for repo in repos:
-                        repo_info = {
-                            'name': repo['full_name'],
-                            'url': repo['html_url'],
-                            'stars': repo['stargazers_count'],
-                            'language': repo.get('language', ''),
-                            'description': repo.get('description', ''),
-                            'size': repo['size']
-                        }
-                        all_repos.append(repo_info)
-                        
-                    print(f"📋 Found {len(repos)} repositories for query: '{query}'")
-                else:
-                    print(f"❌ Search failed for query '{query}': {response.status_code}")
-                
-                # Rate limiting
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"❌ Error searching for '{query}': {e}")
+        return search_queries[:8]  # Limit search queries
+
+    def _repository_search_params(self, query: str) -> Dict:
+        """Parameters for one repository search request"""
+        return {
+            'q': query,
+            'sort': 'stars',
+            'order': 'desc',
+            'per_page': 20
+        }
+
+    def _merge_repo_hits(self, unique_repos: Dict[str, Dict], query: str, repos: List[Dict]):
+        """Fold one repository-search response into the deduplicated candidate map"""
+        for repo in repos:
+            if repo['full_name'] in unique_repos:
+                # Repos returned by several queries are more likely matches
+                existing = unique_repos[repo['full_name']]
+                existing['query_hits'] += 1
+                existing['stars'] = existing.get('stars') or repo['stargazers_count']
+                existing['size'] = existing.get('size') or repo['size']
+                continue
+            
+            unique_repos[repo['full_name']] = {
+                'name': repo['full_name'],
+                'url': repo['html_url'],
+                'stars': repo['stargazers_count'],
+                'language': repo.get('language', ''),
+                'description': repo.get('description', ''),
+                'size': repo['size'],
+                'query_hits': 1
+            }
+        
+        self.events.info("search_results", f"📋 Found {len(repos)} repositories for query: '{query}'",
+                         query=query, repos=len(repos))
+
+    def _rank_candidates(self, unique_repos: Dict[str, Dict], keywords: List[str], target_language: str,
+                         target_info: RepoInfo, fetch_tree_paths) -> List[Dict]:
+        """Rank deduplicated candidates and cap them at max_repos_to_check"""
+        self.events.info("search_candidates", f"📊 Total unique repositories found: {len(unique_repos)}",
+                         candidates=len(unique_repos))
         
-        # Remove duplicates and sort by stars
-        unique_repos = {}
-        for repo in all_repos:
-            if repo['name'] not in unique_repos:
-                unique_repos[repo['name']] = repo
+        # Rank by expected match likelihood instead of popularity
+        target_paths = set()
+        target_size_kb = 0
+        target_name = None
+        if target_info:
+            target_paths = {f.path for f in target_info.files}
+            target_size_kb = sum(f.size for f in target_info.files) / 1024
+            target_name = split_repo_spec(target_info.name)[0].lower()
         
-        sorted_repos = sorted(unique_repos.values(), key=lambda x: x['stars'], reverse=True)
-        print(f"📊 Total unique repositories found: {len(sorted_repos)}")
+        candidates = [repo for repo in unique_repos.values() if repo['name'].lower() != target_name]
+        ranked_repos = self.candidate_ranker.rank(
+            candidates,
+            keywords,
+            target_language=target_language,
+            target_paths=target_paths,
+            target_size_kb=target_size_kb,
+            fetch_tree_paths=fetch_tree_paths
+        )
+        
+        return ranked_repos[:self.max_repos_to_check]
+
+    def _cached_search(self, endpoint: str, params: Dict) -> List[Dict]:
+        """
+        Run a search through the persistent cache, walking up to self.search_pages pages
+        
+        Args:
+            endpoint: Search endpoint ("repositories" or "code")
+            params: Search parameters including 'q' and 'per_page'
+            
+        Returns:
+            Result items, or None if the first page could not be fetched
+        """
+        def fetch_page(page_params: Dict):
+            response = self._api_get(f"{self.api_base}/search/{endpoint}", params=page_params)
+            time.sleep(1)  # Rate limiting, only paid on cache misses
+            if response.status_code != 200:
+                self.events.error("search_failed", f"❌ Search failed for query '{page_params['q']}': {response.status_code}",
+                                  query=page_params['q'], status=response.status_code)
+                return None
+            return response.json()
+        
+        return cached_search(self.search_cache, fetch_page, endpoint, params, self.search_pages)
+
+    def _api_get(self, url: str, params: Dict = None):
+        """GET a GitHub API URL, waiting out a single rate-limit response"""
+        self.metrics.incr("api_requests")
+        response = requests.get(url, headers=self.headers, params=params)
+        self._record_rate_limit(response.headers, 'search' if '/search/' in url else 'core')
+        if response.status_code == 403:
+            self.events.warning("rate_limited", "⚠️  Rate limit hit. Waiting 60 seconds...", wait_seconds=60)
+            self.metrics.incr("rate_limit_waits")
+            time.sleep(60)
+            self.metrics.incr("api_requests")
+            response = requests.get(url, headers=self.headers, params=params)
+            self._record_rate_limit(response.headers, 'search' if '/search/' in url else 'core')
+        return response
+
+    def _record_rate_limit(self, headers, bucket: str):
+        """Publish the X-RateLimit-Remaining of a response as a per-bucket gauge"""
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is not None:
+            self.metrics.set_gauge("rate_limit_remaining", int(remaining),
+                                   bucket=headers.get('X-RateLimit-Resource', bucket))
+
+    def fetch_tree_listing(self, repo_name: str, ref: str = None) -> List[Dict]:
+        """
+        Fetch the recursive git tree listing of a repository (one API call, cached for the run)
         
-        return sorted_repos[:self.max_repos_to_check]
+        Args:
+            repo_name: Repository spec, "owner/repo" or "owner/repo@ref"
+            ref: Branch, tag or commit to list (default: the spec's ref, else HEAD)
+            
+        Returns:
+            List of tree entries (path, type, sha, size), empty on failure
+        """
+        repo_name, spec_ref = split_repo_spec(repo_name)
+        ref = ref or spec_ref or "HEAD"
+        if (repo_name, ref) in self._tree_cache:
+            return self._tree_cache[(repo_name, ref)]
+        tree = []
+        try:
+            url = f"{self.api_base}/repos/{repo_name}/git/trees/{ref}"
+            response = self._api_get(url, params={'recursive': 1})
+            if response.status_code == 200:
+                tree = response.json().get('tree', [])
+        except Exception as e:
+            self.events.error("fetch_error", f"❌ Error fetching tree for {repo_name}: {e}", repo=repo_name, error=str(e))
+        self._tree_cache[(repo_name, ref)] = tree
+        return tree
+
+    def fetch_tree_paths(self, repo_name: str) -> List[str]:
+        """Paths of all blobs in a repository's tree listing"""
+        return [entry['path'] for entry in self.fetch_tree_listing(repo_name) if entry.get('type') == 'blob']
 
-    def fetch_repo_contents(self, repo_name: str) -> RepoInfo:
+    def fetch_repo_contents(self, repo_name: str, subtrees: List[Dict] = None,
+                            source_files: List[FileInfo] = None) -> RepoInfo:
         """
         Fetch repository contents from GitHub API
         
         Args:
-            repo_name: Repository name in format "owner/repo"
+            repo_name: Repository spec, "owner/repo" or "owner/repo@ref"
+            subtrees: Subtrees identical to the target's (from match_candidate_subtrees());
+                their files are taken from source_files instead of being downloaded
+            source_files: Target files backing the matched subtrees
             
         Returns:
             RepoInfo object containing repository data
         """
         try:
-            print(f"📥 Fetching repository: {repo_name}")
+            self.events.info("fetch_start", f"📥 Fetching repository: {repo_name}", repo=repo_name)
+            reused = {subtree['comparison_path']: subtree for subtree in subtrees or []}
+            name, ref = split_repo_spec(repo_name)
+            ref_params = {'ref': ref} if ref else None
             
-            api_url = f"https://api.github.com/repos/{repo_name}/contents"
+            api_url = f"{self.api_base}/repos/{name}/contents"
             files = []
+            excluded_files = []
             files_processed = 0
             
             def fetch_directory(url: str, path: str = ""):
@@ -244,12 +566,7 @@ class GitHubWidePlagiarismDetector:
                     return
                 
                 try:
-                    response = requests.get(url, headers=self.headers)
-                    if response.status_code == 403:
-                        print(f"⚠️  Rate limit hit. Waiting 60 seconds...")
-                        time.sleep(60)
-                        response = requests.get(url, headers=self.headers)
-                    
+                    response = self._api_get(url, params=ref_params)
                     if response.status_code != 200:
                         return
                     
@@ -265,8 +582,16 @@ class GitHubWidePlagiarismDetector:
                             
                             # Only process code files
                             if file_ext in self.code_extensions:
+                                classification = self.file_classifier.classify_path(file_path)
+                                if classification:
+                                    excluded_files.append(classification.to_dict())
+                                    continue
+                                
                                 file_content = self.fetch_file_content(item['download_url'])
-                                if file_content and len(file_content) >= self.min_file_size:
+                                classification = self.file_classifier.classify_content(file_path, file_content)
+                                if classification:
+                                    excluded_files.append(classification.to_dict())
+                                elif file_content and len(file_content) >= self.min_file_size:
                                     file_info = FileInfo(
                                         path=file_path,
                                         content=file_content,
@@ -278,36 +603,51 @@ class GitHubWidePlagiarismDetector:
                                     files_processed += 1
                         
                         elif item['type'] == 'dir' and files_processed < self.max_files_per_repo:
+                            if item['path'] in reused:
+                                copied = subtree_files(reused[item['path']], source_files)
+                                copied = copied[:self.max_files_per_repo - files_processed]
+                                files.extend(copied)
+                                files_processed += len(copied)
+                                continue
+                            
+                            classification = self.file_classifier.classify_dir(item['path'])
+                            if classification:
+                                excluded_files.append(classification.to_dict())
+                                continue
+                            
                             # Recursively fetch subdirectory
                             fetch_directory(item['url'], item['path'])
                 
                 except Exception as e:
-                    print(f"❌ Error fetching directory {url}: {e}")
+                    self.events.error("fetch_error", f"❌ Error fetching directory {url}: {e}", url=url, error=str(e))
             
             fetch_directory(api_url)
             
             total_lines = sum(f.lines for f in files)
             
             return RepoInfo(
-                url=f"https://github.com/{repo_name}",
+                url=repo_spec_url(repo_name),
                 name=repo_name,
                 files=files,
                 total_files=len(files),
-                total_lines=total_lines
+                total_lines=total_lines,
+                excluded_files=excluded_files
             )
             
         except Exception as e:
-            print(f"❌ Error fetching repository {repo_name}: {e}")
+            self.events.error("fetch_error", f"❌ Error fetching repository {repo_name}: {e}", repo=repo_name, error=str(e))
             return None
 
     def fetch_file_content(self, download_url: str) -> str:
         """Fetch file content from GitHub"""
         try:
+            self.metrics.incr("file_downloads")
             response = requests.get(download_url, headers=self.headers)
             if response.status_code == 200:
+                self.metrics.incr("bytes_downloaded", len(response.content))
                 return response.text
         except Exception as e:
-            print(f"❌ Error fetching file content: {e}")
+            self.events.error("fetch_error", f"❌ Error fetching file content: {e}", url=download_url, error=str(e))
         return None
 
     def normalize_code(self, content: str) -> str:
@@ -320,16 +660,7 @@ class GitHubWidePlagiarismDetector:
         Returns:
             Normalized content string
         """
-        # Remove comments (basic patterns)
-        content = re.sub(r'//.*$', '', content, flags=re.MULTILINE)  # Single-line comments
-        content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)  # Multi-line comments
-        content = re.sub(r'#.*$', '', content, flags=re.MULTILINE)   # Python/shell comments
-        
-        # Remove extra whitespace and normalize
-        content = re.sub(r'\s+', ' ', content)
-        content = content.strip().lower()
-        
-        return content
+        return normalize_code_text(content)
 
     def calculate_similarity(self, content1: str, content2: str) -> float:
         """
@@ -349,50 +680,161 @@ class GitHubWidePlagiarismDetector:
         similarity = difflib.SequenceMatcher(None, normalized1, normalized2).ratio()
         return similarity
 
-    def detect_plagiarism_github_wide(self, target_repo: str) -> Dict:
+    def assess_risk(self, total_identical: int, total_suspicious: int) -> str:
         """
-        Detect plagiarism by searching across all of GitHub
+        Map finding counts to a plagiarism risk tier
+        
+        Counts only ever grow during a run, so once CRITICAL is reached the
+        final tier can no longer change.
         
         Args:
-            target_repo: Repository URL to check for plagiarism
+            total_identical: Number of identical files found so far
+            total_suspicious: Number of suspicious (>90%) matches found so far
             
         Returns:
-            Dictionary containing plagiarism analysis results
+            One of LOW, MEDIUM, HIGH, CRITICAL
         """
-        print(f"🔍 Starting GitHub-wide plagiarism detection for: {target_repo}")
-        
-        # Fetch target repository
-        target_repo_name = self.get_repo_info(target_repo)
-        target_info = self.fetch_repo_contents(target_repo_name)
-        if not target_info:
-            return {"error": "Failed to fetch target repository"}
-        
-        print(f"✅ Target repo: {target_info.total_files} files, {target_info.total_lines} lines")
-        
-        # Extract keywords for searching
-        keywords = self.extract_search_keywords(target_info)
-        print(f"🔑 Extracted keywords: {', '.join(keywords)}")
-        
-        # Detect primary language
+        if total_identical > 5 or total_suspicious > 15:
+            return "CRITICAL"
+        elif total_identical > 2 or total_suspicious > 8:
+            return "HIGH"
+        elif total_identical > 0 or total_suspicious > 3:
+            return "MEDIUM"
+        return "LOW"
+
+    def detect_primary_language(self, target_info: RepoInfo) -> str:
+        """Most common code extension of the target, mapped to a GitHub language name"""
         languages = {}
         for file_info in target_info.files:
             ext = os.path.splitext(file_info.path)[1].lower()
             languages[ext] = languages.get(ext, 0) + 1
         
-        primary_language = None
-        if languages:
-            primary_ext = max(languages.keys(), key=languages.get)
-            language_map = {
-                '.py': 'Python', '.js': 'JavaScript', '.ts': 'TypeScript',
-                '.java': 'Java', '.cpp': 'C++', '.c': 'C', '.cs': 'C#',
-                '.php': 'PHP', '.rb': 'Ruby', '.go': 'Go'
-            }
-            primary_language = language_map.get(primary_ext)
-        
-        print(f"🔤 Detected primary language: {primary_language or 'Unknown'}")
+        if not languages:
+            return None
+        primary_ext = max(languages.keys(), key=languages.get)
+        language_map = {
+            '.py': 'Python', '.js': 'JavaScript', '.ts': 'TypeScript',
+            '.java': 'Java', '.cpp': 'C++', '.c': 'C', '.cs': 'C#',
+            '.php': 'PHP', '.rb': 'Ruby', '.go': 'Go'
+        }
+        return language_map.get(primary_ext)
+
+    def _load_checkpointed_repo(self, repo_name: str) -> RepoInfo:
+        """RepoInfo of a repository already fetched in the journaled run, or None"""
+        data = self.journal.fetched(repo_name) if self.journal else None
+        if data is None:
+            return None
+        return RepoInfo(**dict(data, files=[FileInfo(**f) for f in data['files']]))
+
+    def _fetch_checkpointed(self, repo_name: str, subtrees: List[Dict] = None,
+                            source_files: List[FileInfo] = None) -> RepoInfo:
+        """fetch_repo_contents() that replays journaled or warm-cached fetches and journals new ones"""
+        repo_info = self._load_checkpointed_repo(repo_name)
+        if repo_info:
+            self.events.info("journal_replay", f"♻️  Loaded {repo_name} from checkpoint journal", repo=repo_name)
+            self.metrics.incr("repos_from_journal")
+            return repo_info
+        repo_info = self._load_cached_repo(repo_name)
+        if repo_info:
+            return repo_info
+        with self.metrics.track("fetches_in_flight"), self.metrics.timer("fetch"):
+            if subtrees:
+                repo_info = self.fetch_repo_contents(repo_name, subtrees, source_files)
+            else:
+                repo_info = self.fetch_repo_contents(repo_name)
+        self._count_fetch(repo_info)
+        self._store_fetched_repo(repo_info)
+        return repo_info
+
+    def _load_cached_repo(self, repo_name: str) -> RepoInfo:
+        """RepoInfo from the warm repo cache (journaled so a resume does not refetch it), or None"""
+        repo_info = self.repo_cache.get(repo_name.lower()) if self.repo_cache is not None else None
+        if repo_info:
+            self.metrics.incr("repos_from_cache")
+            if self.journal:
+                self.journal.record_fetch(repo_info)
+        return repo_info
+
+    def _store_fetched_repo(self, repo_info: RepoInfo):
+        """Journal and warm-cache a freshly fetched repository"""
+        if not repo_info:
+            return
+        if self.journal:
+            self.journal.record_fetch(repo_info)
+        if self.repo_cache is not None:
+            self.repo_cache[repo_info.name.lower()] = repo_info
+
+    def _count_fetch(self, repo_info: RepoInfo):
+        """Fetch counters and the files-per-repository histogram"""
+        if not repo_info:
+            self.metrics.incr("repos_failed")
+            return
+        self.metrics.incr("repos_fetched")
+        self.metrics.incr("files_fetched", repo_info.total_files)
+        self.metrics.observe("files_per_repo", repo_info.total_files, buckets=(1, 5, 10, 20, 50, 100, 500))
+
+    def match_candidate_subtrees(self, target_tree: List[Dict], comparison_tree: List[Dict],
+                                 repo_name: str) -> List[Dict]:
+        """
+        Subtrees of the target copied wholesale into a candidate, by tree SHA
         
-        # Search GitHub for similar repositories
-        candidate_repos = self.search_github_repositories(keywords, primary_language)
+        Args:
+            target_tree: Recursive tree listing of the target
+            comparison_tree: Recursive tree listing of the candidate
+            repo_name: Candidate name (for events)
+            
+        Returns:
+            Matched subtrees from match_subtrees(), empty when disabled
+        """
+        if not self.subtree_matching or not target_tree or not comparison_tree:
+            return []
+        subtrees = match_subtrees(target_tree, comparison_tree, self.min_subtree_files,
+                                  self.file_classifier.classify_dir)
+        for subtree in subtrees:
+            self.metrics.incr("identical_subtrees")
+            # Taken from the target instead of downloaded
+            self.metrics.incr("subtree_files_reused", subtree['files'])
+            self.events.warning("identical_subtree",
+                                f"🚨 CRITICAL: {subtree['target_path']}/ is identical to "
+                                f"{repo_name}/{subtree['comparison_path']}/ ({subtree['files']} files)",
+                                repo=repo_name, **subtree)
+        return subtrees
+    
+    def _score_checkpointed(self, candidate: Dict, target_files: List[FileInfo],
+                            comparison_info: RepoInfo, subtrees: List[Dict] = None) -> Tuple[List[Dict], float, int]:
+        """compare_files() that replays journaled scores and journals new ones"""
+        scored = self.journal.comparison(candidate['name']) if self.journal else None
+        if scored is None:
+            with self.metrics.timer("score"):
+                scored = compare_files(target_files, comparison_info.files, self.similarity_threshold,
+                                       self.metrics, subtrees)
+            self.metrics.incr("file_pairs_compared", scored[2])
+            if self.journal:
+                self.journal.record_comparison(candidate['name'], scored)
+        return scored
+
+    def analyze_target_history(self, repo_name: str) -> Optional[Dict]:
+        """History forensics of a repository from its commit metadata (None when disabled or unavailable)"""
+        if not self.history_forensics:
+            return None
+        name, ref = split_repo_spec(repo_name)
+        with self.metrics.timer("history"):
+            commits = fetch_api_commits(self._api_get, self.api_base, name, ref, max_commits=self.history_max_commits)
+        if not commits:
+            return None
+        analysis = analyze_history(commits)
+        self.events.info("history_analyzed", f"🕰️  History risk: {analysis['history_risk']} "
+                         f"({analysis['commits']} commits, {len(analysis['flags'])} flags)",
+                         repo=repo_name, history_risk=analysis['history_risk'], flags=analysis['flags'])
+        return analysis
+    
+    def _new_results(self, target_repo: str, target_repo_name: str, target_info: RepoInfo,
+                     primary_language: str, keywords: List[str], candidate_repos: List[Dict],
+                     history: Dict = None) -> Dict:
+        """Empty results dict for a run, with the target registered in the content index"""
+        # Exact duplicates are found by hash lookup as each repository is ingested
+        self.content_index = ContentHashIndex()
+        self.content_index.set_target(target_info)
         
         results = {
             "target_repo": target_repo,
@@ -406,227 +848,397 @@ class GitHubWidePlagiarismDetector:
             "comparisons": [],
             "suspicious_matches": [],
             "identical_files": [],
+            "excluded_files": [],
             "summary": {}
         }
+        if history:
+            results["history"] = {target_repo_name: history}
+        if self.results_sink:
+            self.results_sink.header(results)
+        for entry in target_info.excluded_files:
+            self._add_result(results, "excluded_files", dict(entry, repo=target_repo_name))
+        return results
+
+    def _add_result(self, results: Dict, key: str, item: Dict):
+        """Append an item to a results list, or stream it when a results sink is set"""
+        if self.results_sink:
+            self.results_sink.add(key, item)
+        else:
+            results[key].append(item)
+
+    def _count_results(self, results: Dict, key: str) -> int:
+        """Number of items added to a results list (streamed or in memory)"""
+        return len(results[key]) + (self.results_sink.counts[key] if self.results_sink else 0)
+
+    def _verdict_decided(self, results: Dict) -> bool:
+        """True once the findings so far already put the run at CRITICAL"""
+        return self.assess_risk(self._count_results(results, "identical_files"),
+                                self._count_results(results, "suspicious_matches")) == "CRITICAL"
+
+    def _ingest_candidate(self, candidate: Dict, comparison_info: RepoInfo, results: Dict) -> List[Dict]:
+        """
+        Index a fetched candidate and report its identical files immediately
         
-        print(f"📋 Analyzing {len(candidate_repos)} candidate repositories...")
+        Returns:
+            Identical-file matches found in this candidate
+        """
+        self.events.info("repo_stats", f"✅ Repo stats: {comparison_info.total_files} files, {comparison_info.total_lines} lines",
+                         repo=candidate['name'], files=comparison_info.total_files, lines=comparison_info.total_lines)
+        self.df_table.add_repo(comparison_info)
+        for entry in comparison_info.excluded_files:
+            self._add_result(results, "excluded_files", dict(entry, repo=candidate['name']))
         
-        # Compare with each candidate repository
-        for i, candidate in enumerate(candidate_repos):
-            print(f"\n🔄 [{i+1}/{len(candidate_repos)}] Comparing with: {candidate['name']} (⭐{candidate['stars']})")
-            
-            # Skip if it's the same repository
-            if candidate['name'].lower() == target_repo_name.lower():
-                print("⏭️  Skipping self-comparison")
-                continue
-            
-            comparison_info = self.fetch_repo_contents(candidate['name'])
-            if not comparison_info:
-                print(f"❌ Failed to fetch: {candidate['name']}")
-                continue
-            
-            print(f"✅ Repo stats: {comparison_info.total_files} files, {comparison_info.total_lines} lines")
-            
-            # Compare files
-            matches = []
-            identical_matches = []
-            total_similarity = 0
-            comparisons_made = 0
-            
-            for target_file in target_info.files:
-                for comp_file in comparison_info.files:
-                    # Compare files with similar paths or extensions
-                    if (os.path.splitext(target_file.path)[1] == os.path.splitext(comp_file.path)[1] or
-                        os.path.basename(target_file.path) == os.path.basename(comp_file.path)):
-                        
-                        similarity = self.calculate_similarity(target_file.content, comp_file.content)
-                        total_similarity += similarity
-                        comparisons_made += 1
-                        
-                        # Check for identical files (hash comparison)
-                        if target_file.hash == comp_file.hash:
-                            identical_match = {
-                                "target_file": target_file.path,
-                                "comparison_file": comp_file.path,
-                                "repo": candidate['name'],
-                                "repo_url": candidate['url'],
-                                "lines": target_file.lines,
-                                "stars": candidate['stars']
-                            }
-                            identical_matches.append(identical_match)
-                            results["identical_files"].append(identical_match)
-                        
-                        elif similarity >= self.similarity_threshold:
-                            match = {
-                                "target_file": target_file.path,
-                                "comparison_file": comp_file.path,
-                                "similarity": similarity,
-                                "target_lines": target_file.lines,
-                                "comparison_lines": comp_file.lines
-                            }
-                            matches.append(match)
-                            
-                            if similarity > 0.9:
-                                results["suspicious_matches"].append({
-                                    "repo": candidate['name'],
-                                    "repo_url": candidate['url'],
-                                    "stars": candidate['stars'],
-                                    "match": match
-                                })
-            
-            avg_similarity = total_similarity / comparisons_made if comparisons_made > 0 else 0
-            
-            comparison_result = {
-                "repo": candidate['name'],
-                "repo_url": candidate['url'],
-                "stars": candidate['stars'],
-                "language": candidate['language'],
-                "description": candidate['description'],
-                "repo_stats": {
-                    "files": comparison_info.total_files,
-                    "lines": comparison_info.total_lines
-                },
-                "matches": matches,
-                "identical_files": identical_matches,
-                "average_similarity": avg_similarity,
-                "high_similarity_files": len(matches)
-            }
-            
-            results["comparisons"].append(comparison_result)
+        # Identical files come straight from the content index, before any similarity work
+        return [self._report_identical(candidate, target_file, location, results)
+                for target_file, location in self.content_index.add_repo(comparison_info, candidate['url'], candidate['stars'])]
+
+    def _report_identical(self, candidate: Dict, target_file: FileInfo, location, results: Dict) -> Dict:
+        """Add one identical file to the results, announce it and return the match"""
+        identical_match = {
+            "target_file": target_file.path,
+            "comparison_file": location.path,
+            "repo": candidate['name'],
+            "repo_url": candidate['url'],
+            "lines": target_file.lines,
+            "stars": candidate['stars']
+        }
+        self._add_result(results, "identical_files", identical_match)
+        self.events.warning("identical_file", f"🚨 CRITICAL: {target_file.path} is identical to {candidate['name']}/{location.path}",
+                            repo=candidate['name'], target_file=target_file.path, comparison_file=location.path)
+        if self.on_identical:
+            self.on_identical(identical_match)
+        return identical_match
+
+    def _record_comparison(self, candidate: Dict, comparison_info: RepoInfo, identical_matches: List[Dict],
+                           scored: Tuple[List[Dict], float, int], results: Dict,
+                           subtrees: List[Dict] = None) -> Dict:
+        """
+        Add one candidate's scored comparison to the results
+        
+        Args:
+            candidate: Candidate search result
+            comparison_info: Fetched candidate repository
+            identical_matches: Identical files found by _ingest_candidate()
+            scored: (matches, total_similarity, comparisons_made) from compare_files()
+            results: Results dict being built
+            subtrees: Identical subtrees from match_candidate_subtrees()
             
-            if identical_matches or len(matches) > 0:
-                print(f"🚨 Found {len(matches)} suspicious matches, {len(identical_matches)} identical files (avg: {avg_similarity:.2f})")
-            else:
-                print(f"✅ No significant matches found (avg: {avg_similarity:.2f})")
+        Returns:
+            The comparison result dict
+        """
+        matches, total_similarity, comparisons_made = scored
+        for match in matches:
+            if match['similarity'] > 0.9:
+                self._add_result(results, "suspicious_matches", {
+                    "repo": candidate['name'],
+                    "repo_url": candidate['url'],
+                    "stars": candidate['stars'],
+                    "match": match
+                })
         
-        # Generate summary
-        total_suspicious = len(results["suspicious_matches"])
-        total_identical = len(results["identical_files"])
-        total_comparisons = len(results["comparisons"])
+        avg_similarity = total_similarity / comparisons_made if comparisons_made > 0 else 0
         
-        # Determine risk level based on findings
-        if total_identical > 5 or total_suspicious > 15:
-            risk_level = "CRITICAL"
-        elif total_identical > 2 or total_suspicious > 8:
-            risk_level = "HIGH"
-        elif total_identical > 0 or total_suspicious > 3:
-            risk_level = "MEDIUM"
+        comparison_result = {
+            "repo": candidate['name'],
+            "repo_url": candidate['url'],
+            "stars": candidate['stars'],
+            "language": candidate['language'],
+            "description": candidate['description'],
+            "match_score": candidate.get('match_score', 0),
+            "repo_stats": {
+                "files": comparison_info.total_files,
+                "lines": comparison_info.total_lines,
+                "excluded_files": len(comparison_info.excluded_files)
+            },
+            "matches": matches,
+            "identical_files": identical_matches,
+            "identical_subtrees": subtrees or [],
+            "average_similarity": avg_similarity,
+            "high_similarity_files": len(matches)
+        }
+        
+        self._add_result(results, "comparisons", comparison_result)
+        
+        if identical_matches or len(matches) > 0:
+            message = f"🚨 Found {len(matches)} suspicious matches, {len(identical_matches)} identical files (avg: {avg_similarity:.2f})"
         else:
-            risk_level = "LOW"
+            message = f"✅ No significant matches found (avg: {avg_similarity:.2f})"
+        self.events.info("comparison_scored", message, repo=candidate['name'], matches=len(matches),
+                         identical_files=len(identical_matches), average_similarity=avg_similarity)
+        return comparison_result
+
+    def _finalize_results(self, results: Dict, candidate_repos: List[Dict], decide_fast: bool,
+                          candidates_skipped: int, save_df_table: bool = True) -> Dict:
+        """Fill in the summary section and persist the corpus document frequencies (unless save_df_table is False)"""
+        total_suspicious = self._count_results(results, "suspicious_matches")
+        total_identical = self._count_results(results, "identical_files")
+        total_comparisons = self._count_results(results, "comparisons")
+        
+        # Determine risk level based on findings
+        risk_level = self.assess_risk(total_identical, total_suspicious)
         
         results["summary"] = {
+            "mode": "decide_fast" if decide_fast else "full",
+            "terminated_early": candidates_skipped > 0,
+            "candidates_skipped": candidates_skipped,
             "total_repositories_searched": len(candidate_repos),
             "total_repositories_compared": total_comparisons,
             "total_suspicious_matches": total_suspicious,
             "total_identical_files": total_identical,
+            "total_excluded_files": self._count_results(results, "excluded_files"),
+            "excluded_by_category": (dict(self.results_sink.excluded_by_category) if self.results_sink
+                                     else summarize_exclusions(results["excluded_files"])),
             "plagiarism_risk": risk_level
         }
+        results["metrics"] = self.metrics.snapshot()
+        self.events.info("run_complete", summary=results["summary"])
+        if self.results_sink:
+            self.results_sink.metrics(results["metrics"])
+            self.results_sink.summary(results["summary"])
+            results["results_stream"] = self.results_sink.path
+        
+        # Persist document frequencies so future runs pick rarer snippets
+        if save_df_table:
+            self.df_table.save()
         
         return results
 
-    def generate_github_wide_report(self, results: Dict, output_file: str = None):
+    def detect_plagiarism_github_wide(self, target_repo: str, decide_fast: bool = False) -> Dict:
+        """
+        Detect plagiarism by searching across all of GitHub
+        
+        Args:
+            target_repo: Repository URL to check for plagiarism
+            decide_fast: Triage mode - stop fetching candidates as soon as the
+                risk tier is decided (CRITICAL) and return the evidence so far
+            
+        Returns:
+            Dictionary containing plagiarism analysis results
+        """
+        self.events.info("run_start", f"🔍 Starting GitHub-wide plagiarism detection for: {target_repo}",
+                         target_repo=target_repo)
+        self.metrics.reset()
+        self._tree_cache = {}
+        
+        if self.journal:
+            self.journal.start_run(target_repo, decide_fast=decide_fast)
+        
+        # Fetch target repository (at the ref named by the URL, if any)
+        target_repo_name = self.get_repo_spec(target_repo)
+        target_info = self._fetch_checkpointed(target_repo_name)
+        if not target_info:
+            return {"error": "Failed to fetch target repository"}
+        
+        self.events.info("target_fetched", f"✅ Target repo: {target_info.total_files} files, {target_info.total_lines} lines",
+                         repo=target_repo_name, files=target_info.total_files, lines=target_info.total_lines)
+        
+        journaled_search = self.journal.search(target_repo_name) if self.journal else None
+        if journaled_search:
+            keywords = journaled_search['keywords']
+            primary_language = journaled_search['primary_language']
+            candidate_repos = journaled_search['candidates']
+            self.events.info("journal_replay", f"♻️  Loaded {len(candidate_repos)} search candidates from checkpoint journal",
+                             candidates=len(candidate_repos))
+        else:
+            # Extract keywords for searching
+            keywords = self.extract_search_keywords(target_info)
+            self.events.info("keywords", f"🔑 Extracted keywords: {', '.join(keywords)}", keywords=keywords)
+            
+            # Detect primary language
+            primary_language = self.detect_primary_language(target_info)
+            self.events.info("language", f"🔤 Detected primary language: {primary_language or 'Unknown'}",
+                             language=primary_language)
+            
+            with self.metrics.timer("search"):
+                # Code search for the target's rarest snippets (needs an authenticated token)
+                code_candidates = []
+                if self.use_code_search and self.github_token:
+                    code_candidates = self.search_github_code(target_info, primary_language)
+                
+                # Search GitHub for similar repositories
+                candidate_repos = self.search_github_repositories(keywords, primary_language, target_info=target_info,
+                                                                  seed_candidates=code_candidates)
+            if self.journal:
+                self.journal.record_search(target_repo_name, keywords, primary_language, candidate_repos)
+        self.df_table.add_repo(target_info)
+        history = self.analyze_target_history(target_repo_name)
+        
+        results = self._new_results(target_repo, target_repo_name, target_info, primary_language, keywords,
+                                    candidate_repos, history)
+        
+        self.events.info("candidates", f"📋 Analyzing {len(candidate_repos)} candidate repositories...",
+                         candidates=len(candidate_repos))
+        
+        candidates_skipped = 0
+        
+        # Compare with each candidate repository
+        for i, candidate in enumerate(candidate_repos):
+            # In decide-fast mode stop scheduling fetches once the verdict cannot change
+            if decide_fast and self._verdict_decided(results):
+                candidates_skipped = len(candidate_repos) - i
+                self.events.info("decide_fast_stop", f"\n⏹️  Risk verdict decided (CRITICAL) - skipping {candidates_skipped} remaining candidates",
+                                 skipped=candidates_skipped)
+                break
+            
+            self.events.progress("compare", i + 1, len(candidate_repos),
+                                 f"\n🔄 [{i+1}/{len(candidate_repos)}] Comparing with: {candidate['name']} (⭐{candidate['stars']}, score {candidate.get('match_score', 0):.2f})",
+                                 repo=candidate['name'])
+            
+            # Skip if it's the same repository
+            if candidate['name'].lower() == split_repo_spec(target_repo_name)[0].lower():
+                self.events.info("self_comparison_skipped", "⏭️  Skipping self-comparison", repo=candidate['name'])
+                continue
+            
+            subtrees = []
+            if self.subtree_matching:
+                subtrees = self.match_candidate_subtrees(self.fetch_tree_listing(target_repo_name),
+                                                         self.fetch_tree_listing(candidate['name']), candidate['name'])
+            
+            comparison_info = self._fetch_checkpointed(candidate['name'], subtrees, target_info.files)
+            if not comparison_info:
+                self.events.warning("fetch_failed", f"❌ Failed to fetch: {candidate['name']}", repo=candidate['name'])
+                continue
+            
+            identical_matches = self._ingest_candidate(candidate, comparison_info, results)
+            
+            # Identical files alone may already decide the verdict; skip scoring in decide-fast mode
+            files_to_score = target_info.files
+            if decide_fast and self._verdict_decided(results):
+                files_to_score = []
+            
+            scored = self._score_checkpointed(candidate, files_to_score, comparison_info, subtrees)
+            self._record_comparison(candidate, comparison_info, identical_matches, scored, results, subtrees)
+        
+        return self._finalize_results(results, candidate_repos, decide_fast, candidates_skipped)
+
+    @timed("report")
+    def generate_github_wide_report(self, results: Dict = None, output_file: str = None,
+                                    store: ResultsStore = None, run_id: int = None):
         """
         Generate a comprehensive GitHub-wide plagiarism report
         
+        The report is rendered from ResultsStore queries; pass an existing store and
+        run id to render several views of the same run without reloading it.
+        
         Args:
             results: Results from detect_plagiarism_github_wide()
             output_file: Optional file to save the report
+            store: ResultsStore already holding the run (instead of results)
+            run_id: Run id within store
         """
+        if store is None:
+            store, run_id = ResultsStore.from_results(results)
+        run = store.run(run_id)
+        summary = run['summary']
+        
         report = []
         report.append("=" * 120)
         report.append("GITHUB-WIDE PLAGIARISM DETECTION REPORT")
         report.append("=" * 120)
-        report.append(f"Target Repository: {results['target_repo']}")
-        report.append(f"Target Stats: {results['target_stats']['files']} files, {results['target_stats']['lines']} lines")
-        report.append(f"Primary Language: {results['target_stats']['primary_language']}")
-        report.append(f"Search Keywords: {', '.join(results['search_keywords'])}")
-        report.append(f"Plagiarism Risk: {results['summary']['plagiarism_risk']}")
+        report.append(f"Target Repository: {run['target_repo']}")
+        report.append(f"Target Stats: {run['target_stats']['files']} files, {run['target_stats']['lines']} lines")
+        report.append(f"Primary Language: {run['target_stats']['primary_language']}")
+        report.append(f"Search Keywords: {', '.join(run['search_keywords'])}")
+        report.append(f"Plagiarism Risk: {summary['plagiarism_risk']}")
         report.append(f"Analysis Date: {time.strftime('%Y-%m-%d %H:%M:%S')}")
         report.append("")
         
         # Summary section
         report.append("📊 SEARCH & ANALYSIS SUMMARY:")
         report.append("-" * 80)
-        report.append(f"GitHub Repositories Searched: {results['summary']['total_repositories_searched']}")
-        report.append(f"Repositories Successfully Analyzed: {results['summary']['total_repositories_compared']}")
-        report.append(f"Suspicious Matches Found (>90% similarity): {results['summary']['total_suspicious_matches']}")
-        report.append(f"Identical Files Found (100% match): {results['summary']['total_identical_files']}")
+        report.append(f"GitHub Repositories Searched: {summary['total_repositories_searched']}")
+        report.append(f"Repositories Successfully Analyzed: {summary['total_repositories_compared']}")
+        if summary.get('terminated_early'):
+            report.append(f"Decide-Fast Mode: stopped after verdict, {summary['candidates_skipped']} candidates not fetched")
+        report.append(f"Suspicious Matches Found (>90% similarity): {summary['total_suspicious_matches']}")
+        report.append(f"Identical Files Found (100% match): {summary['total_identical_files']}")
+        report.append(f"Excluded Files (vendored/generated, not scored): {summary.get('total_excluded_files', 0)}")
         report.append("")
         
         # Critical findings - Identical files
-        if results['identical_files']:
+        identical_files = store.identical_files(run_id)
+        if identical_files:
             report.append("🚨 CRITICAL: IDENTICAL FILES FOUND (100% match)")
             report.append("-" * 80)
-            for match in results['identical_files']:
+            for match in identical_files:
                 report.append(f"Repository: {match['repo']} (⭐{match['stars']} stars)")
                 report.append(f"  URL: {match['repo_url']}")
                 report.append(f"  Identical File: {match['target_file']} = {match['comparison_file']}")
                 report.append(f"  Lines of Code: {match['lines']}")
                 report.append("")
         
-        # High-risk findings - Suspicious matches
-        if results['suspicious_matches']:
+        # High-risk findings - Suspicious matches, grouped by repository
+        repo_matches = store.suspicious_by_repo(run_id)
+        if repo_matches:
             report.append("⚠️  HIGH RISK: SUSPICIOUS MATCHES (>90% similarity)")
             report.append("-" * 80)
-            
-            # Group by repository
-            repo_matches = {}
-            for match in results['suspicious_matches']:
-                repo = match['repo']
-                if repo not in repo_matches:
-                    repo_matches[repo] = {
-                        'url': match['repo_url'],
-                        'stars': match['stars'],
-                        'matches': []
-                    }
-                repo_matches[repo]['matches'].append(match['match'])
-            
-            for repo, info in repo_matches.items():
-                report.append(f"Repository: {repo} (⭐{info['stars']} stars)")
+            for info in repo_matches:
+                report.append(f"Repository: {info['repo']} (⭐{info['stars']} stars)")
                 report.append(f"  URL: {info['url']}")
                 report.append(f"  Suspicious Files ({len(info['matches'])}):")
                 for match in info['matches']:
                     report.append(f"    {match['target_file']} → {match['comparison_file']} ({match['similarity']:.1%})")
                 report.append("")
         
+        # Excluded files are listed separately, never scored
+        excluded_files = store.excluded_files(run_id, limit=20)  # Show first 20 exclusions
+        if excluded_files:
+            report.append("🗑️  EXCLUDED FILES (vendored, build output, minified, lockfiles, generated)")
+            report.append("-" * 80)
+            for category, count in sorted(summary['excluded_by_category'].items()):
+                report.append(f"  {category}: {count}")
+            for entry in excluded_files:
+                report.append(f"  {entry['repo']}: {entry['path']} ({entry['reason']})")
+            report.append("")
+        
         # Detailed comparison results
         report.append("📋 DETAILED ANALYSIS RESULTS:")
         report.append("-" * 80)
         
-        # Sort comparisons by risk (identical files, then high similarity, then stars)
-        sorted_comparisons = sorted(
-            results['comparisons'], 
-            key=lambda x: (len(x['identical_files']), x['high_similarity_files'], x['stars']), 
-            reverse=True
-        )
-        
-        for comparison in sorted_comparisons[:20]:  # Show top 20 results
+        # Top 20 by risk (identical files, then high similarity, then stars)
+        for comparison in store.comparisons(run_id, order="risk", limit=20):
             risk_indicator = ""
-            if comparison['identical_files']:
+            if comparison['risk_tier'] == "CRITICAL":
                 risk_indicator = " 🚨 CRITICAL"
-            elif comparison['high_similarity_files'] > 0:
+            elif comparison['risk_tier'] == "SUSPICIOUS":
                 risk_indicator = " ⚠️  SUSPICIOUS"
             
             report.append(f"Repository: {comparison['repo']} (⭐{comparison['stars']} stars){risk_indicator}")
             report.append(f"  URL: {comparison['repo_url']}")
             report.append(f"  Language: {comparison['language']}")
-            report.append(f"  Description: {comparison['description'][:100]}...")
+            report.append(f"  Description: {(comparison['description'] or '')[:100]}...")
             report.append(f"  Stats: {comparison['repo_stats']['files']} files, {comparison['repo_stats']['lines']} lines")
             report.append(f"  Average Similarity: {comparison['average_similarity']:.2%}")
             report.append(f"  High Similarity Files: {comparison['high_similarity_files']}")
-            report.append(f"  Identical Files: {len(comparison['identical_files'])}")
+            report.append(f"  Identical Files: {comparison['identical_count']}")
             
-            if comparison['identical_files']:
+            if comparison.get('identical_subtrees'):
+                report.append("  IDENTICAL SUBTREES:")
+                for subtree in comparison['identical_subtrees']:
+                    report.append(f"    {subtree['target_path']}/ = {subtree['comparison_path']}/ ({subtree['files']} files)")
+            
+            if comparison['identical_count']:
                 report.append("  IDENTICAL FILES:")
-                for match in comparison['identical_files']:
+                for match in store.identical_files(run_id, comparison['repo']):
                     report.append(f"    {match['target_file']} = {match['comparison_file']}")
             
-            if comparison['matches']:
+            if comparison['high_similarity_files']:
                 report.append("  SIMILAR FILES:")
-                for match in comparison['matches'][:3]:  # Show top 3 matches
+                for match in store.comparison_matches(comparison['_id'], limit=3):  # Show top 3 matches
                     report.append(f"    {match['target_file']} ({match['similarity']:.1%})")
             report.append("")
         
+        if run.get('history'):
+            report.append("🕰️  COMMIT HISTORY FORENSICS:")
+            report.append("-" * 80)
+            report.extend(format_history_section(run['history']))
+        
+        if run.get('metrics'):
+            report.append("RUN METRICS:")
+            report.append("-" * 50)
+            report.extend(format_metrics(run['metrics']))
+            report.append("")
+        
         report.append("=" * 120)
         report.append("NOTE: This analysis searched across GitHub using extracted keywords and similarity matching.")
         report.append("High similarity scores may indicate code reuse, common patterns, or potential plagiarism.")
@@ -634,16 +1246,75 @@ class GitHubWidePlagiarismDetector:
         report.append("=" * 120)
         
         report_text = "\n".join(report)
-        print(report_text)
+        self.events.say(report_text)
         
         if output_file:
             with open(output_file, 'w') as f:
                 f.write(report_text)
-            print(f"📄 Report saved to: {output_file}")
+            self.events.info("report_saved", f"📄 Report saved to: {output_file}", path=output_file, format="text")
+
+    def file_content(self, repo_name: str, path: str) -> Optional[str]:
+        """Content of a file fetched during the journaled run (or held in the warm repo cache), or None"""
+        cached = self.repo_cache.get(repo_name.lower()) if self.repo_cache is not None else None
+        if cached:
+            return next((f.content for f in cached.files if f.path == path), None)
+        data = self.journal.fetched(repo_name) if self.journal else None
+        for file_data in (data or {}).get('files', []):
+            if file_data['path'] == path:
+                return file_data['content']
+        return None
+
+    def generate_github_wide_html_report(self, results: Dict, output_dir: str, content_lookup=None) -> str:
+        """
+        Generate the HTML evidence report (compact index plus lazily loaded diff chunks)
+        
+        Args:
+            results: Results from detect_plagiarism_github_wide()
+            output_dir: Directory to write index.html and chunks/ into
+            content_lookup: Callable(repo, path) -> file content; defaults to the
+                checkpoint journal's fetched files
+            
+        Returns:
+            Path of index.html
+        """
+        index_path = write_html_report(results, output_dir, content_lookup or self.file_content,
+                                       self.get_repo_spec(results['target_repo']))
+        self.events.info("report_saved", f"🌐 HTML report saved to: {index_path}", path=index_path, format="html")
+        return index_path
 
 def main():
     """Main function to run GitHub-wide plagiarism detection"""
     
+    parser = argparse.ArgumentParser(description="GitHub-wide plagiarism detection")
+    parser.add_argument("target_repo", nargs="?",
+                        default="https://github.com/ka-reem/agenthacks-25/commits/stolen_rewritten",
+                        help="Repository URL to check for plagiarism")
+    parser.add_argument("--decide-fast", action="store_true",
+                        help="Triage mode: stop fetching once the risk verdict is decided")
+    parser.add_argument("--search-pages", type=int, default=1,
+                        help="Search result pages per query (cached pages cost no API calls)")
+    parser.add_argument("--api-base", default=None,
+                        help="GitHub API base URL (e.g. a local fake server); defaults to $GITHUB_API_URL")
+    parser.add_argument("--journal", default="github_wide_checkpoint.jsonl",
+                        help="Checkpoint journal recording completed fetches and comparisons")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume an interrupted run from the checkpoint journal")
+    parser.add_argument("--stream", default=None,
+                        help="Stream result records to this NDJSON file instead of holding them in memory")
+    parser.add_argument("--html", default=None, metavar="DIR",
+                        help="Also write an HTML evidence report with side-by-side diffs to this directory")
+    parser.add_argument("--profile", default=None, metavar="FILE",
+                        help="Capture cProfile hot spots and tracemalloc allocations of the run to FILE")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Only show warnings, errors and a periodic progress line")
+    parser.add_argument("--events", default=None, metavar="FILE",
+                        help="Append structured run events to this NDJSON file")
+    parser.add_argument("--history", action="store_true",
+                        help="Also flag rewritten or forged commit history of the target")
+    parser.add_argument("--no-subtree-match", action="store_true",
+                        help="Skip the tree-SHA pre-pass that reports wholesale-copied directories")
+    args = parser.parse_args()
+    
     print("🚀 GitHub-Wide Plagiarism Detection Tool")
     print("=" * 80)
     print("This tool will search across all of GitHub to find potential plagiarism")
@@ -651,7 +1322,7 @@ def main():
     print()
     
     # Target repository to check for plagiarism
-    target_repo = "https://github.com/ka-reem/agenthacks-25/commits/stolen_rewritten"
+    target_repo = args.target_repo
     
     # Initialize detector
     github_token = os.getenv('GITHUB_TOKEN')
@@ -660,27 +1331,49 @@ def main():
         print("   Set GITHUB_TOKEN environment variable for better results.")
         print()
     
-    detector = GitHubWidePlagiarismDetector(github_token=github_token)
+    detector = GitHubWidePlagiarismDetector(github_token=github_token, df_table_path="corpus_df.json",
+                                            search_cache_path="search_cache.sqlite", api_base=args.api_base)
+    detector.search_pages = args.search_pages
+    detector.history_forensics = args.history
+    detector.subtree_matching = not args.no_subtree_match
+    detector.events = EventStream(quiet=args.quiet)
+    event_sink = detector.events.add_sink(NDJSONEventSink(args.events)) if args.events else None
+    detector.journal = CheckpointJournal(args.journal, resume=args.resume)
+    if args.stream:
+        detector.results_sink = ResultsStreamWriter(args.stream)
     
     try:
         # Run GitHub-wide plagiarism detection
         print(f"🎯 Analyzing repository: {target_repo}")
-        results = detector.detect_plagiarism_github_wide(target_repo)
+        with RunProfiler() if args.profile else nullcontext() as profiler:
+            results = detector.detect_plagiarism_github_wide(target_repo, decide_fast=args.decide_fast)
+        if profiler:
+            profiler.dump(args.profile)
         
         if "error" in results:
             print(f"❌ {results['error']}")
             return
         
-        # Generate and save report
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        report_file = f"github_wide_plagiarism_report_{timestamp}.txt"
-        detector.generate_github_wide_report(results, report_file)
+        if detector.results_sink:
+            # Records are already on disk; reports are rebuilt from the stream on demand
+            print(f"📄 Result records streamed to: {args.stream}")
+            print(f"💡 Build reports with: python3 results_stream.py {args.stream} --report report.txt --json results.json")
+        else:
+            # Generate and save report
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            report_file = f"github_wide_plagiarism_report_{timestamp}.txt"
+            detector.generate_github_wide_report(results, report_file)
+            results["metrics"] = detector.metrics.snapshot()  # now including the report stage
+            
+            # Save results as JSON for further analysis
+            json_file = f"github_wide_results_{timestamp}.json"
+            with open(json_file, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"📄 JSON results saved to: {json_file}")
         
-        # Save results as JSON for further analysis
-        json_file = f"github_wide_results_{timestamp}.json"
-        with open(json_file, 'w') as f:
-            json.dump(results, f, indent=2)
-        print(f"📄 JSON results saved to: {json_file}")
+        if args.html:
+            report_results = rebuild_results(args.stream) if detector.results_sink else results
+            detector.generate_github_wide_html_report(report_results, args.html)
         
         # Print final summary
         print(f"\n🎯 GITHUB-WIDE PLAGIARISM DETECTION COMPLETE")
@@ -696,8 +1389,15 @@ def main():
         
     except Exception as e:
         print(f"❌ Error during GitHub-wide plagiarism detection: {e}")
+        print(f"💡 Completed work is in {args.journal}; rerun with --resume to continue")
         import traceback
         traceback.print_exc()
+    finally:
+        detector.journal.close()
+        if detector.results_sink:
+            detector.results_sink.close()
+        if event_sink:
+            event_sink.close()
 
 if __name__ == "__main__":
     main()
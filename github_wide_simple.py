@@ -12,9 +12,21 @@ import difflib
 import re
 import time
 from typing import Dict, List, Tuple, Set
-from urllib.parse import urlparse, quote
+from urllib.parse import quote
 from dataclasses import dataclass, field
 from collections import defaultdict
+from search_cache import SearchCache, cached_search
+from instrumentation import Metrics, timed
+from repo_spec import parse_repo_spec, format_repo_spec, split_repo_spec, repo_spec_url
+
+# Point at a local fake server (or GitHub Enterprise) with GITHUB_API_URL
+GITHUB_API_URL = (os.getenv('GITHUB_API_URL') or "https://api.github.com").rstrip('/')
+
+# Stage timers and counters of the current run, reported as results["metrics"]
+METRICS = Metrics()
+
+# Single-pass scanner for class/function names
+DECLARATION_PATTERN = re.compile(r'\b(?:class|function|def)\s+(\w+)', re.IGNORECASE)
 
 @dataclass
 class FileInfo:
@@ -38,52 +50,48 @@ class RepoInfo:
     description: str = ""
 
 def get_repo_info(repo_url: str) -> str:
-    """Extract repository information from GitHub URL"""
-    if repo_url.startswith('http'):
-        parsed = urlparse(repo_url)
-        path_parts = parsed.path.strip('/').split('/')
-    else:
-        path_parts = repo_url.split('/')
-    
-    if len(path_parts) >= 2:
-        owner = path_parts[0]
-        repo = path_parts[1]
-        return f"{owner}/{repo}"
-    
-    raise ValueError(f"Invalid GitHub repository: {repo_url}")
+    """Repository spec ("owner/repo" or "owner/repo@ref") of a GitHub URL"""
+    return format_repo_spec(*parse_repo_spec(repo_url))
 
-def search_github_repositories(keywords: List[str], github_token: str = None) -> List[Dict]:
-    """Search GitHub for repositories using keywords"""
+@timed("search", METRICS)
+def search_github_repositories(keywords: List[str], github_token: str = None,
+                               cache: SearchCache = None, pages: int = 1) -> List[Dict]:
+    """Search GitHub for repositories using keywords (responses cached by normalized query)"""
     headers = {}
     if github_token:
         headers['Authorization'] = f'token {github_token}'
+    cache = cache or SearchCache()
     
     print(f"🔍 Searching GitHub with keywords: {', '.join(keywords[:3])}...")
     
+    def fetch_page(params: Dict):
+        search_url = f"{GITHUB_API_URL}/search/repositories"
+        response = requests.get(search_url, headers=headers, params=params)
+        time.sleep(2)  # Rate limiting, only paid on cache misses
+        
+        if response.status_code == 403:
+            print(f"⚠️  Rate limit hit. Waiting...")
+            time.sleep(60)
+            return None
+        
+        if response.status_code == 200:
+            return response.json()
+        return None
+    
     all_repos = []
     search_queries = keywords[:3] + ["hackathon", "dispatch", "emergency"]
     
     for query in search_queries[:5]:  # Limit to avoid rate limits
         try:
-            search_url = f"https://api.github.com/search/repositories"
             params = {
                 'q': query,
                 'sort': 'stars',
                 'order': 'desc',
                 'per_page': 10
             }
+            repos = cached_search(cache, fetch_page, "repositories", params, pages)
             
-            response = requests.get(search_url, headers=headers, params=params)
-            
-            if response.status_code == 403:
-                print(f"⚠️  Rate limit hit. Waiting...")
-                time.sleep(60)
-                continue
-            
-            if response.status_code == 200:
-                search_results = response.json()
-                repos = search_results.get('items', [])
-                
+            if repos is not None:
                 for repo in repos:
                     repo_info = {
                         'name': repo['full_name'],
@@ -97,8 +105,6 @@ def search_github_repositories(keywords: List[str], github_token: str = None) ->
                     
                 print(f"📋 Found {len(repos)} repositories for query: '{query}'")
             
-            time.sleep(2)  # Rate limiting
-            
         except Exception as e:
             print(f"❌ Error searching for '{query}': {e}")
     
@@ -123,8 +129,9 @@ def fetch_file_content(download_url: str, headers: dict) -> str:
         pass
     return None
 
+@timed("fetch", METRICS)
 def fetch_repo_contents(repo_name: str, github_token: str = None) -> RepoInfo:
-    """Fetch repository contents from GitHub API"""
+    """Fetch repository contents from GitHub API (repo_name may be "owner/repo@ref")"""
     headers = {}
     if github_token:
         headers['Authorization'] = f'token {github_token}'
@@ -132,8 +139,9 @@ def fetch_repo_contents(repo_name: str, github_token: str = None) -> RepoInfo:
     try:
         print(f"📥 Fetching repository: {repo_name}")
         
-        api_url = f"https://api.github.com/repos/{repo_name}/contents"
-        response = requests.get(api_url, headers=headers)
+        name, ref = split_repo_spec(repo_name)
+        api_url = f"{GITHUB_API_URL}/repos/{name}/contents"
+        response = requests.get(api_url, headers=headers, params={'ref': ref} if ref else None)
         
         if response.status_code != 200:
             return None
@@ -162,7 +170,7 @@ def fetch_repo_contents(repo_name: str, github_token: str = None) -> RepoInfo:
         total_lines = sum(f.lines for f in files)
         
         return RepoInfo(
-            url=f"https://github.com/{repo_name}",
+            url=repo_spec_url(repo_name),
             name=repo_name,
             files=files,
             total_files=len(files),
@@ -173,6 +181,7 @@ def fetch_repo_contents(repo_name: str, github_token: str = None) -> RepoInfo:
         print(f"❌ Error fetching repository {repo_name}: {e}")
         return None
 
+@timed("normalize", METRICS)
 def normalize_code(content: str) -> str:
     """Normalize code content for comparison"""
     # Remove comments
@@ -188,32 +197,31 @@ def calculate_similarity(content1: str, content2: str) -> float:
     """Calculate similarity between two pieces of content"""
     normalized1 = normalize_code(content1)
     normalized2 = normalize_code(content2)
-    return difflib.SequenceMatcher(None, normalized1, normalized2).ratio()
+    with METRICS.timer("similarity"):
+        return difflib.SequenceMatcher(None, normalized1, normalized2).ratio()
 
 def extract_keywords(repo_info: RepoInfo) -> List[str]:
-    """Extract keywords from repository content"""
-    keywords = set()
+    """Extract keywords from repository content, most frequent first (stable across runs)"""
+    keyword_counts = defaultdict(int)
     
     for file_info in repo_info.files:
         # Add file names
         filename = os.path.splitext(os.path.basename(file_info.path))[0]
         if len(filename) > 3:
-            keywords.add(filename.lower())
+            keyword_counts[filename.lower()] += 1
         
         # Extract function/class names
-        content = file_info.content.lower()
-        patterns = [r'class\s+(\w+)', r'function\s+(\w+)', r'def\s+(\w+)']
-        for pattern in patterns:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                if len(match) > 4:
-                    keywords.add(match)
+        for match in DECLARATION_PATTERN.findall(file_info.content):
+            if len(match) > 4:
+                keyword_counts[match.lower()] += 1
     
-    return list(keywords)[:5]
+    ranked = sorted(keyword_counts.items(), key=lambda item: (-item[1], item[0]))
+    return [keyword for keyword, _ in ranked[:5]]
 
 def detect_plagiarism_github_wide(target_repo: str) -> Dict:
     """Detect plagiarism by searching across GitHub"""
     print(f"🔍 Starting GitHub-wide plagiarism detection for: {target_repo}")
+    METRICS.reset()
     
     github_token = os.getenv('GITHUB_TOKEN')
     if not github_token:
@@ -231,8 +239,9 @@ def detect_plagiarism_github_wide(target_repo: str) -> Dict:
     keywords = extract_keywords(target_info)
     print(f"🔑 Keywords: {', '.join(keywords)}")
     
-    # Search GitHub
-    candidate_repos = search_github_repositories(keywords, github_token)
+    # Search GitHub (cached across runs)
+    search_cache = SearchCache(os.getenv('PLAGIARISM_SEARCH_CACHE', 'search_cache.sqlite'))
+    candidate_repos = search_github_repositories(keywords, github_token, cache=search_cache)
     
     results = {
         "target_repo": target_repo,
@@ -252,7 +261,7 @@ def detect_plagiarism_github_wide(target_repo: str) -> Dict:
     for i, candidate in enumerate(candidate_repos):
         print(f"🔄 [{i+1}/{len(candidate_repos)}] {candidate['name']} (⭐{candidate['stars']})")
         
-        if candidate['name'].lower() == target_repo_name.lower():
+        if candidate['name'].lower() == split_repo_spec(target_repo_name)[0].lower():
             continue
         
         comp_info = fetch_repo_contents(candidate['name'], github_token)
@@ -299,6 +308,7 @@ def detect_plagiarism_github_wide(target_repo: str) -> Dict:
         "total_suspicious": len(results["suspicious_matches"]),
         "total_identical": len(results["identical_files"])
     }
+    results["metrics"] = METRICS.snapshot()
     
     return results
 
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Commit History Forensics
+Flags commit histories that look rewritten or forged: perfectly uniform
+commit spacing, single-author histories compressed into a few hours,
+author/committer date mismatches, collapsed committer timestamps and
+filter-branch / filter-repo leftovers. History comes from a streamed
+`git log` of a local clone or from paginated commit metadata of the API.
+"""
+
+import os
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Unit and record separators keep arbitrary names and emails parseable
+GIT_LOG_FORMAT = "%H%x1f%an%x1f%ae%x1f%at%x1f%cn%x1f%ce%x1f%ct%x1f%P%x1e"
+
+# Weight of each signal in the history risk score
+SIGNAL_WEIGHTS = {
+    "uniform_spacing": 2,
+    "compressed_history": 1,
+    "date_mismatch": 1,
+    "collapsed_committer_dates": 1,
+    "rewrite_artifacts": 3,
+}
+
+@dataclass
+class CommitRecord:
+    """Identity and timestamps of one commit"""
+    sha: str
+    author_name: str
+    author_email: str
+    author_time: int
+    committer_name: str
+    committer_email: str
+    committer_time: int
+    parents: int = 1
+
+def iter_git_log(repo_path: str, ref: str = "HEAD") -> Iterator[CommitRecord]:
+    """
+    Stream the commits of a local clone from `git log` without buffering the whole output
+
+    Args:
+        repo_path: Working tree or bare repository
+        ref: Revision whose history is read
+    """
+    process = subprocess.Popen(["git", "-C", repo_path, "log", f"--format={GIT_LOG_FORMAT}", ref],
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                               encoding="utf-8", errors="replace")
+    buffer = ""
+    try:
+        for chunk in iter(lambda: process.stdout.read(65536), ""):
+            buffer += chunk
+            *records, buffer = buffer.split("\x1e")
+            for record in records:
+                fields = record.strip("\n").split("\x1f")
+                if len(fields) == 8:
+                    sha, an, ae, at, cn, ce, ct, parents = fields
+                    yield CommitRecord(sha, an, ae, int(at), cn, ce, int(ct), len(parents.split()))
+    finally:
+        process.stdout.close()
+        process.wait()
+
+def rewrite_artifacts(repo_path: str) -> List[str]:
+    """Leftovers of history rewriting tools in a local clone (refs/original, filter-repo state)"""
+    artifacts = []
+    result = subprocess.run(["git", "-C", repo_path, "for-each-ref", "--format=%(refname)", "refs/original/"],
+                            capture_output=True, text=True)
+    artifacts += [f"filter-branch backup ref {ref}" for ref in result.stdout.split()]
+    git_dir = subprocess.run(["git", "-C", repo_path, "rev-parse", "--git-dir"], capture_output=True, text=True).stdout.strip()
+    if git_dir and os.path.isdir(os.path.join(repo_path, git_dir, "filter-repo")):
+        artifacts.append("git filter-repo state directory .git/filter-repo")
+    return artifacts
+
+def _api_time(value: str) -> int:
+    return int(datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp())
+
+def fetch_api_commits(api_get: Callable, api_base: str, repo_name: str, ref: str = None,
+                      max_commits: int = 1000) -> List[CommitRecord]:
+    """
+    Commit metadata of a repository from the paginated commits API
+
+    Args:
+        api_get: Callable(url, params) -> response (e.g. a detector's _api_get)
+        api_base: GitHub API base URL
+        repo_name: "owner/repo"
+        ref: Branch, tag or commit (default branch when None)
+        max_commits: Stop after this many commits (100 per request)
+    """
+    commits = []
+    params = {'per_page': 100}
+    if ref:
+        params['sha'] = ref
+    page = 1
+    while len(commits) < max_commits:
+        response = api_get(f"{api_base}/repos/{repo_name}/commits", dict(params, page=page))
+        if response.status_code != 200:
+            break
+        items = response.json()
+        for item in items:
+            author, committer = item['commit']['author'], item['commit']['committer']
+            commits.append(CommitRecord(
+                item['sha'], author['name'], author['email'], _api_time(author['date']),
+                committer['name'], committer['email'], _api_time(committer['date']),
+                len(item.get('parents', []))
+            ))
+        if len(items) < params['per_page']:
+            break
+        page += 1
+    return commits[:max_commits]
+
+def _duration(seconds: float) -> str:
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f}min"
+    return f"{seconds / 3600:.1f}h"
+
+def _iso(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def analyze_history(commits: List[CommitRecord], artifacts: List[str] = (),
+                    event_window: Tuple[int, int] = None, min_commits: int = 5) -> Dict:
+    """
+    Score a commit history for signs of rewriting or forgery
+
+    Args:
+        commits: Commits in any order
+        artifacts: Rewrite-tool leftovers found in the clone
+        event_window: Optional (start, end) unix times of the event
+        min_commits: Histories shorter than this are only checked for artifacts
+
+    Returns:
+        Dictionary with history stats, flags and a history_risk tier
+    """
+    flags = []
+    n = len(commits)
+    author_times = sorted(c.author_time for c in commits)
+    authors = {c.author_email.lower() for c in commits}
+
+    if n >= min_commits:
+        gaps = [b - a for a, b in zip(author_times, author_times[1:])]
+        common_gap, count = Counter(gaps).most_common(1)[0]
+        mean_gap = statistics.mean(gaps)
+        if common_gap > 0 and count >= 0.8 * len(gaps):
+            flags.append({"signal": "uniform_spacing",
+                          "detail": f"{count}/{len(gaps)} commit gaps are exactly {_duration(common_gap)}"})
+        elif mean_gap > 0 and statistics.pstdev(gaps) / mean_gap < 0.05:
+            flags.append({"signal": "uniform_spacing",
+                          "detail": f"commit gaps vary by under 5% around {_duration(round(mean_gap))}"})
+
+        span = author_times[-1] - author_times[0]
+        if len(authors) == 1 and n >= 10 and mean_gap < 600:
+            flags.append({"signal": "compressed_history",
+                          "detail": f"{n} commits by a single author within {_duration(span)}"})
+
+        mismatched = [c for c in commits if abs(c.committer_time - c.author_time) > 3600]
+        backdated = [c for c in commits if c.committer_time < c.author_time - 60]
+        if backdated or len(mismatched) >= max(3, 0.5 * n):
+            flags.append({"signal": "date_mismatch",
+                          "detail": f"{len(mismatched)} commits committed over an hour from their author date, "
+                                    f"{len(backdated)} committed before they were authored"})
+
+        committed_at, same = Counter(c.committer_time for c in commits).most_common(1)[0]
+        if same >= max(3, 0.5 * n):
+            flags.append({"signal": "collapsed_committer_dates",
+                          "detail": f"{same} commits share the committer date {_iso(committed_at)}"})
+
+    if artifacts:
+        flags.append({"signal": "rewrite_artifacts", "detail": "; ".join(artifacts)})
+
+    score = sum(SIGNAL_WEIGHTS[flag["signal"]] for flag in flags)
+    if score >= 5:
+        risk = "CRITICAL"
+    elif score >= 3:
+        risk = "HIGH"
+    elif score >= 1:
+        risk = "MEDIUM"
+    else:
+        risk = "LOW"
+
+    analysis = {
+        "commits": n,
+        "authors": len(authors),
+        "committers": len({c.committer_email.lower() for c in commits}),
+        "first_commit": _iso(author_times[0]) if commits else None,
+        "last_commit": _iso(author_times[-1]) if commits else None,
+        "flags": flags,
+        "history_risk": risk
+    }
+    if event_window and commits:
+        start, end = event_window
+        analysis["commits_before_event"] = sum(1 for t in author_times if t < start)
+        analysis["commits_after_event"] = sum(1 for t in author_times if t > end)
+    return analysis
+
+def analyze_local_repo(repo_path: str, ref: str = "HEAD", event_window: Tuple[int, int] = None) -> Optional[Dict]:
+    """History analysis of a local clone, or None if it is not a git repository"""
+    if subprocess.run(["git", "-C", repo_path, "rev-parse", "--git-dir"], capture_output=True).returncode != 0:
+        return None
+    return analyze_history(list(iter_git_log(repo_path, ref)), rewrite_artifacts(repo_path), event_window)
+
+def analyze_local_repos(repo_paths: List[str], ref: str = "HEAD", event_window: Tuple[int, int] = None,
+                        workers: int = 16) -> Dict[str, Dict]:
+    """Analyze many clones concurrently (git does the work, so threads suffice)"""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        analyses = pool.map(lambda path: analyze_local_repo(path, ref, event_window), repo_paths)
+        return {path: analysis for path, analysis in zip(repo_paths, analyses) if analysis is not None}
+
+def format_history_section(history: Dict[str, Dict]) -> List[str]:
+    """Report lines for a history-risk section (riskiest repository first)"""
+    order = {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 3}
+    lines = []
+    for repo, analysis in sorted(history.items(), key=lambda item: (order[item[1]["history_risk"]], item[0])):
+        lines.append(f"Repository: {repo}")
+        lines.append(f"  History Risk: {analysis['history_risk']} ({analysis['commits']} commits, "
+                     f"{analysis['authors']} authors, {analysis['first_commit']} → {analysis['last_commit']})")
+        for flag in analysis["flags"]:
+            lines.append(f"  ⚠️  {flag['signal']}: {flag['detail']}")
+        lines.append("")
+    return lines
+
+def main():
+    """Analyze the history of every clone under a directory (or the given clones)"""
+    parser = argparse.ArgumentParser(description="Flag rewritten or forged commit histories")
+    parser.add_argument("paths", nargs="*", default=["./stolen-repos"],
+                        help="Clones, or directories whose subdirectories are clones")
+    parser.add_argument("--ref", default="HEAD", help="Revision whose history is analyzed")
+    parser.add_argument("--event-start", help="Event start (YYYY-MM-DD or ISO time, UTC)")
+    parser.add_argument("--event-end", help="Event end (YYYY-MM-DD or ISO time, UTC)")
+    parser.add_argument("--output", default="history_forensics.json", help="JSON output file")
+    args = parser.parse_args()
+
+    repo_paths = []
+    for path in args.paths:
+        if os.path.exists(os.path.join(path, ".git")):
+            repo_paths.append(path)
+        elif os.path.isdir(path):
+            repo_paths += [os.path.join(path, name) for name in sorted(os.listdir(path))
+                           if os.path.isdir(os.path.join(path, name))]
+
+    event_window = None
+    if args.event_start and args.event_end:
+        event_window = tuple(int(datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp())
+                             for value in (args.event_start, args.event_end))
+
+    started = time.time()
+    history = analyze_local_repos(repo_paths, args.ref, event_window)
+    print("🕰️  Commit History Forensics")
+    print("=" * 80)
+    print("\n".join(format_history_section(history)))
+    with open(args.output, 'w') as f:
+        json.dump(history, f, indent=2)
+    flagged = sum(1 for analysis in history.values() if analysis["history_risk"] != "LOW")
+    print(f"📊 {len(history)} repositories analyzed in {time.time() - started:.2f}s, {flagged} flagged")
+    print(f"📄 Results saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+HTML Evidence Report
+Compact index page of every identical and suspicious file pair, with the
+side-by-side highlighted diffs written as separate script chunks that the
+page loads only when a pair is opened (works from file:// without a server)
+"""
+
+import os
+import json
+import html
+import difflib
+from typing import Callable, Dict, List, Optional
+
+ContentLookup = Callable[[str, str], Optional[str]]
+
+INDEX_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Plagiarism evidence: {title}</title>
+<style>
+body {{ font-family: -apple-system, Segoe UI, sans-serif; margin: 0; display: flex; height: 100vh; }}
+#pairs {{ width: 38%; overflow-y: auto; border-right: 1px solid #ccc; }}
+#detail {{ flex: 1; overflow: auto; padding: 0 12px; }}
+header {{ padding: 8px 12px; background: #f6f8fa; border-bottom: 1px solid #ccc; }}
+table.pairs {{ border-collapse: collapse; width: 100%; font-size: 13px; }}
+table.pairs td {{ padding: 4px 8px; border-bottom: 1px solid #eee; cursor: pointer; }}
+table.pairs tr:hover, table.pairs tr.active {{ background: #eef4ff; }}
+.identical {{ color: #b00020; font-weight: bold; }}
+.suspicious {{ color: #b36b00; font-weight: bold; }}
+table.diff {{ border-collapse: collapse; font: 12px monospace; width: 100%; table-layout: fixed; }}
+table.diff td {{ white-space: pre-wrap; word-break: break-all; vertical-align: top; padding: 0 4px; }}
+table.diff td.no {{ width: 3em; color: #999; text-align: right; }}
+tr.equal td.code {{ background: #ffecb3; }}
+tr.replace td.code {{ background: #f5f5f5; }}
+</style>
+</head>
+<body>
+<div id="pairs">
+<header>
+<strong>{title}</strong><br>
+Risk: <strong>{risk}</strong> &middot; {identical} identical &middot; {suspicious} suspicious
+</header>
+<table class="pairs">
+{rows}
+</table>
+</div>
+<div id="detail"><p>Select a file pair to load its side-by-side comparison. Highlighted lines match.</p></div>
+<script>
+var chunks = {{}};
+var pending = {{}};
+window.loadChunk = function (id, data) {{ chunks[id] = data; (pending[id] || []).forEach(function (f) {{ f(); }}); }};
+function withChunk(id, callback) {{
+  if (chunks[id]) return callback();
+  if (!pending[id]) {{
+    pending[id] = [];
+    var script = document.createElement('script');
+    script.src = 'chunks/chunk_' + id + '.js';
+    document.body.appendChild(script);
+  }}
+  pending[id].push(callback);
+}}
+function cell(tr, text, cls) {{ var td = document.createElement('td'); td.className = cls; td.textContent = text; tr.appendChild(td); }}
+function show(row) {{
+  document.querySelectorAll('tr.active').forEach(function (r) {{ r.classList.remove('active'); }});
+  row.classList.add('active');
+  var chunk = row.dataset.chunk, pair = row.dataset.pair;
+  withChunk(chunk, function () {{
+    var data = chunks[chunk][pair], detail = document.getElementById('detail');
+    detail.innerHTML = '';
+    var heading = document.createElement('h3');
+    heading.textContent = data.left + '  ↔  ' + data.right + (data.note ? '  (' + data.note + ')' : '');
+    detail.appendChild(heading);
+    var table = document.createElement('table'); table.className = 'diff';
+    data.rows.forEach(function (r) {{
+      var tr = document.createElement('tr'); tr.className = r[0];
+      cell(tr, r[1] || '', 'no'); cell(tr, r[2] || '', 'code'); cell(tr, r[3] || '', 'no'); cell(tr, r[4] || '', 'code');
+      table.appendChild(tr);
+    }});
+    detail.appendChild(table);
+  }});
+}}
+document.querySelectorAll('table.pairs tr[data-pair]').forEach(function (row) {{
+  row.addEventListener('click', function () {{ show(row); }});
+}});
+</script>
+</body>
+</html>
+"""
+
+def side_by_side_rows(left: str, right: str, max_lines: int = 2000) -> List[list]:
+    """
+    Aligned diff rows [tag, left_no, left_text, right_no, right_text]
+
+    Tag "equal" marks matching regions (highlighted); other tags are the
+    difflib opcodes for the differing stretches.
+    """
+    left_lines = left.splitlines()[:max_lines]
+    right_lines = right.splitlines()[:max_lines]
+    matcher = difflib.SequenceMatcher(None, left_lines, right_lines, autojunk=False)
+    rows = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        for offset in range(max(i2 - i1, j2 - j1)):
+            i, j = i1 + offset, j1 + offset
+            rows.append([
+                tag,
+                i + 1 if i < i2 else None, left_lines[i] if i < i2 else None,
+                j + 1 if j < j2 else None, right_lines[j] if j < j2 else None,
+            ])
+    return rows
+
+def collect_pairs(results: Dict, target_name: str) -> List[Dict]:
+    """Every identical and suspicious file pair of a run, identical first"""
+    pairs = []
+    for match in results.get('identical_files', []):
+        pairs.append({'kind': 'identical', 'repo': match['repo'], 'target_repo': target_name,
+                      'target_file': match['target_file'], 'comparison_file': match['comparison_file'],
+                      'similarity': 1.0})
+    for entry in results.get('suspicious_matches', []):
+        match = entry['match']
+        pairs.append({'kind': 'suspicious', 'repo': entry['repo'], 'target_repo': target_name,
+                      'target_file': match['target_file'], 'comparison_file': match['comparison_file'],
+                      'similarity': match['similarity']})
+    return pairs
+
+def write_html_report(results: Dict, output_dir: str, content_lookup: ContentLookup, target_name: str,
+                      chunk_size: int = 25) -> str:
+    """
+    Write index.html plus lazily loaded diff chunks
+
+    Args:
+        results: Results dict from a detector
+        output_dir: Directory to write the report into
+        content_lookup: Callable(repo, path) -> file content or None
+        target_name: Target repository name used for content lookups
+        chunk_size: File pairs per chunk file
+
+    Returns:
+        Path of index.html
+    """
+    chunk_dir = os.path.join(output_dir, 'chunks')
+    os.makedirs(chunk_dir, exist_ok=True)
+    pairs = collect_pairs(results, target_name)
+
+    rows = []
+    for start in range(0, len(pairs), chunk_size):
+        chunk_id = start // chunk_size
+        chunk = {}
+        for pair_id, pair in enumerate(pairs[start:start + chunk_size], start):
+            left = content_lookup(target_name, pair['target_file'])
+            right = content_lookup(pair['repo'], pair['comparison_file'])
+            entry = {'left': f"{target_name}/{pair['target_file']}", 'right': f"{pair['repo']}/{pair['comparison_file']}"}
+            if left is None or right is None:
+                entry.update(rows=[], note='file content unavailable')
+            else:
+                entry['rows'] = side_by_side_rows(left, right)
+            chunk[pair_id] = entry
+            rows.append(
+                f'<tr data-chunk="{chunk_id}" data-pair="{pair_id}">'
+                f'<td class="{pair["kind"]}">{pair["similarity"]:.0%}</td>'
+                f'<td>{html.escape(pair["repo"])}</td>'
+                f'<td>{html.escape(pair["target_file"])} &rarr; {html.escape(pair["comparison_file"])}</td></tr>'
+            )
+        # Escape "</" so file contents can never close a script element
+        payload = json.dumps(chunk).replace('</', '<\\/')
+        with open(os.path.join(chunk_dir, f'chunk_{chunk_id}.js'), 'w', encoding='utf-8') as f:
+            f.write(f"loadChunk({chunk_id}, {payload});\n")
+
+    summary = results.get('summary', {})
+    index_path = os.path.join(output_dir, 'index.html')
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write(INDEX_TEMPLATE.format(
+            title=html.escape(str(results.get('target_repo', target_name))),
+            risk=html.escape(str(summary.get('plagiarism_risk', 'UNKNOWN'))),
+            identical=len(results.get('identical_files', [])),
+            suspicious=len(results.get('suspicious_matches', [])),
+            rows='\n'.join(rows) or '<tr><td>No identical or suspicious files found.</td></tr>'
+        ))
+    return index_path
+
+def repo_content_lookup(repo_infos) -> ContentLookup:
+    """Content lookup over already fetched RepoInfo objects"""
+    contents = {(info.name.lower(), f.path): f.content for info in repo_infos if info for f in info.files}
+    return lambda repo, path: contents.get((repo.lower(), path))
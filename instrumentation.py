@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Run Instrumentation
+Lightweight timers, counters and histograms for the detection stages
+(search, fetch, normalize, score, report), reported in the "metrics"
+section of the results, plus an opt-in cProfile/tracemalloc capture
+"""
+
+import io
+import time
+import functools
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds (the last bucket is +Inf)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: 'Histogram'):
+        """Add another histogram with the same buckets into this one"""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def snapshot(self) -> Dict:
+        """Cumulative bucket counts keyed by upper bound (Prometheus "le" style)"""
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip([str(b) for b in self.buckets] + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {"count": self.count, "sum": round(self.total, 6), "max": round(self.max, 6), "buckets": buckets}
+
+class Metrics:
+    def __init__(self):
+        """
+        Thread-safe registry of stage timers, counters and value histograms, plus
+        labelled gauges describing current state (in-flight work, rate-limit
+        remaining) that survive reset(). Each detector keeps one as
+        self.metrics, resets it per run and reports it as results["metrics"]
+        """
+        self._lock = threading.Lock()
+        self.timers: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.gauges: Dict[str, Dict[LabelKey, float]] = {}
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Time a block as one observation of a stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_time(stage, time.perf_counter() - started)
+
+    def observe_time(self, stage: str, seconds: float):
+        with self._lock:
+            self.timers.setdefault(stage, Histogram()).observe(seconds)
+
+    def incr(self, name: str, amount: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: float, buckets=DEFAULT_BUCKETS):
+        """Record a value (e.g. file size, candidate count) in a named histogram"""
+        with self._lock:
+            self.histograms.setdefault(name, Histogram(buckets)).observe(value)
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self.gauges.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+    def add_gauge(self, name: str, amount: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.gauges.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    @contextmanager
+    def track(self, name: str, **labels):
+        """Count a block as in flight in a gauge while it runs"""
+        self.add_gauge(name, 1, **labels)
+        try:
+            yield
+        finally:
+            self.add_gauge(name, -1, **labels)
+
+    def reset(self):
+        """Clear per-run timers, counters and histograms (gauges are kept)"""
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+            self.histograms.clear()
+
+    def merge(self, other: 'Metrics'):
+        """Accumulate another registry's timers, counters and histograms (e.g. a finished run)"""
+        with other._lock:
+            timers = {name: (h.buckets, h) for name, h in other.timers.items()}
+            histograms = {name: (h.buckets, h) for name, h in other.histograms.items()}
+            counters = dict(other.counters)
+        with self._lock:
+            for target, source in ((self.timers, timers), (self.histograms, histograms)):
+                for name, (buckets, histogram) in source.items():
+                    target.setdefault(name, Histogram(buckets)).merge(histogram)
+            for name, value in counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self) -> Dict:
+        """JSON-ready view for the results "metrics" section"""
+        with self._lock:
+            return {
+                "timers": {stage: dict(h.snapshot(), mean=round(h.total / h.count, 6) if h.count else 0.0)
+                           for stage, h in sorted(self.timers.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {name: h.snapshot() for name, h in sorted(self.histograms.items())},
+                "gauges": {name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                           for name, series in sorted(self.gauges.items())}
+            }
+
+def timed(stage: str, metrics: Metrics = None):
+    """
+    Decorator timing every call of a function as one observation of a stage
+
+    Args:
+        stage: Timer name
+        metrics: Registry to record into; defaults to the instance's self.metrics
+            (so detector methods can be decorated at class level)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            registry = metrics if metrics is not None else args[0].metrics
+            with registry.timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def format_metrics(metrics: Dict) -> List[str]:
+    """Report lines summarizing a metrics snapshot, slowest stage first"""
+    lines = []
+    timers = metrics.get("timers", {})
+    for stage, timer in sorted(timers.items(), key=lambda item: -item[1]["sum"]):
+        lines.append(f"  {stage:<14} {timer['sum']:>9.3f}s total  {timer['count']:>6} calls  "
+                     f"{timer['mean'] * 1000:>8.1f}ms mean  {timer['max'] * 1000:>8.1f}ms max")
+    for name, value in metrics.get("counters", {}).items():
+        lines.append(f"  {name:<14} {value:>9g}")
+    return lines
+
+def _prometheus_labels(labels: Dict) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+def format_prometheus(metrics: Dict, namespace: str = "plagiarism") -> str:
+    """
+    Render a metrics snapshot in the Prometheus text exposition format
+
+    Stage timers become one <namespace>_stage_seconds histogram labelled by
+    stage, counters become <namespace>_<name>_total and gauges keep their labels.
+    """
+    lines = []
+    timers = metrics.get("timers", {})
+    if timers:
+        name = f"{namespace}_stage_seconds"
+        lines += [f"# HELP {name} Latency of detection stages", f"# TYPE {name} histogram"]
+        for stage, timer in timers.items():
+            for bound, count in timer["buckets"].items():
+                lines.append(f"{name}_bucket{_prometheus_labels({'stage': stage, 'le': bound})} {count}")
+            lines.append(f"{name}_sum{_prometheus_labels({'stage': stage})} {timer['sum']}")
+            lines.append(f"{name}_count{_prometheus_labels({'stage': stage})} {timer['count']}")
+    for counter, value in metrics.get("counters", {}).items():
+        name = f"{namespace}_{counter}_total"
+        lines += [f"# TYPE {name} counter", f"{name} {value:g}"]
+    for histogram_name, histogram in metrics.get("histograms", {}).items():
+        name = f"{namespace}_{histogram_name}"
+        lines.append(f"# TYPE {name} histogram")
+        for bound, count in histogram["buckets"].items():
+            lines.append(f"{name}_bucket{_prometheus_labels({'le': bound})} {count}")
+        lines += [f"{name}_sum {histogram['sum']}", f"{name}_count {histogram['count']}"]
+    for gauge, series in metrics.get("gauges", {}).items():
+        name = f"{namespace}_{gauge}"
+        lines.append(f"# TYPE {name} gauge")
+        lines += [f"{name}{_prometheus_labels(point['labels'])} {point['value']:g}" for point in series]
+    return "\n".join(lines) + "\n"
+
+class RunProfiler:
+    def __init__(self, top: int = 25):
+        """
+        Opt-in cProfile + tracemalloc capture around a run
+
+        Args:
+            top: Number of functions and allocation sites kept in the dump
+        """
+        self.top = top
+        self.profile: Optional[cProfile.Profile] = None
+        self.memory_peak = 0
+        self.allocations: List[str] = []
+
+    def __enter__(self):
+        tracemalloc.start()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        self.memory_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.allocations = [str(stat) for stat in snapshot.statistics('lineno')[:self.top]]
+        return False
+
+    def hot_spots(self) -> str:
+        """Top functions by cumulative time, as pstats text"""
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats('cumulative').print_stats(self.top)
+        return out.getvalue()
+
+    def dump(self, path: str):
+        """Write hot spots (text) plus the raw profile (path + ".prof") for snakeviz/pstats"""
+        self.profile.dump_stats(path + ".prof")
+        with open(path, 'w') as f:
+            f.write(f"Peak traced memory: {self.memory_peak / 1024 / 1024:.1f} MiB\n\n")
+            f.write("Top allocation sites:\n")
+            f.write("\n".join(self.allocations) + "\n\n")
+            f.write(self.hot_spots())
+        print(f"🔬 Profile saved to: {path} (raw: {path}.prof)")
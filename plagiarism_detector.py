@@ -10,11 +10,16 @@ import json
 import hashlib
 import difflib
 import re
+import argparse
 from typing import Dict, List, Tuple, Set
-from urllib.parse import urlparse
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from collections import defaultdict
+from contextlib import nullcontext
+from file_classifier import FileClassifier
+from instrumentation import Metrics, RunProfiler, format_metrics, timed
+from events import EventStream, NDJSONEventSink
+from repo_spec import parse_repo_spec, format_repo_spec
 
 @dataclass
 class FileInfo:
@@ -33,15 +38,18 @@ class RepoInfo:
     files: List[FileInfo]
     total_files: int
     total_lines: int
+    excluded_files: List[Dict] = field(default_factory=list)
 
 class PlagiarismDetector:
-    def __init__(self, github_token: str = None):
+    def __init__(self, github_token: str = None, api_base: str = None):
         """
         Initialize the plagiarism detector
         
         Args:
             github_token: GitHub personal access token for API access
+            api_base: GitHub API base URL (e.g. a local fake server); defaults to $GITHUB_API_URL
         """
+        self.api_base = (api_base or os.getenv('GITHUB_API_URL') or "https://api.github.com").rstrip('/')
         self.github_token = github_token
         self.headers = {}
         if github_token:
@@ -61,47 +69,54 @@ class PlagiarismDetector:
         
         # Similarity threshold for flagging potential plagiarism
         self.similarity_threshold = 0.7
+        
+        # Classifier for vendored, minified and generated files
+        self.file_classifier = FileClassifier()
+        
+        self.metrics = Metrics()
+        
+        self.events = EventStream()
 
     def get_repo_info(self, repo_url: str) -> str:
         """Extract repository information from GitHub URL"""
-        parsed = urlparse(repo_url)
-        path_parts = parsed.path.strip('/').split('/')
-        
-        if len(path_parts) >= 2:
-            owner = path_parts[0]
-            repo = path_parts[1]
-            return f"{owner}/{repo}"
-        
-        raise ValueError(f"Invalid GitHub repository URL: {repo_url}")
+        return parse_repo_spec(repo_url)[0]
+
+    def get_repo_ref(self, repo_url: str) -> str:
+        """Branch, tag or commit named by a GitHub URL or spec (None for the default branch)"""
+        return parse_repo_spec(repo_url)[1]
 
+    @timed("fetch")
     def fetch_repo_contents(self, repo_url: str) -> RepoInfo:
         """
         Fetch repository contents from GitHub API
         
         Args:
-            repo_url: GitHub repository URL
+            repo_url: GitHub repository URL, optionally naming a branch, tag or commit
             
         Returns:
             RepoInfo object containing repository data
         """
         try:
             repo_name = self.get_repo_info(repo_url)
-            print(f"📥 Fetching repository: {repo_name}")
+            ref = self.get_repo_ref(repo_url)
+            ref_params = {'ref': ref} if ref else None
+            self.events.info("fetch_start", f"📥 Fetching repository: {format_repo_spec(repo_name, ref)}", repo=repo_name, ref=ref)
             
-            api_url = f"https://api.github.com/repos/{repo_name}/contents"
+            api_url = f"{self.api_base}/repos/{repo_name}/contents"
             files = []
+            excluded_files = []
             
             def fetch_directory(url: str, path: str = ""):
                 """Recursively fetch directory contents"""
                 try:
-                    response = requests.get(url, headers=self.headers)
+                    response = requests.get(url, headers=self.headers, params=ref_params)
                     if response.status_code == 403:
-                        print(f"⚠️  Rate limit hit. Waiting 60 seconds...")
+                        self.events.warning("rate_limited", "⚠️  Rate limit hit. Waiting 60 seconds...", wait_seconds=60)
                         time.sleep(60)
-                        response = requests.get(url, headers=self.headers)
+                        response = requests.get(url, headers=self.headers, params=ref_params)
                     
                     if response.status_code != 200:
-                        print(f"❌ Failed to fetch {url}: {response.status_code}")
+                        self.events.error("fetch_failed", f"❌ Failed to fetch {url}: {response.status_code}", url=url, status=response.status_code)
                         return
                     
                     items = response.json()
@@ -113,8 +128,16 @@ class PlagiarismDetector:
                             
                             # Only process code files
                             if file_ext in self.code_extensions:
+                                classification = self.file_classifier.classify_path(file_path)
+                                if classification:
+                                    excluded_files.append(classification.to_dict())
+                                    continue
+                                
                                 file_content = self.fetch_file_content(item['download_url'])
-                                if file_content and len(file_content) >= self.min_file_size:
+                                classification = self.file_classifier.classify_content(file_path, file_content)
+                                if classification:
+                                    excluded_files.append(classification.to_dict())
+                                elif file_content and len(file_content) >= self.min_file_size:
                                     file_info = FileInfo(
                                         path=file_path,
                                         content=file_content,
@@ -125,11 +148,16 @@ class PlagiarismDetector:
                                     files.append(file_info)
                         
                         elif item['type'] == 'dir':
+                            classification = self.file_classifier.classify_dir(item['path'])
+                            if classification:
+                                excluded_files.append(classification.to_dict())
+                                continue
+                            
                             # Recursively fetch subdirectory
                             fetch_directory(item['url'], item['path'])
                 
                 except Exception as e:
-                    print(f"❌ Error fetching directory {url}: {e}")
+                    self.events.error("fetch_error", f"❌ Error fetching directory {url}: {e}", url=url, error=str(e))
             
             fetch_directory(api_url)
             
@@ -140,11 +168,12 @@ class PlagiarismDetector:
                 name=repo_name,
                 files=files,
                 total_files=len(files),
-                total_lines=total_lines
+                total_lines=total_lines,
+                excluded_files=excluded_files
             )
             
         except Exception as e:
-            print(f"❌ Error fetching repository {repo_url}: {e}")
+            self.events.error("fetch_error", f"❌ Error fetching repository {repo_url}: {e}", repo=repo_url, error=str(e))
             return None
 
     def fetch_file_content(self, download_url: str) -> str:
@@ -154,9 +183,10 @@ class PlagiarismDetector:
             if response.status_code == 200:
                 return response.text
         except Exception as e:
-            print(f"❌ Error fetching file content: {e}")
+            self.events.error("fetch_error", f"❌ Error fetching file content: {e}", url=download_url, error=str(e))
         return None
 
+    @timed("normalize")
     def normalize_code(self, content: str) -> str:
         """
         Normalize code content for comparison
@@ -193,7 +223,8 @@ class PlagiarismDetector:
         normalized2 = self.normalize_code(content2)
         
         # Use SequenceMatcher for similarity calculation
-        similarity = difflib.SequenceMatcher(None, normalized1, normalized2).ratio()
+        with self.metrics.timer("similarity"):
+            similarity = difflib.SequenceMatcher(None, normalized1, normalized2).ratio()
         return similarity
 
     def detect_plagiarism(self, target_repo: str, comparison_repos: List[str]) -> Dict:
@@ -207,21 +238,25 @@ class PlagiarismDetector:
         Returns:
             Dictionary containing plagiarism analysis results
         """
-        print(f"🔍 Starting plagiarism detection for: {target_repo}")
-        print(f"📋 Comparing against {len(comparison_repos)} repositories")
+        self.events.info("run_start", f"🔍 Starting plagiarism detection for: {target_repo}", target_repo=target_repo)
+        self.events.info("candidates", f"📋 Comparing against {len(comparison_repos)} repositories",
+                         candidates=len(comparison_repos))
+        self.metrics.reset()
         
         # Fetch target repository
         target_info = self.fetch_repo_contents(target_repo)
         if not target_info:
             return {"error": "Failed to fetch target repository"}
         
-        print(f"✅ Target repo: {target_info.total_files} files, {target_info.total_lines} lines")
+        self.events.info("target_fetched", f"✅ Target repo: {target_info.total_files} files, {target_info.total_lines} lines",
+                         files=target_info.total_files, lines=target_info.total_lines)
         
         results = {
             "target_repo": target_repo,
             "target_stats": {
                 "files": target_info.total_files,
-                "lines": target_info.total_lines
+                "lines": target_info.total_lines,
+                "excluded_files": len(target_info.excluded_files)
             },
             "comparisons": [],
             "suspicious_matches": [],
@@ -229,15 +264,16 @@ class PlagiarismDetector:
         }
         
         # Compare with each repository
-        for repo_url in comparison_repos:
-            print(f"\n🔄 Comparing with: {repo_url}")
+        for i, repo_url in enumerate(comparison_repos, 1):
+            self.events.progress("compare", i, len(comparison_repos), f"\n🔄 Comparing with: {repo_url}", repo=repo_url)
             
             comparison_info = self.fetch_repo_contents(repo_url)
             if not comparison_info:
-                print(f"❌ Failed to fetch: {repo_url}")
+                self.events.warning("fetch_failed", f"❌ Failed to fetch: {repo_url}", repo=repo_url)
                 continue
             
-            print(f"✅ Comparison repo: {comparison_info.total_files} files, {comparison_info.total_lines} lines")
+            self.events.info("repo_stats", f"✅ Comparison repo: {comparison_info.total_files} files, {comparison_info.total_lines} lines",
+                             repo=repo_url, files=comparison_info.total_files, lines=comparison_info.total_lines)
             
             # Compare files
             matches = []
@@ -271,12 +307,14 @@ class PlagiarismDetector:
                                 })
             
             avg_similarity = total_similarity / comparisons_made if comparisons_made > 0 else 0
+            self.metrics.incr("file_pairs_compared", comparisons_made)
             
             comparison_result = {
                 "repo": repo_url,
                 "repo_stats": {
                     "files": comparison_info.total_files,
-                    "lines": comparison_info.total_lines
+                    "lines": comparison_info.total_lines,
+                    "excluded_files": len(comparison_info.excluded_files)
                 },
                 "matches": matches,
                 "average_similarity": avg_similarity,
@@ -284,7 +322,8 @@ class PlagiarismDetector:
             }
             
             results["comparisons"].append(comparison_result)
-            print(f"📊 Found {len(matches)} suspicious matches (avg similarity: {avg_similarity:.2f})")
+            self.events.info("comparison_scored", f"📊 Found {len(matches)} suspicious matches (avg similarity: {avg_similarity:.2f})",
+                             repo=repo_url, matches=len(matches), average_similarity=avg_similarity)
         
         # Generate summary
         total_suspicious = len(results["suspicious_matches"])
@@ -295,9 +334,12 @@ class PlagiarismDetector:
             "total_suspicious_matches": total_suspicious,
             "plagiarism_risk": "HIGH" if total_suspicious > 5 else "MEDIUM" if total_suspicious > 2 else "LOW"
         }
+        results["metrics"] = self.metrics.snapshot()
+        self.events.info("run_complete", summary=results["summary"])
         
         return results
 
+    @timed("report")
     def generate_report(self, results: Dict, output_file: str = None):
         """
         Generate a detailed plagiarism report
@@ -331,6 +373,7 @@ class PlagiarismDetector:
         for comparison in results['comparisons']:
             report.append(f"Repository: {comparison['repo']}")
             report.append(f"  Files: {comparison['repo_stats']['files']}, Lines: {comparison['repo_stats']['lines']}")
+            report.append(f"  Excluded Files (vendored/generated): {comparison['repo_stats'].get('excluded_files', 0)}")
             report.append(f"  Average Similarity: {comparison['average_similarity']:.2%}")
             report.append(f"  High Similarity Files: {comparison['high_similarity_files']}")
             
@@ -340,19 +383,34 @@ class PlagiarismDetector:
                     report.append(f"    {match['target_file']} ({match['similarity']:.2%})")
             report.append("")
         
+        if results.get('metrics'):
+            report.append("RUN METRICS:")
+            report.append("-" * 50)
+            report.extend(format_metrics(results['metrics']))
+            report.append("")
+        
         report.append("=" * 80)
         
         report_text = "\n".join(report)
-        print(report_text)
+        self.events.say(report_text)
         
         if output_file:
             with open(output_file, 'w') as f:
                 f.write(report_text)
-            print(f"📄 Report saved to: {output_file}")
+            self.events.info("report_saved", f"📄 Report saved to: {output_file}", path=output_file, format="text")
 
 def main():
     """Main function to run plagiarism detection"""
     
+    parser = argparse.ArgumentParser(description="Plagiarism detection against a fixed list of repositories")
+    parser.add_argument("--profile", default=None, metavar="FILE",
+                        help="Capture cProfile hot spots and tracemalloc allocations of the run to FILE")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Only show warnings, errors and a periodic progress line")
+    parser.add_argument("--events", default=None, metavar="FILE",
+                        help="Append structured run events to this NDJSON file")
+    args = parser.parse_args()
+    
     # Target repository to check for plagiarism
     target_repo = "https://github.com/ka-reem/agenthacks-25/commits/stolen_rewritten"
     
@@ -366,15 +424,21 @@ def main():
     # You can set a GitHub token for higher API rate limits
     github_token = os.getenv('GITHUB_TOKEN')
     detector = PlagiarismDetector(github_token=github_token)
+    detector.events = EventStream(quiet=args.quiet)
+    event_sink = detector.events.add_sink(NDJSONEventSink(args.events)) if args.events else None
     
     try:
         # Run plagiarism detection
-        results = detector.detect_plagiarism(target_repo, comparison_repos)
+        with RunProfiler() if args.profile else nullcontext() as profiler:
+            results = detector.detect_plagiarism(target_repo, comparison_repos)
+        if profiler:
+            profiler.dump(args.profile)
         
         # Generate and save report
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         report_file = f"plagiarism_report_{timestamp}.txt"
         detector.generate_report(results, report_file)
+        results["metrics"] = detector.metrics.snapshot()  # now including the report stage
         
         # Save results as JSON for further analysis
         json_file = f"plagiarism_results_{timestamp}.json"
@@ -384,6 +448,9 @@ def main():
         
     except Exception as e:
         print(f"❌ Error during plagiarism detection: {e}")
+    finally:
+        if event_sink:
+            event_sink.close()
 
 if __name__ == "__main__":
     main()
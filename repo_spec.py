@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Repository Source Specs
+Parses the ways a submission can point at code - repository URLs, branch and
+tag pages (/tree/<ref>, /commits/<ref>), single commits (/commit/<sha>),
+file links (/blob/<ref>/...) and "owner/repo@ref" - into one canonical spec
+string, "owner/repo" or "owner/repo@ref", that every fetch path understands.
+"""
+
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+
+# URL sections after owner/repo whose next segments name a ref
+REF_SECTIONS = {"tree", "commits", "commit", "blob"}
+
+def parse_repo_spec(source: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a repository URL or spec into (owner/repo, ref)
+
+    The segment after /tree/, /commits/, /commit/ or /blob/ is the ref and the
+    rest is a path inside the repository (a subdirectory or file link scans the
+    whole repository at that ref). URLs cannot tell a slashed branch name from
+    a path without asking the API, so such branches need the "owner/repo@ref"
+    form (e.g. "me/app@feature/login").
+
+    Args:
+        source: GitHub URL, "owner/repo" or "owner/repo@ref"
+
+    Returns:
+        (repository name, ref or None for the default branch)
+
+    Raises:
+        ValueError: If no owner/repo can be found
+    """
+    source = source.strip()
+    ref = None
+    if source.startswith('http') or source.startswith('github.com/'):
+        path = urlparse(source if source.startswith('http') else f"https://{source}").path
+    else:
+        path, _, ref = source.partition('@')
+    parts = [part for part in path.strip('/').split('/') if part]
+    if len(parts) < 2:
+        raise ValueError(f"Invalid GitHub repository: {source}")
+
+    owner, repo = parts[0], parts[1]
+    if repo.endswith('.git'):
+        repo = repo[:-4]
+    if '@' in repo:
+        repo, _, ref = repo.partition('@')
+    if len(parts) > 3 and parts[2] in REF_SECTIONS:
+        ref = parts[3]
+    return f"{owner}/{repo}", ref or None
+
+def format_repo_spec(name: str, ref: Optional[str] = None) -> str:
+    """Canonical spec string for a repository at a ref (default branch when ref is None)"""
+    return f"{name}@{ref}" if ref else name
+
+def split_repo_spec(spec: str) -> Tuple[str, Optional[str]]:
+    """Inverse of format_repo_spec() (repository names never contain "@")"""
+    name, _, ref = spec.partition('@')
+    return name, ref or None
+
+def repo_spec_url(spec: str) -> str:
+    """Browser URL of a spec: the repository page, or its tree at the ref"""
+    name, ref = split_repo_spec(spec)
+    return f"https://github.com/{name}/tree/{ref}" if ref else f"https://github.com/{name}"
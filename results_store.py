@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Results Store
+Small indexed sqlite schema for detection results, so report views (text,
+JSON, per-repository drill-down) are queries instead of repeated walks and
+regroupings of the results lists
+"""
+
+import json
+import argparse
+import sqlite3
+from typing import Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    target_repo TEXT,
+    header TEXT,
+    summary TEXT,
+    plagiarism_risk TEXT
+);
+CREATE TABLE IF NOT EXISTS comparisons (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER,
+    repo TEXT,
+    stars INTEGER,
+    average_similarity REAL,
+    high_similarity_files INTEGER,
+    identical_count INTEGER,
+    risk_tier TEXT,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER,
+    comparison_id INTEGER,
+    repo TEXT,
+    target_file TEXT,
+    comparison_file TEXT,
+    similarity REAL,
+    target_lines INTEGER,
+    comparison_lines INTEGER,
+    suspicious INTEGER
+);
+CREATE TABLE IF NOT EXISTS identical_files (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER,
+    repo TEXT,
+    target_file TEXT,
+    comparison_file TEXT,
+    lines INTEGER,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS excluded_files (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER,
+    repo TEXT,
+    path TEXT,
+    category TEXT,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_comparisons_repo ON comparisons (run_id, repo);
+CREATE INDEX IF NOT EXISTS idx_comparisons_risk ON comparisons (run_id, risk_tier);
+CREATE INDEX IF NOT EXISTS idx_comparisons_rank ON comparisons (run_id, identical_count, high_similarity_files, stars);
+CREATE INDEX IF NOT EXISTS idx_matches_repo ON matches (run_id, repo);
+CREATE INDEX IF NOT EXISTS idx_matches_similarity ON matches (run_id, similarity);
+CREATE INDEX IF NOT EXISTS idx_matches_comparison ON matches (comparison_id);
+CREATE INDEX IF NOT EXISTS idx_identical_repo ON identical_files (run_id, repo);
+CREATE INDEX IF NOT EXISTS idx_excluded_category ON excluded_files (run_id, category);
+"""
+
+# Result list keys that are stored in their own tables rather than the run header
+LIST_KEYS = ("comparisons", "suspicious_matches", "identical_files", "excluded_files", "summary")
+
+def comparison_risk_tier(comparison: Dict) -> str:
+    """Per-repository tier, as flagged in the detailed report"""
+    if comparison.get('identical_files'):
+        return "CRITICAL"
+    if comparison.get('high_similarity_files', 0) > 0:
+        return "SUSPICIOUS"
+    return "CLEAN"
+
+class ResultsStore:
+    def __init__(self, path: str = None):
+        """
+        Open (or create) a results store
+
+        Args:
+            path: sqlite file (None keeps the store in memory)
+        """
+        self.path = path or ':memory:'
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def add_results(self, results: Dict) -> int:
+        """
+        Store one run's results dict (from any detector) in a single transaction
+
+        Returns:
+            The run id used by every query
+        """
+        header = {key: value for key, value in results.items() if key not in LIST_KEYS}
+        summary = results.get('summary', {})
+        suspicious_keys = {
+            (m['repo'], m['match']['target_file'], m['match']['comparison_file'])
+            for m in results.get('suspicious_matches', [])
+        }
+
+        with self.conn:
+            run_id = self.conn.execute(
+                "INSERT INTO runs (target_repo, header, summary, plagiarism_risk) VALUES (?, ?, ?, ?)",
+                (results.get('target_repo'), json.dumps(header), json.dumps(summary), summary.get('plagiarism_risk'))
+            ).lastrowid
+
+            for comparison in results.get('comparisons', []):
+                data = {key: value for key, value in comparison.items() if key not in ('matches', 'identical_files')}
+                comparison_id = self.conn.execute(
+                    "INSERT INTO comparisons (run_id, repo, stars, average_similarity, high_similarity_files, "
+                    "identical_count, risk_tier, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, comparison['repo'], comparison.get('stars', 0), comparison['average_similarity'],
+                     comparison['high_similarity_files'], len(comparison['identical_files']),
+                     comparison_risk_tier(comparison), json.dumps(data))
+                ).lastrowid
+                self.conn.executemany(
+                    "INSERT INTO matches (run_id, comparison_id, repo, target_file, comparison_file, similarity, "
+                    "target_lines, comparison_lines, suspicious) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id, comparison_id, comparison['repo'], m['target_file'], m['comparison_file'],
+                      m['similarity'], m['target_lines'], m['comparison_lines'],
+                      int((comparison['repo'], m['target_file'], m['comparison_file']) in suspicious_keys))
+                     for m in comparison['matches']]
+                )
+
+            self.conn.executemany(
+                "INSERT INTO identical_files (run_id, repo, target_file, comparison_file, lines, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, m['repo'], m['target_file'], m['comparison_file'], m['lines'], json.dumps(m))
+                 for m in results.get('identical_files', [])]
+            )
+            self.conn.executemany(
+                "INSERT INTO excluded_files (run_id, repo, path, category, reason) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, e.get('repo'), e['path'], e['category'], e['reason'])
+                 for e in results.get('excluded_files', [])]
+            )
+        return run_id
+
+    @classmethod
+    def from_results(cls, results: Dict) -> tuple:
+        """In-memory store holding one results dict: (store, run_id)"""
+        store = cls()
+        return store, store.add_results(results)
+
+    # --- queries -----------------------------------------------------------------------
+
+    def run(self, run_id: int) -> Dict:
+        """Run header fields plus the summary"""
+        row = self.conn.execute("SELECT header, summary FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return dict(json.loads(row['header']), summary=json.loads(row['summary']))
+
+    def _comparison(self, row) -> Dict:
+        return dict(json.loads(row['data']), repo=row['repo'])
+
+    def identical_files(self, run_id: int, repo: str = None) -> List[Dict]:
+        """Identical-file matches in discovery order, optionally for one repository"""
+        query = "SELECT data FROM identical_files WHERE run_id = ?"
+        params = [run_id]
+        if repo:
+            query += " AND repo = ?"
+            params.append(repo)
+        return [json.loads(row['data']) for row in self.conn.execute(query + " ORDER BY id", params)]
+
+    def suspicious_matches(self, run_id: int) -> List[Dict]:
+        """Suspicious matches in discovery order"""
+        rows = self.conn.execute(
+            "SELECT m.*, c.data FROM matches m JOIN comparisons c ON c.id = m.comparison_id "
+            "WHERE m.run_id = ? AND m.suspicious = 1 ORDER BY m.id", (run_id,)
+        )
+        return [self._suspicious(row) for row in rows]
+
+    def _suspicious(self, row) -> Dict:
+        comparison = json.loads(row['data'])
+        entry = {"repo": row['repo']}
+        if 'repo_url' in comparison:
+            entry.update(repo_url=comparison['repo_url'], stars=comparison.get('stars', 0))
+        entry["match"] = self._match(row)
+        return entry
+
+    def _match(self, row) -> Dict:
+        return {
+            "target_file": row['target_file'],
+            "comparison_file": row['comparison_file'],
+            "similarity": row['similarity'],
+            "target_lines": row['target_lines'],
+            "comparison_lines": row['comparison_lines']
+        }
+
+    def suspicious_by_repo(self, run_id: int) -> List[Dict]:
+        """Suspicious matches grouped per repository (repositories in first-match order)"""
+        groups = []
+        for entry in self.suspicious_matches(run_id):
+            if not groups or groups[-1]['repo'] != entry['repo']:
+                groups.append({'repo': entry['repo'], 'url': entry.get('repo_url', ''),
+                               'stars': entry.get('stars', 0), 'matches': []})
+            groups[-1]['matches'].append(entry['match'])
+        return groups
+
+    def comparisons(self, run_id: int, order: str = "discovery", limit: int = None,
+                    risk_tier: str = None) -> List[Dict]:
+        """
+        Comparison rows (without matches)
+
+        Args:
+            run_id: Run to query
+            order: "discovery" or "risk" (identical files, then similar files, then stars)
+            limit: Maximum rows
+            risk_tier: Only CRITICAL / SUSPICIOUS / CLEAN repositories
+        """
+        query = "SELECT * FROM comparisons WHERE run_id = ?"
+        params = [run_id]
+        if risk_tier:
+            query += " AND risk_tier = ?"
+            params.append(risk_tier)
+        if order == "risk":
+            query += " ORDER BY identical_count DESC, high_similarity_files DESC, stars DESC, id"
+        else:
+            query += " ORDER BY id"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [dict(self._comparison(row), _id=row['id'], identical_count=row['identical_count'],
+                     risk_tier=row['risk_tier']) for row in self.conn.execute(query, params)]
+
+    def comparison_matches(self, comparison_id: int, limit: int = None) -> List[Dict]:
+        """Matches of one comparison in discovery order"""
+        query = "SELECT * FROM matches WHERE comparison_id = ? ORDER BY id"
+        params = [comparison_id]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [self._match(row) for row in self.conn.execute(query, params)]
+
+    def excluded_files(self, run_id: int, limit: int = None, category: str = None) -> List[Dict]:
+        """Excluded files in discovery order"""
+        query = "SELECT repo, path, category, reason FROM excluded_files WHERE run_id = ?"
+        params = [run_id]
+        if category:
+            query += " AND category = ?"
+            params.append(category)
+        query += " ORDER BY id"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def count(self, run_id: int, table: str) -> int:
+        if table not in ('comparisons', 'matches', 'identical_files', 'excluded_files'):
+            raise ValueError(f"Unknown table: {table}")
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table} WHERE run_id = ?", (run_id,)).fetchone()[0]
+
+    def repo_drilldown(self, run_id: int, repo: str) -> Optional[Dict]:
+        """Everything known about one compared repository"""
+        row = self.conn.execute("SELECT * FROM comparisons WHERE run_id = ? AND repo = ?", (run_id, repo)).fetchone()
+        if row is None:
+            return None
+        return dict(
+            self._comparison(row),
+            risk_tier=row['risk_tier'],
+            matches=self.comparison_matches(row['id']),
+            identical_files=self.identical_files(run_id, repo),
+            excluded_files=[dict(e) for e in self.conn.execute(
+                "SELECT path, category, reason FROM excluded_files WHERE run_id = ? AND repo = ? ORDER BY id",
+                (run_id, repo))]
+        )
+
+    def to_results(self, run_id: int) -> Dict:
+        """Rebuild the results dict of a run (JSON view)"""
+        results = self.run(run_id)
+        comparisons = []
+        for comparison in self.comparisons(run_id):
+            comparison_id = comparison.pop('_id')
+            comparison.pop('identical_count')
+            comparison.pop('risk_tier')
+            comparison['matches'] = self.comparison_matches(comparison_id)
+            comparison['identical_files'] = self.identical_files(run_id, comparison['repo'])
+            comparisons.append(comparison)
+        results.update(
+            comparisons=comparisons,
+            suspicious_matches=self.suspicious_matches(run_id),
+            identical_files=self.identical_files(run_id),
+            excluded_files=self.excluded_files(run_id)
+        )
+        return results
+
+    def close(self):
+        self.conn.close()
+
+def main():
+    """Load results (JSON or NDJSON stream) into a store and render a view"""
+    parser = argparse.ArgumentParser(description="Query detection results from an indexed store")
+    parser.add_argument("results", help="Results JSON file or NDJSON results stream")
+    parser.add_argument("--db", default=None, help="sqlite file to persist the store (default: in memory)")
+    parser.add_argument("--view", choices=["text", "json", "repo"], default="text")
+    parser.add_argument("--repo", help="Repository for the drill-down view")
+    args = parser.parse_args()
+
+    if args.results.endswith('.ndjson') or args.results.endswith('.jsonl'):
+        from results_stream import rebuild_results
+        results = rebuild_results(args.results)
+    else:
+        with open(args.results, 'r') as f:
+            results = json.load(f)
+
+    store = ResultsStore(args.db)
+    run_id = store.add_results(results)
+    if args.view == "json":
+        print(json.dumps(store.to_results(run_id), indent=2))
+    elif args.view == "repo":
+        print(json.dumps(store.repo_drilldown(run_id, args.repo), indent=2))
+    else:
+        from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector
+        GitHubWidePlagiarismDetector().generate_github_wide_report(store=store, run_id=run_id)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Streaming Results Sink
+Writes detection results as NDJSON records the moment they are produced,
+keeping only summary counters in memory, and rebuilds the usual results
+dict (and reports) from a finished or partial stream
+"""
+
+import os
+import json
+import argparse
+from collections import defaultdict
+from typing import Dict, Iterator
+
+# results list key -> NDJSON record type
+RECORD_TYPES = {
+    "comparisons": "comparison",
+    "suspicious_matches": "suspicious_match",
+    "identical_files": "identical_file",
+    "excluded_files": "excluded_file",
+}
+
+class ResultsStreamWriter:
+    def __init__(self, path: str):
+        """
+        Open an NDJSON results stream (replacing any existing file)
+
+        Args:
+            path: File the records are written to
+        """
+        self.path = path
+        self.counts: Dict[str, int] = {key: 0 for key in RECORD_TYPES}
+        self.excluded_by_category: Dict[str, int] = defaultdict(int)
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def _write(self, record_type: str, data: Dict):
+        self._file.write(json.dumps({"type": record_type, "data": data}) + '\n')
+        self._file.flush()
+
+    def header(self, results: Dict):
+        """Write the run header (every results field that is not a list of records)"""
+        self._write("header", {key: value for key, value in results.items()
+                               if key not in RECORD_TYPES and key != "summary"})
+
+    def add(self, key: str, item: Dict):
+        """Stream one item of a results list (e.g. key "comparisons") and count it"""
+        self._write(RECORD_TYPES[key], item)
+        self.counts[key] += 1
+        if key == "excluded_files":
+            self.excluded_by_category[item.get('category', 'unknown')] += 1
+
+    def metrics(self, metrics: Dict):
+        """Write the run's metrics snapshot"""
+        self._write("metrics", metrics)
+
+    def summary(self, summary: Dict):
+        """Write the final summary record"""
+        self._write("summary", summary)
+
+    def close(self):
+        self._file.close()
+
+def iter_records(path: str) -> Iterator[Dict]:
+    """Yield the records of a stream, skipping a torn final line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+def rebuild_results(path: str) -> Dict:
+    """
+    Rebuild the in-memory results dict from a stream
+
+    A stream without a summary record (an interrupted run) rebuilds with an
+    empty summary.
+
+    Args:
+        path: NDJSON stream written by ResultsStreamWriter
+
+    Returns:
+        Results dict in the detectors' usual format
+    """
+    results = {key: [] for key in RECORD_TYPES}
+    results["summary"] = {}
+    list_key = {record_type: key for key, record_type in RECORD_TYPES.items()}
+    for record in iter_records(path):
+        if record["type"] == "header":
+            results.update(record["data"])
+        elif record["type"] == "summary":
+            results["summary"] = record["data"]
+        elif record["type"] == "metrics":
+            results["metrics"] = record["data"]
+        elif record["type"] in list_key:
+            results[list_key[record["type"]]].append(record["data"])
+    return results
+
+def main():
+    """Rebuild the JSON results and text report from a results stream"""
+    parser = argparse.ArgumentParser(description="Rebuild reports from an NDJSON results stream")
+    parser.add_argument("stream", help="NDJSON results stream")
+    parser.add_argument("--json", help="Write the rebuilt results dict to this file")
+    parser.add_argument("--report", help="Write the GitHub-wide text report to this file")
+    args = parser.parse_args()
+
+    from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector
+    detector = GitHubWidePlagiarismDetector()
+
+    results = rebuild_results(args.stream)
+    print(f"📥 Rebuilt {len(results['comparisons'])} comparisons from {args.stream}")
+    if not results["summary"]:
+        print("⚠️  Stream has no summary record (interrupted run?) - summarizing the records so far")
+        detector._finalize_results(results, [None] * results.get("candidates_found", 0), False, 0)
+        results["summary"]["incomplete"] = True
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 JSON results saved to: {args.json}")
+    if args.report:
+        detector.generate_github_wide_report(results, args.report)
+    if not args.json and not args.report:
+        base = os.path.splitext(args.stream)[0]
+        print(f"💡 Use --json {base}.json and/or --report {base}.txt")
+
+if __name__ == "__main__":
+    main()
@@ -32,8 +32,10 @@ def main():
     print("1. Basic plagiarism detection (predefined GitHub repos)")
     print("2. Enhanced detection (predefined GitHub + local repos)")
     print("3. GitHub-wide detection (searches ALL of GitHub) 🌟")
+    print("4. Batch check (every repository listed in wins.txt)")
+    print("5. Detection service (warm daemon with a local HTTP/JSON API)")
     
-    choice = input("Enter choice (1, 2, or 3): ").strip()
+    choice = input("Enter choice (1, 2, 3, 4, or 5): ").strip()
     
     if choice == "1":
         print("\n🚀 Running basic plagiarism detection...")
@@ -50,6 +52,15 @@ def main():
             os.system("python3 github_wide_simple.py")
         else:
             print("❌ GitHub-wide detection cancelled.")
+    elif choice == "4":
+        print("\n📦 Running batch plagiarism check...")
+        os.system("python3 batch_plagiarism_check.py wins.txt")
+    elif choice == "5":
+        print("\n🛰️  Starting detection service (Ctrl+C to stop)...")
+        # Runs in this interpreter: the point of the service is to stay warm between targets
+        from detection_service import main as serve
+        sys.argv = [sys.argv[0]]
+        serve()
     else:
         print("❌ Invalid choice. Please run the script again.")
 
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Search Response Cache
+Persistent sqlite cache for GitHub search responses, keyed by normalized
+query + parameters, with TTL expiry and size-bounded LRU eviction
+"""
+
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+# Quoted phrases stay intact; everything else splits on whitespace
+QUERY_TERM_PATTERN = re.compile(r'"[^"]*"|\S+')
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a search query for cache keys
+
+    GitHub search ANDs its terms, so term order and case do not change the
+    result set; quoted phrases keep their inner order.
+    """
+    terms = [' '.join(term.lower().split()) for term in QUERY_TERM_PATTERN.findall(query)]
+    return ' '.join(sorted(terms))
+
+class SearchCache:
+    def __init__(self, path: str = None, ttl_seconds: int = 24 * 3600, max_entries: int = 2000):
+        """
+        Open (or create) the cache
+
+        Args:
+            path: sqlite file to persist to (None keeps the cache in memory for this process)
+            ttl_seconds: Entries older than this are treated as misses
+            max_entries: Least recently used entries beyond this are evicted
+        """
+        self.path = path or ':memory:'
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT,
+                query TEXT,
+                params TEXT,
+                response TEXT,
+                created_at REAL,
+                last_used REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_last_used ON search_cache (last_used)")
+        self._conn.commit()
+
+    def make_key(self, endpoint: str, query: str, params: Dict = None) -> str:
+        """Cache key from endpoint, normalized query and the remaining parameters"""
+        params = {k: v for k, v in (params or {}).items() if k != 'q'}
+        raw = json.dumps([endpoint, normalize_query(query), params], sort_keys=True)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, endpoint: str, query: str, params: Dict = None) -> Optional[Dict]:
+        """
+        Look up a cached response
+
+        Returns:
+            The cached response JSON, or None on a miss or expired entry
+        """
+        key = self.make_key(endpoint, query, params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE search_cache SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, endpoint: str, query: str, params: Dict, response: Dict):
+        """Store a response and evict least recently used entries beyond max_entries"""
+        key = self.make_key(endpoint, query, params)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, normalize_query(query), json.dumps(params, sort_keys=True),
+                 json.dumps(response), now, now)
+            )
+            self._conn.execute("""
+                DELETE FROM search_cache WHERE key IN (
+                    SELECT key FROM search_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired entries, returning how many were removed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM search_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this process"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+def cached_search(cache: SearchCache, fetch_page, endpoint: str, params: Dict, pages: int = 1) -> List[Dict]:
+    """
+    Run a (possibly paginated) search through the cache
+
+    Args:
+        cache: SearchCache to consult first
+        fetch_page: Callable(params) -> response JSON dict or None; only called on cache misses
+        endpoint: Search endpoint name used in the cache key (e.g. "repositories", "code")
+        params: Search parameters including 'q' and 'per_page'
+        pages: Maximum number of result pages to walk
+
+    Returns:
+        Items from every page in page order, or None if the first page could not be fetched
+    """
+    items = []
+    per_page = params.get('per_page', 30)
+    for page in range(1, pages + 1):
+        page_params = dict(params, page=page)
+        response = cache.get(endpoint, params['q'], page_params)
+        if response is None:
+            response = fetch_page(page_params)
+            if response is None:
+                return None if page == 1 else items
+            cache.put(endpoint, params['q'], page_params, response)
+
+        page_items = response.get('items', [])
+        items.extend(page_items)
+        if len(page_items) < per_page:
+            break
+    return items
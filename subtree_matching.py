@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Subtree Equality Matching
+Git tree objects are content-addressed, so a directory copied wholesale has
+the same tree SHA in both repositories. Matching tree SHAs from two recursive
+tree listings (API `git/trees?recursive=1` or a local `git ls-tree -r -t`)
+finds identical subtrees without reading a single file; they can then be
+reported whole and their files taken from the target instead of downloaded.
+"""
+
+import subprocess
+from dataclasses import replace
+from typing import Callable, Dict, List
+
+def local_tree_listing(repo_path: str, ref: str = "HEAD") -> List[Dict]:
+    """
+    Recursive tree listing of a local clone in the API's entry format
+
+    Args:
+        repo_path: Working tree or bare repository
+        ref: Revision to list
+
+    Returns:
+        List of entries (path, mode, type, sha, size), empty if the listing fails
+    """
+    result = subprocess.run(["git", "-C", repo_path, "ls-tree", "-r", "-t", "-l", "-z", "--full-tree", ref],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return []
+    entries = []
+    for record in filter(None, result.stdout.split("\0")):
+        # "<mode> <type> <sha> <size>\t<path>" (size is "-" for trees, paths unquoted with -z)
+        meta, path = record.split("\t", 1)
+        mode, kind, sha, size = meta.split()
+        entries.append({"path": path, "mode": mode, "type": kind, "sha": sha,
+                        "size": int(size) if size.isdigit() else None})
+    return entries
+
+def subtree_file_counts(tree: List[Dict]) -> Dict[str, int]:
+    """Number of blobs under every directory of a tree listing"""
+    counts = {}
+    for entry in tree:
+        if entry.get('type') != 'blob':
+            continue
+        parts = entry['path'].split('/')
+        for depth in range(1, len(parts)):
+            directory = '/'.join(parts[:depth])
+            counts[directory] = counts.get(directory, 0) + 1
+    return counts
+
+def _ancestors(path: str) -> List[str]:
+    parts = path.split('/')
+    return ['/'.join(parts[:depth]) for depth in range(1, len(parts))]
+
+def match_subtrees(target_tree: List[Dict], comparison_tree: List[Dict], min_files: int = 2,
+                   skip_dir: Callable[[str], object] = None) -> List[Dict]:
+    """
+    Maximal subtrees of the target whose tree SHA also occurs in the comparison
+
+    Args:
+        target_tree: Recursive tree listing of the target
+        comparison_tree: Recursive tree listing of the comparison repository
+        min_files: Smallest subtree (in blobs) worth reporting
+        skip_dir: Optional callable flagging directory names that are not evidence
+            (e.g. FileClassifier.classify_dir for node_modules or build output)
+
+    Returns:
+        List of {"target_path", "comparison_path", "tree_sha", "files"} dicts;
+        subtrees nested in a reported match are not reported again
+    """
+    def skipped(path: str) -> bool:
+        return bool(skip_dir) and any(skip_dir(part) for part in path.split('/'))
+
+    # Shallowest occurrence wins when the comparison holds the same tree twice
+    comparison_paths = {}
+    for entry in sorted((e for e in comparison_tree if e.get('type') == 'tree'),
+                        key=lambda e: (e['path'].count('/'), e['path'])):
+        if not skipped(entry['path']):
+            comparison_paths.setdefault(entry['sha'], entry['path'])
+
+    counts = subtree_file_counts(target_tree)
+    matched = set()
+    matches = []
+    # Lexicographic order visits every directory before its descendants
+    for entry in sorted((e for e in target_tree if e.get('type') == 'tree'), key=lambda e: e['path']):
+        path = entry['path']
+        comparison_path = comparison_paths.get(entry['sha'])
+        if comparison_path is None or counts.get(path, 0) < min_files:
+            continue
+        if any(ancestor in matched for ancestor in _ancestors(path)) or skipped(path):
+            continue
+        matched.add(path)
+        matches.append({"target_path": path, "comparison_path": comparison_path,
+                        "tree_sha": entry['sha'], "files": counts[path]})
+    return matches
+
+def under_subtree(path: str, prefixes) -> bool:
+    """True if path lies inside one of the directory prefixes"""
+    return any(path.startswith(prefix + '/') for prefix in prefixes)
+
+def subtree_files(subtree: Dict, source_files: List) -> List:
+    """Target files (FileInfo) inside a matched subtree, re-pathed into the comparison repository"""
+    prefix = subtree['target_path'] + '/'
+    return [replace(f, path=subtree['comparison_path'] + f.path[len(subtree['target_path']):])
+            for f in source_files or [] if f.path.startswith(prefix)]
+
+def subtree_copies(target_paths: List[str], comparison_paths: List[str], subtrees: List[Dict]) -> int:
+    """
+    Number of file pairs known identical because both sides lie in a matched subtree
+
+    Args:
+        target_paths: Paths of the target files being scored
+        comparison_paths: Paths of the comparison files being scored
+        subtrees: Matches from match_subtrees()
+
+    Returns:
+        Per subtree, the files present on both sides (at most the subtree's file count)
+    """
+    copies = 0
+    for subtree in subtrees:
+        in_target = sum(1 for path in target_paths if under_subtree(path, [subtree['target_path']]))
+        in_comparison = sum(1 for path in comparison_paths if under_subtree(path, [subtree['comparison_path']]))
+        copies += min(subtree['files'], in_target, in_comparison)
+    return copies
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the async GitHub-wide detector
+"""
+
+import base64
+import hashlib
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self.data = data
+        self.status_code = status_code
+        self.headers = {}
+
+    def json(self):
+        return self.data
+
+def make_fake_api(repos):
+    """In-memory trees/blobs API for {repo_name: {path: content}}"""
+    blobs = {}
+    trees = {}
+    for name, files in repos.items():
+        tree = []
+        for path, content in files.items():
+            sha = hashlib.sha1(content.encode()).hexdigest()
+            blobs[sha] = content
+            tree.append({'path': path, 'type': 'blob', 'sha': sha, 'size': len(content)})
+        trees[name] = tree
+
+    async def request(url, params=None, bucket='core'):
+        path = url.split("/repos/", 1)[-1]
+        if "/git/trees/" in path:
+            name = path.split("/git/trees/")[0]
+            return FakeResponse({'tree': trees[name]}) if name in trees else FakeResponse({}, 404)
+        if "/git/blobs/" in path:
+            content = blobs[path.rsplit("/", 1)[-1]]
+            return FakeResponse({'encoding': 'base64', 'content': base64.b64encode(content.encode()).decode()})
+        return FakeResponse({}, 404)
+    return request
+
+def test_async_detection_matches_sync_results():
+    """The async flow finds the same identical files as the sync flow, in candidate order"""
+    from async_github_detector import AsyncGitHubWideDetector
+
+    copied = {f"src/handler_{i}.py": f"def handler_{i}(request):\n    payload = request.json()\n    return payload[{i}] * 42\n" for i in range(3)}
+    repos = {
+        "me/target": dict(copied, **{"node_modules/lib/index.js": "module.exports = function () { return 1 }\n"}),
+        "other/copy": dict(copied),
+        "other/unrelated": {"app.py": "print('something else entirely, nothing shared here')\n"},
+    }
+
+    detector = AsyncGitHubWideDetector(scoring_executor="thread")
+    detector._request = make_fake_api(repos)
+
+    async def search(keywords, target_language=None, **kwargs):
+        return [{'name': name, 'url': f"https://github.com/{name}", 'stars': 0,
+                 'language': 'Python', 'description': '', 'size': 1}
+                for name in ("other/copy", "other/unrelated")]
+    detector.search_github_repositories_async = search
+
+    results = detector.detect_plagiarism_github_wide("https://github.com/me/target")
+    assert [c['repo'] for c in results["comparisons"]] == ["other/copy", "other/unrelated"]
+    assert len(results["identical_files"]) == 3
+    assert results["summary"]["plagiarism_risk"] == "HIGH"
+    assert results["excluded_files"][0]["path"].startswith("node_modules")
+    assert len(detector.blob_cache) == 4  # shared blobs are downloaded once
+
+def test_a_failing_search_query_only_fails_itself():
+    """A timeout in one repository search is reported and the other queries' results are kept"""
+    import asyncio
+    import requests
+    from async_github_detector import AsyncGitHubWideDetector
+
+    detector = AsyncGitHubWideDetector(scoring_executor="thread")
+    events = []
+    detector.events.add_sink(events.append)
+
+    async def request(url, params=None, bucket='core'):
+        if params['q'] == "broken":
+            raise requests.Timeout("read timed out")
+        name = f"other/{params['q']}"
+        return FakeResponse({'items': [{'full_name': name, 'html_url': f"https://github.com/{name}",
+                                        'stargazers_count': 1, 'size': 1}]})
+    detector._request = request
+
+    candidates = asyncio.run(detector.search_github_repositories_async(["broken", "working"]))
+
+    assert "other/working" in [candidate['name'] for candidate in candidates]
+    assert [event['query'] for event in events if event['event'] == "search_error"] == ["broken"]
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-target batch check
+"""
+
+import json
+
+def test_batch_check_scores_targets_against_each_other(tmp_path, make_repo):
+    """Every target gets a results file and copying targets end up in one cluster"""
+    from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector
+    from batch_plagiarism_check import BatchPlagiarismChecker, load_targets
+
+    shared = [f"def shared_handler_{i}(request):\n    return request.json()['{i}'] * 42\n" for i in range(3)]
+    repos = {
+        "team/a": make_repo("team/a", shared),
+        "team/b@dev": make_repo("team/b@dev", shared[:2] + ["def own_code():\n    return 'something entirely different here'\n"]),
+        "team/c": make_repo("team/c", ["class Unrelated:\n    def run(self):\n        return sum(range(100))\n"]),
+    }
+    fetched = []
+    detector = GitHubWidePlagiarismDetector()
+    detector.fetch_repo_contents = lambda name: fetched.append(name) or repos.get(name)
+    saves = []
+    detector.df_table.save = lambda: saves.append(True)
+    identical_events = []
+    detector.events.add_sink(lambda record: record["event"] == "identical_file" and identical_events.append(record))
+
+    targets_file = tmp_path / "wins.txt"
+    targets_file.write_text("https://github.com/team/a\nhttps://devpost.com/gallery\n"
+                            "team-c,https://github.com/team/c.git\nhttps://github.com/team/b/tree/dev\n")
+    targets, skipped = load_targets(str(targets_file))
+    assert targets == ["https://github.com/team/a", "https://github.com/team/c", "https://github.com/team/b/tree/dev"]
+    assert skipped == ["https://devpost.com/gallery"]
+
+    refs_file = tmp_path / "refs.txt"
+    refs_file.write_text("https://github.com/x/b/tree/dev/src\nhttps://github.com/x/c@v1\nx/d@v2\nx/d@v2\n")
+    assert load_targets(str(refs_file))[0] == ["https://github.com/x/b/tree/dev", "https://github.com/x/c/tree/v1",
+                                               "https://github.com/x/d/tree/v2"]
+
+    checker = BatchPlagiarismChecker(detector, output_dir=str(tmp_path / "out"), search=False)
+    summary = checker.run(targets)
+
+    assert sorted(fetched) == ["team/a", "team/b@dev", "team/c"]  # each repository fetched once, at its ref
+    assert [cluster["members"] for cluster in summary["clusters"]] == [["team/a", "team/b@dev"]]
+    risks = {t["target"]: t["plagiarism_risk"] for t in summary["targets"]}
+    assert risks["team/c"] == "LOW" and risks["team/a"] != "LOW"
+
+    results_a = json.loads((tmp_path / "out" / "team__a.json").read_text())
+    assert {m["repo"] for m in results_a["identical_files"]} == {"team/b@dev"}
+    # Identical files go through the detector's shared recording and event path
+    assert len(identical_events) == 2 * len(results_a["identical_files"])
+    # Each target reports only its own scoring work: team/b@dev (scored last) compares 3 x 3 files with team/a
+    results_b = json.loads((tmp_path / "out" / "team__b--dev.json").read_text())
+    assert results_a["metrics"]["counters"]["file_pairs_compared"] == 9
+    assert results_b["metrics"]["counters"]["file_pairs_compared"] == 9
+    assert saves == [True]
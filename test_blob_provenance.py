@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the blob-provenance timeline of a suspected copy
+"""
+
+import os
+import subprocess
+
+def commit_files(path, files, message, removed=()):
+    """Write files (and delete paths) in a repository, then commit"""
+    for name, content in files.items():
+        os.makedirs(os.path.dirname(os.path.join(path, name)) or path, exist_ok=True)
+        with open(os.path.join(path, name), 'w') as f:
+            f.write(content)
+    for name in removed:
+        os.remove(os.path.join(path, name))
+    env = dict(os.environ, GIT_AUTHOR_NAME="dev", GIT_AUTHOR_EMAIL="dev@example.com",
+               GIT_COMMITTER_NAME="dev", GIT_COMMITTER_EMAIL="dev@example.com")
+    subprocess.run(["git", "-C", path, "add", "-A"], check=True, env=env)
+    subprocess.run(["git", "-C", path, "commit", "-q", "-m", message], check=True, env=env)
+
+def test_bulk_import_commit_is_pinpointed(tmp_path):
+    """A copy that starts unrelated, then imports 19 of 20 original files in one commit and edits one later"""
+    from blob_provenance import local_blob_shas, provenance_timeline
+
+    original_files = {f"src/module_{i}.py": f"def handler_{i}():\n    return {i} * {i}\n" for i in range(20)}
+    original = str(tmp_path / "original")
+    subprocess.run(["git", "init", "-q", str(original)], check=True)
+    commit_files(original, {"src/module_0.py": original_files["src/module_0.py"]}, "start")
+    commit_files(original, original_files, "finish")
+
+    copy = str(tmp_path / "copy")
+    subprocess.run(["git", "init", "-q", str(copy)], check=True)
+    commit_files(copy, {"README.md": "# Totally original project\n", "empty.txt": ""}, "readme")
+    imported = {f"app/{name}": content for name, content in original_files.items() if name != "src/module_19.py"}
+    commit_files(copy, imported, "initial implementation")
+    commit_files(copy, {"app/src/module_3.py": "def handler_3():\n    return 'rewritten'\n"}, "refactor")
+
+    original_blobs = local_blob_shas(original)
+    assert len(original_blobs) == 20
+    # all_history adds nothing here: the early module_0 blob is identical to the final one
+    assert local_blob_shas(original, all_history=True) == original_blobs
+
+    result = provenance_timeline(original_blobs, copy)
+    assert result["commits_replayed"] == 3
+    assert result["verdict"] == "bulk_import"
+    assert result["first_shared"]["commit_index"] == 2
+    assert result["first_shared"]["original_blobs_added"] == 19
+    assert result["milestones"]["50%"]["commit_index"] == 2
+    assert result["milestones"]["95%"]["commit_index"] == 2
+    assert result["final_coverage"] == 0.9
+    assert [entry["commit_index"] for entry in result["timeline"]] == [2, 3]
+
+    unrelated = provenance_timeline({"0" * 39 + "1"}, copy)
+    assert unrelated["verdict"] == "no_shared_code" and unrelated["timeline"] == []
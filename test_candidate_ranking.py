@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Test script for candidate ranking by expected match likelihood
+"""
+
+from candidate_ranking import CandidateRanker
+
+def test_relevant_repo_outranks_popular_unrelated_repo():
+    """Metadata and tree overlap beat raw star counts"""
+    candidates = [
+        {'name': 'big/web-framework', 'description': 'A popular web framework', 'language': 'JavaScript',
+         'size': 90000, 'stars': 50000, 'query_hits': 1},
+        {'name': 'someone/dispatch-ai', 'description': 'Emergency dispatch assistant', 'language': 'Python',
+         'size': 120, 'stars': 3, 'query_hits': 3},
+    ]
+    trees = {
+        'big/web-framework': ['lib/router.js', 'index.js'],
+        'someone/dispatch-ai': ['server/main.py', 'client/app.js', 'README.md'],
+    }
+
+    ranked = CandidateRanker().rank(
+        candidates, ['dispatch', 'emergency'], target_language='Python',
+        target_paths={'server/main.py', 'client/app.js'}, target_size_kb=100,
+        fetch_tree_paths=trees.get
+    )
+
+    assert [c['name'] for c in ranked] == ['someone/dispatch-ai', 'big/web-framework']
+    assert ranked[0]['tree_overlap'] == 1.0
+    assert ranked[1]['tree_overlap'] == 0.0
+
+def test_tree_checks_are_capped():
+    """Only the top metadata-ranked candidates cost a tree-listing call"""
+    calls = []
+    candidates = [{'name': f'user/repo{i}', 'stars': i, 'size': 10} for i in range(10)]
+    CandidateRanker(max_tree_checks=3).rank(candidates, [], target_paths={'a.py'},
+                                            fetch_tree_paths=lambda name: calls.append(name) or [])
+    assert len(calls) == 3
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for resumable runs with the checkpoint journal
+"""
+
+import pytest
+
+def test_resume_skips_completed_work_and_rebuilds_results(tmp_path, make_repo, make_fake_detector):
+    """A crashed run resumes without refetching or rescoring journaled repositories"""
+    from checkpoint_journal import CheckpointJournal
+
+    copied = [f"def handler_{i}(request):\n    return request.json()['{i}'] * 42\n" for i in range(2)]
+    repos = {"me/target": make_repo("me/target", copied)}
+    for i in range(4):
+        repos[f"other/copy{i}"] = make_repo(f"other/copy{i}", copied[:1] + [f"x = {i}\n" * 20])
+    journal_path = str(tmp_path / "run.jsonl")
+
+    # First run dies while fetching the third candidate
+    crashing = make_fake_detector(repos)
+    fetched = []
+    def crash_on_third(name):
+        if name == "other/copy2":
+            raise RuntimeError("rate limited")
+        fetched.append(name)
+        return repos[name]
+    crashing.fetch_repo_contents = crash_on_third
+    crashing.journal = CheckpointJournal(journal_path)
+    with pytest.raises(RuntimeError):
+        crashing.detect_plagiarism_github_wide("me/target")
+    crashing.journal.close()
+    assert fetched == ["me/target", "other/copy0", "other/copy1"]
+
+    # Resume: only the remaining candidates hit the fetch layer
+    resumed = make_fake_detector(repos)
+    refetched = []
+    resumed.fetch_repo_contents = lambda name: refetched.append(name) or repos[name]
+    resumed.search_github_repositories = lambda *args, **kwargs: pytest.fail("search should be replayed")
+    resumed.journal = CheckpointJournal(journal_path, resume=True)
+    results = resumed.detect_plagiarism_github_wide("me/target")
+    resumed.journal.close()
+    assert refetched == ["other/copy2", "other/copy3"]
+
+    clean = make_fake_detector(repos).detect_plagiarism_github_wide("me/target")
+    assert results["comparisons"] == clean["comparisons"]
+    assert results["summary"] == clean["summary"]
+
+def test_journal_ignores_torn_last_line_and_rejects_other_targets(tmp_path):
+    from checkpoint_journal import CheckpointJournal
+
+    path = tmp_path / "run.jsonl"
+    journal = CheckpointJournal(str(path))
+    journal.start_run("https://github.com/me/target")
+    journal.record_comparison("other/repo", ([], 0.5, 1))
+    journal.close()
+    with open(path, 'a') as f:
+        f.write('{"type": "comparison", "repo": "oth')
+
+    journal = CheckpointJournal(str(path), resume=True)
+    assert journal.comparison("other/repo") == ([], 0.5, 1)
+    with pytest.raises(ValueError):
+        journal.start_run("https://github.com/someone/else")
+    journal.record_comparison("third/repo", ([], 1.0, 1))
+    journal.close()
+    assert CheckpointJournal(str(path), resume=True).comparison("third/repo") == ([], 1.0, 1)
+
+def test_resume_rejects_a_journal_written_with_other_options(tmp_path, make_repo, make_fake_detector):
+    """Unscored decide-fast comparisons are never replayed into a full run"""
+    from checkpoint_journal import CheckpointJournal
+
+    copied = [f"def handler_{i}(request):\n    return request.json()['{i}'] * 42\n" for i in range(5)]
+    repos = {"me/target": make_repo("me/target", copied)}
+    for i in range(3):
+        repos[f"other/copy{i}"] = make_repo(f"other/copy{i}", copied)
+    journal_path = str(tmp_path / "run.jsonl")
+
+    triage = make_fake_detector(repos)
+    triage.journal = CheckpointJournal(journal_path)
+    triage.detect_plagiarism_github_wide("me/target", decide_fast=True)
+    triage.journal.close()
+
+    full = make_fake_detector(repos)
+    full.journal = CheckpointJournal(journal_path, resume=True)
+    with pytest.raises(ValueError, match="options"):
+        full.detect_plagiarism_github_wide("me/target")
+    full.journal.close()
+
+    again = make_fake_detector(repos)
+    again.journal = CheckpointJournal(journal_path, resume=True)
+    assert again.detect_plagiarism_github_wide("me/target", decide_fast=True)["summary"]["plagiarism_risk"] == "CRITICAL"
+    again.journal.close()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Test script for fingerprinting and the rare-snippet code-search planner
+"""
+
+from corpus_frequency import DocumentFrequencyTable
+from code_search import CodeSearchPlanner
+from fingerprints import fingerprint_content
+from github_wide_plagiarism_detector import FileInfo, RepoInfo
+
+TARGET_CODE = """
+def route_emergency_call(caller_location, triage_priority):
+    nearest_unit = find_nearest_ambulance(caller_location)
+    return dispatch_unit_with_priority(nearest_unit, triage_priority)
+
+def handle_request(request):
+    data = request.get_json()
+    return jsonify(data)
+"""
+
+def test_shared_code_shares_fingerprints():
+    """A copied block keeps fingerprints even when surrounded by other code"""
+    copied = "def unrelated():\n    pass\n" + TARGET_CODE + "\nprint('extra tail code here')\n"
+    original = {fp.hash for fp in fingerprint_content(TARGET_CODE)}
+    copy = {fp.hash for fp in fingerprint_content(copied)}
+    assert len(original & copy) >= len(original) // 2
+
+def test_planner_prefers_rare_snippets():
+    """Snippets made of corpus-common tokens lose to distinctive ones, and plans are stable"""
+    df_table = DocumentFrequencyTable()
+    for _ in range(50):
+        df_table.add_document(['handle', 'request', 'get_json', 'jsonify', 'data'])
+    target = RepoInfo("https://github.com/me/target", "me/target",
+                      [FileInfo("server/dispatch.py", TARGET_CODE, "h", len(TARGET_CODE), 8)], 1, 8)
+
+    planner = CodeSearchPlanner(df_table, max_queries=2)
+    plan = planner.plan(target, language="Python")
+
+    assert plan, "expected at least one planned query"
+    assert all('jsonify' not in p['phrase'] for p in plan)
+    assert plan[0]['query'].endswith('language:Python')
+    assert plan == planner.plan(target, language="Python")
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Tests for all-pairs collusion clustering
+"""
+
+import pytest
+
+@pytest.fixture
+def make_submission(make_repo):
+    def build(name, seed, copied=()):
+        own = [f"def solve_{seed}_{i}(grid):\n    total_{seed} = compute_{seed}(grid, {i})\n"
+               f"    return normalize_{seed}_{i}(total_{seed}) + offset_{seed}\n" for i in range(3)]
+        return make_repo(name, own + list(copied))
+    return build
+
+def test_clusters_connect_copying_submissions_only(make_submission):
+    """Submissions sharing code form clusters; boilerplate shared by everyone does not pair anyone"""
+    from collusion_clustering import find_collusion
+
+    stolen = [f"def shared_pipeline_{i}(frames):\n    cleaned = denoise_frames(frames, level={i})\n"
+              f"    return classify_cleaned_frames(cleaned, model_registry)\n" for i in range(4)]
+    boilerplate = ["def main():\n    app = create_application(config)\n    app.run(host, port, debug)\n"]
+    repos = [make_submission("a/one", 1, stolen[:3] + boilerplate),
+             make_submission("b/two", 2, stolen[1:] + boilerplate),
+             make_submission("c/three", 3, stolen[:2] + boilerplate)]
+    repos += [make_submission(f"x/solo{i}", 10 + i, boilerplate) for i in range(8)]
+
+    results = find_collusion(repos, threshold=0.2, min_repo_cutoff=3)
+    assert [cluster["members"] for cluster in results["clusters"]] == [["a/one", "b/two", "c/three"]]
+    assert all("x/" not in name for edge in results["edges"] for name in edge["repos"])
+    top = results["edges"][0]["file_pairs"][0]
+    assert top["files"][0].startswith("file_")
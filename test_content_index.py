@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Test script for the corpus-wide content hash index
+"""
+
+from content_index import ContentHashIndex
+
+def test_duplicates_found_on_ingest_regardless_of_extension(make_repo):
+    """Identical content is reported even when names and extensions differ"""
+    target = make_repo("me/target", [("server/main.py", "print('dispatch')"), ("app.js", "let x = 1")])
+    found = []
+    index = ContentHashIndex(on_identical=lambda target_file, location: found.append(location.path))
+    index.set_target(target)
+
+    duplicates = index.add_repo(make_repo("them/original", [("backend/copy.txt", "print('dispatch')"),
+                                                            ("other.js", "let y = 2")]))
+
+    assert [(t.path, loc.path) for t, loc in duplicates] == [("server/main.py", "backend/copy.txt")]
+    assert found == ["backend/copy.txt"]
+
+def test_find_duplicates_across_whole_corpus(make_repo):
+    """One lookup per target file finds copies in every ingested repository"""
+    target = make_repo("me/target", [("main.py", "shared code")])
+    index = ContentHashIndex()
+    index.add_repo(target)
+    index.add_repo(make_repo("a/one", [("x.py", "shared code")]))
+    index.add_repo(make_repo("b/two", [("y.py", "shared code"), ("z.py", "unique")]))
+
+    repos = sorted(loc.repo for _, loc in index.find_duplicates(target))
+    assert repos == ["a/one", "b/two"]
+    assert index.stats()["repositories"] == 3
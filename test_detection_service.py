@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the long-running detection service
+"""
+
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+def api(url, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    with urllib.request.urlopen(urllib.request.Request(url, data=data)) as response:
+        return response.status, json.loads(response.read())
+
+def wait_for(url, job_id):
+    for _ in range(200):
+        status, job = api(f"{url}/jobs/{job_id}")
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError("job did not finish")
+
+def test_jobs_run_over_http_and_reuse_the_warm_repo_cache(make_repo, make_fake_detector):
+    """A second target only fetches repositories the warm cache has not seen"""
+    from detection_service import DetectionService
+
+    copied = [f"def handler_{i}(request):\n    return request.json()['{i}'] * 42\n" for i in range(2)]
+    repos = {"me/target": make_repo("me/target", copied),
+             "other/copy0": make_repo("other/copy0", copied),
+             "other/copy1": make_repo("other/copy1", copied[:1])}
+    detector = make_fake_detector(repos)
+    fetched = []
+    detector.fetch_repo_contents = lambda name: fetched.append(name) or repos.get(name)
+
+    service = DetectionService(detector).start(port=0)
+    try:
+        status, job = api(f"{service.address}/jobs", {"target_repo": "https://github.com/me/target"})
+        assert status == 202 and job["status"] in ("queued", "running", "done")
+        first = wait_for(service.address, job["id"])
+        assert first["summary"]["plagiarism_risk"] == "HIGH" and first["progress"]["done"] == 2
+
+        _, second = api(f"{service.address}/jobs", {"target_repo": "other/copy0"})
+        assert wait_for(service.address, second["id"])["status"] == "done"
+        assert sorted(fetched) == ["me/target", "other/copy0", "other/copy1"]  # nothing refetched
+
+        _, results = api(f"{service.address}/jobs/{job['id']}/results")
+        assert len(results["identical_files"]) == 3
+        _, events = api(f"{service.address}/jobs/{job['id']}/events?since=1")
+        assert events[0]["seq"] == 2 and events[-1]["event"] == "run_complete"
+        with pytest.raises(urllib.error.HTTPError) as bad_since:
+            api(f"{service.address}/jobs/{job['id']}/events?since=latest")
+        assert bad_since.value.code == 400 and "since" in json.loads(bad_since.value.read())["error"]
+        _, health = api(f"{service.address}/health")
+        assert health["cached_repos"] == 3 and health["jobs"] == {"done": 2}
+    finally:
+        service.stop()
+
+def test_metrics_endpoint_exposes_prometheus_text(make_repo, make_fake_detector):
+    """Stage histograms and counters accumulate across jobs next to queue and cache gauges"""
+    from detection_service import DetectionService
+
+    copied = [f"def handler_{i}(request):\n    return request.json()['{i}'] * 42\n" for i in range(2)]
+    repos = {"me/target": make_repo("me/target", copied), "other/copy0": make_repo("other/copy0", copied)}
+    service = DetectionService(make_fake_detector(repos)).start(port=0)
+    try:
+        for target in ("me/target", "other/copy0"):
+            _, job = api(f"{service.address}/jobs", {"target_repo": target})
+            wait_for(service.address, job["id"])
+        with urllib.request.urlopen(f"{service.address}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            text = response.read().decode()
+    finally:
+        service.stop()
+
+    samples = dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+    assert samples['plagiarism_stage_seconds_count{stage="score"}'] == "1"  # the second job skips itself
+    assert samples['plagiarism_stage_seconds_bucket{le="+Inf",stage="fetch"}'] == "2"
+    assert samples["plagiarism_file_pairs_compared_total"] == "4"
+    assert samples["plagiarism_jobs_queued"] == "0" and samples['plagiarism_jobs{status="done"}'] == "2"
+    assert float(samples['plagiarism_cache_hit_ratio{cache="repo"}']) == pytest.approx(1 / 3, abs=1e-6)
+    assert float(samples["plagiarism_scoring_pairs_per_second"]) > 0
+    assert samples["plagiarism_fetches_in_flight"] == "0"
+
+def test_warm_entries_expire_and_refresh_jobs_refetch_the_target(make_repo, make_fake_detector):
+    """Stale repositories are refetched after the TTL or on request; blob caches stay bounded"""
+    from detection_service import BlobCache, DetectionService, RepoCache
+
+    cache = RepoCache(ttl=0.05)
+    cache["me/target"] = "info"
+    assert cache.get("me/target") == "info"
+    time.sleep(0.1)
+    assert cache.get("me/target") is None and cache.expired == 1 and len(cache) == 0
+
+    blobs = BlobCache(max_blobs=2)
+    for sha in ("a", "b", "c"):
+        blobs[sha] = sha.upper()
+    assert "a" not in blobs and blobs.get("c") == "C" and len(blobs) == 2
+
+    copied = [f"def handler_{i}(request):\n    return request.json()['{i}'] * 42\n" for i in range(2)]
+    repos = {"me/target": make_repo("me/target", copied), "other/copy0": make_repo("other/copy0", copied)}
+    detector = make_fake_detector(repos)
+    fetched = []
+    detector.fetch_repo_contents = lambda name: fetched.append(name) or repos.get(name)
+
+    service = DetectionService(detector).start(port=0)
+    try:
+        for body in ({"target_repo": "me/target"}, {"target_repo": "me/target"},
+                     {"target_repo": "me/target", "refresh": True}):
+            _, job = api(f"{service.address}/jobs", body)
+            assert wait_for(service.address, job["id"])["status"] == "done"
+        assert job["refresh"] is True
+        assert fetched == ["me/target", "other/copy0", "me/target"]
+    finally:
+        service.stop()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Tests for structured run events
+"""
+
+import io
+import json
+
+def test_quiet_run_keeps_console_short_and_sinks_complete(tmp_path, make_repo, make_fake_detector):
+    """Quiet mode shows findings and throttled progress; sinks still get every event"""
+    from events import EventStream, NDJSONEventSink
+
+    copied = [f"def handler_{i}(request):\n    return request.json()['{i}'] * 42\n" for i in range(2)]
+    repos = {"me/target": make_repo("me/target", copied)}
+    for i in range(4):
+        repos[f"other/copy{i}"] = make_repo(f"other/copy{i}", copied[:1])
+
+    console = io.StringIO()
+    detector = make_fake_detector(repos)
+    detector.events = EventStream(quiet=True, progress_interval=60, stream=console)
+    received = []
+    detector.events.add_sink(received.append)
+    sink = detector.events.add_sink(NDJSONEventSink(str(tmp_path / "events.ndjson")))
+    detector.detect_plagiarism_github_wide("me/target")
+    sink.close()
+
+    lines = console.getvalue().splitlines()
+    assert [line for line in lines if line.startswith("⏳")] == ["⏳ compare: 1/4", "⏳ compare: 4/4"]
+    assert sum("is identical to" in line for line in lines) == 4
+    assert not any("Fetching repository" in line for line in lines)
+
+    progress = [event for event in received if event["event"] == "progress"]
+    assert [event["done"] for event in progress] == [1, 2, 3, 4]
+    assert received[-1]["event"] == "run_complete" and received[-1]["summary"]["total_identical_files"] == 4
+    written = [json.loads(line) for line in (tmp_path / "events.ndjson").read_text().splitlines()]
+    assert [event["event"] for event in written] == [event["event"] for event in received]
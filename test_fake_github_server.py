@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+End-to-end tests of the fetch layers against the local fake GitHub server
+"""
+
+import requests
+
+from fake_github_server import FakeGitHubServer, git_object_sha
+
+def test_fake_server_endpoints(tmp_path, write_fixtures, copied_files):
+    """Contents, trees, blobs, raw and search responses have GitHub's shape"""
+    root = write_fixtures(tmp_path, {"me/target": copied_files})
+    with FakeGitHubServer(root) as server:
+        base = server.api_base
+        listing = requests.get(f"{base}/repos/me/target/contents").json()
+        assert listing[0]['type'] == 'dir' and listing[0]['path'] == 'src'
+
+        tree = requests.get(f"{base}/repos/me/target/git/trees/HEAD", params={'recursive': 1}).json()['tree']
+        blob = next(entry for entry in tree if entry['path'] == 'src/ambulance.py')
+        assert blob['sha'] == git_object_sha('blob', copied_files['src/ambulance.py'].encode())
+
+        raw = requests.get(f"{base}/raw/me/target/main/src/firetruck.py")
+        assert raw.text == copied_files['src/firetruck.py']
+
+        hits = requests.get(f"{base}/search/code", params={'q': '"payload request json" language:Python'}).json()
+        assert len(hits['items']) == 3
+
+        response = requests.get(f"{base}/search/repositories", params={'q': 'dispatchparamedic'})
+        assert response.json()['items'][0]['full_name'] == 'me/target'
+        assert response.headers['X-RateLimit-Resource'] == 'search'
+
+        server.inject_403()
+        assert requests.get(f"{base}/repos/me/target").status_code == 403
+        assert requests.get(f"{base}/repos/me/target").status_code == 200
+
+def test_sync_and_async_detectors_against_fake_server(tmp_path, write_fixtures, copied_files):
+    """Both detectors fetch the same files; the async run finds the copied repository"""
+    from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector
+    from async_github_detector import AsyncGitHubWideDetector
+
+    root = write_fixtures(tmp_path, {
+        "me/target": copied_files,
+        "other/copy": dict(copied_files, **{"README.md": "copy"}),
+        "other/unrelated": {"app.py": "print('something else entirely, nothing shared here at all')\n"},
+    })
+    with FakeGitHubServer(root, reset_seconds=1) as server:
+        sync_info = GitHubWidePlagiarismDetector(api_base=server.api_base).fetch_repo_contents("me/target")
+
+        detector = AsyncGitHubWideDetector(api_base=server.api_base, scoring_executor="thread",
+                                           rate_limits={'search': (100.0, 100)})
+        server.inject_403()  # the first request is retried after the rate-limit reset
+        results = detector.detect_plagiarism_github_wide("https://github.com/me/target")
+
+    async_info_paths = sorted(results["identical_files"][i]["target_file"] for i in range(3))
+    assert sorted(f.path for f in sync_info.files) == async_info_paths
+    assert {m["repo"] for m in results["identical_files"]} == {"other/copy"}
+    assert results["summary"]["plagiarism_risk"] == "HIGH"
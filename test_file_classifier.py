@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test script for the vendored/generated file classifier
+"""
+
+import os
+import tempfile
+
+from file_classifier import FileClassifier
+
+def test_classify_paths():
+    """Lockfiles, minified bundles and build outputs are excluded by path alone"""
+    classifier = FileClassifier()
+    assert classifier.classify_path("package-lock.json").category == "lockfile"
+    assert classifier.classify_path("static/js/app.min.js").category == "minified"
+    assert classifier.classify_path("frontend/dist/index.js").category == "build_output"
+    assert classifier.classify_path("proto/service_pb2.py").category == "generated"
+    assert classifier.classify_path("server/main.py") is None
+
+def test_classify_content():
+    """Header markers and line-length statistics catch files with ordinary names"""
+    classifier = FileClassifier()
+    generated = "# Code generated by protoc. DO NOT EDIT.\nimport os\n"
+    assert classifier.classify_content("api.py", generated).category == "generated"
+
+    minified = "var a=1;" * 500
+    assert classifier.classify_content("bundle.js", minified).category == "minified"
+
+    normal = "def dispatch():\n    return 1\n" * 20
+    assert classifier.classify_content("dispatch.py", normal) is None
+
+def test_local_scan_reports_exclusions():
+    """The local scanner skips excluded files and reports them separately"""
+    from enhanced_plagiarism_detector import EnhancedPlagiarismDetector
+
+    with tempfile.TemporaryDirectory() as repo_path:
+        os.makedirs(os.path.join(repo_path, "dist"))
+        with open(os.path.join(repo_path, "dist", "app.js"), "w") as f:
+            f.write("console.log('built');\n" * 10)
+        with open(os.path.join(repo_path, "app.min.js"), "w") as f:
+            f.write("var a=1;" * 100)
+        with open(os.path.join(repo_path, "main.py"), "w") as f:
+            f.write("def dispatch_emergency():\n    return 'dispatched'\n" * 3)
+
+        detector = EnhancedPlagiarismDetector(config_file="missing_config.json")
+        repo_info = detector.fetch_local_repo_contents(repo_path)
+
+        assert [f.path for f in repo_info.files] == ["main.py"]
+        excluded = {entry['path']: entry['category'] for entry in repo_info.excluded_files}
+        assert excluded == {"dist": "build_output", "app.min.js": "minified"}
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent cat-file object reader and object-database ingestion of local clones
+"""
+
+import os
+
+def test_reader_streams_objects_through_one_process(tmp_path, make_git_repo):
+    """Single and pipelined reads share one cat-file process; missing objects come back empty"""
+    from git_object_reader import GitObjectReader, GitObjectReaderPool
+    from subtree_matching import local_tree_listing
+
+    files = {f"src/module_{i}.py": f"VALUE_{i} = {i}\n" * (i + 1) for i in range(300)}
+    repo = make_git_repo(tmp_path / "repo", files)
+    shas = {entry['path']: entry['sha'] for entry in local_tree_listing(repo) if entry['type'] == 'blob'}
+
+    pool = GitObjectReaderPool()
+    reader = pool.get(repo)
+    assert pool.get(os.path.join(repo, ".")) is reader
+    kind, data = reader.read(shas["src/module_7.py"])
+    pid = reader._process.pid
+    assert (kind, data.decode()) == ("blob", files["src/module_7.py"])
+    assert reader.read("HEAD:src/module_2.py") == ("blob", files["src/module_2.py"].encode())
+    assert reader.read("0" * 40) == (None, None)
+
+    blobs = reader.read_blobs(list(shas.values()) + ["0" * 40, "HEAD^{tree}"])
+    assert reader._process.pid == pid
+    assert len(blobs) == 300
+    assert all(blobs[shas[path]].decode() == content for path, content in files.items())
+    pool.close()
+    assert reader._process is None
+
+    with GitObjectReader(repo) as fresh:
+        assert fresh.read("HEAD")[0] == "commit"
+
+def test_local_clone_ingestion_reads_committed_objects(tmp_path, make_git_repo):
+    """Git clones are read at HEAD from the object database with the walker's filters; plain directories are walked"""
+    from enhanced_plagiarism_detector import EnhancedPlagiarismDetector
+
+    handler = "def dispatch_emergency(call):\n    return call.route_to_nearest_unit()\n"
+    repo = make_git_repo(tmp_path / "clone", {
+        "app/dispatch.py": handler,
+        "app/tiny.py": "x = 1\n",
+        "node_modules/lib/index.js": "module.exports = function () { return 'vendored code here'; };\n",
+        ".github/workflows/ci.yml": "name: ci\non: push\njobs: {build: {runs-on: ubuntu-latest}}\n",
+    })
+    with open(os.path.join(repo, "app", "dispatch.py"), 'a') as f:
+        f.write("# uncommitted edit\n")
+
+    detector = EnhancedPlagiarismDetector(config_file="missing_config.json")
+    try:
+        repo_info = detector.fetch_local_repo_contents(repo)
+        assert [(f.path, f.content) for f in repo_info.files] == [("app/dispatch.py", handler)]
+        assert {entry['path']: entry['category'] for entry in repo_info.excluded_files} == {"node_modules": "vendored"}
+        assert detector.metrics.snapshot()["counters"]["blobs_read"] == 1
+
+        plain = tmp_path / "plain"
+        plain.mkdir()
+        (plain / "main.py").write_text(handler)
+        assert [f.path for f in detector.fetch_local_repo_contents(str(plain)).files] == ["main.py"]
+
+        # A clone whose HEAD resolves to no commit (e.g. before the first one) is walked like a plain directory
+        unborn = make_git_repo(tmp_path / "unborn", {"main.py": handler})
+        with open(os.path.join(unborn, ".git", "HEAD"), 'w') as f:
+            f.write("ref: refs/heads/not-yet-created\n")
+        assert [f.path for f in detector.fetch_local_repo_contents(unborn).files] == ["main.py"]
+    finally:
+        detector.object_readers.close()
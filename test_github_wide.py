@@ -44,6 +44,39 @@ def test_github_wide_detector():
         print(f"❌ Test failed: {e}")
         return False
 
+def test_decide_fast_stops_after_critical_verdict(make_repo, make_fake_detector):
+    """Decide-fast mode stops fetching once CRITICAL is reached; full mode does not"""
+    copied = [f"def handler_{i}():\n    return {i} * 42\n" for i in range(6)]
+    repos = {"me/target": make_repo("me/target", copied)}
+    for i in range(5):
+        repos[f"other/copy{i}"] = make_repo(f"other/copy{i}", copied)
+
+    fast = make_fake_detector(repos).detect_plagiarism_github_wide("me/target", decide_fast=True)
+    assert fast["summary"]["plagiarism_risk"] == "CRITICAL"
+    assert fast["summary"]["terminated_early"]
+    assert fast["summary"]["total_repositories_compared"] == 1
+    assert fast["summary"]["candidates_skipped"] == 4
+
+    full = make_fake_detector(repos).detect_plagiarism_github_wide("me/target")
+    assert full["summary"]["mode"] == "full"
+    assert full["summary"]["total_repositories_compared"] == 5
+
+def test_keyword_extraction_is_ranked_and_stable(make_repo):
+    """Keywords are ranked by TF-IDF and identical across runs"""
+    from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector
+
+    repo = make_repo("me/target", [
+        "def dispatch_emergency():\n    pass\ndef dispatch_emergency():\n    pass\n",
+        "class Ambulance:\n    pass\nconst handler = 1\n",
+    ])
+    detector = GitHubWidePlagiarismDetector()
+    for _ in range(20):
+        detector.df_table.add_document(["handler"])
+
+    keywords = detector.extract_search_keywords(repo)
+    assert keywords == detector.extract_search_keywords(repo)
+    assert keywords.index("ambulance") < keywords.index("handler")
+
 def main():
     print("🔍 GitHub-Wide Plagiarism Detector Test")
     print("=" * 50)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for commit-history forensics on local clones and API commit metadata
+"""
+
+import io
+import os
+import json
+import subprocess
+import contextlib
+from datetime import datetime, timezone
+
+from fake_github_server import FakeGitHubServer
+
+BASE_TIME = 1718877600  # 2024-06-20T10:00:00Z, main.py's rewrite base time
+
+def make_clone(path, commits):
+    """Create a git repository with (author, author_time, committer_time) commits"""
+    subprocess.run(["git", "init", "-q", "-b", "main", str(path)], check=True)
+    for i, (author, author_time, committer_time) in enumerate(commits):
+        with open(os.path.join(path, f"step_{i}.py"), 'w') as f:
+            f.write(f"STEP = {i}\n")
+        env = dict(os.environ, GIT_AUTHOR_NAME=author, GIT_AUTHOR_EMAIL=f"{author}@example.com",
+                   GIT_COMMITTER_NAME=author, GIT_COMMITTER_EMAIL=f"{author}@example.com",
+                   GIT_AUTHOR_DATE=f"@{author_time} +0000", GIT_COMMITTER_DATE=f"@{committer_time} +0000")
+        subprocess.run(["git", "-C", str(path), "add", "-A"], check=True, env=env)
+        subprocess.run(["git", "-C", str(path), "commit", "-q", "-m", f"step {i}"], check=True, env=env)
+    return str(path)
+
+def test_rewritten_clone_is_flagged_and_natural_history_is_not(tmp_path):
+    """main.py's 3-minute spacing plus filter-branch backup refs; a messy two-person history stays LOW"""
+    from history_forensics import analyze_local_repos
+
+    forged = make_clone(tmp_path / "forged", [("thief", BASE_TIME + i * 180, BASE_TIME + i * 180) for i in range(12)])
+    subprocess.run(["git", "-C", forged, "update-ref", "refs/original/refs/heads/main", "HEAD"], check=True)
+    offsets = [0, 2400, 9100, 9700, 30000, 31337, 86000, 90050]
+    natural = make_clone(tmp_path / "natural", [("alice" if i % 3 else "bob", BASE_TIME + o, BASE_TIME + o + 30)
+                                                for i, o in enumerate(offsets)])
+    (tmp_path / "not-a-repo").mkdir()
+
+    history = analyze_local_repos([forged, natural, str(tmp_path / "not-a-repo")])
+    assert set(history) == {forged, natural}
+
+    signals = {flag["signal"] for flag in history[forged]["flags"]}
+    assert signals == {"uniform_spacing", "compressed_history", "rewrite_artifacts"}
+    assert history[forged]["history_risk"] == "CRITICAL" and history[forged]["commits"] == 12
+    assert "11/11 commit gaps are exactly 3min" in history[forged]["flags"][0]["detail"]
+    assert history[natural]["flags"] == [] and history[natural]["history_risk"] == "LOW"
+
+def test_date_mismatch_and_collapsed_committer_dates():
+    """A rebase-style rewrite keeps spread author dates but stamps one committer date"""
+    from history_forensics import CommitRecord, analyze_history
+
+    authored = [BASE_TIME - offset for offset in (800000, 640000, 500500, 321000, 90000, 7200)]
+    commits = [CommitRecord(f"{i:040x}", "a", "a@x", author_time, "a", "a@x", BASE_TIME)
+               for i, author_time in enumerate(authored)]
+    analysis = analyze_history(commits, event_window=(BASE_TIME - 3600, BASE_TIME + 86400))
+    assert {flag["signal"] for flag in analysis["flags"]} == {"date_mismatch", "collapsed_committer_dates"}
+    assert analysis["history_risk"] == "MEDIUM" and analysis["commits_before_event"] == 6
+
+def test_github_wide_report_includes_history_section(tmp_path, write_fixtures, copied_files):
+    """API commit metadata is paginated, analyzed and rendered as a report section"""
+    from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector
+
+    def api_commit(i):
+        date = datetime.fromtimestamp(BASE_TIME + i * 180, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        signature = {'name': 'thief', 'email': 'thief@example.com', 'date': date}
+        return {'sha': f"{i:040x}", 'parents': [{'sha': f"{i - 1:040x}"}] if i else [],
+                'commit': {'author': signature, 'committer': signature, 'message': f"step {i}"}}
+
+    root = write_fixtures(tmp_path, {"me/target": copied_files})
+    with open(os.path.join(root, "repos.json"), 'w') as f:
+        json.dump({"me/target": {"commits": [api_commit(i) for i in reversed(range(150))]}}, f)
+
+    with FakeGitHubServer(root) as server:
+        detector = GitHubWidePlagiarismDetector(api_base=server.api_base)
+        detector.history_forensics = True
+        detector.search_github_repositories = lambda *args, **kwargs: []
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = detector.detect_plagiarism_github_wide("https://github.com/me/target")
+        assert server.request_counts()["commits"] == 2  # 100 + 50 commits
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            detector.generate_github_wide_report(results)
+
+    analysis = results["history"]["me/target"]
+    assert analysis["commits"] == 150 and analysis["history_risk"] == "HIGH"
+    assert "🕰️  COMMIT HISTORY FORENSICS:" in output.getvalue()
+    assert "uniform_spacing: 149/149 commit gaps are exactly 3min" in output.getvalue()
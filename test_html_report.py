@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Tests for the HTML evidence report
+"""
+
+def test_html_index_is_compact_and_diffs_load_from_chunks(tmp_path, make_repo, make_fake_detector):
+    """File contents live only in the lazily loaded chunks, never in the index page"""
+    from checkpoint_journal import CheckpointJournal
+
+    copied = [f"def handler_{i}(request):\n    return request.json()['{i}'] * 42  # </script>\n" for i in range(30)]
+    repos = {"me/target": make_repo("me/target", copied),
+             "other/copy": make_repo("other/copy", copied[:10] + [c.replace("42", "43") for c in copied[10:]])}
+    detector = make_fake_detector(repos)
+    detector.journal = CheckpointJournal(str(tmp_path / "run.jsonl"))
+    results = detector.detect_plagiarism_github_wide("me/target")
+    index_path = detector.generate_github_wide_html_report(results, str(tmp_path / "html"))
+    detector.journal.close()
+
+    pairs = len(results['identical_files']) + len(results['suspicious_matches'])
+    index = open(index_path).read()
+    assert "request.json()" not in index
+    assert index.count('data-pair=') == pairs
+
+    chunks = list((tmp_path / "html" / "chunks").iterdir())
+    assert len(chunks) == -(-pairs // 25)  # 25 pairs per chunk
+    first = (tmp_path / "html" / "chunks" / "chunk_0.js").read_text()
+    assert first.startswith("loadChunk(0, ") and "</script>" not in first
+    assert '"equal", 1, "def handler_0(request):"' in first
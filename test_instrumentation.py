@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for run instrumentation
+"""
+
+def test_run_reports_stage_metrics_and_profile(tmp_path, make_repo, make_fake_detector):
+    """Every stage of a run lands in results["metrics"], and the profiler dumps hot spots"""
+    from instrumentation import RunProfiler
+
+    copied = [f"def handler_{i}(request):\n    return request.json()['{i}'] * 42\n" for i in range(3)]
+    repos = {"me/target": make_repo("me/target", copied),
+             "other/copy": make_repo("other/copy", [c.replace("42", "43") for c in copied])}
+    detector = make_fake_detector(repos)
+    with RunProfiler() as profiler:
+        results = detector.detect_plagiarism_github_wide("me/target")
+    profiler.dump(str(tmp_path / "profile.txt"))
+
+    metrics = results["metrics"]
+    assert {"fetch", "search", "score", "normalize", "similarity"} <= set(metrics["timers"])
+    assert metrics["timers"]["fetch"]["count"] == 2
+    assert metrics["timers"]["fetch"]["buckets"]["+Inf"] == 2
+    assert metrics["counters"]["repos_fetched"] == 2
+    assert metrics["counters"]["file_pairs_compared"] == 9
+    assert metrics["histograms"]["files_per_repo"]["sum"] == 6
+
+    detector.generate_github_wide_report(results, str(tmp_path / "report.txt"))
+    assert "RUN METRICS:" in (tmp_path / "report.txt").read_text()
+    assert detector.metrics.snapshot()["timers"]["report"]["count"] == 1
+
+    assert "detect_plagiarism_github_wide" in (tmp_path / "profile.txt").read_text()
+    assert (tmp_path / "profile.txt.prof").exists()
+
+def test_merge_accumulates_runs_and_gauges_survive_reset():
+    """Finished runs merge into service totals; reset() keeps current-state gauges"""
+    from instrumentation import Metrics, format_prometheus
+
+    run, totals = Metrics(), Metrics()
+    for _ in range(2):
+        run.incr("api_requests", 3)
+        run.observe_time("fetch", 0.2)
+        run.set_gauge("rate_limit_remaining", 41, bucket="core")
+        with run.track("fetches_in_flight"):
+            assert run.gauges["fetches_in_flight"][()] == 1
+        totals.merge(run)
+        run.reset()
+
+    assert totals.counters == {"api_requests": 6} and totals.timers["fetch"].count == 2
+    assert run.counters == {} and run.gauges["rate_limit_remaining"] == {(("bucket", "core"),): 41}
+    text = format_prometheus(dict(totals.snapshot(), gauges=run.snapshot()["gauges"]))
+    assert 'plagiarism_stage_seconds_bucket{le="0.25",stage="fetch"} 2' in text
+    assert "plagiarism_api_requests_total 6" in text
+    assert 'plagiarism_rate_limit_remaining{bucket="core"} 41' in text
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for ref-aware source specs and multi-ref scans against the fake GitHub server
+"""
+
+from fake_github_server import FakeGitHubServer
+
+FEATURE_ONLY = "def feature_branch_router(calls):\n    return [call for call in calls if call.priority > 2]\n"
+
+def test_repo_specs_keep_the_ref():
+    """Branch, commit and file URLs keep their ref; plain repository URLs mean the default branch"""
+    from repo_spec import parse_repo_spec, format_repo_spec, repo_spec_url
+
+    assert parse_repo_spec("https://github.com/ka-reem/agenthacks-25/commits/stolen_rewritten") == \
+        ("ka-reem/agenthacks-25", "stolen_rewritten")
+    assert parse_repo_spec("https://github.com/me/app/tree/main/src") == ("me/app", "main")
+    assert parse_repo_spec("me/app@feature/login") == ("me/app", "feature/login")
+    assert parse_repo_spec("https://github.com/me/app/blob/v1.2/src/main.py") == ("me/app", "v1.2")
+    assert parse_repo_spec("github.com/me/app.git") == ("me/app", None)
+    assert parse_repo_spec("me/app@abc123") == ("me/app", "abc123")
+    assert parse_repo_spec("https://github.com/me/app/") == ("me/app", None)
+    assert format_repo_spec("me/app", "dev") == "me/app@dev"
+    assert repo_spec_url("me/app@dev") == "https://github.com/me/app/tree/dev"
+
+def test_branch_urls_fetch_the_branch_and_refs_share_blobs(tmp_path, write_fixtures, copied_files):
+    """A /commits/<branch> target is scanned at that branch; a multi-ref scan downloads shared blobs once"""
+    from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector
+    from async_github_detector import AsyncGitHubWideDetector
+
+    root = write_fixtures(tmp_path, {
+        "me/target": copied_files,
+        "me/target@feature": dict(copied_files, **{"src/router.py": FEATURE_ONLY}),
+        "other/copy": dict(copied_files, **{"README.md": "copy"}),
+    })
+    with FakeGitHubServer(root) as server:
+        detector = GitHubWidePlagiarismDetector(api_base=server.api_base)
+        default_info = detector.fetch_repo_contents(detector.get_repo_spec("https://github.com/me/target"))
+        feature_info = detector.fetch_repo_contents(detector.get_repo_spec("https://github.com/me/target/commits/feature"))
+        assert "src/router.py" not in {f.path for f in default_info.files}
+        assert "src/router.py" in {f.path for f in feature_info.files}
+        assert feature_info.name == "me/target@feature"
+        assert feature_info.url == "https://github.com/me/target/tree/feature"
+        # A link to a subdirectory scans the repository at that branch instead of failing
+        subdir_info = detector.fetch_repo_contents(detector.get_repo_spec("https://github.com/me/target/tree/feature/src"))
+        assert sorted(f.path for f in subdir_info.files) == sorted(f.path for f in feature_info.files)
+
+        server.reset_counters()
+        detector = AsyncGitHubWideDetector(api_base=server.api_base, scoring_executor="thread",
+                                           rate_limits={'search': (100.0, 100)})
+        scan = detector.scan_refs("https://github.com/me/target", ["main", "feature"])
+        blob_paths = [entry['path'] for entry in server.request_log if entry['kind'] == 'blobs']
+        tree_paths = [entry['path'] for entry in server.request_log if entry['kind'] == 'trees']
+
+    assert scan["blobs"] == {"total": 7, "unique": 4}
+    # Each blob is downloaded once across both refs (and the copy holding the same blobs)
+    assert len(blob_paths) == len(set(blob_paths)) == 4
+    # Tree listings prefetched for the scan are reused by the per-ref runs; the target is no candidate
+    assert sorted(tree_paths) == ['/repos/me/target/git/trees/feature', '/repos/me/target/git/trees/main',
+                                 '/repos/other/copy/git/trees/HEAD']
+    assert set(scan["refs"]) == {"main", "feature"}
+    assert all({m["repo"] for m in results["identical_files"]} == {"other/copy"} for results in scan["refs"].values())
+    assert scan["summary"]["main"] == scan["summary"]["feature"] == "HIGH"
+    assert detector.repo_cache is None
+
+def test_basic_and_simple_detectors_fetch_the_linked_branch(tmp_path, monkeypatch, write_fixtures, copied_files):
+    """The basic and simplified detectors scan a /commits/<branch> target at that branch"""
+    import github_wide_simple
+    from plagiarism_detector import PlagiarismDetector
+
+    root = write_fixtures(tmp_path, {
+        "me/target": copied_files,
+        "me/target@feature": {"router.py": FEATURE_ONLY},
+    })
+    with FakeGitHubServer(root) as server:
+        detector = PlagiarismDetector(api_base=server.api_base)
+        basic = detector.fetch_repo_contents("https://github.com/me/target/commits/feature")
+
+        monkeypatch.setattr(github_wide_simple, "GITHUB_API_URL", server.api_base)
+        spec = github_wide_simple.get_repo_info("https://github.com/me/target/commits/feature")
+        simple = github_wide_simple.fetch_repo_contents(spec)
+
+    assert [f.path for f in basic.files] == ["router.py"]
+    assert spec == "me/target@feature"
+    assert [f.path for f in simple.files] == ["router.py"]
+    assert simple.url == "https://github.com/me/target/tree/feature"
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Tests for the indexed results store
+"""
+
+def test_store_round_trips_results_and_answers_views(make_repo, make_fake_detector):
+    """Results survive the store unchanged and report views are simple queries"""
+    from results_store import ResultsStore
+
+    copied = [f"def handler_{i}(request):\n    return request.json()['{i}'] * 42\n" for i in range(3)]
+    repos = {"me/target": make_repo("me/target", copied)}
+    for i in range(3):
+        repos[f"other/copy{i}"] = make_repo(f"other/copy{i}", copied[:i] + [c.replace("42", "43") for c in copied[i:]])
+    results = make_fake_detector(repos).detect_plagiarism_github_wide("me/target")
+
+    store, run_id = ResultsStore.from_results(results)
+    assert store.to_results(run_id) == results
+
+    ranked = store.comparisons(run_id, order="risk")
+    assert [c['repo'] for c in ranked] == ["other/copy2", "other/copy1", "other/copy0"]
+    assert [c['repo'] for c in store.comparisons(run_id, risk_tier="SUSPICIOUS")] == ["other/copy0"]
+
+    drilldown = store.repo_drilldown(run_id, "other/copy1")
+    assert len(drilldown['identical_files']) == 1 and drilldown['risk_tier'] == "CRITICAL"
+    assert [group['repo'] for group in store.suspicious_by_repo(run_id)] == ["other/copy0", "other/copy1", "other/copy2"]
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming NDJSON results sink
+"""
+
+def test_streamed_run_rebuilds_to_in_memory_results(tmp_path, make_repo, make_fake_detector):
+    """Streaming keeps only counters in memory and the stream rebuilds the full results"""
+    from results_stream import ResultsStreamWriter, rebuild_results
+
+    copied = [f"def handler_{i}(request):\n    return request.json()['{i}'] * 42\n" for i in range(3)]
+    repos = {"me/target": make_repo("me/target", copied)}
+    for i in range(3):
+        repos[f"other/copy{i}"] = make_repo(f"other/copy{i}", copied[:i + 1])
+
+    in_memory = make_fake_detector(repos).detect_plagiarism_github_wide("me/target")
+
+    streaming = make_fake_detector(repos)
+    streaming.results_sink = ResultsStreamWriter(str(tmp_path / "results.ndjson"))
+    streamed = streaming.detect_plagiarism_github_wide("me/target")
+    streaming.results_sink.close()
+
+    assert streamed["comparisons"] == [] and streamed["identical_files"] == []
+    assert streamed["summary"] == in_memory["summary"]
+
+    rebuilt = rebuild_results(str(tmp_path / "results.ndjson"))
+    # Timings differ between the two runs; the work counted does not
+    assert rebuilt.pop("metrics")["counters"] == in_memory.pop("metrics")["counters"]
+    assert rebuilt == in_memory
+
+def test_enhanced_detector_streams_the_same_records(tmp_path, write_fixtures, copied_files):
+    """The comprehensive detector routes its result lists through the same sink"""
+    from enhanced_plagiarism_detector import EnhancedPlagiarismDetector
+    from results_stream import ResultsStreamWriter, rebuild_results
+
+    root = write_fixtures(tmp_path, {
+        "target": copied_files,
+        "copy": dict(copied_files, **{"node_modules/lib/index.js": "module.exports = 1;\n" * 5}),
+        "partial": {"src/ambulance.py": copied_files["src/ambulance.py"].replace("42", "41")},
+    })
+
+    def run(results_sink=None):
+        detector = EnhancedPlagiarismDetector(config_file="missing_config.json")
+        detector.target_repo = "https://github.com/me/target"
+        detector.comparison_repos = [str(tmp_path / "copy"), str(tmp_path / "partial")]
+        detector.fetch_repo_contents = lambda url: detector.fetch_local_repo_contents(str(tmp_path / "target"))
+        detector.fetch_tree_listing = lambda url: []
+        detector.scan_local_repositories = lambda: []
+        detector.history_forensics = False
+        detector.results_sink = results_sink
+        return detector.detect_plagiarism_comprehensive()
+
+    in_memory = run()
+    sink = ResultsStreamWriter(str(tmp_path / "results.ndjson"))
+    streamed = run(sink)
+    sink.close()
+
+    assert streamed["comparisons"] == [] and streamed["excluded_files"] == []
+    assert streamed["summary"] == in_memory["summary"]
+    assert in_memory["summary"]["total_identical_files"] == 3 and in_memory["summary"]["total_excluded_files"] == 1
+    rebuilt = rebuild_results(str(tmp_path / "results.ndjson"))
+    assert rebuilt.pop("metrics")["counters"] == in_memory.pop("metrics")["counters"]
+    assert rebuilt == in_memory
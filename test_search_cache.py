@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent search-response cache
+"""
+
+def test_search_cache_normalizes_and_paginates():
+    """Equivalent queries share cache entries, and warm pages never hit the network"""
+    from search_cache import SearchCache, cached_search
+
+    calls = []
+    def fetch_page(params):
+        calls.append(params['page'])
+        return {'items': [{'page': params['page']}] * (2 if params['page'] < 3 else 1)}
+
+    cache = SearchCache()
+    params = {'q': 'Dispatch  language:Python', 'per_page': 2}
+    first = cached_search(cache, fetch_page, "repositories", params, pages=5)
+    again = cached_search(cache, fetch_page, "repositories",
+                          {'q': 'language:python dispatch', 'per_page': 2}, pages=5)
+
+    assert len(first) == 5 and first == again
+    assert calls == [1, 2, 3]
+    assert cache.stats()['hits'] == 3
+
+def test_search_cache_ttl_and_eviction():
+    """Expired entries are misses and the cache stays within max_entries"""
+    from search_cache import SearchCache
+
+    cache = SearchCache(ttl_seconds=0, max_entries=2)
+    for i in range(4):
+        cache.put("code", f"query {i}", {'page': 1}, {'items': []})
+    assert cache._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0] == 2
+    assert cache.get("code", "query 3", {'page': 1}) is None
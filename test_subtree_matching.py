@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for tree-SHA subtree equality matching on local clones and the fetch path
+"""
+
+from fake_github_server import FakeGitHubServer
+
+def test_local_subtrees_match_by_tree_sha(tmp_path, make_git_repo, copied_files):
+    """A relocated copy of src/ is one maximal match; vendored trees and single files are not reported"""
+    from file_classifier import FileClassifier
+    from subtree_matching import local_tree_listing, match_subtrees
+
+    nested = dict(copied_files, **{"src/util/helpers.py": "def helper():\n    return 'shared helper'\n"})
+    vendored = {"node_modules/left-pad/index.js": "module.exports = 1\n", "node_modules/left-pad/a.js": "x\n"}
+    original = make_git_repo(tmp_path / "original", dict(nested, **vendored, **{"docs/one.md": "# docs\n"}))
+    copied = {f"app/{path}": content for path, content in nested.items()}
+    target = make_git_repo(tmp_path / "target", dict(copied, **vendored, **{"app/main.py": "print('own')\n",
+                                                                             "notes/one.md": "# docs\n"}))
+
+    target_tree = local_tree_listing(target)
+    assert {"path": "app/src", "type": "tree"}.items() <= next(e for e in target_tree if e["path"] == "app/src").items()
+
+    matches = match_subtrees(target_tree, local_tree_listing(original), 2, FileClassifier().classify_dir)
+    assert [(m["target_path"], m["comparison_path"], m["files"]) for m in matches] == [("app/src", "src", 4)]
+
+
+def test_copied_subtree_is_reported_whole_and_not_downloaded(tmp_path, write_fixtures, copied_files):
+    """The candidate's copied src/ costs no contents or raw requests and is reported as one subtree"""
+    from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector
+
+    own = "def candidate_only_logic(values):\n    return sorted(set(values), reverse=True)\n"
+    root = write_fixtures(tmp_path, {
+        "me/target": dict({path.replace("src/", "lib/"): content for path, content in copied_files.items()},
+                          **{"main.py": "from lib import ambulance\nprint(ambulance.dispatchambulance({}))\n"}),
+        "other/copy": dict(copied_files, **{"own.py": own}),
+    })
+    with FakeGitHubServer(root) as server:
+        detector = GitHubWidePlagiarismDetector(api_base=server.api_base)
+        detector.search_github_repositories = lambda *args, **kwargs: [
+            {'name': "other/copy", 'url': "https://github.com/other/copy", 'stars': 0,
+             'language': 'Python', 'description': ''}
+        ]
+        results = detector.detect_plagiarism_github_wide("https://github.com/me/target")
+        raw_paths = [entry['path'] for entry in server.request_log if entry['kind'] == 'raw']
+        contents_paths = [entry['path'] for entry in server.request_log if entry['kind'] == 'contents']
+
+    assert not any(path.startswith("/raw/other/copy/main/src/") for path in raw_paths)
+    assert any(path.endswith("/own.py") for path in raw_paths)
+    assert not any(path.endswith("/other/copy/contents/src") for path in contents_paths)
+
+    comparison = results["comparisons"][0]
+    assert [(s["target_path"], s["comparison_path"], s["files"]) for s in comparison["identical_subtrees"]] == \
+        [("lib", "src", 3)]
+    assert comparison["repo_stats"]["files"] == 4
+    # The copied files are still individually identical, and the subtree pairs count as perfect matches
+    assert len(results["identical_files"]) == 3
+    assert results["metrics"]["counters"]["subtree_files_reused"] == 3
+
+def test_near_copies_outside_a_subtree_are_still_scored(tmp_path, monkeypatch, write_fixtures, copied_files):
+    """Subtree files are scored against the rest of the candidate, so a reworked copy elsewhere is still found"""
+    import difflib
+    from github_wide_plagiarism_detector import GitHubWidePlagiarismDetector
+
+    ratios = []
+    sequence_matcher = difflib.SequenceMatcher
+    def counting_matcher(*args, **kwargs):
+        ratios.append(args)
+        return sequence_matcher(*args, **kwargs)
+    monkeypatch.setattr(difflib, "SequenceMatcher", counting_matcher)
+
+    reworked = copied_files["src/ambulance.py"].replace("dispatchambulance", "dispatch_unit").replace("42", "41")
+    root = write_fixtures(tmp_path, {
+        "me/target": {path.replace("src/", "lib/"): content for path, content in copied_files.items()},
+        "other/copy": dict(copied_files, **{"tools/run.py": reworked}),
+    })
+    scores = {}
+    with FakeGitHubServer(root) as server:
+        for subtree_matching in (True, False):
+            detector = GitHubWidePlagiarismDetector(api_base=server.api_base)
+            detector.subtree_matching = subtree_matching
+            detector.search_github_repositories = lambda *args, **kwargs: [
+                {'name': "other/copy", 'url': "https://github.com/other/copy", 'stars': 0,
+                 'language': 'Python', 'description': ''}
+            ]
+            ratios.clear()
+            results = detector.detect_plagiarism_github_wide("https://github.com/me/target")
+            scores[subtree_matching] = (results["comparisons"][0], len(ratios))
+
+    (with_subtrees, with_ratios), (without, without_ratios) = scores[True], scores[False]
+    assert [s["target_path"] for s in with_subtrees["identical_subtrees"]] == ["lib"]
+    assert ("lib/ambulance.py", "tools/run.py") in {(m["target_file"], m["comparison_file"]) for m in with_subtrees["matches"]}
+    # Matches between different files of the copied subtree are not re-reported; the rest are unchanged
+    assert with_subtrees["matches"] == [m for m in without["matches"] if m["comparison_file"] == "tools/run.py"]
+    # Only the three lib/ x tools/run.py pairs need SequenceMatcher; the six cross pairs inside the subtree do not
+    assert (with_ratios, without_ratios) == (3, 9)
+    # 3 copies credited at 1.0 plus the scored pairs, instead of 12 pairs
+    assert with_subtrees["average_similarity"] > without["average_similarity"]
+
+def test_comprehensive_detector_matches_subtrees_before_downloading(tmp_path, write_fixtures, copied_files):
+    """The comprehensive detector takes a remote comparison's copied subtree from the target"""
+    from enhanced_plagiarism_detector import EnhancedPlagiarismDetector
+
+    own = "def candidate_only_logic(values):\n    return sorted(set(values), reverse=True)\n"
+    root = write_fixtures(tmp_path, {
+        "me/target": {path.replace("src/", "lib/"): content for path, content in copied_files.items()},
+        "other/copy": dict(copied_files, **{"own.py": own}),
+    })
+    with FakeGitHubServer(root) as server:
+        detector = EnhancedPlagiarismDetector(config_file="missing_config.json", api_base=server.api_base)
+        detector.target_repo = "https://github.com/me/target"
+        detector.comparison_repos = ["https://github.com/other/copy"]
+        detector.scan_local_repositories = lambda: []
+        results = detector.detect_plagiarism_comprehensive()
+        raw_paths = [entry['path'] for entry in server.request_log if entry['kind'] == 'raw']
+
+    assert not any(path.startswith("/raw/other/copy/main/src/") for path in raw_paths)
+    assert any(path.endswith("/other/copy/main/own.py") for path in raw_paths)
+    comparison = results["comparisons"][0]
+    assert [(s["target_path"], s["comparison_path"]) for s in comparison["identical_subtrees"]] == [("lib", "src")]
+    assert results["summary"]["total_identical_files"] == 3
+    assert results["metrics"]["counters"]["subtree_files_reused"] == 3
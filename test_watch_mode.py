@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental watch-mode rescans against the local fake GitHub server
+"""
+
+import json
+import os
+import urllib.request
+
+from fake_github_server import FakeGitHubServer
+
+AMBULANCE = ("def dispatch_ambulance(request):\n    payload = request.json()\n"
+             "    units = [unit for unit in payload['ambulance'] if unit['available']]\n"
+             "    return sorted(units, key=lambda unit: unit['distance'])[:3]\n")
+FIRETRUCK = ("class HydrantMap:\n    def __init__(self, hydrants):\n        self.by_street = {}\n"
+             "        for hydrant in hydrants:\n            self.by_street.setdefault(hydrant.street, []).append(hydrant)\n\n"
+             "    def nearest(self, street, number):\n"
+             "        return min(self.by_street.get(street, []), key=lambda h: abs(h.number - number), default=None)\n")
+
+def make_watcher(server, repos):
+    from async_github_detector import AsyncGitHubWideDetector
+    from events import EventStream
+    from watch_mode import SubmissionWatcher
+
+    detector = AsyncGitHubWideDetector(api_base=server.api_base, scoring_executor="thread")
+    detector.events = EventStream(quiet=True)
+    return SubmissionWatcher(repos, detector, min_shared=1)
+
+def test_pushes_fetch_only_changed_blobs_and_rescore_affected_pairs(tmp_path, write_fixtures):
+    """Unchanged repositories cost a 304; a push downloads and rescores just the changed file"""
+    root = write_fixtures(tmp_path, {
+        "team/alpha": {"app/ambulance.py": AMBULANCE, "app/firetruck.py": FIRETRUCK},
+        "team/beta": {"src/ambulance.py": AMBULANCE, "src/police.py": "print('nothing shared at all here, really nothing')\n" * 2},
+        "team/gamma": {"main.py": "import sys\n\nprint(sum(int(arg) for arg in sys.argv[1:]), 'is the total')\n"},
+    })
+    with FakeGitHubServer(root) as server:
+        watcher = make_watcher(server, ["team/alpha", "https://github.com/team/beta", "team/gamma"])
+        first = watcher.poll_once()
+        assert sorted(first["changed_repos"]) == ["team/alpha", "team/beta", "team/gamma"]
+        assert [m["files"] for m in watcher.matches()] == [["app/ambulance.py", "src/ambulance.py"]]
+
+        # gamma copies alpha's second handler
+        with open(os.path.join(root, "team/gamma/dispatch.py"), 'w') as f:
+            f.write(FIRETRUCK.replace("hydrants", "plugs"))
+        server.load_fixtures()
+        server.reset_counters()
+        second = watcher.poll_once()
+        assert second["changed_repos"] == ["team/gamma"] and second["changed_files"] == 1
+        assert second["pairs_rescored"] == 1 and second["new_matches"] == 1
+        assert server.request_counts() == {"commits": 3, "compare": 1, "blobs": 1}
+        assert [entry["status"] for entry in server.request_log if entry["kind"] == "commits"].count(304) == 2
+
+        pairs = {tuple(p["repos"]): p for p in watcher.repo_pairs()}
+        assert pairs[("team/alpha", "team/beta")]["identical_files"] == 1
+        assert 0.7 < pairs[("team/alpha", "team/gamma")]["max_similarity"] < 1.0
+
+        # beta deletes its copy; the stale pair disappears without touching the others
+        os.remove(os.path.join(root, "team/beta/src/ambulance.py"))
+        server.load_fixtures()
+        third = watcher.poll_once()
+        assert third["removed_files"] == 1 and third["pairs_rescored"] == 0
+        assert [m["repos"] for m in watcher.matches()] == [["team/alpha", "team/gamma"]]
+
+def test_webhook_push_rechecks_only_the_notified_repository(tmp_path, write_fixtures):
+    """A push payload queues one repository, and the pending-only poll skips the others"""
+    root = write_fixtures(tmp_path, {
+        "team/alpha": {"app/ambulance.py": AMBULANCE},
+        "team/beta": {"src/other.py": "print('nothing shared at all here, really nothing')\n" * 2},
+    })
+    with FakeGitHubServer(root) as server:
+        watcher = make_watcher(server, ["team/alpha", "team/beta"]).start_webhook_server(port=0)
+        try:
+            watcher.poll_once()
+            with open(os.path.join(root, "team/beta/src/copied.py"), 'w') as f:
+                f.write(AMBULANCE)
+            server.load_fixtures()
+            server.reset_counters()
+
+            payload = {"ref": "refs/heads/main", "after": server.repos["team/beta"].head_sha,
+                       "repository": {"full_name": "team/beta", "default_branch": "main"}}
+            request = urllib.request.Request(f"{watcher.address}/webhook", data=json.dumps(payload).encode(),
+                                             headers={"X-GitHub-Event": "push"})
+            with urllib.request.urlopen(request) as response:
+                assert response.status == 202 and json.loads(response.read()) == {"queued": "team/beta"}
+
+            summary = watcher.poll_once(only_pending=True)
+            assert summary["checked"] == 1 and summary["new_matches"] == 1
+            assert "commits" not in server.request_counts()  # the payload already named the head
+
+            with urllib.request.urlopen(f"{watcher.address}/matches") as response:
+                assert json.loads(response.read())["repo_pairs"][0]["identical_files"] == 1
+        finally:
+            watcher.stop()
+
+def test_failed_blob_downloads_are_retried_on_the_next_poll(tmp_path, write_fixtures):
+    """A blob that fails to download is neither removed nor forgotten; the next poll fetches it"""
+    root = write_fixtures(tmp_path, {
+        "team/alpha": {"app/ambulance.py": AMBULANCE},
+        "team/beta": {"src/ambulance.py": AMBULANCE, "src/firetruck.py": FIRETRUCK},
+    })
+    with FakeGitHubServer(root) as server:
+        watcher = make_watcher(server, ["team/alpha", "team/beta"])
+        fetch_blob = watcher.detector.fetch_blob_async
+        failing = {server.repos["team/beta"].blob_shas["src/firetruck.py"]}
+
+        async def flaky_fetch(repo_name, sha):
+            if sha in failing:
+                failing.discard(sha)
+                return None
+            return await fetch_blob(repo_name, sha)
+        watcher.detector.fetch_blob_async = flaky_fetch
+
+        watcher.poll_once()
+        beta = watcher.repos["team/beta"]
+        assert sorted(beta.files) == ["src/ambulance.py"] and list(beta.retry) == ["src/firetruck.py"]
+
+        server.reset_counters()
+        second = watcher.poll_once()
+        assert second["changed_repos"] == ["team/beta"] and second["changed_files"] == 1
+        assert second["removed_files"] == 0
+        assert sorted(beta.files) == ["src/ambulance.py", "src/firetruck.py"] and beta.retry == {}
+        assert server.request_counts() == {"commits": 2, "blobs": 1}
+
+        assert watcher.poll_once()["changed_repos"] == []
+
+def test_pushes_to_other_refs_are_ignored():
+    """Only pushes to the followed branch queue a recheck; deletions and other branches do not"""
+    from watch_mode import SubmissionWatcher
+
+    watcher = SubmissionWatcher(["team/alpha", "https://github.com/team/beta/tree/dev"])
+    head = "a" * 40
+
+    def push(repo, ref, after=head, **repository):
+        return watcher.notify_push({"ref": ref, "after": after,
+                                    "repository": dict({"full_name": repo}, **repository)})
+
+    assert push("team/beta", "refs/heads/main") is None
+    assert push("team/beta", "refs/heads/dev", after="0" * 40) is None
+    assert push("team/alpha", "refs/heads/feature", default_branch="main") is None
+    assert push("team/alpha", "refs/tags/v1", default_branch="main") is None
+    assert watcher.pending == {}
+
+    assert push("team/beta", "refs/heads/dev") == "team/beta"
+    assert push("team/alpha", "refs/heads/main", default_branch="main") == "team/alpha"
+    assert watcher.pending == {"team/beta": head, "team/alpha": head}
+    # Without the default branch in the payload the head is looked up instead of trusted
+    assert push("team/alpha", "refs/heads/feature") == "team/alpha"
+    assert watcher.pending["team/alpha"] is None
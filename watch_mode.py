@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+Watch Mode
+Continuous rescans of a submission set during a live event: every poll asks
+for each repository's head commit (conditional requests, so unchanged
+repositories cost no rate limit), pulls only the changed blobs through the
+compare API, updates one shared fingerprint index in place and re-scores
+just the file pairs that involve changed files
+
+Pushes can also arrive as GitHub-style webhook payloads (POST /webhook) from
+a local stand-in, so a repository is rechecked right away instead of at the
+next poll.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from events import EventStream
+from collusion_clustering import FingerprintIndex, fingerprint_files
+from async_github_detector import AsyncGitHubWideDetector, AsyncRateLimiter
+from github_wide_plagiarism_detector import FileInfo, compare_files
+from repo_spec import split_repo_spec
+
+# GitHub's compare API lists at most this many files; larger pushes fall back to a tree diff
+COMPARE_FILE_LIMIT = 300
+
+PairKey = Tuple[str, str, str, str]  # (repo_a, path_a, repo_b, path_b) with repo_a/path_a first in order
+
+@dataclass
+class WatchedRepo:
+    """Latest known snapshot of a watched repository"""
+    name: str
+    ref: str = "HEAD"  # branch, tag or commit followed
+    head_sha: Optional[str] = None
+    etag: Optional[str] = None
+    files: Dict[str, FileInfo] = field(default_factory=dict)
+    blob_shas: Dict[str, str] = field(default_factory=dict)  # every blob path in the tree -> sha
+    retry: Dict[str, str] = field(default_factory=dict)  # path -> sha of blobs whose download failed
+    updates: int = 0
+    last_changed: Optional[float] = None
+
+class SubmissionWatcher:
+    def __init__(self, repos: List[str], detector: AsyncGitHubWideDetector = None, ref: str = "HEAD",
+                 similarity_threshold: float = None, min_shared: int = 3, k: int = 5, window: int = 4):
+        """
+        Initialize the watcher
+
+        Args:
+            repos: Repository URLs, "owner/repo" names or "owner/repo@ref" specs to watch
+            detector: Async detector supplying the HTTP layer, filters and blob cache
+            ref: Branch (or HEAD) followed in repositories whose spec names no ref
+            similarity_threshold: Minimum similarity recorded as a match (default: the detector's)
+            min_shared: Shared fingerprints needed before a file pair is scored
+            k: Tokens per k-gram for the fingerprint index
+            window: Winnowing window size
+        """
+        self.detector = detector or AsyncGitHubWideDetector()
+        self.ref = ref
+        self.similarity_threshold = (similarity_threshold if similarity_threshold is not None
+                                     else self.detector.similarity_threshold)
+        self.min_shared = min_shared
+        self.index = FingerprintIndex(k=k, window=window)
+        self.repos: Dict[str, WatchedRepo] = {}
+        for repo in repos:
+            name, repo_ref = split_repo_spec(self.detector.get_repo_spec(repo))
+            self.repos[name] = WatchedRepo(name, ref=repo_ref or ref)
+        self.pair_scores: Dict[PairKey, Dict] = {}
+        self._pairs_by_file: Dict[Tuple[str, str], set] = defaultdict(set)
+        self.pending: Dict[str, Optional[str]] = {}  # repo -> head sha announced by a webhook
+        self.polls = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._httpd = None
+
+    @property
+    def events(self) -> EventStream:
+        return self.detector.events
+
+    @property
+    def metrics(self):
+        return self.detector.metrics
+
+    def watched_name(self, full_name: str) -> Optional[str]:
+        """Watched repository matching an "owner/repo" name, or None"""
+        return next((name for name in self.repos if name.lower() == full_name.lower()), None)
+
+    def notify_push(self, payload: Dict) -> Optional[str]:
+        """
+        Queue a repository for an immediate recheck from a push webhook payload
+
+        Only pushes to the followed branch count; other branches, tags and branch
+        deletions are ignored. A repository following its default branch takes the
+        payload's head only when the payload names that branch, and otherwise
+        looks its head up again.
+
+        Returns:
+            Name of the queued repository, or None if the payload is for an unknown
+            repository or another ref
+        """
+        repository = payload.get('repository') or {}
+        name = self.watched_name(repository.get('full_name', ''))
+        after = payload.get('after')
+        if not name or payload.get('deleted') or not after or set(after) == {'0'}:
+            return None
+        branch = self.repos[name].ref
+        if branch == "HEAD":
+            branch = repository.get('default_branch')
+            if branch is None:
+                after = None  # cannot tell whether this push moved the default branch
+        if branch is not None and payload.get('ref') != f"refs/heads/{branch}":
+            return None
+        with self._lock:
+            self.pending[name] = after
+        self._wake.set()
+        return name
+
+    # --- Fetching changes ---------------------------------------------------------------
+
+    async def _head_sha(self, watched: WatchedRepo) -> Optional[str]:
+        """Current head commit, or the known one when the conditional request says unchanged"""
+        headers = {'If-None-Match': watched.etag} if watched.etag else None
+        response = await self.detector._request(
+            f"{self.detector.api_base}/repos/{watched.name}/commits/{watched.ref}", headers=headers
+        )
+        if response is None:
+            return None
+        if response.status_code == 304:
+            self.metrics.incr("repos_not_modified")
+            return watched.head_sha
+        if response.status_code != 200:
+            self.events.error("watch_head_failed", f"❌ Could not read head of {watched.name}: {response.status_code}",
+                              repo=watched.name, status=response.status_code)
+            return None
+        watched.etag = response.headers.get('ETag')
+        return response.json()['sha']
+
+    async def _compare(self, watched: WatchedRepo, head: str) -> Optional[Tuple[List[Dict], List[str]]]:
+        """Changed blob entries and removed paths from the compare API, or None if it cannot say"""
+        response = await self.detector._request(
+            f"{self.detector.api_base}/repos/{watched.name}/compare/{watched.head_sha}...{head}"
+        )
+        if response is None or response.status_code != 200:
+            return None
+        files = response.json().get('files', [])
+        if len(files) >= COMPARE_FILE_LIMIT:
+            return None
+        changed, removed = [], []
+        for item in files:
+            if item.get('previous_filename'):
+                removed.append(item['previous_filename'])
+            if item['status'] == 'removed':
+                removed.append(item['filename'])
+            else:
+                changed.append({'path': item['filename'], 'type': 'blob', 'sha': item['sha']})
+        return changed, removed
+
+    async def _tree_diff(self, watched: WatchedRepo, head: str) -> Tuple[List[Dict], List[str]]:
+        """Changed blob entries and removed paths from a full tree listing (first sync or compare fallback)"""
+        response = await self.detector._request(
+            f"{self.detector.api_base}/repos/{watched.name}/git/trees/{head}", {'recursive': 1}
+        )
+        if response is None or response.status_code != 200:
+            raise RuntimeError(f"tree listing failed ({response.status_code if response is not None else 'no response'})")
+        tree = response.json().get('tree', [])
+        blobs = {entry['path'] for entry in tree if entry.get('type') == 'blob'}
+        changed = [entry for entry in tree
+                   if entry.get('type') == 'tree' or
+                   (entry.get('type') == 'blob' and watched.blob_shas.get(entry['path']) != entry['sha'])]
+        return changed, [path for path in watched.blob_shas if path not in blobs]
+
+    async def _sync_repo(self, watched: WatchedRepo, pushed_head: str = None):
+        """
+        Bring one repository up to its head commit, downloading only changed blobs
+
+        Returns:
+            (changed FileInfos, removed paths), or None if the repository did not change
+        """
+        head = pushed_head or await self._head_sha(watched)
+        if head is None or (head == watched.head_sha and not watched.retry):
+            return None
+
+        entries, removed = [], []
+        if head != watched.head_sha:
+            diff = await self._compare(watched, head) if watched.head_sha else None
+            if diff is None:
+                diff = await self._tree_diff(watched, head)
+            entries, removed = diff
+        # Blobs that failed to download earlier are fetched again unless the diff supersedes them
+        covered = {entry['path'] for entry in entries} | set(removed)
+        entries = entries + [{'path': path, 'type': 'blob', 'sha': sha}
+                             for path, sha in watched.retry.items() if path not in covered]
+
+        excluded_files = []
+        selected = self.detector.select_tree_blobs(entries, excluded_files)
+        selected_paths = {entry['path'] for entry in selected}
+        dropped = [entry['path'] for entry in entries
+                   if entry.get('type') == 'blob' and entry['path'] not in selected_paths]
+        contents = await asyncio.gather(*(self.detector.fetch_blob_async(watched.name, entry['sha'])
+                                          for entry in selected))
+
+        changed = []
+        failed = {}
+        for entry, content in zip(selected, contents):
+            if content is None:
+                failed[entry['path']] = entry['sha']
+            elif (len(content) >= self.detector.min_file_size and
+                    not self.detector.file_classifier.classify_content(entry['path'], content)):
+                changed.append(FileInfo(
+                    path=entry['path'],
+                    content=content,
+                    hash=hashlib.md5(content.encode()).hexdigest(),
+                    size=len(content),
+                    lines=len(content.splitlines())
+                ))
+            else:
+                dropped.append(entry['path'])
+
+        if failed:
+            self.events.warning("watch_blobs_failed", f"⚠️  {len(failed)} blobs of {watched.name} failed to download, "
+                                f"retrying next poll", repo=watched.name, paths=sorted(failed))
+        # A failed blob keeps its old SHA, so snapshots and tree diffs still see it as outdated
+        for entry in entries:
+            if entry.get('type') == 'blob' and entry['path'] not in failed:
+                watched.blob_shas[entry['path']] = entry['sha']
+        for path in removed:
+            watched.blob_shas.pop(path, None)
+        watched.retry = failed
+        if head == watched.head_sha and not changed and not dropped:
+            return None
+        watched.head_sha = head
+        # Paths that stopped qualifying (e.g. now minified) leave the index like removed ones
+        return changed, [path for path in removed + dropped if path in watched.files]
+
+    # --- Incremental index and scoring --------------------------------------------------
+
+    def _apply(self, watched: WatchedRepo, changed: List[FileInfo], removed: List[str]) -> List[int]:
+        """Swap changed files into the snapshot and the index, dropping their stale pair scores"""
+        for path in removed:
+            watched.files.pop(path, None)
+        for file_info in changed:
+            watched.files[file_info.path] = file_info
+        for path in set(removed) | {f.path for f in changed}:
+            for key in self._pairs_by_file.pop((watched.name, path), ()):
+                self.pair_scores.pop(key, None)
+        watched.updates += 1
+        watched.last_changed = time.time()
+        file_fingerprints = fingerprint_files([(f.path, f.content) for f in changed], self.index.k, self.index.window)
+        return self.index.update_repo(watched.name, file_fingerprints, removed)
+
+    def _rescore(self, file_ids: List[int]) -> Tuple[int, List[Dict]]:
+        """
+        Score every changed file against the files sharing its fingerprints
+
+        Returns:
+            (pairs scored, new matches)
+        """
+        scored = set()
+        new_matches = []
+        with self.metrics.timer("score"):
+            for file_id in file_ids:
+                for other_id in self.index.related_files(file_id, self.min_shared):
+                    pair = (min(file_id, other_id), max(file_id, other_id))
+                    if pair in scored:
+                        continue
+                    scored.add(pair)
+                    match = self._score_pair(*pair)
+                    if match:
+                        new_matches.append(match)
+        self.metrics.incr("file_pairs_compared", len(scored))
+        return len(scored), new_matches
+
+    def _score_pair(self, file_a: int, file_b: int) -> Optional[Dict]:
+        (repo_a, path_a), (repo_b, path_b) = [(self.index.repos[r], p) for r, p in
+                                              (self.index.files[file_a], self.index.files[file_b])]
+        if (repo_a, path_a) > (repo_b, path_b):
+            repo_a, path_a, repo_b, path_b = repo_b, path_b, repo_a, path_a
+        left, right = self.repos[repo_a].files[path_a], self.repos[repo_b].files[path_b]
+        if left.hash == right.hash:
+            similarity = 1.0
+        else:
+            matches, _, _ = compare_files([left], [right], self.similarity_threshold, self.metrics)
+            if not matches:
+                return None
+            similarity = matches[0]['similarity']
+        key = (repo_a, path_a, repo_b, path_b)
+        match = {
+            "repos": [repo_a, repo_b],
+            "files": [path_a, path_b],
+            "similarity": round(similarity, 4),
+            "identical": left.hash == right.hash,
+            "detected": time.time()
+        }
+        self.pair_scores[key] = match
+        self._pairs_by_file[(repo_a, path_a)].add(key)
+        self._pairs_by_file[(repo_b, path_b)].add(key)
+        return match
+
+    # --- Polling ------------------------------------------------------------------------
+
+    async def poll_once_async(self, only_pending: bool = False) -> Dict:
+        """
+        Check every watched repository (or only webhook-notified ones) and rescore changes
+
+        Returns:
+            Poll summary (repositories checked and changed, files, pairs rescored, new matches)
+        """
+        started = time.time()
+        self.polls += 1
+        self._wake.clear()
+        with self._lock:
+            pending, self.pending = self.pending, {}
+        names = [name for name in self.repos if name in pending] if only_pending else list(self.repos)
+        self.detector.limiter = AsyncRateLimiter(self.detector.rate_limits, max_concurrency=self.detector.max_concurrency)
+
+        async def sync(name: str):
+            try:
+                return await self._sync_repo(self.repos[name], pending.get(name))
+            except Exception as e:
+                self.events.error("watch_sync_failed", f"❌ Could not update {name}: {e}", repo=name, error=str(e))
+                return None
+
+        with self.metrics.timer("fetch"):
+            synced = await asyncio.gather(*(sync(name) for name in names))
+
+        file_ids = []
+        changed_repos = []
+        changed_files = removed_files = 0
+        for name, diff in zip(names, synced):
+            if diff is None:
+                continue
+            changed, removed = diff
+            changed_repos.append(name)
+            changed_files += len(changed)
+            removed_files += len(removed)
+            file_ids += self._apply(self.repos[name], changed, removed)
+            self.events.info("repo_changed", f"🔁 {name}: {len(changed)} changed, {len(removed)} removed files "
+                             f"(head {self.repos[name].head_sha[:7]})",
+                             repo=name, head=self.repos[name].head_sha, changed=len(changed), removed=len(removed))
+
+        pairs_scored, new_matches = self._rescore(file_ids)
+        for match in new_matches:
+            label = "identical" if match["identical"] else f"{match['similarity']:.0%} similar"
+            self.events.warning("pair_match", f"🚨 {match['repos'][0]}/{match['files'][0]} ↔ "
+                                f"{match['repos'][1]}/{match['files'][1]} ({label})", **match)
+
+        summary = {
+            "poll": self.polls,
+            "checked": len(names),
+            "changed_repos": changed_repos,
+            "changed_files": changed_files,
+            "removed_files": removed_files,
+            "pairs_rescored": pairs_scored,
+            "new_matches": len(new_matches),
+            "total_matches": len(self.pair_scores),
+            "elapsed_seconds": round(time.time() - started, 3)
+        }
+        self.events.info("watch_poll", f"👀 Poll {self.polls}: {len(changed_repos)}/{len(names)} repositories changed, "
+                         f"{pairs_scored} file pairs rescored, {len(new_matches)} new matches", **summary)
+        return summary
+
+    def poll_once(self, only_pending: bool = False) -> Dict:
+        """Synchronous entry point for one poll"""
+        return asyncio.run(self.poll_once_async(only_pending=only_pending))
+
+    def run(self, interval: float = 60.0, iterations: int = None, on_poll=None):
+        """
+        Poll every `interval` seconds, rechecking webhook-notified repositories in between
+
+        Args:
+            interval: Seconds between full polls
+            iterations: Stop after this many polls (default: run until interrupted)
+            on_poll: Callable(summary) after each poll (e.g. to save matches)
+        """
+        next_full = 0.0
+        while iterations is None or self.polls < iterations:
+            full = time.monotonic() >= next_full
+            if full:
+                next_full = time.monotonic() + interval
+            summary = self.poll_once(only_pending=not full)
+            if on_poll:
+                on_poll(summary)
+            self._wake.wait(max(0.0, next_full - time.monotonic()))
+
+    # --- Views --------------------------------------------------------------------------
+
+    def matches(self) -> List[Dict]:
+        """Current file-pair matches, most similar first"""
+        return sorted(self.pair_scores.values(), key=lambda m: (-m["similarity"], m["repos"], m["files"]))
+
+    def repo_pairs(self) -> List[Dict]:
+        """Current matches grouped per repository pair with a risk tier"""
+        grouped = defaultdict(list)
+        for match in self.pair_scores.values():
+            grouped[tuple(match["repos"])].append(match)
+        pairs = []
+        for repos, matches in grouped.items():
+            identical = sum(1 for m in matches if m["identical"])
+            suspicious = sum(1 for m in matches if not m["identical"] and m["similarity"] > 0.9)
+            pairs.append({
+                "repos": list(repos),
+                "identical_files": identical,
+                "suspicious_files": suspicious,
+                "matched_files": len(matches),
+                "max_similarity": max(m["similarity"] for m in matches),
+                "risk": self.detector.assess_risk(identical, suspicious)
+            })
+        return sorted(pairs, key=lambda p: (-p["identical_files"], -p["max_similarity"], p["repos"]))
+
+    def stats(self) -> Dict:
+        return {
+            "repositories": len(self.repos),
+            "synced": sum(1 for watched in self.repos.values() if watched.head_sha),
+            "files": sum(len(watched.files) for watched in self.repos.values()),
+            "fingerprints": len(self.index.postings),
+            "matches": len(self.pair_scores),
+            "polls": self.polls,
+            "pending": len(self.pending)
+        }
+
+    # --- Webhook receiver ---------------------------------------------------------------
+
+    def start_webhook_server(self, host: str = '127.0.0.1', port: int = 8788) -> 'SubmissionWatcher':
+        """Accept push webhooks (and serve current matches) in a background thread"""
+        self._httpd = ThreadingHTTPServer((host, port), WatchWebhookHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.watcher = self
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def address(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+class WatchWebhookHandler(BaseHTTPRequestHandler):
+    server_version = "PlagiarismWatch/1.0"
+
+    def log_message(self, format, *args):
+        pass  # Watch events are the log
+
+    def do_GET(self):
+        watcher: SubmissionWatcher = self.server.watcher
+        path = urlparse(self.path).path.rstrip('/')
+        if path == '/health':
+            return self._send_json(200, watcher.stats())
+        if path == '/matches':
+            return self._send_json(200, {"repo_pairs": watcher.repo_pairs(), "matches": watcher.matches()})
+        return self._send_json(404, {'error': 'Not Found'})
+
+    def do_POST(self):
+        watcher: SubmissionWatcher = self.server.watcher
+        if urlparse(self.path).path.rstrip('/') != '/webhook':
+            return self._send_json(404, {'error': 'Not Found'})
+        if self.headers.get('X-GitHub-Event', 'push') != 'push':
+            return self._send_json(202, {'ignored': self.headers['X-GitHub-Event']})
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        except ValueError as e:
+            return self._send_json(400, {'error': f"Invalid JSON payload: {e}"})
+        if not watcher.watched_name((payload.get('repository') or {}).get('full_name', '')):
+            return self._send_json(404, {'error': 'Repository is not watched'})
+        repo = watcher.notify_push(payload)
+        if not repo:
+            return self._send_json(202, {'ignored': payload.get('ref')})
+        return self._send_json(202, {'queued': repo})
+
+    def _send_json(self, status: int, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+def main():
+    """Watch a submission set until interrupted"""
+    parser = argparse.ArgumentParser(description="Incremental plagiarism rescans of a live submission set")
+    parser.add_argument("source", nargs="?", default="wins.txt", help="Targets file (GitHub URLs / devpost CSV)")
+    parser.add_argument("--interval", type=float, default=60.0, help="Seconds between full polls")
+    parser.add_argument("--iterations", type=int, default=None, help="Stop after this many polls")
+    parser.add_argument("--ref", default="HEAD", help="Branch followed in every repository")
+    parser.add_argument("--api-base", default=None,
+                        help="GitHub API base URL (e.g. a local fake server); defaults to $GITHUB_API_URL")
+    parser.add_argument("--webhook-port", type=int, default=None,
+                        help="Also accept push webhooks on this port (POST /webhook)")
+    parser.add_argument("--output", default="watch_matches.json", help="Current matches, rewritten after each poll")
+    parser.add_argument("--quiet", action="store_true", help="Only show warnings (new matches) and errors")
+    args = parser.parse_args()
+
+    from batch_plagiarism_check import load_targets
+    targets, skipped = load_targets(args.source)
+    if skipped:
+        print(f"⚠️  Skipped {len(skipped)} lines without a GitHub repository URL")
+
+    detector = AsyncGitHubWideDetector(github_token=os.getenv('GITHUB_TOKEN'), api_base=args.api_base)
+    detector.events = EventStream(quiet=args.quiet)
+    watcher = SubmissionWatcher(targets, detector, ref=args.ref)
+    print(f"👀 Watching {len(watcher.repos)} repositories every {args.interval:g}s")
+    if args.webhook_port is not None:
+        watcher.start_webhook_server(port=args.webhook_port)
+        print(f"🪝 Push webhooks: POST {watcher.address}/webhook")
+
+    def save(summary: Dict):
+        with open(args.output, 'w') as f:
+            json.dump({"summary": summary, "repo_pairs": watcher.repo_pairs(), "matches": watcher.matches()}, f, indent=2)
+
+    try:
+        watcher.run(interval=args.interval, iterations=args.iterations, on_poll=save)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping watch mode")
+    finally:
+        watcher.stop()
+    print(f"📄 Matches saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()